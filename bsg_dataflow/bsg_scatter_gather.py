@@ -1,8 +1,5 @@
 #!/usr/bin/python
 
-import sys;
-import math;
-
 # Given a bit vector, generate
 # permutation vectors that perform
 # concentration (fwd) and deconcentration (bkwd).
@@ -19,33 +16,47 @@ import math;
 #     0     1 -----> 0  <------ 0
 #
 #
+# Usage:
+#
+#   bsg_scatter_gather.py [table_max]       # the module; case tables for
+#                                           # vec_size_lp < table_max (12),
+#                                           # a prefix network above that
+#   bsg_scatter_gather.py report [max]      # cost of the two, per size
+#   bsg_scatter_gather.py check [max]       # prefix network vs. the tables
+#
+# The tables grow as 2**vec_size_lp; the prefix network is a log depth
+# popcount scan for bk_o (the rank of each set bit) and a compaction
+# network for fwd_o, in which each set bit moves down by its distance
+# i - rank, 2**s places at stage s if bit s of the distance is set. The
+# distances never decrease with i, so two bits never meet at a stage;
+# this is the monotone routing half of a Benes network.
+#
 
+from __future__ import print_function
 
-max_channel = 12;
+import sys;
+import math;
+import random;
 
-# input
-channels = [x for x in range(1,max_channel)];
+max_channel = 12;
 
 # converts from an integer to a list of bit integers
 def int_to_bit_list(a,pad) :
     b = [int(x) for x in bin(a)[2:]]
     return ([0] * (pad - len(b))) + b;
 
-def print_bit_list(a) :
-    for x in a :
-        sys.stdout.write(str(x))
+def bit_list_string(a) :
+    return "".join([str(x) for x in a]);
 
 def bits_to_rep(x) :
     return len(bin(x-1))-2;
 
 def print_case_line(a,result,var_name,result_x):
-    print "        ",str(len(a))+"'b",
-    print_bit_list(a)
-    print ": "+var_name+" = ",str(bits_to_rep(len(a))*len(a))+"'b",
-    for x in reversed(result) :
-        print_bit_list(int_to_bit_list(x,bits_to_rep(len(a))));
-        #sys.stdout.write("_")
-    print "; // ", ' '.join([str(y) for y in reversed(result_x)]);
+    width = bits_to_rep(len(a));
+    print("         "+str(len(a))+"'b" + bit_list_string(a)
+          + ": "+var_name+" =  "+str(width*len(a))+"'b"
+          + "".join([bit_list_string(int_to_bit_list(x,width)) for x in reversed(result)])
+          + "; //  " + ' '.join([str(y) for y in reversed(result_x)]));
 
 def gen_vec(channels, fn) :
 
@@ -58,37 +69,44 @@ def gen_vec(channels, fn) :
     print ("        default: "+q+"= 'X;");
     print ("    endcase");
 
-def gen_fwd_vec_line_helper(a,dpath) :
-    i = 0;
+# the four permutation vectors of one bit vector a (msb first), as lists
+# indexed by position: fwd, fwd datapath, bk, bk datapath.
+def permutation_vecs(a) :
+    fwd = [];
     spare = -1;
-    pos  = 0;
-    result = [];
-    result_x = [];
 
-    for x in reversed(a) :
+    for (i, x) in enumerate(reversed(a)) :
         if (x) :
-            if (dpath) :
-                result.append(i-pos);
-            else :
-                result.append(i);
-            pos = pos+1;
+            fwd.append(i);
         else :
             spare = i;
-        i = i+1;
 
-    # add unused items
-    result_x = result + [ "X" ] * (len(a)-len(result));
+    # number all of the bits that are set; for the others any unused
+    # value would be okay, the ones below are always safe
+    bk = [];
+    rank = 0;
+    for x in reversed(a) :
+        bk.append(rank if x else None);
+        rank = rank + x;
+
+    unused = len(a) - len(fwd);
+    return ( fwd + [spare] * unused
+           , [x - k for (k, x) in enumerate(fwd)] + [0] * unused
+           , [len(a)-1 if x is None else x for x in bk]
+           , [0 if x is None else x for x in bk]
+           , fwd + [ "X" ] * unused
+           , ["X" if x is None else x for x in bk]
+           );
+
+def gen_fwd_vec_line_helper(a,dpath) :
+    (fwd, fwd_dpath, bk, bk_dpath, fwd_x, bk_x) = permutation_vecs(a);
 
     if (dpath) :
-        result = result +  [0] * (len(a)-len(result));
-        print_case_line (a,result,"fwd_datapath_o",result_x);
+        print_case_line (a,fwd_dpath,"fwd_datapath_o",[d if x != "X" else x for (d, x) in zip(fwd_dpath, fwd_x)]);
         return "fwd_datapath_o"
-    else: 
-        result = result + [spare] * (len(a)-len(result));
-        print_case_line (a,result,"fwd_o",result_x);
+    else:
+        print_case_line (a,fwd,"fwd_o",fwd_x);
         return "fwd_o"
-    # print it all out
-    
 
 def gen_fwd_vec_line_dpath(a) :
     return gen_fwd_vec_line_helper(a,1);
@@ -97,32 +115,13 @@ def gen_fwd_vec_line(a) :
     return gen_fwd_vec_line_helper(a,0);
 
 def gen_back_vec_line_helper(a,dpth) :
-    i = 0;
-    result = [];
-    result_x = [];
-
-    # number all of the bits that are set
-    # for forward permutation
-    for x in reversed(a) :
-        if (x) :
-            result.append(i);
-            result_x.append(i);
-            i = i+1;
-        else :
-            # this is always a safe value
-            # any other unused value would be okay
-            # too, and possibly will reduce logic.
-            if (dpth) :
-                result.append(0),
-            else :
-                result.append(len(a)-1),
-            result_x.append("X");
+    (fwd, fwd_dpath, bk, bk_dpath, fwd_x, bk_x) = permutation_vecs(a);
 
     if (dpth) :
-        print_case_line (a,result,"bk_datapath_o",result_x);
+        print_case_line (a,bk_dpath,"bk_datapath_o",bk_x);
         return "bk_datapath_o";
     else :
-        print_case_line (a,result,"bk_o",result_x);
+        print_case_line (a,bk,"bk_o",bk_x);
         return "bk_o";
 
 def gen_back_vec_line_dpath(a) :
@@ -134,23 +133,23 @@ def gen_back_vec_line(a) :
 
 def generate_code_for_channel(chan) :
 
-    print "\nif (vec_size_lp == "+str(chan)+")"
-    print "  begin"
+    print("\nif (vec_size_lp == "+str(chan)+")")
+    print("  begin")
 
-    print "    // backward vec";
+    print("    // backward vec");
 
     gen_vec(chan,gen_back_vec_line)
 
-    print "\n    // backward vec datapath";
+    print("\n    // backward vec datapath");
 
     gen_vec(chan,gen_back_vec_line_dpath)
 
-    
-    print "\n    // fwd vec";
+
+    print("\n    // fwd vec");
 
     gen_vec(chan,gen_fwd_vec_line)
 
-    print "\n    // fwd datapath vec";
+    print("\n    // fwd datapath vec");
 
     gen_vec(chan,gen_fwd_vec_line_dpath)
 
@@ -159,9 +158,181 @@ def generate_code_for_channel(chan) :
     print ("  end")
 
 
+# the same network for every vec_size_lp >= table_max
+def generate_prefix_code(table_max) :
+
+    print("""
+if (vec_size_lp >= """ + str(table_max) + """)
+  begin : prefix
+    localparam lg_lp = `BSG_SAFE_CLOG2(vec_size_lp);
+
+    genvar s, i;
+
+    // backward vec: the rank of each set bit, an exclusive prefix
+    // popcount; count[s][i] is the popcount of vec_i[i-2**s+1..i]
+
+    wire [lg_lp:0][vec_size_lp-1:0][lg_lp:0] count;
+    wire [vec_size_lp-1:0][lg_lp-1:0] rank;
+
+    for (i = 0; i < vec_size_lp; i++)
+      begin : scan_in
+        assign count[0][i] = { lg_lp'(0), vec_i[i] };
+        if (i == 0)
+          assign rank[i] = '0;
+        else
+          assign rank[i] = count[lg_lp][i-1][lg_lp-1:0];
+      end
+
+    for (s = 0; s < lg_lp; s++)
+      begin : scan
+        for (i = 0; i < vec_size_lp; i++)
+          begin : c
+            if (i >= (1 << s))
+              assign count[s+1][i] = count[s][i] + count[s][i-(1 << s)];
+            else
+              assign count[s+1][i] = count[s][i];
+          end
+      end
+
+    // fwd vec: each set bit moves down by dist = i - rank[i], 2**s
+    // places at stage s if bit s of dist is set. dist never decreases
+    // with i, so a place never takes a bit from above and keeps its own.
+
+    wire [lg_lp:0][vec_size_lp-1:0]            move_v;
+    wire [lg_lp:0][vec_size_lp-1:0][lg_lp-1:0] move_dist;
+
+    for (i = 0; i < vec_size_lp; i++)
+      begin : route_in
+        assign move_v   [0][i] = vec_i[i];
+        assign move_dist[0][i] = lg_lp'(i) - rank[i];
+      end
+
+    for (s = 0; s < lg_lp; s++)
+      begin : route
+        for (i = 0; i < vec_size_lp; i++)
+          begin : m
+            wire stay = move_v[s][i] & ~move_dist[s][i][s];
+            if (i + (1 << s) < vec_size_lp)
+              begin : above
+                wire take = move_v[s][i+(1 << s)] & move_dist[s][i+(1 << s)][s];
+                assign move_v   [s+1][i] = stay | take;
+                assign move_dist[s+1][i] = take ? move_dist[s][i+(1 << s)] : move_dist[s][i];
+              end
+            else
+              begin : top
+                assign move_v   [s+1][i] = stay;
+                assign move_dist[s+1][i] = move_dist[s][i];
+              end
+          end
+      end
+
+    // empty fwd slots take the highest unused slot, as the tables do
+
+    logic [lg_lp-1:0] spare;
+
+    always_comb
+      begin
+        spare = '0;
+        for (integer j = 0; j < vec_size_lp; j++)
+          if (~vec_i[j])
+            spare = lg_lp'(j);
+      end
+
+    always_comb
+      for (integer j = 0; j < vec_size_lp; j++)
+        begin
+          bk_o          [j*lg_lp+:lg_lp] = vec_i[j] ? rank[j] : lg_lp'(vec_size_lp-1);
+          bk_datapath_o [j*lg_lp+:lg_lp] = vec_i[j] ? rank[j] : '0;
+          fwd_o         [j*lg_lp+:lg_lp] = move_v[lg_lp][j] ? lg_lp'(j) + move_dist[lg_lp][j] : spare;
+          fwd_datapath_o[j*lg_lp+:lg_lp] = move_v[lg_lp][j] ? move_dist[lg_lp][j] : '0;
+        end
+  end""")
 
+#
+# python model of the prefix network, stage for stage; returns the
+# same lists as permutation_vecs
+#
 
-print """
+def prefix_vecs(a) :
+    n = len(a);
+    lg = bits_to_rep(n);
+    vec = list(reversed(a));
+
+    count = vec[:];
+    for s in range(0,lg) :
+        count = [count[i] + (count[i-(1 << s)] if i >= (1 << s) else 0) for i in range(0,n)];
+    rank = [0] + [count[i-1] % (1 << lg) for i in range(1,n)];
+
+    v = vec[:];
+    dist = [(i - rank[i]) % (1 << lg) for i in range(0,n)];
+    for s in range(0,lg) :
+        stay = [v[i] and not (dist[i] >> s) & 1 for i in range(0,n)];
+        take = [i + (1 << s) < n and v[i+(1 << s)] and (dist[i+(1 << s)] >> s) & 1 for i in range(0,n)];
+        assert not any([stay[i] and take[i] for i in range(0,n)]), "collision at stage " + str(s);
+        dist = [dist[i+(1 << s)] if take[i] else dist[i] for i in range(0,n)];
+        v = [bool(stay[i] or take[i]) for i in range(0,n)];
+
+    spare = 0;
+    for j in range(0,n) :
+        if (not vec[j]) :
+            spare = j;
+
+    return ( [(j + dist[j]) % (1 << lg) if v[j] else spare for j in range(0,n)]
+           , [dist[j] if v[j] else 0 for j in range(0,n)]
+           , [rank[j] if vec[j] else n-1 for j in range(0,n)]
+           , [rank[j] if vec[j] else 0 for j in range(0,n)]
+           );
+
+# exhaustive up to 2**12 vectors per size, random above that
+def check_prefix(max_size, samples=4096) :
+    rng = random.Random(1);
+    bad = 0;
+    for n in range(1,max_size+1) :
+        if (2**n <= samples) :
+            vecs = range(0,2**n);
+        else :
+            vecs = [rng.getrandbits(n) for x in range(0,samples // 4)];
+            # runs of ones and zeros at both ends
+            vecs = vecs + [(1 << k) - 1 for k in range(0,n+1)] + [(2**n - 1) ^ ((1 << k) - 1) for k in range(0,n+1)];
+        for j in vecs :
+            a = int_to_bit_list(j,n);
+            if (prefix_vecs(a) != permutation_vecs(a)[0:4]) :
+                if (bad == 0) :
+                    print("mismatch: vec_size_lp " + str(n) + " vec_i " + bit_list_string(a));
+                bad = bad + 1;
+    print(str(max_size) + " sizes checked, " + str(bad) + " mismatches");
+    return bad == 0;
+
+#
+# cost of the two ways; the table cost is in rows of the four case
+# statements and lines of verilog, the network in adder and mux bits
+# and in stages of adders and 2:1 muxes.
+#
+
+def prefix_cost(n) :
+    lg = bits_to_rep(n);
+    adders = sum([max(0, n - (1 << s)) for s in range(0,lg)]);
+    route  = adders;
+    return { "adders"     : adders
+           , "adder_bits" : adders * (lg+1)
+           # a 2:1 mux per place and stage that has a place above it
+           # carries valid and dist; then the four output muxes
+           , "mux_bits"   : route * (lg+1) + 4 * n * lg
+           , "stages"     : 2 * lg
+           };
+
+def report(max_size) :
+    print("# bsg_scatter_gather: case tables vs. prefix network")
+    print("%5s %3s %22s %12s %8s %10s %9s %6s" % ("size", "lg", "table_rows", "table_lines", "adders", "adder_bits", "mux_bits", "stages"));
+    for n in range(1,max_size+1) :
+        c = prefix_cost(n);
+        rows = 4 * 2**n;
+        # generate_code_for_channel writes 27 lines besides the rows
+        print("%5d %3d %22d %12d %8d %10d %9d %6d" % (n, bits_to_rep(n), rows, rows + 27, c["adders"], c["adder_bits"], c["mux_bits"], c["stages"]));
+
+
+def generate_module(table_max) :
+    print("""
 // MBT 8-18-2014
 // bsg_scatter_gather
 // generated by bsg_scatter_gather.py;
@@ -175,10 +346,10 @@ print """
 //
 //           bit   fwd          bkwd
 //   pos.   vec    vec          vec
-//     3     1 --\    1      --- 2
-//                \         /
-//     2     1 -\  -> 3  <--  -- 1
-//               \           /
+//     3     1 --\\    1      --- 2
+//                \\         /
+//     2     1 -\\  -> 3  <--  -- 1
+//               \\           /
 //     1     0    --> 2  <---    3 --> 1
 
 //     0     1 -----> 0  <------ 0
@@ -187,28 +358,38 @@ print """
 // reusing the same empty slot multiple times. This allows
 // control logic to be unselected.
 //
+// Sizes below """ + str(table_max) + """ are case tables; larger ones are a log depth
+// prefix popcount and compaction network (see bsg_scatter_gather.py).
+//
+
 
+`include "bsg_defines.v"
 
-module bsg_scatter_gather #(`BSG_INV_PARAM(vec_size_lp))
+module bsg_scatter_gather #(parameter `BSG_INV_PARAM(vec_size_lp))
        (input [vec_size_lp-1:0] vec_i
        ,output reg [vec_size_lp*`BSG_SAFE_CLOG2(vec_size_lp)-1:0] fwd_o
        ,output reg [vec_size_lp*`BSG_SAFE_CLOG2(vec_size_lp)-1:0] fwd_datapath_o
        ,output reg [vec_size_lp*`BSG_SAFE_CLOG2(vec_size_lp)-1:0] bk_o
        ,output reg [vec_size_lp*`BSG_SAFE_CLOG2(vec_size_lp)-1:0] bk_datapath_o       
        );
-"""
-
+""")
 
-for x in channels :
-    generate_code_for_channel(x)
+    for x in range(1,table_max) :
+        generate_code_for_channel(x)
 
-print "// synopsys translate_off";
-print "initial assert (vec_size_lp < ",max_channel,") else $error(\"bsg_scatter_gather: vec_size_lp too large %d\", vec_size_lp);";
-print "// synopsys translate_on";
+    generate_prefix_code(table_max)
 
-print "endmodule";
+    print("endmodule");
+    print("");
+    print("`BSG_ABSTRACT_MODULE(bsg_scatter_gather)")
 
-print "`BSG_ABSTRACT_MODULE(bsg_scatter_gather)"
 
-#for i in range(1,10) :
-#    print i,bits_to_rep(i)
+args = sys.argv[1:];
+if (len(args) <= 1 and all([x.isdigit() for x in args])) :
+    generate_module(int(args[0]) if args else max_channel);
+elif (args[0] == "report" and len(args) <= 2 and all([x.isdigit() for x in args[1:]])) :
+    report(int(args[1]) if len(args) == 2 else 64);
+elif (args[0] == "check" and len(args) <= 2 and all([x.isdigit() for x in args[1:]])) :
+    sys.exit(0 if check_prefix(int(args[1]) if len(args) == 2 else 64) else 1);
+else :
+    print("Usage: " + sys.argv[0] + " [table_max] | report [max_size] | check [max_size]");
@@ -24,6 +24,9 @@
 // reusing the same empty slot multiple times. This allows
 // control logic to be unselected.
 //
+// Sizes below 12 are case tables; larger ones are a log depth
+// prefix popcount and compaction network (see bsg_scatter_gather.py).
+//
 
 
 `include "bsg_defines.v"
@@ -16709,9 +16712,92 @@ if (vec_size_lp == 11)
         default: fwd_datapath_o= 'X;
     endcase
   end
-// synopsys translate_off
-initial assert (vec_size_lp <  12 ) else $error("bsg_scatter_gather: vec_size_lp too large %d", vec_size_lp);
-// synopsys translate_on
+
+if (vec_size_lp >= 12)
+  begin : prefix
+    localparam lg_lp = `BSG_SAFE_CLOG2(vec_size_lp);
+
+    genvar s, i;
+
+    // backward vec: the rank of each set bit, an exclusive prefix
+    // popcount; count[s][i] is the popcount of vec_i[i-2**s+1..i]
+
+    wire [lg_lp:0][vec_size_lp-1:0][lg_lp:0] count;
+    wire [vec_size_lp-1:0][lg_lp-1:0] rank;
+
+    for (i = 0; i < vec_size_lp; i++)
+      begin : scan_in
+        assign count[0][i] = { lg_lp'(0), vec_i[i] };
+        if (i == 0)
+          assign rank[i] = '0;
+        else
+          assign rank[i] = count[lg_lp][i-1][lg_lp-1:0];
+      end
+
+    for (s = 0; s < lg_lp; s++)
+      begin : scan
+        for (i = 0; i < vec_size_lp; i++)
+          begin : c
+            if (i >= (1 << s))
+              assign count[s+1][i] = count[s][i] + count[s][i-(1 << s)];
+            else
+              assign count[s+1][i] = count[s][i];
+          end
+      end
+
+    // fwd vec: each set bit moves down by dist = i - rank[i], 2**s
+    // places at stage s if bit s of dist is set. dist never decreases
+    // with i, so a place never takes a bit from above and keeps its own.
+
+    wire [lg_lp:0][vec_size_lp-1:0]            move_v;
+    wire [lg_lp:0][vec_size_lp-1:0][lg_lp-1:0] move_dist;
+
+    for (i = 0; i < vec_size_lp; i++)
+      begin : route_in
+        assign move_v   [0][i] = vec_i[i];
+        assign move_dist[0][i] = lg_lp'(i) - rank[i];
+      end
+
+    for (s = 0; s < lg_lp; s++)
+      begin : route
+        for (i = 0; i < vec_size_lp; i++)
+          begin : m
+            wire stay = move_v[s][i] & ~move_dist[s][i][s];
+            if (i + (1 << s) < vec_size_lp)
+              begin : above
+                wire take = move_v[s][i+(1 << s)] & move_dist[s][i+(1 << s)][s];
+                assign move_v   [s+1][i] = stay | take;
+                assign move_dist[s+1][i] = take ? move_dist[s][i+(1 << s)] : move_dist[s][i];
+              end
+            else
+              begin : top
+                assign move_v   [s+1][i] = stay;
+                assign move_dist[s+1][i] = move_dist[s][i];
+              end
+          end
+      end
+
+    // empty fwd slots take the highest unused slot, as the tables do
+
+    logic [lg_lp-1:0] spare;
+
+    always_comb
+      begin
+        spare = '0;
+        for (integer j = 0; j < vec_size_lp; j++)
+          if (~vec_i[j])
+            spare = lg_lp'(j);
+      end
+
+    always_comb
+      for (integer j = 0; j < vec_size_lp; j++)
+        begin
+          bk_o          [j*lg_lp+:lg_lp] = vec_i[j] ? rank[j] : lg_lp'(vec_size_lp-1);
+          bk_datapath_o [j*lg_lp+:lg_lp] = vec_i[j] ? rank[j] : '0;
+          fwd_o         [j*lg_lp+:lg_lp] = move_v[lg_lp][j] ? lg_lp'(j) + move_dist[lg_lp][j] : spare;
+          fwd_datapath_o[j*lg_lp+:lg_lp] = move_v[lg_lp][j] ? move_dist[lg_lp][j] : '0;
+        end
+  end
 endmodule
 
 `BSG_ABSTRACT_MODULE(bsg_scatter_gather)
@@ -14,51 +14,601 @@
 #
 # to compress out zero entries with a default 0 setting:
 #
-# usage: bsg_ascii_to_rom.py <filename> <modulename> zero  
-# 
- 
-import sys;
-import os;
-import binascii;
-
-zero = 0;
-
-if ((len(sys.argv)==4) and sys.argv[3]=="zero") :
-    zero = 1;
-
-if ((len(sys.argv)!=3) and (len(sys.argv)!=4)) :
-    print "Usage ascii_to_rom.py <filename> <modulename>";
-    exit -1
-
-myFile = open(sys.argv[1],"r");
-
-i = 0;
-print "// auto-generated by bsg_ascii_to_rom.py from " + os.path.abspath(sys.argv[1]) + "; do not modify";
-print "`include \"bsg_defines.v\""
-print "module " + sys.argv[2] + " #(`BSG_INV_PARAM(width_p), `BSG_INV_PARAM(addr_width_p))";
-print "(input  [addr_width_p-1:0] addr_i";
-print ",output logic [width_p-1:0]      data_o";
-print ");";
-print "always_comb case(addr_i)"
-all_zero = set("0_");
-for line in myFile.readlines() :
-    line = line.strip();
-    if (len(line)!=0):
-        if (line[0] != "#") :
-            if (not zero or not (set(line) <= all_zero)) :
-                digits_only = filter(lambda m:m.isdigit(), str(line));
-
-                # http://stackoverflow.com/questions/2072351/python-conversion-from-binary-string-to-hexadecimal
-                hstr = '%0*X' % ((len(digits_only) + 3) // 4, int(digits_only, 2))
-
-                print str(i).rjust(10)+": data_o = width_p ' (" + str(len(digits_only))+ "'b"+line+");"+" // 0x"+hstr;
-            i = i + 1;
+# usage: bsg_ascii_to_rom.py <filename> <modulename> zero
+#
+# other encodings, for large roms:
+#
+# usage: bsg_ascii_to_rom.py <filename> <modulename> [zero] [--encoding E]
+#                            [--banks N] [--hex-dir DIR] [--report]
+#
+#   --encoding case      one case item per entry (default)
+#              rle       runs of equal consecutive rows become [lo:hi] items
+#              dict      a run-length coded rom of row ids, and a case table
+#                        of the distinct rows
+#              readmemh  an array loaded by $readmemh from <module>.hex in
+#                        DIR (default .), for simulation
+#              sop       two-level minimized sum of products per output
+#                        bit, as assigns; for small and medium roms
+#              auto      whichever of case, rle and dict has the fewest
+#                        table bits, per bank
+#   --banks N            split into at most N sub-roms <modulename>_bank<k>
+#                        of a power of 2 entries, selected by the high
+#                        address bits
+#   --report             entries, runs, distinct rows and the encoding of
+#                        each bank, and the terms and literals of sop, on
+#                        stderr
+#
+# The input is read a line at a time, once to count and once to emit, so
+# the case, rle and readmemh encodings run in constant memory; dict and
+# auto (and --report) also keep the distinct rows, and sop the whole rom.
+#
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+
+encodings = ["case", "rle", "dict", "readmemh", "sop", "auto"]
+
+all_zero = set("0_")
+
+# the rom file a line at a time: (digits, line) for rows, (None, line)
+# for comments
+def rom_lines (filename) :
+    with open(filename, "r") as f :
+        for line in f :
+            line = line.strip()
+            if (len(line) != 0) :
+                if (line[0] != "#") :
+                    yield ("".join([c for c in line if c.isdigit()]), line)
+                else :
+                    yield (None, line)
+
+def hex_str (digits) :
+    # http://stackoverflow.com/questions/2072351/python-conversion-from-binary-string-to-hexadecimal
+    return '%0*X' % ((len(digits) + 3) // 4, int(digits, 2))
+
+def row_value (digits, line) :
+    return "width_p ' (" + str(len(digits)) + "'b" + line + ");" + " // 0x" + hex_str(digits)
+
+def clog2 (n) :
+    return max(n - 1, 0).bit_length()
+
+def print_comment (line) :
+    print("                                 // " + line)
+
+def print_module (name) :
+    print("module " + name + " #(parameter `BSG_INV_PARAM(width_p), parameter `BSG_INV_PARAM(addr_width_p))")
+    print("(input  [addr_width_p-1:0] addr_i")
+    print(",output logic [width_p-1:0]      data_o")
+    print(");")
+
+def print_endmodule (name) :
+    print("endmodule")
+    print("")
+    print("`BSG_ABSTRACT_MODULE(" + name + ")")
+
+def print_default (target, zero, zero_value) :
+    if (zero) :
+        print("default".rjust(10) + ": " + target + " = " + zero_value + ";")
+    else :
+        print("default".rjust(10) + ": " + target + " = 'X;")
+
+# counts for one (bank of the) rom
+class RomStats :
+
+    def __init__ (self, zero, distinct) :
+        self.zero = zero
+        self.entries = 0
+        self.width = 0
+        self.zeros = 0
+        self.runs = 0
+        self.zero_runs = 0
+        self.last = None
+        # value -> row id, and the first line of each id; zero rows get no
+        # id when zeros are compressed out
+        self.row_id = dict() if distinct else None
+        self.rows = []
+
+    def add (self, digits, line) :
+        value = int(digits, 2)
+        is_zero = set(line) <= all_zero
+        self.entries = self.entries + 1
+        self.width = max(self.width, len(digits))
+        if (is_zero) :
+            self.zeros = self.zeros + 1
+        if (value != self.last) :
+            self.runs = self.runs + 1
+            if (is_zero) :
+                self.zero_runs = self.zero_runs + 1
+            self.last = value
+        if (self.row_id is not None and not (self.zero and is_zero) and value not in self.row_id) :
+            self.row_id[value] = len(self.rows)
+            self.rows.append((digits, line))
+
+    def distinct (self) :
+        return len(self.rows) + (1 if (self.zero and self.zeros) else 0)
+
+    def id_width (self) :
+        return max(1, clog2(len(self.rows) + (1 if self.zero else 0)))
+
+    # bits of case table each encoding emits
+    def table_bits (self, encoding) :
+        items = self.entries - self.zeros if self.zero else self.entries
+        runs = self.runs - self.zero_runs if self.zero else self.runs
+        if (encoding == "case") :
+            return items * self.width
+        if (encoding == "rle") :
+            return runs * self.width
+        if (encoding == "dict") :
+            return runs * self.id_width() + len(self.rows) * self.width
+        return None
+
+    def best (self) :
+        return min(["case", "rle", "dict"], key=lambda e : self.table_bits(e))
+
+################################################################################
+#    Encodings; begin, then comment/row in file order, then end
+################################################################################
+
+class CaseRom :
+
+    def __init__ (self, name, stats, args) :
+        self.name = name
+        self.zero = args.zero
+
+    def begin (self) :
+        print_module(self.name)
+        print("always_comb case(addr_i)")
+
+    def comment (self, line) :
+        print_comment(line)
+
+    def row (self, i, digits, line) :
+        if (not self.zero or not (set(line) <= all_zero)) :
+            print(str(i).rjust(10) + ": data_o = " + row_value(digits, line))
+
+    def end (self) :
+        print_default("data_o", self.zero, "{ width_p { 1'b0 } }")
+        print("endcase")
+        print_endmodule(self.name)
+
+# consecutive rows with the same value share one [lo:hi] case item
+class RleRom (CaseRom) :
+
+    target = "data_o"
+
+    def begin (self) :
+        print_module(self.name)
+        print("always_comb case(addr_i) inside")
+        self.run = None
+
+    def flush (self) :
+        if (self.run is not None) :
+            (lo, hi, value, text) = self.run
+            if (text is not None) :
+                addr = ("[" + str(lo) + ":" + str(hi) + "]") if (hi != lo) else str(lo)
+                print(addr.rjust(10) + ": " + self.target + " = " + text)
+        self.run = None
+
+    def item (self, digits, line) :
+        if (self.zero and set(line) <= all_zero) :
+            return None
+        return row_value(digits, line)
+
+    def row (self, i, digits, line) :
+        value = int(digits, 2)
+        if (self.run is not None and self.run[2] == value) :
+            self.run = (self.run[0], i, value, self.run[3])
+        else :
+            self.flush()
+            self.run = (i, i, value, self.item(digits, line))
+
+    def end (self) :
+        self.flush()
+        print_default("data_o", self.zero, "{ width_p { 1'b0 } }")
+        print("endcase")
+        print_endmodule(self.name)
+
+# run-length coded rom of row ids, then a table of the distinct rows;
+# with zero, the id one past the last row reads as zero
+class DictRom (RleRom) :
+
+    target = "row_id"
+
+    def __init__ (self, name, stats, args) :
+        RleRom.__init__(self, name, stats, args)
+        self.stats = stats
+
+    def begin (self) :
+        print_module(self.name)
+        print("localparam row_id_width_lp = " + str(self.stats.id_width()) + ";")
+        print("logic [row_id_width_lp-1:0] row_id;")
+        print("")
+        print("always_comb case(addr_i) inside")
+        self.run = None
+
+    def item (self, digits, line) :
+        if (self.zero and set(line) <= all_zero) :
+            return None
+        return "row_id_width_lp ' (" + str(self.stats.row_id[int(digits, 2)]) + ");"
+
+    def end (self) :
+        self.flush()
+        print_default("row_id", self.zero, "row_id_width_lp ' (" + str(len(self.stats.rows)) + ")")
+        print("endcase")
+        print("")
+        print("always_comb case(row_id)")
+        for (i, (digits, line)) in enumerate(self.stats.rows) :
+            print(str(i).rjust(10) + ": data_o = " + row_value(digits, line))
+        print_default("data_o", self.zero, "{ width_p { 1'b0 } }")
+        print("endcase")
+        print_endmodule(self.name)
+
+# for simulation: the rows go to <module>.hex, the module is an array
+class ReadmemhRom (CaseRom) :
+
+    def __init__ (self, name, stats, args) :
+        CaseRom.__init__(self, name, stats, args)
+        self.entries = max(stats.entries, 1)
+        self.hex_file = os.path.join(args.hex_dir, name + ".hex")
+
+    def begin (self) :
+        self.hex = open(self.hex_file, "w")
+        print_module(self.name)
+        print("logic [width_p-1:0] rom_r [0:" + str(self.entries - 1) + "];")
+        print("")
+        print("initial $readmemh(\"" + self.hex_file + "\", rom_r);")
+        print("")
+
+    def comment (self, line) :
+        self.hex.write("// " + line + "\n")
+
+    def row (self, i, digits, line) :
+        self.hex.write(hex_str(digits) + "\n")
+
+    def end (self) :
+        self.hex.close()
+        print("assign data_o = (addr_i < " + str(self.entries) + ") ? rom_r[addr_i] : "
+              + ("'0;" if self.zero else "'X;"))
+        print_endmodule(self.name)
+
+################################################################################
+#    Two-level minimization
+#
+# An espresso-style loop (expand, irredundant, then reduce/expand/
+# irredundant while the literal count drops) on one output bit at a time.
+# A function of n address bits is a 2**n bit integer with bit m set for
+# minterm m, so a cube's minterms, and whether it hits the off-set, are a
+# few shifts and ands. A cube is (mask, value): the address bits in mask
+# are literals of polarity value.
+################################################################################
+
+def popcount (x) :
+    return bin(x).count("1")
+
+class SopMinimizer :
+
+    def __init__ (self, n) :
+        self.n = n
+        self.all = (1 << (1 << n)) - 1
+        # minterms with address bit i set
+        self.var = []
+        for i in range(n) :
+            half = ((1 << (1 << i)) - 1) << (1 << i)
+            pattern = 0
+            for k in range(0, 1 << n, 2 << i) :
+                pattern = pattern | (half << k)
+            self.var.append(pattern)
+
+    def cube_bits (self, cube) :
+        (mask, value) = cube
+        bits = self.all
+        for i in range(self.n) :
+            if ((mask >> i) & 1) :
+                bits = bits & (self.var[i] if ((value >> i) & 1) else self.all & ~self.var[i])
+        return bits
+
+    # smallest cube containing the minterms
+    def supercube (self, bits) :
+        (mask, value) = (0, 0)
+        for i in range(self.n) :
+            if (bits & ~self.var[i] == 0) :
+                (mask, value) = (mask | (1 << i), value | (1 << i))
+            elif (bits & self.var[i] == 0) :
+                mask = mask | (1 << i)
+        return (mask, value)
+
+    # drop literals while the cube stays off the off-set, each time the one
+    # that covers the most of want
+    def expand (self, cube, bits, off, want) :
+        (mask, value) = cube
+        while True :
+            best = None
+            for i in range(self.n) :
+                if ((mask >> i) & 1) :
+                    grown = bits | ((bits >> (1 << i)) if ((value >> i) & 1) else (bits << (1 << i)))
+                    if (grown & off == 0) :
+                        gain = popcount(grown & want)
+                        if (best is None or gain > best[0]) :
+                            best = (gain, i, grown)
+            if (best is None) :
+                return ((mask, value), bits)
+            mask = mask & ~(1 << best[1])
+            value = value & mask
+            bits = best[2]
+
+    def expand_cover (self, cover, on, off) :
+        # cubes swallowed by an earlier expanded cube go away
+        result = []
+        covered = 0
+        for (cube, bits) in sorted(cover, key=lambda c : popcount(c[1])) :
+            if (bits & on & ~covered == 0) :
+                continue
+            (cube, bits) = self.expand(cube, bits, off, on & ~covered)
+            result.append((cube, bits))
+            covered = covered | bits
+        return result
+
+    # others[k] is the union of every cube but k
+    def others (self, cover) :
+        prefix = [0]
+        for (cube, bits) in cover :
+            prefix.append(prefix[-1] | bits)
+        suffix = 0
+        result = [0] * len(cover)
+        for k in range(len(cover) - 1, -1, -1) :
+            result[k] = prefix[k] | suffix
+            suffix = suffix | cover[k][1]
+        return result
+
+    def irredundant (self, cover, on) :
+        cover = sorted(cover, key=lambda c : popcount(c[1]))
+        while True :
+            others = self.others(cover)
+            redundant = [k for k in range(len(cover)) if cover[k][1] & on & ~others[k] == 0]
+            if (not redundant) :
+                return cover
+            del cover[redundant[0]]
+
+    def reduce (self, cover, on) :
+        cover = sorted(cover, key=lambda c : -popcount(c[1]))
+        k = 0
+        while (k < len(cover)) :
+            others = 0
+            for (j, (cube, bits)) in enumerate(cover) :
+                if (j != k) :
+                    others = others | bits
+            part = cover[k][1] & on & ~others
+            if (part == 0) :
+                del cover[k]
+                continue
+            cube = self.supercube(part)
+            cover[k] = (cube, self.cube_bits(cube))
+            k = k + 1
+        return cover
+
+    # on/off/don't care minterms -> list of cubes
+    def minimize (self, on, dc, iterations=4) :
+        off = self.all & ~on & ~dc
+        if (on == 0) :
+            return []
+        if (off == 0) :
+            return [(0, 0)]
+        full = (1 << self.n) - 1
+        cover = []
+        rest = on
+        while (rest) :
+            m = (rest & -rest).bit_length() - 1
+            (cube, bits) = self.expand((full, m), 1 << m, off, rest)
+            cover.append((cube, bits))
+            rest = rest & ~bits
+        cover = self.irredundant(cover, on)
+        cost = cover_literals([c for (c, b) in cover])
+        for i in range(iterations) :
+            trial = self.irredundant(self.expand_cover(self.reduce(list(cover), on), on, off), on)
+            trial_cost = cover_literals([c for (c, b) in trial])
+            if (trial_cost >= cost) :
+                break
+            (cover, cost) = (trial, trial_cost)
+        bits = 0
+        for (cube, b) in cover :
+            bits = bits | b
+        assert (bits & off == 0) and (on & ~bits == 0), "sop cover does not match the rom"
+        return [c for (c, b) in cover]
+
+def cube_literals (cube) :
+    return popcount(cube[0])
+
+def cover_literals (cover) :
+    return sum([cube_literals(c) for c in cover])
+
+def cube_verilog (cube, n) :
+    (mask, value) = cube
+    literals = [("" if ((value >> i) & 1) else "~") + "addr_i[" + str(i) + "]"
+                for i in range(n - 1, -1, -1) if ((mask >> i) & 1)]
+    return " & ".join(literals) if literals else "1'b1"
+
+# one sum of products per output bit; identical product terms are shared.
+# The rom is held in memory to minimize it.
+class SopRom (CaseRom) :
+
+    def __init__ (self, name, stats, args) :
+        CaseRom.__init__(self, name, stats, args)
+        self.entries = stats.entries
+        self.width = max(stats.width, 1)
+        self.report = args.report
+        self.comments = []
+        self.values = []
+
+    def begin (self) :
+        pass
+
+    def comment (self, line) :
+        self.comments.append(line)
+
+    def row (self, i, digits, line) :
+        self.values.append(int(digits, 2))
+
+    def end (self) :
+        n = max(1, clog2(self.entries))
+        sop = SopMinimizer(n)
+        # past the last entry reads X, or 0 with zero
+        dc = 0 if self.zero else sop.all & ~((1 << self.entries) - 1)
+        covers = []
+        for j in range(self.width) :
+            on = 0
+            for (m, v) in enumerate(self.values) :
+                if ((v >> j) & 1) :
+                    on = on | (1 << m)
+            covers.append(sop.minimize(on, dc))
+
+        terms = []
+        term_id = dict()
+        for cover in covers :
+            for cube in cover :
+                if (cube not in term_id) :
+                    term_id[cube] = len(terms)
+                    terms.append(cube)
+        literals = cover_literals(terms)
+        and_depth = max([cube_literals(c) for c in terms] + [0])
+        or_depth = max([len(c) for c in covers] + [0])
+
+        print_module(self.name)
+        print("// sum of products over addr_i[" + str(n - 1) + ":0]: " + str(len(terms)) + " terms, "
+              + str(literals) + " literals, and fan-in <= " + str(and_depth) + ", or fan-in <= " + str(or_depth))
+        for line in self.comments :
+            print_comment(line)
+        if (terms) :
+            print("logic [" + str(len(terms) - 1) + ":0] term;")
+        print("logic [" + str(self.width - 1) + ":0] rom_data;")
+        print("")
+        for (t, cube) in enumerate(terms) :
+            print("assign term[" + str(t) + "] = " + cube_verilog(cube, n) + ";")
+        print("")
+        for (j, cover) in enumerate(covers) :
+            ors = " | ".join(["term[" + str(term_id[c]) + "]" for c in cover]) if cover else "1'b0"
+            print("assign rom_data[" + str(j) + "] = " + ors + "; // " + str(len(cover)) + " terms, "
+                  + str(cover_literals(cover)) + " literals")
+        print("")
+        if (self.zero) :
+            print("assign data_o = ((addr_i >> " + str(n) + ") == '0) ? width_p ' (rom_data) : '0;")
         else :
-            print "                                 // " + line;
-if (zero) : 
-    print "default".rjust(10) + ": data_o = { width_p { 1'b0 } };"
-else :
-    print "default".rjust(10) + ": data_o = 'X;"
-print "endcase"
-print "endmodule"
-print "`BSG_ABSTRACT_MODULE(" + sys.argv[2] + ")"
+            print("assign data_o = width_p ' (rom_data);")
+        print_endmodule(self.name)
+
+        if (self.report) :
+            print("# " + self.name + " sop: " + str(len(terms)) + " terms, " + str(literals) + " literals, "
+                  + "and fan-in <= " + str(and_depth) + ", or fan-in <= " + str(or_depth)
+                  + " (case form: " + str(self.entries) + " items of " + str(self.width) + " bits)", file=sys.stderr)
+            print("%6s %6s %9s" % ("bit", "terms", "literals"), file=sys.stderr)
+            for (j, cover) in enumerate(covers) :
+                print("%6d %6d %9d" % (j, len(cover), cover_literals(cover)), file=sys.stderr)
+
+rom_encoding = { "case"     : CaseRom
+               , "rle"      : RleRom
+               , "dict"     : DictRom
+               , "readmemh" : ReadmemhRom
+               , "sop"      : SopRom
+               }
+
+################################################################################
+#    Banks
+################################################################################
+
+def print_banks (name, banks, bank_addr_width, zero) :
+    print_module(name)
+    print("")
+    print("localparam bank_addr_width_lp = " + str(bank_addr_width) + ";")
+    print("logic [" + str(banks - 1) + ":0][width_p-1:0] bank_data_lo;")
+    print("")
+    for b in range(banks) :
+        print(name + "_bank" + str(b) + " #(.width_p(width_p), .addr_width_p(bank_addr_width_lp)) bank" + str(b))
+        print("  (.addr_i(addr_i[bank_addr_width_lp-1:0]), .data_o(bank_data_lo[" + str(b) + "]));")
+    print("")
+    print("always_comb case(addr_i >> bank_addr_width_lp)")
+    for b in range(banks) :
+        print(str(b).rjust(10) + ": data_o = bank_data_lo[" + str(b) + "];")
+    print_default("data_o", zero, "{ width_p { 1'b0 } }")
+    print("endcase")
+    print_endmodule(name)
+    print("")
+
+def report (name, stats, chosen, file=sys.stderr) :
+    total = sum([s.entries for s in stats])
+    print("# bsg_ascii_to_rom " + name + ": " + str(total) + " entries, "
+          + str(max([s.width for s in stats])) + " bits, " + str(len(stats)) + " bank(s)", file=file)
+    print("%6s %8s %6s %8s %6s %10s %10s %10s  %s" % ("bank", "entries", "zeros", "distinct", "runs",
+                                                     "case_bits", "rle_bits", "dict_bits", "encoding"), file=file)
+    for (b, (s, e)) in enumerate(zip(stats, chosen)) :
+        print("%6d %8d %6d %8d %6d %10d %10d %10d  %s" % (b, s.entries, s.zeros, s.distinct(), s.runs,
+                                                         s.table_bits("case"), s.table_bits("rle"),
+                                                         s.table_bits("dict"), e), file=file)
+
+def main (argv) :
+    parser = argparse.ArgumentParser(description="rom module from a file of verilog binary strings")
+    parser.add_argument("filename")
+    parser.add_argument("modulename")
+    parser.add_argument("zero", nargs="?", choices=["zero"], help="compress out zero entries, default 0")
+    parser.add_argument("--encoding", choices=encodings, default="case")
+    parser.add_argument("--banks", type=int, default=1, help="number of sub-roms")
+    parser.add_argument("--hex-dir", default=".", help="directory of the readmemh .hex files")
+    parser.add_argument("--report", action="store_true", help="rom statistics on stderr")
+    args = parser.parse_args(argv[1:])
+    args.zero = (args.zero == "zero")
+
+    if (args.banks < 1) :
+        parser.error("--banks must be at least 1")
+
+    distinct = args.report or args.encoding in ("dict", "auto")
+
+    # banks of 2**bank_addr_width entries
+    if (args.banks > 1) :
+        entries = sum([1 for (digits, line) in rom_lines(args.filename) if digits is not None])
+        bank_addr_width = max(1, clog2((entries + args.banks - 1) // args.banks))
+        banks = max(1, (entries + (1 << bank_addr_width) - 1) >> bank_addr_width)
+        names = [args.modulename + "_bank" + str(b) for b in range(banks)]
+    else :
+        bank_addr_width = None
+        names = [args.modulename]
+
+    stats = [RomStats(args.zero, distinct) for n in names]
+    i = 0
+    for (digits, line) in rom_lines(args.filename) :
+        if (digits is not None) :
+            stats[i >> bank_addr_width if bank_addr_width else 0].add(digits, line)
+            i = i + 1
+
+    chosen = [s.best() if args.encoding == "auto" else args.encoding for s in stats]
+    if (args.report) :
+        report(args.modulename, stats, chosen)
+
+    print("// auto-generated by bsg_ascii_to_rom.py from " + os.path.abspath(args.filename) + "; do not modify")
+    print("`include \"bsg_defines.v\"")
+    print("")
+
+    if (bank_addr_width) :
+        print_banks(args.modulename, len(names), bank_addr_width, args.zero)
+
+    bank = 0
+    rom = rom_encoding[chosen[0]](names[0], stats[0], args)
+    rom.begin()
+    i = 0
+    for (digits, line) in rom_lines(args.filename) :
+        if (digits is None) :
+            rom.comment(line)
+            continue
+        if (bank_addr_width and (i >> bank_addr_width) != bank) :
+            rom.end()
+            print("")
+            bank = bank + 1
+            rom = rom_encoding[chosen[bank]](names[bank], stats[bank], args)
+            rom.begin()
+        rom.row(i & ((1 << bank_addr_width) - 1) if bank_addr_width else i, digits, line)
+        i = i + 1
+    rom.end()
+    return 0
+
+if __name__ == "__main__" :
+    sys.exit(main(sys.argv))
@@ -98,15 +98,16 @@ if ( reset_on_sr_p ) begin:reset_on_%d
 end else begin:not_reset_on_sr_p
     assign reset_on_sr = '0;
 end //end of reset_on_sr_p """)
-max_reqs = 0 # no. of inputs
-try:
-    assert len(sys.argv) == 2
-    max_reqs = int(sys.argv[1])
-except:
-    print ("UsageError: bsg_round_robin_arb.py <max no. of channels>")
-    sys.exit()
-
-print ("""// Round robin arbitration unit
+
+################################################################################
+#    Module header
+################################################################################
+
+def print_header():
+    """
+    Print the module header and the declarations shared by every size
+    """
+    print ("""// Round robin arbitration unit
 // NOTE: generally prefer https://github.com/bespoke-silicon-group/basejump_stl/blob/master/bsg_misc/bsg_arb_round_robin.v to this module.
 // Automatically generated using bsg_round_robin_arb.py
 // DO NOT MODIFY
@@ -125,7 +126,7 @@ print ("""// Round robin arbitration unit
 
 """)
 
-print ("""module bsg_round_robin_arb #(`BSG_INV_PARAM(inputs_p)
+    print ("""module bsg_round_robin_arb #(parameter `BSG_INV_PARAM(inputs_p)
                                      ,lg_inputs_p   =`BSG_SAFE_CLOG2(inputs_p)
                                      ,reset_on_sr_p = 1'b0
                                      ,hold_on_sr_p  = 1'b0
@@ -138,7 +139,7 @@ print ("""module bsg_round_robin_arb #(`BSG_INV_PARAM(inputs_p)
                                      // arbitrates based on age, so minimizes worst case latency.
                                      ,hold_on_valid_p = 1'b0)""")
 
-print ("""    (input clk_i
+    print ("""    (input clk_i
     , input reset_i
     , input grants_en_i // whether to suppress grants_o
 
@@ -161,7 +162,15 @@ logic hold_on_sr, reset_on_sr;
 
 """)
 
-for reqs_w in range(1, max_reqs+1):
+################################################################################
+#    Table (casez) arbiter of one size
+################################################################################
+
+def print_table_arb(reqs_w):
+    """
+    Print the arbiter for inputs_p == reqs_w as a casez of every
+    (last_r, reqs_i) pattern
+    """
     print ("""
 if(inputs_p == %d)
 begin: inputs_%d
@@ -208,7 +217,11 @@ assign grants_o      = sel_one_hot_n & {%d{grants_en_i}} ;
     print ("""
 end: inputs_%d""" % (reqs_w))
 
-print ("""
+def print_footer():
+    """
+    Print the logic shared by every size: v_o and the last_r register
+    """
+    print ("""
 
 assign v_o = | reqs_i ;
 
@@ -239,3 +252,206 @@ endmodule
 
 `BSG_ABSTRACT_MODULE(bsg_round_robin_arb)""")
 
+################################################################################
+#    Parallel prefix arbiter
+################################################################################
+
+def print_prefix_arb(min_reqs):
+    """
+    Print the arbiter for every inputs_p >= min_reqs as a parallel prefix
+    circuit: a thermometer mask of the inputs above last_r, and a priority
+    encoder (an exclusive prefix OR, Kogge-Stone) that picks the lowest
+    request above last_r if there is one, else the lowest request. Its
+    depth is log(inputs_p) and its size inputs_p*log(inputs_p), where the
+    casez grows as inputs_p**2 lines.
+    """
+    print ("""
+if(inputs_p >= """ + str(min_reqs) + """)
+begin: inputs_prefix
+
+genvar i, s;
+
+logic [inputs_p-1: 0 ] sel_one_hot_n;
+
+// above_last[i]: input i comes before last_r+1 .. inputs_p-1 wrap around
+wire [inputs_p-1:0] above_last;
+
+for (i = 0; i < inputs_p; i++)
+  begin: thermo
+    assign above_last[i] = (lg_inputs_p+1)'(i) > {1'b0, last_r};
+  end
+
+wire [inputs_p-1:0] reqs_above = reqs_i & above_last;
+
+// lower_*[lg_inputs_p][i]: is there a request below input i
+wire [lg_inputs_p:0][inputs_p-1:0] lower_above, lower_all;
+
+assign lower_above[0] = reqs_above << 1;
+assign lower_all  [0] = reqs_i     << 1;
+
+for (s = 0; s < lg_inputs_p; s++)
+  begin: scan
+    assign lower_above[s+1] = lower_above[s] | (lower_above[s] << (1 << s));
+    assign lower_all  [s+1] = lower_all  [s] | (lower_all  [s] << (1 << s));
+  end
+
+assign sel_one_hot_n = (|reqs_above) ? (reqs_above & ~lower_above[lg_inputs_p])
+                                     : (reqs_i     & ~lower_all  [lg_inputs_p]);
+
+always_comb
+  begin
+    tag_o = (lg_inputs_p) ' (0);
+    for (integer j = 0; j < inputs_p; j++)
+      tag_o = tag_o | ({lg_inputs_p{sel_one_hot_n[j]}} & (lg_inputs_p) ' (j));
+  end
+
+assign sel_one_hot_o = sel_one_hot_n;
+assign grants_o      = sel_one_hot_n & {inputs_p{grants_en_i}} ;
+
+if ( hold_on_sr_p ) begin: hold_on_sr_prefix
+    // as in the casez arbiters, the single request is at bit
+    // inputs_p-1-((last_r+1) % inputs_p); see get_single_request_str()
+    wire [inputs_p-1:0] next_one_hot = (|above_last) ? (above_last & ~(above_last << 1))
+                                                     : (inputs_p) ' (1);
+    wire [inputs_p-1:0] single_req;
+
+    for (i = 0; i < inputs_p; i++)
+      begin: rev
+        assign single_req[i] = next_one_hot[inputs_p-1-i];
+      end
+
+    assign hold_on_sr = ( reqs_i == single_req );
+end else begin:not_hold_on_sr_p
+    assign hold_on_sr = '0;
+end //end of hold_on_sr_p
+
+if ( reset_on_sr_p ) begin:reset_on_prefix
+    // exactly one request
+    assign reset_on_sr = (|reqs_i) & ~(|(reqs_i & lower_all[lg_inputs_p]));
+end else begin:not_reset_on_sr_p
+    assign reset_on_sr = '0;
+end //end of reset_on_sr_p
+
+end: inputs_prefix""")
+
+################################################################################
+#    Cross-check of the prefix arbiter against calculate_grants()
+################################################################################
+
+def last_width(reqs_w):
+    return int(math.ceil(math.log(reqs_w)/math.log(2))) if (reqs_w!=1) else 1
+
+def grant_table(last, reqs_w):
+    """
+    Returns calculate_grants(last, reqs_w) as (care mask, value, grant)
+    integers, and the single requests of the hold and reset logic
+    """
+    result = []
+    for (inp, grant) in calculate_grants(last, reqs_w):
+        care = int(inp.replace("0", "1").replace("?", "0"), 2)
+        result.append((care, int(inp.replace("?", "0"), 2), int(grant, 2)))
+    hold = int(get_single_request_str(last, reqs_w), 2)
+    reset = set([int(get_single_request_str(r, reqs_w), 2) for r in range(reqs_w)])
+    return (result, hold, reset)
+
+def table_arb(table, reqs):
+    """
+    Returns (sel_one_hot, tag, hold_on_sr, reset_on_sr) of the casez
+    arbiter; table is grant_table(last_r, inputs_p)
+    """
+    (grants, hold, reset) = table
+    sel = 0
+    for (care, value, grant) in grants:
+        if (reqs & care) == value:
+            sel = grant
+            break
+    tag = sel.bit_length() - 1 if sel else 0
+    return (sel, tag, reqs == hold, reqs in reset)
+
+def prefix_arb(last, reqs, reqs_w):
+    """
+    Python model of print_prefix_arb(), signal for signal
+    """
+    full = (1 << reqs_w) - 1
+    lg = last_width(reqs_w)
+
+    def lower(x):
+        l = (x << 1) & full
+        for s in range(lg):
+            l = (l | (l << (1 << s))) & full
+        return l
+
+    above_last = sum([1 << i for i in range(reqs_w) if i > last])
+    reqs_above = reqs & above_last
+    if reqs_above:
+        sel = reqs_above & ~lower(reqs_above)
+    else:
+        sel = reqs & ~lower(reqs)
+
+    tag = 0
+    for j in range(reqs_w):
+        if (sel >> j) & 1:
+            tag = tag | j
+
+    next_one_hot = (above_last & ~(above_last << 1)) if above_last else 1
+    single_req = sum([1 << i for i in range(reqs_w) if (next_one_hot >> (reqs_w-1-i)) & 1])
+    hold = reqs == single_req
+    reset = reqs != 0 and not (reqs & lower(reqs))
+    return (sel, tag, hold, reset)
+
+def check_prefix_arb(max_reqs, samples=1 << 10):
+    """
+    Compares prefix_arb() with table_arb() for every last_r and every
+    request vector, or samples random request vectors per last_r when there
+    are more than that
+    """
+    import random
+    rng = random.Random(1)
+    bad = 0
+    for reqs_w in range(1, max_reqs+1):
+        for last in range(reqs_w):
+            table = grant_table(last, reqs_w)
+            if (1 << reqs_w) <= samples:
+                vecs = range(1 << reqs_w)
+            else:
+                vecs = [rng.getrandbits(reqs_w) for x in range(samples)] \
+                     + [1 << i for i in range(reqs_w)] + [0, (1 << reqs_w) - 1]
+            for reqs in vecs:
+                if prefix_arb(last, reqs, reqs_w) != table_arb(table, reqs):
+                    if bad == 0:
+                        print ("mismatch: inputs_p %d last_r %d reqs_i %s" % (reqs_w, last, bin(reqs)[2:].zfill(reqs_w)))
+                    bad = bad + 1
+    print ("%d sizes checked, %d mismatches" % (max_reqs, bad))
+    return bad == 0
+
+def main(argv):
+    if len(argv) in (2, 3) and argv[1] == "check":
+        try:
+            max_reqs = int(argv[2]) if len(argv) == 3 else 64
+        except ValueError:
+            max_reqs = 0
+        if max_reqs > 0:
+            return 0 if check_prefix_arb(max_reqs) else 1
+
+    max_reqs = 0 # no. of inputs
+    try:
+        assert len(argv) == 2
+        max_reqs = int(argv[1])
+    except:
+        print ("UsageError: bsg_round_robin_arb.py <max no. of channels>")
+        print ("            bsg_round_robin_arb.py check [max no. of channels]")
+        sys.exit()
+
+    print_header()
+
+    # casez tables up to max_reqs, the prefix arbiter above that
+    for reqs_w in range(1, max_reqs+1):
+        print_table_arb(reqs_w)
+
+    print_prefix_arb(max_reqs+1)
+
+    print_footer()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
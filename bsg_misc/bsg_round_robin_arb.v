@@ -2423,6 +2423,74 @@ end //end of reset_on_sr_p
 
 end: inputs_16
 
+if(inputs_p >= 17)
+begin: inputs_prefix
+
+genvar i, s;
+
+logic [inputs_p-1: 0 ] sel_one_hot_n;
+
+// above_last[i]: input i comes before last_r+1 .. inputs_p-1 wrap around
+wire [inputs_p-1:0] above_last;
+
+for (i = 0; i < inputs_p; i++)
+  begin: thermo
+    assign above_last[i] = (lg_inputs_p+1)'(i) > {1'b0, last_r};
+  end
+
+wire [inputs_p-1:0] reqs_above = reqs_i & above_last;
+
+// lower_*[lg_inputs_p][i]: is there a request below input i
+wire [lg_inputs_p:0][inputs_p-1:0] lower_above, lower_all;
+
+assign lower_above[0] = reqs_above << 1;
+assign lower_all  [0] = reqs_i     << 1;
+
+for (s = 0; s < lg_inputs_p; s++)
+  begin: scan
+    assign lower_above[s+1] = lower_above[s] | (lower_above[s] << (1 << s));
+    assign lower_all  [s+1] = lower_all  [s] | (lower_all  [s] << (1 << s));
+  end
+
+assign sel_one_hot_n = (|reqs_above) ? (reqs_above & ~lower_above[lg_inputs_p])
+                                     : (reqs_i     & ~lower_all  [lg_inputs_p]);
+
+always_comb
+  begin
+    tag_o = (lg_inputs_p) ' (0);
+    for (integer j = 0; j < inputs_p; j++)
+      tag_o = tag_o | ({lg_inputs_p{sel_one_hot_n[j]}} & (lg_inputs_p) ' (j));
+  end
+
+assign sel_one_hot_o = sel_one_hot_n;
+assign grants_o      = sel_one_hot_n & {inputs_p{grants_en_i}} ;
+
+if ( hold_on_sr_p ) begin: hold_on_sr_prefix
+    // as in the casez arbiters, the single request is at bit
+    // inputs_p-1-((last_r+1) % inputs_p); see get_single_request_str()
+    wire [inputs_p-1:0] next_one_hot = (|above_last) ? (above_last & ~(above_last << 1))
+                                                     : (inputs_p) ' (1);
+    wire [inputs_p-1:0] single_req;
+
+    for (i = 0; i < inputs_p; i++)
+      begin: rev
+        assign single_req[i] = next_one_hot[inputs_p-1-i];
+      end
+
+    assign hold_on_sr = ( reqs_i == single_req );
+end else begin:not_hold_on_sr_p
+    assign hold_on_sr = '0;
+end //end of hold_on_sr_p
+
+if ( reset_on_sr_p ) begin:reset_on_prefix
+    // exactly one request
+    assign reset_on_sr = (|reqs_i) & ~(|(reqs_i & lower_all[lg_inputs_p]));
+end else begin:not_reset_on_sr_p
+    assign reset_on_sr = '0;
+end //end of reset_on_sr_p
+
+end: inputs_prefix
+
 
 assign v_o = | reqs_i ;
 
@@ -0,0 +1,372 @@
+#!/usr/bin/python
+
+"""
+Cycle level fairness/latency model of bsg_round_robin_arb
+
+Runs many independent copies (trials) of the arbiter side by side, one
+numpy array lane per trial, under the plain, hold_on_sr_p, reset_on_sr_p
+and hold_on_valid_p policies. Each input has a fifo of requests fed by
+Bernoulli, bursty (on/off) or trace driven traffic; reqs_i is "fifo not
+empty", grants_en_i is set with probability --ready, and yumi_i is
+v_o & grants_en_i, which dequeues the granted input.
+
+The grants come from calculate_grants() (tabulated up to 12 inputs) or,
+above that, from the prefix arbiter, which
+"bsg_round_robin_arb.py check" shows to grant identically. The hold and
+reset conditions come from get_single_request_str().
+
+Per input, it reports the offered load, the throughput and share of the
+grants, the latency (arrival to yumi) mean and percentiles, and the worst
+wait (the most cycles an input requested without a grant).
+
+    bsg_round_robin_arb_sim.py 8 --traffic bursty --rate 0.12 --burst 16
+    bsg_round_robin_arb_sim.py 4 --mode hold_on_valid --ready 0.5 --rate 0.4,0.1,0.1,0.1
+    bsg_round_robin_arb_sim.py 4 --traffic trace --trace reqs.txt
+
+A trace has one line per cycle of inputs_p 0/1 characters, input
+inputs_p-1 first as in reqs_i; the trace repeats if shorter than --cycles.
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bsg_round_robin_arb import calculate_grants, get_single_request_str, grant_table, table_arb
+
+modes = ["plain", "hold_on_sr", "reset_on_sr", "hold_on_valid"]
+
+# largest inputs_p whose grants are tabulated from calculate_grants()
+table_max = 12
+
+class ArbModel(object):
+    """
+    The combinational grant and the last_r update of bsg_round_robin_arb,
+    for arrays of (last_r, reqs_i)
+    """
+
+    def __init__(self, inputs, mode):
+        assert 1 <= inputs <= 64, "inputs_p must be 1..64"
+        assert mode in modes, "unknown mode " + mode
+        self.inputs = inputs
+        self.mode = mode
+        n = inputs
+
+        if n <= table_max:
+            # tag[last_r, reqs_i], straight from calculate_grants()
+            reqs = np.arange(1 << n, dtype=np.int64)
+            self.tags = np.zeros((n, 1 << n), dtype=np.int64)
+            for last in range(n):
+                for (inp, grant) in calculate_grants(last, n):
+                    care = int(inp.replace("0", "1").replace("?", "0"), 2)
+                    value = int(inp.replace("?", "0"), 2)
+                    self.tags[last][(reqs & care) == value] = grant[::-1].index("1")
+        else:
+            self.tags = None
+            self.above = np.array([sum([1 << i for i in range(n) if i > last]) for last in range(n)], dtype=np.uint64)
+
+        self.single_req = np.array([int(get_single_request_str(last, n), 2) for last in range(n)], dtype=np.uint64)
+
+    def grant(self, last, reqs):
+        """
+        Returns tag_o for arrays last (int64) and reqs (uint64); 0 if no
+        requests, as in the RTL
+        """
+        if self.tags is not None:
+            return self.tags[last, reqs.astype(np.int64)]
+        masked = reqs & self.above[last]
+        x = np.where(masked != 0, masked, reqs)
+        low = x & (~x + np.uint64(1))
+        # one hot values are exact in float64
+        with np.errstate(divide="ignore"):
+            tag = np.log2(low.astype(np.float64))
+        return np.where(low != 0, tag, 0).astype(np.int64)
+
+    def next_last(self, last, reqs, tag, v, yumi):
+        """
+        Returns last_n
+        """
+        n = self.inputs
+        if n == 1:
+            return np.zeros_like(last)
+        advance = np.where(yumi, tag, last)
+        if self.mode == "hold_on_sr":
+            return np.where(reqs == self.single_req[last], last, advance)
+        if self.mode == "reset_on_sr":
+            single = (reqs != 0) & ((reqs & (reqs - np.uint64(1))) == 0)
+            return np.where(single, n-2, advance)
+        if self.mode == "hold_on_valid":
+            # tag_o-1 wraps to inputs_p-1 whether or not inputs_p is a power of 2
+            return np.where(yumi, tag, np.where(v, (tag - 1) % n, last))
+        return advance
+
+################################################################################
+#    Traffic
+################################################################################
+
+class BernoulliTraffic(object):
+    """
+    Each input gets a request each cycle with probability rate[i]
+    """
+    def __init__(self, rng, trials, rate):
+        self.rng = rng
+        self.trials = trials
+        self.rate = np.array(rate)
+
+    def arrivals(self, t):
+        return self.rng.random_sample((self.trials, len(self.rate))) < self.rate
+
+class BurstyTraffic(object):
+    """
+    On/off traffic: an input requests every cycle while on; bursts average
+    burst cycles and the long run rate is rate[i]
+    """
+    def __init__(self, rng, trials, rate, burst):
+        self.rng = rng
+        self.rate = np.array(rate)
+        assert burst >= 1, "burst must be at least 1"
+        self.p_off = np.full(len(rate), 1.0 / burst)
+        self.p_on = np.array([1.0 if r >= 1 else r / (burst * (1.0 - r)) for r in rate])
+        assert (self.p_on <= 1).all(), "rate too high for that burst length"
+        self.on = rng.random_sample((trials, len(rate))) < self.rate
+
+    def arrivals(self, t):
+        on = self.on
+        u = self.rng.random_sample(on.shape)
+        self.on = np.where(on, u >= self.p_off, u < self.p_on)
+        return on
+
+class TraceTraffic(object):
+    """
+    The same per cycle request vectors in every trial
+    """
+    def __init__(self, trials, inputs, lines):
+        rows = []
+        for line in lines:
+            line = line.split("#")[0].strip()
+            if not line:
+                continue
+            assert len(line) == inputs and set(line) <= set("01"), "bad trace line '" + line + "'"
+            rows.append([c == "1" for c in reversed(line)])
+        assert rows, "empty trace"
+        self.rows = np.array(rows)
+        self.trials = trials
+
+    def arrivals(self, t):
+        return np.broadcast_to(self.rows[t % len(self.rows)], (self.trials, self.rows.shape[1]))
+
+################################################################################
+#    Simulation
+################################################################################
+
+def simulate(model, traffic, trials, cycles, ready=1.0, warmup=0, depth=64, max_latency=1024, seed=1):
+    """
+    Runs trials copies of model for cycles cycles; returns per input
+    statistics (arrays of length inputs_p) collected after warmup cycles
+    """
+    n = model.inputs
+    rng = np.random.RandomState(seed + 1)
+    lanes = np.arange(trials)
+    bit = np.uint64(1) << np.arange(n, dtype=np.uint64)
+
+    fifo = np.zeros((trials, n, depth), dtype=np.int64)
+    head = np.zeros((trials, n), dtype=np.int64)
+    count = np.zeros((trials, n), dtype=np.int64)
+    last = np.zeros(trials, dtype=np.int64)
+    wait = np.zeros((trials, n), dtype=np.int64)
+
+    s = { "offered"  : np.zeros(n, dtype=np.int64)
+        , "dropped"  : np.zeros(n, dtype=np.int64)
+        , "granted"  : np.zeros(n, dtype=np.int64)
+        , "hist"     : np.zeros((n, max_latency+1), dtype=np.int64)
+        , "max_wait" : np.zeros(n, dtype=np.int64)
+        , "cycles"   : (cycles - warmup) * trials
+        }
+
+    for t in range(cycles):
+        counting = t >= warmup
+
+        # enqueue the new requests
+        new = traffic.arrivals(t)
+        room = count < depth
+        accept = new & room
+        (b, i) = np.nonzero(accept)
+        fifo[b, i, (head[b, i] + count[b, i]) % depth] = t
+        count += accept
+        if counting:
+            s["offered"] += new.sum(axis=0)
+            s["dropped"] += (new & ~room).sum(axis=0)
+
+        # arbitrate
+        reqs = ((count > 0) * bit).sum(axis=1, dtype=np.uint64)
+        tag = model.grant(last, reqs)
+        v = reqs != 0
+        yumi = v & (rng.random_sample(trials) < ready)
+
+        # dequeue the granted input
+        b = lanes[yumi]
+        i = tag[yumi]
+        latency = t - fifo[b, i, head[b, i]]
+        head[b, i] = (head[b, i] + 1) % depth
+        count[b, i] -= 1
+
+        granted = np.zeros((trials, n), dtype=bool)
+        granted[b, i] = True
+        requesting = (((reqs[:, None] & bit) != 0))
+        wait = np.where(requesting & ~granted, wait + 1, 0)
+
+        if counting:
+            np.add.at(s["granted"], i, 1)
+            np.add.at(s["hist"], (i, np.minimum(latency, max_latency)), 1)
+            s["max_wait"] = np.maximum(s["max_wait"], wait.max(axis=0))
+
+        last = model.next_last(last, reqs, tag, v, yumi)
+
+    return s
+
+def percentile(hist, p):
+    """
+    Returns the p'th percentile of a latency histogram; the last bin
+    holds everything at or above it
+    """
+    total = hist.sum()
+    if total == 0:
+        return 0
+    return int(np.searchsorted(np.cumsum(hist), p * total / 100.0))
+
+def report_lines(s, inputs):
+    lines = ["%5s %8s %8s %7s %7s %8s %5s %5s %5s %7s %8s"
+             % ("input", "offered", "granted", "share", "dropped", "lat_mean", "p50", "p90", "p99", "lat_max", "max_wait")]
+    total = max(1, s["granted"].sum())
+    lat = np.arange(s["hist"].shape[1])
+
+    def row(name, offered, granted, dropped, hist, max_wait):
+        n = max(1, hist.sum())
+        top = np.nonzero(hist)[0]
+        lines.append("%5s %8.4f %8.4f %6.2f%% %7d %8.2f %5d %5d %5d %7s %8d"
+                     % (name, offered / float(s["cycles"]), granted / float(s["cycles"]),
+                        100.0 * granted / total, dropped, (hist * lat).sum() / float(n),
+                        percentile(hist, 50), percentile(hist, 90), percentile(hist, 99),
+                        # the last bin is an overflow bin
+                        (str(top[-1]) + ("+" if top[-1] == len(hist)-1 else "")) if len(top) else "-",
+                        max_wait))
+
+    for i in range(inputs):
+        row(str(i), s["offered"][i], s["granted"][i], s["dropped"][i], s["hist"][i], s["max_wait"][i])
+    row("all", s["offered"].sum(), s["granted"].sum(), s["dropped"].sum(), s["hist"].sum(axis=0), s["max_wait"].max())
+    return lines
+
+def summary_line(mode, s, inputs):
+    """
+    One line per mode for --mode all: the spread of the grant shares of
+    the inputs that offered load, the worst p99 latency and the worst wait
+    """
+    share = s["granted"] / float(max(1, s["granted"].sum()))
+    active = s["offered"] > 0
+    spread = (share[active].max() - share[active].min()) * 100.0 if active.any() else 0.0
+    p99 = max([percentile(s["hist"][i], 99) for i in range(inputs)])
+    return "%13s %10.4f %11.2f%% %8d %8d" % (mode, s["granted"].sum() / float(s["cycles"]), spread, p99, s["max_wait"].max())
+
+def check_model(sizes=(1, 2, 3, 5, 8, 12, 13, 17, 33, 64), samples=4096, seed=1):
+    """
+    Compares the grants and hold/reset conditions of ArbModel with
+    table_arb() of bsg_round_robin_arb.py on random (last_r, reqs_i)
+    """
+    rng = np.random.RandomState(seed)
+    bad = 0
+    for n in sizes:
+        m = ArbModel(n, "plain")
+        last = rng.randint(0, n, samples)
+        # dense and sparse request vectors
+        reqs = np.frombuffer(rng.bytes(8 * samples), dtype=np.uint64).copy()
+        reqs[::2] &= np.frombuffer(rng.bytes(8 * samples), dtype=np.uint64)[::2]
+        reqs &= np.uint64((1 << n) - 1)
+        tag = m.grant(last, reqs)
+        single = (reqs != 0) & ((reqs & (reqs - np.uint64(1))) == 0)
+        tables = [grant_table(l, n) for l in range(n)]
+        for k in range(samples):
+            (sel, want_tag, hold, reset) = table_arb(tables[last[k]], int(reqs[k]))
+            if (tag[k], reqs[k] == m.single_req[last[k]], single[k]) != (want_tag, hold, reset):
+                if bad == 0:
+                    print("mismatch: inputs_p %d last_r %d reqs_i %s" % (n, last[k], bin(int(reqs[k]))[2:].zfill(n)))
+                bad += 1
+    print("%d sizes checked, %d mismatches" % (len(sizes), bad))
+    return bad == 0
+
+def parse_rate(text, inputs):
+    rate = [float(x) for x in text.split(",")]
+    if len(rate) == 1:
+        rate = rate * inputs
+    if len(rate) != inputs:
+        raise ValueError("--rate needs 1 or inputs_p values")
+    return rate
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Fairness/latency model of bsg_round_robin_arb")
+    parser.add_argument("inputs", type=int, nargs="?", help="inputs_p (1..64)")
+    parser.add_argument("--mode", default="all", choices=modes + ["all"], help="arbitration policy (default: compare all)")
+    parser.add_argument("--traffic", default="bernoulli", choices=["bernoulli", "bursty", "trace"])
+    parser.add_argument("--rate", default=None, help="requests/cycle, one value or one per input (default: 0.9/inputs_p)")
+    parser.add_argument("--burst", type=float, default=8, help="mean burst length of bursty traffic")
+    parser.add_argument("--trace", help="trace file for --traffic trace")
+    parser.add_argument("--ready", type=float, default=1.0, help="probability grants_en_i is set")
+    parser.add_argument("--cycles", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=None, help="cycles before statistics are kept (default: cycles/10)")
+    parser.add_argument("--trials", type=int, default=64, help="independent arbiters simulated in parallel")
+    parser.add_argument("--depth", type=int, default=64, help="request fifo depth per input")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--check", action="store_true", help="check the model against bsg_round_robin_arb.py and exit")
+    args = parser.parse_args(argv[1:])
+
+    if np is None:
+        print("bsg_round_robin_arb_sim.py needs numpy", file=sys.stderr)
+        return 1
+
+    if args.check:
+        return 0 if check_model() else 1
+
+    if args.inputs is None or not 1 <= args.inputs <= 64:
+        parser.error("inputs_p must be 1..64")
+    n = args.inputs
+    rate = parse_rate(args.rate, n) if args.rate else [0.9 / n] * n
+    warmup = args.cycles // 10 if args.warmup is None else args.warmup
+
+    def run(mode):
+        rng = np.random.RandomState(args.seed)
+        if args.traffic == "bernoulli":
+            traffic = BernoulliTraffic(rng, args.trials, rate)
+        elif args.traffic == "bursty":
+            traffic = BurstyTraffic(rng, args.trials, rate, args.burst)
+        else:
+            if not args.trace:
+                parser.error("--traffic trace needs --trace")
+            with open(args.trace) as f:
+                traffic = TraceTraffic(args.trials, n, f.readlines())
+        return simulate(ArbModel(n, mode), traffic, args.trials, args.cycles, args.ready, warmup, args.depth, seed=args.seed)
+
+    load = ("trace " + args.trace) if args.traffic == "trace" else \
+           (args.traffic + " rate " + ",".join(["%g" % r for r in (rate if len(set(rate)) > 1 else rate[:1])])
+            + ((" burst %g" % args.burst) if args.traffic == "bursty" else ""))
+    title = "# bsg_round_robin_arb inputs_p=%d, %s, ready %g; %d trials x %d cycles (%d warmup)" \
+            % (n, load, args.ready, args.trials, args.cycles, warmup)
+
+    if args.mode == "all":
+        print(title)
+        print("%13s %10s %12s %8s %8s" % ("mode", "throughput", "share_spread", "p99_max", "max_wait"))
+        for mode in modes:
+            print(summary_line(mode, run(mode), n))
+    else:
+        print(title + ", " + args.mode)
+        for line in report_lines(run(args.mode), n):
+            print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -12,27 +12,65 @@
 # MBT 5-26-2016
 #
 #
+# Usage:
+#
+#   bsg_mesh_to_ring_stitch.py                 # every size up to 8x8, serpentine
+#   bsg_mesh_to_ring_stitch.py X Y [curve]     # only x_max_p == X, y_max_p == Y
+#   bsg_mesh_to_ring_stitch.py report X Y      # hop lengths of each curve
+#
+# The ring visits the tiles in the order of a curve and closes from the
+# last tile back to the first. The curves:
+#
+#   serpentine     up and down the columns (or rows), back along the
+#                  bottom (or left) edge; every hop is 1 tile, and it needs
+#                  an even side
+#   boustrophedon  back and forth along the rows of the long side, folded
+#                  into a ring (even positions out, odd positions back), so
+#                  hops are 1 or 2 tiles for any size
+#   hilbert        two generalized hilbert curves, one per half of the short
+#                  side, joined at both ends (a moore curve on 2**k squares)
+#   peano          a generalized peano curve (3x3 serpentines of blocks,
+#                  corner to opposite corner), folded into a ring
+#
+# The hop length is the manhattan distance between consecutive tiles of
+# the ring, i.e. the wire length of the edge in tiles.
+#
+
+from __future__ import print_function
+
+import sys
 
 topX = 8
 topY = 8
 
-print "// AUTOGENERATED FILE; DO NOT MODIFY."
-print "// run with topX=",topX," and topY=",topY
-print "// ";
-print '`include "bsg_defines.v"'
+curves = ["serpentine", "boustrophedon", "hilbert", "peano"]
+
+def print_header(run_with) :
+    print("// AUTOGENERATED FILE; DO NOT MODIFY.")
+    print("// run with " + run_with)
+    print("// ")
+    print('`include "bsg_defines.v"')
+    print("")
+    print("module bsg_mesh_to_ring_stitch   #(parameter `BSG_INV_PARAM(y_max_p)")
+    print("                                  ,parameter `BSG_INV_PARAM(x_max_p)")
+    print("                                  ,parameter `BSG_INV_PARAM(width_back_p)")
+    print("                                  ,parameter `BSG_INV_PARAM(width_fwd_p)")
+    print("                                  ,parameter b_lp = $clog2(x_max_p*y_max_p)")
+    print("                                  ) (output  [x_max_p-1:0][y_max_p-1:0][b_lp-1:0] id_o")
+    print("                                     ,output [x_max_p-1:0][y_max_p-1:0][width_back_p-1:0] back_data_in_o")
+    print("                                     ,input  [x_max_p-1:0][y_max_p-1:0][width_back_p-1:0] back_data_out_i")
+    print("                                     ,output [x_max_p-1:0][y_max_p-1:0][width_fwd_p-1:0]  fwd_data_in_o")
+    print("                                     ,input  [x_max_p-1:0][y_max_p-1:0][width_fwd_p-1:0]  fwd_data_out_i")
+    print("                                    );\n\n")
 
-print "module bsg_mesh_to_ring_stitch   #(`BSG_INV_PARAM(y_max_p)"
-print "                                  ,`BSG_INV_PARAM(x_max_p)"
-print "                                  ,`BSG_INV_PARAM(width_back_p)"
-print "                                  ,`BSG_INV_PARAM(width_fwd_p)"
-print "                                  ,parameter b_lp = $clog2(x_max_p*y_max_p)"
-print "                                  ) (output  [x_max_p-1:0][y_max_p-1:0][b_lp-1:0] id_o"
-print "                                     ,output [x_max_p-1:0][y_max_p-1:0][width_back_p-1:0] back_data_in_o"
-print "                                     ,input  [x_max_p-1:0][y_max_p-1:0][width_back_p-1:0] back_data_out_i"
-print "                                     ,output [x_max_p-1:0][y_max_p-1:0][width_fwd_p-1:0]  fwd_data_in_o"
-print "                                     ,input  [x_max_p-1:0][y_max_p-1:0][width_fwd_p-1:0]  fwd_data_out_i"
-print "                                    );\n\n"
+def print_footer() :
+    print("endmodule")
+    print("")
+    print("`BSG_ABSTRACT_MODULE(bsg_mesh_to_ring_stitch)")
 
+# the items of a python2 print statement
+def fields(*items) :
+    return " ".join([str(x) for x in items])
 
 def print_config (maxX,maxY,order) :
         matrix = [[0 for y in range(maxY)] for x in range(maxX)]
@@ -41,7 +79,7 @@ def print_config (maxX,maxY,order) :
             my_dict[position] = (x,y);
             matrix[x][y] = position;
 
-        print "if (x_max_p ==",maxX," && y_max_p ==",maxY,")\nbegin\n"
+        print(fields("if (x_max_p ==",maxX," && y_max_p ==",maxY,")\nbegin\n"))
         for y in range(maxY-1,-1,-1) :
             for x in range(maxX-1,-1,-1) :
                 position=matrix[x][y];
@@ -49,30 +87,31 @@ def print_config (maxX,maxY,order) :
                 above = 0 if ((position + 1) == maxX*maxY) else position + 1;
                 (below_x,below_y)=my_dict[below];
                 (above_x,above_y)=my_dict[above];
-                print "assign back_data_in_o[",below_x,"][",below_y,"] = back_data_out_i[",x,"][",y,"]; // ",below,"<-",position
-                print "assign fwd_data_in_o [",above_x,"][",above_y,"] = fwd_data_out_i [",x,"][",y,"]; // ",position,"->",above
-        print "\n"
-        print " assign id_o = \n {"
-        print "// y = ",
-        for y in range(0,maxY) :
-            print str(y)+", ",
-        print "";
+                print(fields("assign back_data_in_o[",below_x,"][",below_y,"] = back_data_out_i[",x,"][",y,"]; // ",below,"<-",position))
+                print(fields("assign fwd_data_in_o [",above_x,"][",above_y,"] = fwd_data_out_i [",x,"][",y,"]; // ",position,"->",above))
+        print("\n")
+        print(" assign id_o = \n {")
+        print("// y = " + "".join([" " + str(y) + ", " for y in range(0,maxY)]) + " ")
         for x in range(0,maxX) :
-            print "  {",
-            for y in range(0,maxY) :
-                if (y != 0) :
-                        print ",",
-                print "b_lp ' (" + str(matrix[x][y]) +")",
+            ids = "".join([(" ," if (y != 0) else "") + " b_lp ' (" + str(matrix[x][y]) + ")" for y in range(0,maxY)])
             if (x != maxX-1) :
-                    print "    }, // x = ",x
+                    print("  {" + ids + " " + fields("    }, // x = ",x))
             else:
-                    print "    } // x = ",x
-        print " };\nend\n"
+                    print("  {" + ids + " " + fields("    } // x = ",x))
+        print(" };\nend\n")
 
-# even X, odd/even Y
-for maxX in range(2,topX+1,2) :
-    for maxY in range(2,topY+1,1) :
-        order=[]
+################################################################################
+#    Curves; each returns the tiles (x,y) in ring order
+################################################################################
+
+# even X, odd/even Y: up and down column pairs, back along y = 0
+# odd X, even Y: along row pairs, back along x = 0
+def serpentine_order (maxX,maxY) :
+    order=[]
+    if (maxX*maxY == 2) :
+        # handle 1x2
+        return [(0,0), (1,0)] if (maxX == 2) else [(0,0), (0,1)]
+    elif (maxX % 2 == 0 and maxY >= 2) :
         for x in range(0,maxX,2) :
             for y in range(1,maxY,1) :
                 order.append( (x,y))
@@ -81,13 +120,7 @@ for maxX in range(2,topX+1,2) :
 
         for x in range(maxX-1,-1,-1) :
             order.append((x,0))
-
-        print_config(maxX,maxY,order)
-
-# odd X, even Y
-for maxX in range(3,topX+1,2) :
-    for maxY in range(2,topY+1,2) :
-        order=[]
+    elif (maxY % 2 == 0 and maxX >= 3) :
         for y in range(0,maxY,2) :
             for x in range(1,maxX,1) :
                 order.append( (x,y))
@@ -96,16 +129,195 @@ for maxX in range(3,topX+1,2) :
 
         for y in range(maxY-1,-1,-1) :
             order.append((0,y))
+    else :
+        raise ValueError("serpentine needs an even side and both sides > 1 (or 1x2/2x1)")
+    return order
+
+# a path (every hop 1 or 2 tiles if the path's are 1) closing on itself:
+# even positions out, odd positions back
+def fold (path) :
+    return path[0::2] + list(reversed(path[1::2]))
+
+def boustrophedon_order (maxX,maxY) :
+    if (maxX >= maxY) :
+        path = [(x if (y % 2 == 0) else maxX-1-x, y) for y in range(maxY) for x in range(maxX)]
+    else :
+        path = [(x, y if (x % 2 == 0) else maxY-1-y) for x in range(maxX) for y in range(maxY)]
+    return fold(path)
+
+def sign (a) :
+    return (a > 0) - (a < 0)
+
+# generalized hilbert curve over the rectangle spanned by a (the major
+# axis) and b from corner (x,y); it ends at the far corner along a, and its
+# hops are 1 tile except for at most one diagonal on odd sizes
+def gilbert (x,y,ax,ay,bx,by,out) :
+    w = abs(ax + ay)
+    h = abs(bx + by)
+    (dax, day) = (sign(ax), sign(ay))
+    (dbx, dby) = (sign(bx), sign(by))
+
+    if (h == 1) :
+        for i in range(w) :
+            out.append((x,y))
+            (x, y) = (x + dax, y + day)
+        return
+    if (w == 1) :
+        for i in range(h) :
+            out.append((x,y))
+            (x, y) = (x + dbx, y + dby)
+        return
+
+    (ax2, ay2) = (ax // 2, ay // 2)
+    (bx2, by2) = (bx // 2, by // 2)
+    w2 = abs(ax2 + ay2)
+    h2 = abs(bx2 + by2)
+
+    if (2*w > 3*h) :
+        # long: two halves along a
+        if (w2 % 2 and w > 2) :
+            (ax2, ay2) = (ax2 + dax, ay2 + day)
+        gilbert(x, y, ax2, ay2, bx, by, out)
+        gilbert(x+ax2, y+ay2, ax-ax2, ay-ay2, bx, by, out)
+    else :
+        # up half of b, along a, back down
+        if (h2 % 2 and h > 2) :
+            (bx2, by2) = (bx2 + dbx, by2 + dby)
+        gilbert(x, y, bx2, by2, ax2, ay2, out)
+        gilbert(x+bx2, y+by2, ax, ay, bx-bx2, by-by2, out)
+        gilbert(x+(ax-dax)+(bx2-dbx), y+(ay-day)+(by2-dby), -bx2, -by2, -(ax-ax2), -(ay-ay2), out)
+
+def hilbert_order (maxX,maxY) :
+    order = []
+    if (min(maxX,maxY) == 1) :
+        return boustrophedon_order(maxX,maxY)
+    if (maxX >= maxY) :
+        # bottom half left to right, top half right to left
+        h = maxY // 2
+        gilbert(0, h-1, maxX, 0, 0, -h, order)
+        gilbert(maxX-1, h, -maxX, 0, 0, maxY-h, order)
+    else :
+        w = maxX // 2
+        gilbert(w-1, maxY-1, 0, -maxY, -w, 0, order)
+        gilbert(w, 0, 0, maxY, maxX-w, 0, order)
+    return order
+
+# three parts, odd where possible, so blocks run corner to opposite corner
+def peano_split (d) :
+    if (d < 3) :
+        return [d]
+    a = d // 3
+    if (a % 2 == 0) :
+        a = a + 1
+    return [a, d - 2*a, a]
+
+# (0,0) to (w-1,h-1), a column serpentine of blocks, each reflected so that
+# it starts next to where the one before ended
+def peano_path (w,h) :
+    cols = peano_split(w)
+    rows = peano_split(h)
+    if (len(cols) == 1 and len(rows) == 1) :
+        return [(x, y if (x % 2 == 0) else h-1-y) for x in range(w) for y in range(h)]
+
+    path = []
+    x0 = 0
+    for (c, cw) in enumerate(cols) :
+        order = list(range(len(rows))) if (c % 2 == 0) else list(reversed(range(len(rows))))
+        for (k, r) in enumerate(order) :
+            rh = rows[r]
+            y0 = sum(rows[:r])
+            for (x, y) in peano_path(cw, rh) :
+                path.append((x0 + (cw-1-x if (k % 2) else x), y0 + (rh-1-y if (c % 2) else y)))
+        x0 = x0 + cw
+    return path
+
+def peano_order (maxX,maxY) :
+    return fold(peano_path(maxX,maxY))
+
+def curve_order (curve,maxX,maxY) :
+    if (maxX < 1 or maxY < 1 or maxX*maxY < 2) :
+        raise ValueError("need at least 2 tiles")
+    order = { "serpentine"    : serpentine_order
+            , "boustrophedon" : boustrophedon_order
+            , "hilbert"       : hilbert_order
+            , "peano"         : peano_order
+            }[curve](maxX,maxY)
+    assert sorted(order) == [(x,y) for x in range(maxX) for y in range(maxY)], curve + " does not visit every tile once"
+    return order
+
+# manhattan length of every ring edge, from each tile to the next
+def hop_lengths (order) :
+    return [abs(x1-x0) + abs(y1-y0) for ((x0,y0),(x1,y1)) in zip(order, order[1:] + order[:1])]
+
+def report (maxX,maxY) :
+    print("# bsg_mesh_to_ring_stitch " + str(maxX) + "x" + str(maxY) + ": hop length of each ring edge, in tiles")
+    print("%14s %6s %8s %8s %7s  %s" % ("curve", "edges", "max_hop", "avg_hop", "hops>1", "histogram (hop:edges)"))
+    best = None
+    for curve in curves :
+        try :
+            hops = hop_lengths(curve_order(curve,maxX,maxY))
+        except ValueError as e :
+            print("%14s  %s" % (curve, str(e)))
+            continue
+        key = (max(hops), sum(hops))
+        if (best is None or key < best[0]) :
+            best = (key, [curve])
+        elif (key == best[0]) :
+            best[1].append(curve)
+        print("%14s %6d %8d %8.3f %7d  %s" % (curve, len(hops), max(hops), sum(hops) / float(len(hops)),
+                                              len([h for h in hops if h > 1]),
+                                              " ".join([str(h) + ":" + str(hops.count(h)) for h in sorted(set(hops))])))
+    if best :
+        print("# shortest (max, then average hop): " + ", ".join(best[1]))
+
+def generate_all () :
+    print_header(fields("topX=",topX," and topY=",topY))
+
+    # even X, odd/even Y
+    for maxX in range(2,topX+1,2) :
+        for maxY in range(2,topY+1,1) :
+            print_config(maxX,maxY,serpentine_order(maxX,maxY))
+
+    # odd X, even Y
+    for maxX in range(3,topX+1,2) :
+        for maxY in range(2,topY+1,2) :
+            print_config(maxX,maxY,serpentine_order(maxX,maxY))
+
+    # handle 1x2
+    print_config(1,2,[(0,0), (0,1)]);
+    print_config(2,1,[(0,0), (1,0)]);
 
-        print_config(maxX,maxY,order)
+    print("initial assert ((x_max_p <= " + str(topX) + ") && (y_max_p <= " + str(topY) +")) else begin $error(\"%m x_max_p %d or y_max_p %d too large; rerun generator with larger size than %d/%d\",x_max_p,y_max_p,"+str(topX)+","+str(topY)+"); $finish(); end ")
 
-# handle 1x2
-print_config(1,2,[(0,0), (0,1)]);
-print_config(2,1,[(0,0), (1,0)]);
+    print_footer()
 
-print "initial assert ((x_max_p <= " + str(topX) + ") && (y_max_p <= " + str(topY) +")) else begin $error(\"%m x_max_p %d or y_max_p %d too large; rerun generator with larger size than %d/%d\",x_max_p,y_max_p,"+str(topX)+","+str(topY)+"); $finish(); end "
+def generate_one (maxX,maxY,curve) :
+    order = curve_order(curve,maxX,maxY)
+    hops = hop_lengths(order)
 
+    print_header(fields("x_max_p=",maxX," and y_max_p=",maxY) + ", " + curve
+                 + " ring, max hop " + str(max(hops)) + " tiles")
+    print_config(maxX,maxY,order)
+    print("initial assert ((x_max_p == " + str(maxX) + ") && (y_max_p == " + str(maxY) +")) else begin $error(\"%m x_max_p %d y_max_p %d; generated for "+str(maxX)+"/"+str(maxY)+" only, rerun generator\",x_max_p,y_max_p); $finish(); end ")
+    print_footer()
 
-print "endmodule"
+def main (argv) :
+    args = argv[1:]
+    try :
+        if (len(args) == 0) :
+            generate_all()
+        elif (len(args) == 3 and args[0] == "report") :
+            report(int(args[1]),int(args[2]))
+        elif (len(args) in (2,3) and (len(args) == 2 or args[2] in curves)) :
+            generate_one(int(args[0]),int(args[1]),args[2] if len(args) == 3 else "serpentine")
+        else :
+            raise ValueError("")
+    except ValueError as e :
+        if str(e) :
+            print("Error: " + str(e), file=sys.stderr)
+        print("Usage: " + argv[0] + " [X Y [" + "|".join(curves) + "]] | report X Y", file=sys.stderr)
+        return 1
+    return 0
 
-print "`BSG_ABSTRACT_MODULE(bsg_mesh_to_ring_stitch)"
+if __name__ == "__main__" :
+    sys.exit(main(sys.argv))
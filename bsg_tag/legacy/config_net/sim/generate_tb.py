@@ -1,37 +1,52 @@
-#!/nbu_async/luzh/install/bin/python
+#!/usr/bin/env python
+
+#
+# generate_tb.py - testbench generator for a config_node network
+#
+# Reads the network specification (config_spec.in format, or
+# --random-nodes N), builds the relay_node tree, and writes the test
+# sequence, setter vector, probe references, latency report and
+# SystemVerilog testbench.
+#
+#   generate_tb.py --spec config_spec.in --generate-tests config_test.in --number-of-tests 20
+#   generate_tb.py --spec config_spec.in --read-tests config_test.in \
+#                  --testbench config_net_tb.v --create-setter-file config_file_setter.in \
+#                  --create-probe-file config_probe.in [--latency-report config_latency.out]
+#
+# Relay tree layouts (--layout), for specs without 'r' lines:
+#
+#   random    relays (--relays, default 1..16) hang off random earlier relays
+#             and 'x' config nodes off random relays, as before
+#   balanced  every relay drives at most --fanout children (relays or
+#             config nodes) and all config nodes are at (nearly) the same
+#             depth: an f-ary huffman tree with equal weights
+#   latency   the same, with each config node weighted by its number of test
+#             packets, so busy nodes sit closer to the root
+#
+# Latency model: the setter shifts one bit per clk_cfg cycle, reset bits
+# first, and every relay_node is one register. A packet whose first bit is
+# bit s of the setter vector is complete in the shift register of a node
+# behind d relay nodes after s + d + packet_len cycles; the clock crossing
+# to the destination domain comes on top of that.
+#
+# The tests are taken in a single pass; the setter vector is joined once,
+# so networks with thousands of relay nodes and long test sequences are
+# generated in linear time. The number of config nodes is bounded by
+# id_width_lp (and data_bits by data_max_bits_lp), as in config_defs.v.
+#
+
+from __future__ import print_function
 
-import optparse
-import subprocess
-import time
-import os
-import re
-import sys
-import random
-import os.path
 import argparse
+import heapq
+import random
+import sys
 
 # ========== Global variables ==========
 indent = "  " # indentation
 
-l_inst_id = [] # list of unique decimals
-d_inst_name = {} # dictionary of strings indexed by inst id
-d_inst_data_bits = {} # dictionary of decimals indexed by inst id
-d_inst_default = {} # dictionary of binary strings indexed by inst id
-d_inst_pos = {} # a dict specifying config_node position in the relay_tree
-l_inst_data_o = [] # list of outputs data_o for all nodes
-
-#
-d_relay_tree = {} # a tree describing relay nodes interconnections
-
-# configuration network test sequence
-l_test_id = []
-l_test_data = []
-l_test_packet = []
-
-# dictionary of verification sequences
-d_reference = {}
-
 # configuration network communication protocol parameters, applying to all nodes
+# (keep in sync with ../src/config_defs.v)
 valid_bits = "10" #
 frame_bit = '0' #
 len_width_lp = 8 # lenth field width in a config_node
@@ -52,33 +67,6 @@ clk_dst_period = 10 # time units
 sim_time = 500 # time units
 
 # ========== Functions ==========
-def readme():
-  print "  \n\
-    Name:\n\
-      generate_tb.py - python script to generate testbench for chained config_node instances\n\
-    \n\
-    Usage:\n\
-      generate_tb.py {-w <testfile> <number of tests> | -r <testfile> -o <tb file name>}\n\
-    \n\
-    Example:\n\
-      generate_tb.py -w config_test.in 10\n\
-      generate_tb.py -r config_test.in -o config_net_tb.v\n\
-    \n\
-    Description:\n\
-      This script reads config network specifications from config_spec.in file,\n\
-      generates a random configuraion network using relay_nodes, and\n\
-      attach config_nodes to a randomly chosen relay_node. It also\n\
-      generates random test sequence and creates config_net_tb.v\n\
-      testbench.\n\
-    \n\
-      Use command ./generate_tb.py -w <testfile> <number of tests> to\n\
-      generate a new sequence of <number of tests> tests and writes the\n\
-      sequence to <testfile>.\n\
-    \n\
-      You can extend the generated testfile to contain your specific test cases;\n\
-      then use command ./generate_tb.py -r <testfile> -o <tb file name> to read the\n\
-      modified file, and create testbench accordingly."
-
 def dec2bin(dec, n): # Only works on non-negative number
   bin = ""
   while n > 0:
@@ -100,6 +88,23 @@ def insert_frame_bits(data):
   framed_data = frame_bit + "_" + framed_data
   return framed_data
 
+# number of bits in a packet for a node with data_bits, i.e. its shift register width
+def packet_bits(data_bits):
+  send_data_bits = data_bits + (data_bits // data_frame_len_lp) + frame_bit_size_lp
+  return send_data_bits + frame_bit_size_lp + \
+         id_width_lp + frame_bit_size_lp + \
+         len_width_lp + frame_bit_size_lp + \
+         valid_bit_size_lp
+
+def make_packet(test_id, test_data, packet_len):
+  return insert_frame_bits(test_data) +\
+         "_" + frame_bit +\
+         "_" + dec2bin(test_id, id_width_lp) +\
+         "_" + frame_bit +\
+         "_" + dec2bin(packet_len, len_width_lp) +\
+         "_" + frame_bit +\
+         "_" + valid_bits
+
 def write_localparam(file, lhs, rhs):
   file.write(indent + "localparam " + lhs + " = " + rhs + ";\n")
 
@@ -132,250 +137,223 @@ def write_relay_node(file, id, config_i, config_o):
     relay_id_" + \
           id + "_dut(  .config_i(" + config_i + "),\n\
                        .config_o(" + config_o + ") );\n")
-# ========== ==========
-argparser = argparse.ArgumentParser()
-argparser.add_argument("--spec",
-                       type=argparse.FileType('r'),
-                       metavar='Filename',
-                       dest="spec_file",
-                       required=True,
-                       help="read configuration network specification file")
-
-arg_tests_rw = argparser.add_mutually_exclusive_group()
-arg_tests_rw.add_argument("--generate-tests",
-                          type=argparse.FileType('w'),
-                          metavar='Filename',
-                          dest="generate_tests",
-                          required=False,
-                          help="write randomly generated test sequence to file")
-arg_tests_rw.add_argument("--read-tests",
-                          type=argparse.FileType('r'),
-                          metavar='Filename',
-                          dest="read_tests",
-                          required=False,
-                          help="read existing test sequence file")
-
-argparser.add_argument("--number-of-tests",
-                       type=int,
-                       metavar='Integer',
-                       default=10,
-                       dest="number_of_tests",
-                       required=False,
-                       help="number of tests to be created with --generate-tests")
-
-argparser.add_argument("--testbench",
-                       type=argparse.FileType('w'),
-                       metavar='Filename',
-                       dest="testbench",
-                       required=False,
-                       help="generate configuration network SystemVerilog testbench file")
-
-argparser.add_argument("--create-setter-file",
-                       type=argparse.FileType('w'),
-                       metavar='Filename',
-                       dest="create_setter_file",
-                       required=False,
-                       help="generate configuration network setter vector according to --read-tests and write the vector to file")
-
-argparser.add_argument("--create-probe-file",
-                       type=argparse.FileType('w'),
-                       metavar='Filename',
-                       dest="create_probe_file",
-                       required=False,
-                       help="generate verification probes for each config_node according to --read-tests and write the probes to file")
-
-try:
-  args = argparser.parse_args()
-except IOError, msg:
-  argparser.error(str(msg))
 
-# ========== ==========
-# read specification file, parse relay nodes
-spec_file = args.spec_file
-relay_nodes = 0 # number of relay nodes in the configuration network
-for line in spec_file:
-  line = line.rstrip('\n') # remove the newline character
-  if line != "": # if not an empty line
-    l_words = line.split() # split a line into a list of words on white spaces
-    if (line[0] != '#') and (line[0] != ' '): # ignore lines starting with '#' or spaces
-      if (l_words[0] == 'r'): # type 'r' indicates a relay node
-        relay_id = int(l_words[1]) # l_words[1] must be consecutive integers starting from 0
-        if (relay_id != relay_nodes):
-          print "ERROR spec file format: relay_id must be consecutive integers starting from 0!"
-          print ">>> " + line
-          sys.exit(1)
-        else: # relay_nodes != 0
-          if (l_words[1] != '0'): # no need to process relay node 0
-            if (l_words[2] == 'x'): # position 'x' indicates a random branch
-              branch_id = random.randint(0, relay_nodes - 1) # to which the new relay node is connected
-            else:
-              branch_id = int(l_words[2]) # l_words[2] must be an integer if not an 'x'
-            if d_relay_tree.has_key(branch_id):
-              d_relay_tree[branch_id].append(relay_id)
-            else:
-              d_relay_tree[branch_id] = [relay_id]
-        relay_nodes += 1
-      elif (l_words[0] == 'c'): # type 'c' indicates a config node
-        inst_id = int(l_words[1])
-        l_inst_id.append(inst_id)
-        d_inst_name[inst_id] = l_words[3]
-        d_inst_data_bits[inst_id] = int(l_words[4])
-        d_inst_default[inst_id] = l_words[5]
-      else:
-        print "ERROR spec file format: type " + l_words[0] + " is not recognized!"
-        print ">>> " + line
-        sys.exit(1)
-
-# randomize d_relay_tree if relay_nodes are not provided in spec file
-if (relay_nodes == 0):
-  relay_nodes = random.randint(1, 16) # generate random number [1..16] of relay nodes
-  for relay_id in range(1, relay_nodes): # relay_id 0 is the root
-    # because relay node id are consecutive integers, randint(0, relay_id - 1) makes all nodes are connected
-    branch_id = random.randint(0, relay_id - 1) # to which the new relay is connected
-    if d_relay_tree.has_key(branch_id):
-      d_relay_tree[branch_id].append(relay_id)
+def spec_error(message, line):
+  print("ERROR spec file format: " + message)
+  if line is not None:
+    print(">>> " + line)
+  sys.exit(1)
+
+# ========== Network ==========
+class ConfigNode:
+  def __init__(self, inst_id, branch, name, data_bits, default):
+    self.inst_id = inst_id
+    self.branch = branch # relay id, or 'x' for any
+    self.name = name
+    self.data_bits = data_bits
+    self.default = default
+
+# relays: list of (relay_id, branch or 'x', line); nodes: list of ConfigNode in spec order
+def read_spec(spec_file):
+  relays = []
+  nodes = []
+  for line in spec_file:
+    line = line.rstrip('\n') # remove the newline character
+    if line != "": # if not an empty line
+      l_words = line.split() # split a line into a list of words on white spaces
+      if (line[0] != '#') and (line[0] != ' '): # ignore lines starting with '#' or spaces
+        if (l_words[0] == 'r'): # type 'r' indicates a relay node
+          relay_id = int(l_words[1]) # l_words[1] must be consecutive integers starting from 0
+          if (relay_id != len(relays)):
+            spec_error("relay_id must be consecutive integers starting from 0!", line)
+          branch = None if relay_id == 0 else (l_words[2] if l_words[2] == 'x' else int(l_words[2]))
+          if (branch not in (None, 'x')) and (branch >= relay_id):
+            spec_error("relay branch id must be a smaller relay id!", line)
+          relays.append((relay_id, branch, line))
+        elif (l_words[0] == 'c'): # type 'c' indicates a config node
+          node = ConfigNode(int(l_words[1]),
+                            l_words[2] if l_words[2] == 'x' else int(l_words[2]),
+                            l_words[3], int(l_words[4]), l_words[5])
+          check_node(node, line)
+          nodes.append(node)
+        else:
+          spec_error("type " + l_words[0] + " is not recognized!", line)
+  spec_file.close()
+  return (relays, nodes)
+
+def check_node(node, line):
+  if (node.inst_id < 0) or (node.inst_id >= (1 << id_width_lp)):
+    spec_error("config node id " + str(node.inst_id) + " does not fit in id_width_lp = " + str(id_width_lp) + " bits!", line)
+  if (node.data_bits < 1) or (node.data_bits > data_max_bits_lp):
+    spec_error("data_bits must be 1.." + str(data_max_bits_lp) + "!", line)
+  if (len(node.default) != node.data_bits):
+    spec_error("the #digits of <default> should be equal to data_bits!", line)
+
+# config nodes 0..n-1 with random widths and defaults, the same for a given n
+def random_nodes(n):
+  rng = random.Random(n)
+  nodes = []
+  for inst_id in range(n):
+    data_bits = rng.randint(1, data_max_bits_lp)
+    nodes.append(ConfigNode(inst_id, 'x', "node_" + str(inst_id), data_bits,
+                            dec2bin(rng.getrandbits(data_bits), data_bits)))
+  return nodes
+
+class RelayTree:
+  def __init__(self):
+    self.parent = [None] # relay 0 is the root
+    self.node_pos = {} # config node id -> relay id
+
+  def add_relay(self, branch):
+    self.parent.append(branch)
+    return len(self.parent) - 1
+
+  def relays(self):
+    return len(self.parent)
+
+  def children(self): # branch relay id -> list of relay ids, in id order
+    d_relay_tree = {}
+    for relay_id in range(1, len(self.parent)):
+      d_relay_tree.setdefault(self.parent[relay_id], []).append(relay_id)
+    return d_relay_tree
+
+  # number of relay nodes from the root to each relay, inclusive
+  def depths(self):
+    depth = [1]
+    for relay_id in range(1, len(self.parent)):
+      depth.append(depth[self.parent[relay_id]] + 1) # parents have smaller ids
+    return depth
+
+def random_tree(relays, nodes, number_of_relays):
+  tree = RelayTree()
+  if relays:
+    for (relay_id, branch, line) in relays[1:]:
+      # because relay node id are consecutive integers, randint(0, relay_id - 1) makes all nodes are connected
+      tree.add_relay(random.randint(0, relay_id - 1) if branch == 'x' else branch)
+  else: # randomize the tree if relay_nodes are not provided in spec file
+    if number_of_relays is None:
+      number_of_relays = random.randint(1, 16) # generate random number [1..16] of relay nodes
+    for relay_id in range(1, number_of_relays): # relay_id 0 is the root
+      tree.add_relay(random.randint(0, relay_id - 1)) # to which the new relay is connected
+  for node in nodes:
+    if (node.branch == 'x'): # position 'x' indicates a random branch
+      tree.node_pos[node.inst_id] = random.randint(0, tree.relays() - 1) # inclusive of 0 and (relay_nodes - 1)
+    elif (node.branch >= tree.relays()):
+      spec_error("config node branch id doesn't exist, " + str(node.branch) + " >= number of relay nodes = " + str(tree.relays()) + "!", None)
     else:
-      d_relay_tree[branch_id] = [relay_id]
-
-spec_file.seek(0) # rewind to read from the beginning of spec file
-# read specification file, attach config nodes
-for line in spec_file:
-  line = line.rstrip('\n') # remove the newline character
-  if line != "": # if not an empty line
-    l_words = line.split() # split a line into a list of words on white spaces
-    if (line[0] != '#') and (line[0] != ' '): # ignore lines starting with '#' or spaces
-      if (l_words[0] == 'c'): # type 'c' indicates a config node
-        inst_id = int(l_words[1])
-        if (l_words[2] == 'x'): # position 'x' indicates a random branch
-          d_inst_pos[inst_id] = random.randint(0, relay_nodes - 1) # inclusive of 0 and (relay_nodes - 1)
-        elif (int(l_words[2]) >= relay_nodes): # l_words[2] must be an integer if not an 'x'
-          print "ERROR spec file format: config node branch id doesn't exist, " + l_words[2] + " >= number of relay nodes = " + str(relay_nodes) + "!"
-          print ">>> " + line
-          sys.exit(1)
+      tree.node_pos[node.inst_id] = node.branch
+  return tree
+
+# f-ary huffman tree over the config nodes: every relay drives at most fanout
+# children, and the sum of weight * depth is minimal; relays are numbered
+# breadth first so that branches have smaller ids
+def huffman_tree(nodes, weight, fanout):
+  tree = RelayTree()
+  if len(nodes) <= fanout:
+    for node in nodes:
+      tree.node_pos[node.inst_id] = 0
+    return tree
+
+  # heap of (weight, order, children); children are config nodes or subtrees
+  heap = [(weight[node.inst_id], order, node) for (order, node) in enumerate(nodes)]
+  order = len(heap)
+  # pad with empty leaves so every merge takes fanout entries
+  while (len(heap) - 1) % (fanout - 1) != 0:
+    heap.append((0, -order, None))
+    order += 1
+  heapq.heapify(heap)
+  while len(heap) > 1:
+    group = [heapq.heappop(heap) for i in range(fanout)]
+    heapq.heappush(heap, (sum([w for (w, o, c) in group]), order, [c for (w, o, c) in group if c is not None]))
+    order += 1
+
+  queue = [(0, heap[0][2])]
+  while queue:
+    next_queue = []
+    for (relay_id, children) in queue:
+      for child in children:
+        if isinstance(child, ConfigNode):
+          tree.node_pos[child.inst_id] = relay_id
         else:
-          d_inst_pos[inst_id] = int(l_words[2])
-spec_file.close()
-
-# randomly generate test file or read an existing one
-if (args.generate_tests != None):
-  # randomly generate test id and test data
-  test_file = args.generate_tests
-  number_of_tests = args.number_of_tests
-  generated_tests = 0
-  while (generated_tests < number_of_tests):
-    rand_idx = random.randint(0, len(l_inst_id) - 1)
-    test_id = l_inst_id[rand_idx]
-    l_test_id.append(test_id)
-    test_data_bits = d_inst_data_bits[test_id]
-    randbits = random.getrandbits(test_data_bits)
-    test_data = dec2bin(randbits, test_data_bits)
-    l_test_data.append(test_data)
-    generated_tests += 1
-  # write random test cases to test file
+          next_queue.append((tree.add_relay(relay_id), child))
+    queue = next_queue
+  return tree
+
+# ========== Tests ==========
+def generate_tests(nodes, number_of_tests):
+  tests = []
+  for test in range(number_of_tests):
+    node = nodes[random.randint(0, len(nodes) - 1)]
+    tests.append((node.inst_id, dec2bin(random.getrandbits(node.data_bits), node.data_bits)))
+  return tests
+
+def write_tests(test_file, tests):
   test_file.write("# This is a generated file with random test id and data.\n" + \
                   "# You can extend this file to contain your specific test cases.\n" + \
-                  "# Use command `./generate_tb.py -r <this file name> -o <tb file name>` if you would like to use the modified file.\n" + \
-                  "# Use command `./generate_tb.py -w <this file name> <number of tests>` will overwrite this file.\n\n" + \
+                  "# Use command `./generate_tb.py --spec <spec> --read-tests <this file name> --testbench <tb file name>` if you would like to use the modified file.\n" + \
+                  "# Use command `./generate_tb.py --spec <spec> --generate-tests <this file name> --number-of-tests <n>` will overwrite this file.\n\n" + \
                   "# <test id> <test data>\n")
-  for test in range(0, number_of_tests):
-    test_file.write(str(l_test_id[test]) + "\t\t" + l_test_data[test] + "\n")
+  for (test_id, test_data) in tests:
+    test_file.write(str(test_id) + "\t\t" + test_data + "\n")
   test_file.close()
-  os.system("cat " + test_file.name)
-  print "  "
-  print str(number_of_tests) + " sets of random test id and data are generated and written into " + test_file.name
-  sys.exit(0) # exit after making the test file
-elif (args.read_tests != None):
-  # read existing test file and parse
-  test_file = args.read_tests
+
+def read_tests(test_file, d_node):
+  tests = []
   for line in test_file:
     line = line.rstrip('\n') # remove the newline character
     if line != "": # if not an empty line
       l_words = line.split() # split a line into a list of words on white spaces
       if (line[0] != '#') and (line[0] != ' '): # ignore lines starting with '#' or spaces
-        l_test_id.append(int(l_words[0]))
-        l_test_data.append(l_words[1])
+        test_id = int(l_words[0])
+        if (test_id not in d_node) or (len(l_words[1]) != d_node[test_id].data_bits):
+          print("ERROR test file format: no config node " + str(test_id) + " with " + str(len(l_words[1])) + " data bits!")
+          print(">>> " + line)
+          sys.exit(1)
+        tests.append((test_id, l_words[1]))
   test_file.close()
-
-# create test string and calculate total bits
-test_idx = 0
-test_vector_bits = 0
-for test_id in l_test_id:
-  send_data = insert_frame_bits(l_test_data[test_idx])
-  data_bits = d_inst_data_bits[test_id]
-  send_data_bits = data_bits + (data_bits / data_frame_len_lp) + frame_bit_size_lp
-  packet_len = send_data_bits + frame_bit_size_lp + \
-               id_width_lp + frame_bit_size_lp + \
-               len_width_lp + frame_bit_size_lp + \
-               valid_bit_size_lp
-  test_vector_bits += packet_len
-  test_packet = send_data +\
-                "_" + frame_bit +\
-                "_" + dec2bin(test_id, id_width_lp) +\
-                "_" + frame_bit +\
-                "_" + dec2bin(packet_len, len_width_lp) +\
-                "_" + frame_bit +\
-                "_" + valid_bits
-  l_test_packet.append(test_packet)
-  test_idx += 1
-
-# create a dictionary indexed by inst_id
-# each node must be reset before random testing
-for inst_id in l_inst_id: # initialize dictionary with config_node default values
-  d_reference[inst_id] = [d_inst_default[inst_id]]
-# if a new data item for an id is the same as its previous one, the new data is not appended as a new reference;
-# because the verilog testbench is not able to detect signal change.
-test_idx = 0
-for test_id in l_test_id:
-  test_data = l_test_data[test_idx]
-  if d_reference.has_key(test_id): # extend an existing test sequence for a node having test_id
-    last_index = len(d_reference[test_id]) - 1
-    # if a new data item for an id is the same as its previous one, the new data is not appended.
-    if(d_reference[test_id][last_index] != test_data):
-      d_reference[test_id].append(test_data)
-  test_idx += 1
-
-# create reset string
-reset_string = ""
-for bit in range(0, reset_len_lp): # 0, 1, ..., reset_len_lp - 1
-  reset_string += '1'
-
-# the whole test vector begins with reset string
-test_vector_bits += reset_len_lp
-test_vector = reset_string
-# the first test packet in l_test_packet is fed into the configuration network first
-for packet in l_test_packet:
-  # double underscore __ separates test packet for each node
-  test_vector = packet + "__" + test_vector
-
-# write test vector to file
-if (args.create_setter_file != None):
-  setter_file = args.create_setter_file
+  return tests
+
+# packets, reference sequences and latencies of a test sequence, in one pass
+class Schedule:
+  def __init__(self, nodes, tree, tests):
+    depth = tree.depths()
+    self.l_test_packet = []
+    # each node must be reset before random testing, so the first reference
+    # is the default value; a new data item that is the same as the node's
+    # previous one is not appended, because the verilog testbench is not
+    # able to detect signal change.
+    self.d_reference = dict([(node.inst_id, [node.default]) for node in nodes])
+    # (test id, relay, depth, packet bits, first bit, latency, done cycle)
+    self.latency = []
+    self.test_vector_bits = reset_len_lp # the whole test vector begins with reset string
+    for (test_id, test_data) in tests:
+      packet_len = packet_bits(len(test_data))
+      self.l_test_packet.append(make_packet(test_id, test_data, packet_len))
+      relay_id = tree.node_pos[test_id]
+      d = depth[relay_id]
+      self.latency.append((test_id, relay_id, d, packet_len, self.test_vector_bits,
+                           d + packet_len, self.test_vector_bits + d + packet_len))
+      self.test_vector_bits += packet_len
+      if (self.d_reference[test_id][-1] != test_data):
+        self.d_reference[test_id].append(test_data)
+    self.max_depth = max(depth)
+    self.done = max([l[6] for l in self.latency] + [reset_len_lp])
+
+  # the first test packet in l_test_packet is fed into the configuration network first
+  def test_vector(self):
+    # double underscore __ separates test packet for each node
+    return "__".join(list(reversed(self.l_test_packet)) + ['1' * reset_len_lp])
+
+def write_setter_file(setter_file, schedule):
   setter_file.write("# This is a file giving test input bit vector.\n" + \
                     "# The left-most bit is the first bit feeding into the configuration network first.\n" + \
                     "# You can modify this file to contain some specific testing pattern.\n" + \
                     "# Be sure you know how to modulate data and add headers, and change the vector bits value accordingly.\n")
-  setter_file.write("vector bits: " + str(test_vector_bits) + "\n\n")
-  setter_file.write(test_vector[::-1]) # the reversed string, for easy parsing in SystemVerilog testbench file
+  setter_file.write("vector bits: " + str(schedule.test_vector_bits) + "\n\n")
+  setter_file.write(schedule.test_vector()[::-1]) # the reversed string, for easy parsing in SystemVerilog testbench file
   setter_file.close()
 
-# calculate the shift register length of the whole configuration network
-shift_chain_length = 0
-for key in d_inst_data_bits:
-  data_bits = d_inst_data_bits[key]
-  send_data_bits = data_bits + (data_bits / data_frame_len_lp) + frame_bit_size_lp
-  shift_chain_length += send_data_bits + frame_bit_size_lp +\
-                       id_width_lp + frame_bit_size_lp +\
-                       len_width_lp + frame_bit_size_lp +\
-                       valid_bit_size_lp
-
-# revise simulation time to ensure all test bits walks through the whole configuration network
-sim_time += (test_vector_bits + shift_chain_length + relay_nodes) * clk_cfg_period
-# double the simulation time just to exercise config nodes longer
-sim_time = sim_time * 2
-
-# open and write expected change sequences to probe file
-if (args.create_probe_file != None):
-  probe_file = args.create_probe_file
+def write_probe_file(probe_file, nodes, schedule):
   probe_file.write("# This is a file with all config_node IDs and their expect output sequences in testbench.\n" + \
                    "# The ID value of each config_node is given in decimal after \"config id: \".\n" + \
                    "# The number of test sets for a config_node is given in decimal after \"test sets: \".\n" + \
@@ -386,169 +364,337 @@ if (args.create_probe_file != None):
                    "# The instance of config_node_bind module reads this file and test simulation outputs using this file's outputs as reference.\n" + \
                    "# Parsing of this file in VCS simulation is based on the first letter of each line.\n" + \
                    "# If this file becomes more complex in syntax, the parser should also be extended.")
-  for key in d_reference:
-    test_id = key
-    probe_file.write("\n\nconfig id: " + str(test_id))
-    tests = len(d_reference[test_id])
-    probe_file.write("\ntest sets: " + str(tests))
-    for test in range(0, tests):
-      probe_file.write("\nreference: " + d_reference[test_id][test])
+  for node in nodes:
+    references = schedule.d_reference[node.inst_id]
+    probe_file.write("\n\nconfig id: " + str(node.inst_id))
+    probe_file.write("\ntest sets: " + str(len(references)))
+    for reference in references:
+      probe_file.write("\nreference: " + reference)
   probe_file.close()
 
-# generate testbench file
-if (args.testbench == None): sys.exit(0) # Do not generate testbench file
-
-tb_file = args.testbench
-tb_file.write("module config_net_tb;\n\n")
-
-# write localparam
-write_localparam(tb_file, "len_width_lp       ", str(len_width_lp))
-write_localparam(tb_file, "id_width_lp        ", str(id_width_lp))
-write_localparam(tb_file, "valid_bit_size_lp  ", str(valid_bit_size_lp))
-write_localparam(tb_file, "frame_bit_size_lp  ", str(frame_bit_size_lp))
-write_localparam(tb_file, "data_frame_len_lp  ", str(data_frame_len_lp))
-write_localparam(tb_file, "reset_len_lp       ", str(reset_len_lp))
-write_localparam(tb_file, "data_max_bits_lp   ", str(data_max_bits_lp))
-
-tb_file.write(indent + "// double underscore __ separates test packet for each node\n")
-write_localparam(tb_file, "test_vector_bits_lp", str(test_vector_bits))
-write_localparam(tb_file, "test_vector_lp     ", str(test_vector_bits) + "'b" + test_vector)
-
-# write clock and reset signals
-tb_file.write("\n" + indent + "//\n")
-write_logic(tb_file, clk_cfg)
-write_logic(tb_file, rst_cfg)
-write_logic(tb_file, clk_dst)
-write_logic(tb_file, rst_dst)
-
-# write config_s signals
-write_config_s(tb_file, "config_root_i")
-write_config_s(tb_file, "config_snooper_o")
-
-# declare relay node outputs struct
-for relay_id in range(0, relay_nodes):
-  write_config_s(tb_file, "relay_" + str(relay_id) + "_o")
-
-# declare output data
-for inst_id in l_inst_id:
-  if (inst_id != 'r'):
-    l_inst_data_o.append("data_" + str(inst_id) + "_o")
-    write_logic_vec(tb_file, "data_" + str(inst_id) + "_o", str(d_inst_data_bits[inst_id] - 1), '0')
-
-# declare test vector logic
-write_logic_vec(tb_file, "test_vector", str(test_vector_bits - 1), '0')
-
-# declare snooper output logic
-write_logic_vec(tb_file, "config_snooped_id", str(data_max_bits_lp - 1), '0')
-write_logic_vec(tb_file, "config_snooped_data", str(data_max_bits_lp - 1), '0')
-
-# write relay node tree structure to testbench file
-tb_file.write("\n" + indent + "// " + "The relay node tree is generated as follows:\n")
-for key in d_relay_tree:
-  tb_file.write(indent + "// branch node " + str(key) + ": " + str(d_relay_tree[key]) + "\n")
-# creat relay node tree
-tb_file.write("\n" + indent + "// " + "Relay node 0 (root) \n")
-write_relay_node(tb_file, "0", "config_root_i", "relay_0_o")
-for key in d_relay_tree:
-  branch = key
-  for leaf in d_relay_tree[branch]:
-    tb_file.write("\n" + indent + "// " + "Relay node " + str(leaf) + "\n")
-    write_relay_node(tb_file, str(leaf), "relay_" + str(branch) + "_o", "relay_" + str(leaf) + "_o")
-
-# instantiate and connect configuration nodes
-for key in d_inst_pos:
-  inst_id = key
-  pos = d_inst_pos[key]
-  tb_file.write("\n" + indent + "// " + d_inst_name[inst_id] + "\n")
-  write_inst_node(tb_file, str(inst_id), str(d_inst_data_bits[inst_id]), d_inst_default[inst_id],\
-                           "relay_" + str(pos) + "_o",\
-                           "data_" + str(inst_id) + "_o")
-
-# write clock generator
-tb_file.write("\n")
-tb_file.write(indent + "// clock generator\n")
-tb_file.write(indent + "initial begin\n" + \
-              indent + indent + clk_cfg + " = 1;\n" + \
-              indent + indent + rst_cfg + " = 1;\n" + \
-              indent + indent + clk_dst + " = 1;\n" + \
-              indent + indent + rst_dst + " = 1;\n" + \
-              indent + indent + "#" + str(clk_cfg_period / 2) + " " + rst_cfg + " = 0;\n" + \
-              indent + indent + "#" + str(clk_dst_period)     + " " + rst_dst + " = 0;\n" + \
-              indent + indent + "#" + str(clk_dst_period)     + " " + rst_dst + " = 1;\n" + \
-              indent + indent + "#" + str(clk_dst_period)     + " " + rst_dst + " = 0;\n" + \
-              indent + "end\n" + \
-              indent + "always #" + str(clk_cfg_period / 2) + " begin\n" + \
-              indent + indent + clk_cfg + " = ~" + clk_cfg + ";\n" + \
-              indent + "end\n" + \
-              indent + "always #" + str(clk_dst_period / 2) + " begin\n" + \
-              indent + indent + clk_dst + " = ~" + clk_dst + ";\n" + \
-              indent + "end\n")
-
-# module config_setter and config_file_setter are used for the same purpose:
-# reading test vectors from some source and serialized each bit to the module's
-# output in each clock cycle. config_setter reads from a parameter, and this
-# module is synthesizable; config_file_setter is not synthesizable and it reads
-# from a formated file "config_file_setter.in". config_setter can be used with
-# other components in this design to randomize test patterns for config_node
-# network in simulation testbench.
-
-# instantiate config_setter to deliver configuration bits
-tb_file.write("\n")
-tb_file.write(indent + "// instantiate config_setter to read configuration bits from localparams\n")
-tb_file.write(indent + "config_setter #(.setter_vector_p(test_vector_lp),\n" + \
-              indent + "                .setter_vector_bits_p(test_vector_bits_lp) )\n" + \
-              indent + "  inst_setter  (.clk_i(" + clk_cfg + "),\n" + \
-              indent + "                .reset_i(" + rst_cfg + "),\n" + \
-              indent + "                .config_o() ); // not connected in simulation testbench\n")
-
-# instantiate config_file_setter to deliver configuration bits
-# module config_file_setter is used for reading setter vector bits from file
-# and feed them to the configuration network.
-tb_file.write("\n")
-tb_file.write(indent + "// instantiate config_file_setter to read configuration bits from file\n")
-tb_file.write(indent + "config_file_setter\n" + \
-              indent + "  inst_file_setter(.clk_i(" + clk_cfg + "),\n" + \
-              indent + "                   .reset_i(" + rst_cfg + "),\n" + \
-              indent + "                   .config_o(config_root_i) );\n")
-
-# insert snooper node
-tb_file.write("\n")
-tb_file.write(indent + "// insert snooper node\n")
-tb_file.write(indent + "config_snooper\n" + \
-              indent + "  inst_config_snooper(.clk(" + clk_dst + "),\n" + \
-              indent + "                      .reset(" + rst_dst + "),\n" + \
-              indent + "                      .config_i(config_root_i),\n" + \
-              indent + "                      .id_o(config_snooped_id),\n" + \
-              indent + "                      .data_o(config_snooped_data) );\n")
-
-# create config_node_bind instance
-tb_file.write("\n")
-tb_file.write(indent + "// configuration node binding verification module\n" + \
-              indent + "bind config_node config_node_bind #(.id_p(id_p),\n" + \
-              indent + "                                    .data_bits_p(data_bits_p))\n" + \
-              indent + "             inst_config_node_bind (clk, data_o);\n\n")
-
-# create config_snooper_bind instance
-tb_file.write("\n")
-tb_file.write(indent + "// configuration snooper binding verification module\n" + \
-              indent + "bind inst_config_snooper config_snooper_bind\n" + \
-              indent + "          inst_config_snooper_bind (clk, id_o, data_o);\n\n")
-
-# write simulation ending condition
-tb_file.write("\n")
-tb_file.write(indent + "// simulation end\n")
-tb_file.write(indent + "initial begin\n" + \
-              indent + indent + "#" + str(sim_time) + " $finish;\n" + \
-              indent + "end\n")
-
-# write "final" block
-tb_file.write("\n")
-tb_file.write(indent + "// simulation statistics\n")
-tb_file.write(indent + "final begin\n" + \
-#             indent + indent + "$display(\"\\n  - - - Configuration Network Simulation Statistics - - -\\n\");\n" + \
-              indent + "end\n")
-
-tb_file.write("\n//\n")
-tb_file.write("endmodule\n\n")
-
-tb_file.close()
+def latency_summary(tree, schedule):
+  worst = max([l[5] for l in schedule.latency] + [0])
+  return "relay nodes: " + str(tree.relays()) + ", max depth: " + str(schedule.max_depth) + \
+         ", packets: " + str(len(schedule.latency)) + ", max packet latency: " + str(worst) + \
+         " cycles, last packet done at cycle " + str(schedule.done) + " of " + clk_cfg
+
+def write_latency_report(report_file, tree, schedule):
+  report_file.write("# Expected configuration latency of each test packet, in " + clk_cfg + " cycles (period " + str(clk_cfg_period) + ").\n" + \
+                    "# depth is the number of relay nodes from the setter to the config node, first_bit the position of the\n" + \
+                    "# packet in the setter vector; the packet is in the node's shift register latency = depth + packet_bits\n" + \
+                    "# cycles after its first bit, i.e. at done = first_bit + latency.\n" + \
+                    "# " + latency_summary(tree, schedule) + "\n" + \
+                    "# <test> <id> <relay> <depth> <packet_bits> <first_bit> <latency> <done>\n")
+  for (test, l) in enumerate(schedule.latency):
+    report_file.write("\t".join([str(x) for x in (test,) + l]) + "\n")
+  report_file.close()
+
+# ========== Testbench ==========
+def write_testbench(tb_file, nodes, tree, schedule):
+  global sim_time
+
+  # revise simulation time to ensure all test bits walk through the configuration network
+  shift_width = max([packet_bits(node.data_bits) for node in nodes])
+  sim_time += (schedule.done + shift_width) * clk_cfg_period
+  # double the simulation time just to exercise config nodes longer
+  sim_time = sim_time * 2
+
+  tb_file.write("module config_net_tb;\n\n")
+
+  # write localparam
+  write_localparam(tb_file, "len_width_lp       ", str(len_width_lp))
+  write_localparam(tb_file, "id_width_lp        ", str(id_width_lp))
+  write_localparam(tb_file, "valid_bit_size_lp  ", str(valid_bit_size_lp))
+  write_localparam(tb_file, "frame_bit_size_lp  ", str(frame_bit_size_lp))
+  write_localparam(tb_file, "data_frame_len_lp  ", str(data_frame_len_lp))
+  write_localparam(tb_file, "reset_len_lp       ", str(reset_len_lp))
+  write_localparam(tb_file, "data_max_bits_lp   ", str(data_max_bits_lp))
+
+  tb_file.write(indent + "// double underscore __ separates test packet for each node\n")
+  write_localparam(tb_file, "test_vector_bits_lp", str(schedule.test_vector_bits))
+  write_localparam(tb_file, "test_vector_lp     ", str(schedule.test_vector_bits) + "'b" + schedule.test_vector())
+
+  # write clock and reset signals
+  tb_file.write("\n" + indent + "//\n")
+  write_logic(tb_file, clk_cfg)
+  write_logic(tb_file, rst_cfg)
+  write_logic(tb_file, clk_dst)
+  write_logic(tb_file, rst_dst)
+
+  # write config_s signals
+  write_config_s(tb_file, "config_root_i")
+  write_config_s(tb_file, "config_snooper_o")
+
+  # declare relay node outputs struct
+  for relay_id in range(0, tree.relays()):
+    write_config_s(tb_file, "relay_" + str(relay_id) + "_o")
+
+  # declare output data
+  for node in nodes:
+    write_logic_vec(tb_file, "data_" + str(node.inst_id) + "_o", str(node.data_bits - 1), '0')
+
+  # declare test vector logic
+  write_logic_vec(tb_file, "test_vector", str(schedule.test_vector_bits - 1), '0')
+
+  # declare snooper output logic
+  write_logic_vec(tb_file, "config_snooped_id", str(data_max_bits_lp - 1), '0')
+  write_logic_vec(tb_file, "config_snooped_data", str(data_max_bits_lp - 1), '0')
+
+  # write relay node tree structure to testbench file
+  d_relay_tree = tree.children()
+  tb_file.write("\n" + indent + "// " + "The relay node tree is generated as follows:\n")
+  for key in sorted(d_relay_tree):
+    tb_file.write(indent + "// branch node " + str(key) + ": " + str(d_relay_tree[key]) + "\n")
+  tb_file.write(indent + "// " + latency_summary(tree, schedule) + "\n")
+  # creat relay node tree
+  tb_file.write("\n" + indent + "// " + "Relay node 0 (root) \n")
+  write_relay_node(tb_file, "0", "config_root_i", "relay_0_o")
+  for relay_id in range(1, tree.relays()):
+    tb_file.write("\n" + indent + "// " + "Relay node " + str(relay_id) + "\n")
+    write_relay_node(tb_file, str(relay_id), "relay_" + str(tree.parent[relay_id]) + "_o", "relay_" + str(relay_id) + "_o")
+
+  # instantiate and connect configuration nodes
+  for node in nodes:
+    tb_file.write("\n" + indent + "// " + node.name + "\n")
+    write_inst_node(tb_file, str(node.inst_id), str(node.data_bits), node.default,\
+                             "relay_" + str(tree.node_pos[node.inst_id]) + "_o",\
+                             "data_" + str(node.inst_id) + "_o")
+
+  # write clock generator
+  tb_file.write("\n")
+  tb_file.write(indent + "// clock generator\n")
+  tb_file.write(indent + "initial begin\n" + \
+                indent + indent + clk_cfg + " = 1;\n" + \
+                indent + indent + rst_cfg + " = 1;\n" + \
+                indent + indent + clk_dst + " = 1;\n" + \
+                indent + indent + rst_dst + " = 1;\n" + \
+                indent + indent + "#" + str(clk_cfg_period // 2) + " " + rst_cfg + " = 0;\n" + \
+                indent + indent + "#" + str(clk_dst_period)     + " " + rst_dst + " = 0;\n" + \
+                indent + indent + "#" + str(clk_dst_period)     + " " + rst_dst + " = 1;\n" + \
+                indent + indent + "#" + str(clk_dst_period)     + " " + rst_dst + " = 0;\n" + \
+                indent + "end\n" + \
+                indent + "always #" + str(clk_cfg_period // 2) + " begin\n" + \
+                indent + indent + clk_cfg + " = ~" + clk_cfg + ";\n" + \
+                indent + "end\n" + \
+                indent + "always #" + str(clk_dst_period // 2) + " begin\n" + \
+                indent + indent + clk_dst + " = ~" + clk_dst + ";\n" + \
+                indent + "end\n")
+
+  # module config_setter and config_file_setter are used for the same purpose:
+  # reading test vectors from some source and serialized each bit to the module's
+  # output in each clock cycle. config_setter reads from a parameter, and this
+  # module is synthesizable; config_file_setter is not synthesizable and it reads
+  # from a formated file "config_file_setter.in". config_setter can be used with
+  # other components in this design to randomize test patterns for config_node
+  # network in simulation testbench.
+
+  # instantiate config_setter to deliver configuration bits
+  tb_file.write("\n")
+  tb_file.write(indent + "// instantiate config_setter to read configuration bits from localparams\n")
+  tb_file.write(indent + "config_setter #(.setter_vector_p(test_vector_lp),\n" + \
+                indent + "                .setter_vector_bits_p(test_vector_bits_lp) )\n" + \
+                indent + "  inst_setter  (.clk_i(" + clk_cfg + "),\n" + \
+                indent + "                .reset_i(" + rst_cfg + "),\n" + \
+                indent + "                .config_o() ); // not connected in simulation testbench\n")
+
+  # instantiate config_file_setter to deliver configuration bits
+  # module config_file_setter is used for reading setter vector bits from file
+  # and feed them to the configuration network.
+  tb_file.write("\n")
+  tb_file.write(indent + "// instantiate config_file_setter to read configuration bits from file\n")
+  tb_file.write(indent + "config_file_setter\n" + \
+                indent + "  inst_file_setter(.clk_i(" + clk_cfg + "),\n" + \
+                indent + "                   .reset_i(" + rst_cfg + "),\n" + \
+                indent + "                   .config_o(config_root_i) );\n")
+
+  # insert snooper node
+  tb_file.write("\n")
+  tb_file.write(indent + "// insert snooper node\n")
+  tb_file.write(indent + "config_snooper\n" + \
+                indent + "  inst_config_snooper(.clk(" + clk_dst + "),\n" + \
+                indent + "                      .reset(" + rst_dst + "),\n" + \
+                indent + "                      .config_i(config_root_i),\n" + \
+                indent + "                      .id_o(config_snooped_id),\n" + \
+                indent + "                      .data_o(config_snooped_data) );\n")
+
+  # create config_node_bind instance
+  tb_file.write("\n")
+  tb_file.write(indent + "// configuration node binding verification module\n" + \
+                indent + "bind config_node config_node_bind #(.id_p(id_p),\n" + \
+                indent + "                                    .data_bits_p(data_bits_p))\n" + \
+                indent + "             inst_config_node_bind (clk, data_o);\n\n")
+
+  # create config_snooper_bind instance
+  tb_file.write("\n")
+  tb_file.write(indent + "// configuration snooper binding verification module\n" + \
+                indent + "bind inst_config_snooper config_snooper_bind\n" + \
+                indent + "          inst_config_snooper_bind (clk, id_o, data_o);\n\n")
+
+  # write simulation ending condition
+  tb_file.write("\n")
+  tb_file.write(indent + "// simulation end\n")
+  tb_file.write(indent + "initial begin\n" + \
+                indent + indent + "#" + str(sim_time) + " $finish;\n" + \
+                indent + "end\n")
+
+  # write "final" block
+  tb_file.write("\n")
+  tb_file.write(indent + "// simulation statistics\n")
+  tb_file.write(indent + "final begin\n" + \
+  #             indent + indent + "$display(\"\\n  - - - Configuration Network Simulation Statistics - - -\\n\");\n" + \
+                indent + "end\n")
+
+  tb_file.write("\n//\n")
+  tb_file.write("endmodule\n\n")
+
+  tb_file.close()
+
+# ========== ==========
+def main(argv):
+  argparser = argparse.ArgumentParser(description="generate a testbench for a config_node network")
+
+  arg_nodes = argparser.add_mutually_exclusive_group(required=True)
+  arg_nodes.add_argument("--spec",
+                         type=argparse.FileType('r'),
+                         metavar='Filename',
+                         dest="spec_file",
+                         help="read configuration network specification file")
+  arg_nodes.add_argument("--random-nodes",
+                         type=int,
+                         metavar='Integer',
+                         dest="random_nodes",
+                         help="use this many config nodes with random widths and defaults instead of a spec file")
+
+  arg_tests_rw = argparser.add_mutually_exclusive_group()
+  arg_tests_rw.add_argument("--generate-tests",
+                            type=argparse.FileType('w'),
+                            metavar='Filename',
+                            dest="generate_tests",
+                            required=False,
+                            help="write randomly generated test sequence to file")
+  arg_tests_rw.add_argument("--read-tests",
+                            type=argparse.FileType('r'),
+                            metavar='Filename',
+                            dest="read_tests",
+                            required=False,
+                            help="read existing test sequence file")
+
+  argparser.add_argument("--number-of-tests",
+                         type=int,
+                         metavar='Integer',
+                         default=10,
+                         dest="number_of_tests",
+                         required=False,
+                         help="number of tests to be created with --generate-tests")
+
+  argparser.add_argument("--layout",
+                         choices=["random", "balanced", "latency"],
+                         default="random",
+                         help="relay tree layout (default random)")
+  argparser.add_argument("--fanout",
+                         type=int,
+                         metavar='Integer',
+                         default=4,
+                         help="children per relay node for --layout balanced/latency")
+  argparser.add_argument("--relays",
+                         type=int,
+                         metavar='Integer',
+                         help="number of relay nodes for --layout random without 'r' lines (default 1..16)")
+  argparser.add_argument("--seed",
+                         type=int,
+                         metavar='Integer',
+                         help="random seed")
+
+  argparser.add_argument("--testbench",
+                         type=argparse.FileType('w'),
+                         metavar='Filename',
+                         dest="testbench",
+                         required=False,
+                         help="generate configuration network SystemVerilog testbench file")
+
+  argparser.add_argument("--create-setter-file",
+                         type=argparse.FileType('w'),
+                         metavar='Filename',
+                         dest="create_setter_file",
+                         required=False,
+                         help="generate configuration network setter vector according to --read-tests and write the vector to file")
+
+  argparser.add_argument("--create-probe-file",
+                         type=argparse.FileType('w'),
+                         metavar='Filename',
+                         dest="create_probe_file",
+                         required=False,
+                         help="generate verification probes for each config_node according to --read-tests and write the probes to file")
+
+  argparser.add_argument("--latency-report",
+                         type=argparse.FileType('w'),
+                         metavar='Filename',
+                         dest="latency_report",
+                         required=False,
+                         help="write the expected configuration latency of each test packet to file")
+
+  try:
+    args = argparser.parse_args(argv[1:])
+  except IOError as msg:
+    argparser.error(str(msg))
+
+  if (args.random_nodes is not None) and ((args.random_nodes < 1) or (args.random_nodes > (1 << id_width_lp))):
+    argparser.error("--random-nodes must be 1.." + str(1 << id_width_lp) + " (id_width_lp = " + str(id_width_lp) + ")")
+  if (args.fanout < 2):
+    argparser.error("--fanout must be at least 2")
+
+  if args.seed is not None:
+    random.seed(args.seed)
+
+  if args.spec_file is not None:
+    (relays, nodes) = read_spec(args.spec_file)
+  else:
+    (relays, nodes) = ([], random_nodes(args.random_nodes))
+  if not nodes:
+    spec_error("no config node!", None)
+  d_node = dict([(node.inst_id, node) for node in nodes])
+  if len(d_node) != len(nodes):
+    spec_error("config node ids must be unique!", None)
+
+  # randomly generate test file or read an existing one
+  if (args.generate_tests is not None):
+    test_file = args.generate_tests
+    tests = generate_tests(nodes, args.number_of_tests)
+    write_tests(test_file, tests)
+    if args.number_of_tests <= 100:
+      with open(test_file.name) as f:
+        sys.stdout.write(f.read())
+      print("  ")
+    print(str(args.number_of_tests) + " sets of random test id and data are generated and written into " + test_file.name)
+    return 0 # exit after making the test file
+  elif (args.read_tests is not None):
+    tests = read_tests(args.read_tests, d_node)
+  else:
+    tests = []
+
+  if (args.layout == "random"):
+    tree = random_tree(relays, nodes, args.relays)
+  else:
+    if relays:
+      spec_error("--layout " + args.layout + " builds its own relay tree; remove the 'r' lines", None)
+    weight = dict([(node.inst_id, 1) for node in nodes])
+    if (args.layout == "latency"):
+      for (test_id, test_data) in tests:
+        weight[test_id] += 1
+    tree = huffman_tree(nodes, weight, args.fanout)
+
+  schedule = Schedule(nodes, tree, tests)
+
+  if (args.create_setter_file is not None):
+    write_setter_file(args.create_setter_file, schedule)
+  if (args.create_probe_file is not None):
+    write_probe_file(args.create_probe_file, nodes, schedule)
+  if (args.latency_report is not None):
+    write_latency_report(args.latency_report, tree, schedule)
+  if (args.testbench is not None):
+    write_testbench(args.testbench, nodes, tree, schedule)
+  print(latency_summary(tree, schedule))
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv))
@@ -0,0 +1,9 @@
+"""
+Python side of the experimental/bsg_cordic generators
+
+    tables   angle tables, gain constants and iteration schedules
+    generate every function on the shared bsg_cordic_stage.v
+    model    bit-exact fixed-point models of the generated pipelines
+    optimize smallest configuration that meets an error target
+    harness  batch accuracy sign-off of a Verilated module against numpy
+"""
@@ -0,0 +1,944 @@
+"""
+One generator for every bsg_cordic function
+
+Each function is a unit. A unit has a front end that sets up x, y and
+ang from the inputs. It then runs a chain of bsg_cordic_stage
+iterations in one coordinate system (circular, linear or hyperbolic)
+and one direction (rotation, vectoring, or chosen per sample), and a
+back end reads the results off the last stage. Every unit is written by
+the same emitter, and several can be generated in one run:
+
+    python3 -m bsg_cordic.generate sine_cosine exponential:21,40,6,12,16,4
+    python3 -m bsg_cordic.generate sine_cosine_atan:posprec=16 -o build
+
+(run from experimental/bsg_cordic). A bare name takes the Makefile's
+parameters of its script; positional values replace them from the
+front, and name=value pairs replace single ones. Each unit writes
+<module>.v, <module>_params_def.h and <module>_report.txt into -o.
+Compile the modules with bsg_cordic_stage.v.
+
+By default every iteration is a pipeline stage. --fold F makes each
+stage iterate F cycles in place on one bsg_cordic_stage with barrel
+shifters, and takes a new sample every F cycles. --per-cycle C chains C
+iterations between registers, for fewer stages and a longer path. The
+two combine, and fold=/per_cycle= set them for one function. A folded
+module has a reset_i for its phase counter. The report gives the
+initiation interval, the latency, the adders and shifters, and an
+estimate of the register bits; --compare prints it for a range of
+both instead of generating:
+
+    python3 -m bsg_cordic.generate exponential --fold 4 --per-cycle 2
+    python3 -m bsg_cordic.generate sine_cosine --compare
+
+Module names, ports and params_def.h are the same as the per-function
+scripts'. Their *_test.cpp testbenches therefore run on these modules,
+with the header copied to params_def.h. The RTL differs from the
+scripts' where the scripts are wrong or waste hardware:
+
+  - the hyperbolic units repeat iterations 4, 13, 40, ... and every
+    iteration reaches the output; the scripts repeat 4 and 12, and
+    their 12 repeat overwrites the register 11 writes
+  - the start constants correct for the gain of every iteration run,
+    and a negative constant is written as one
+  - the hyperbolic angle tables are rounded, not truncated, so their
+    error does not add up along the stages
+  - sine_cosine folds any angle in [-180, 180] into [0, 90] for any
+    ang_width_p, not only when the integer degrees start at bit
+    ang_width_p-2
+  - rect_to_polar carries the quadrant of each input with it and stalls
+    its output register; the script's pipeline applies the quadrant of
+    the input two samples later on a stream
+  - combinational front ends are wires, not initialized logic
+
+There are also units no script has. sine_cosine_atan shares one chain
+of circular stages between sin/cos (rotation) and atan (vectoring),
+chosen per sample by atan_i. multiply and divide are the linear
+coordinate system.
+"""
+
+from __future__ import print_function
+
+import argparse
+import math
+import os
+import sys
+
+from . import tables
+
+CIRCULAR, LINEAR, HYPERBOLIC = 1, 0, -1
+
+def literal(width, value):
+    """value as a width bit Verilog literal"""
+    if value < 0:
+        return "-%d'h%x" % (width, -value)
+    return "%d'h%x" % (width, value)
+
+def format_iterations(chain):
+    """[-1,0,1,2,3,4,4,5,6] as '-1..4,4..6'"""
+    runs = []
+    for k in chain:
+        if runs and runs[-1][-1] + 1 == k:
+            runs[-1].append(k)
+        else:
+            runs.append([k])
+    return ",".join("%d..%d" % (r[0], r[-1]) if len(r) > 2 else ",".join(str(k) for k in r)
+                    for r in runs)
+
+class Unit(object):
+    """
+    One function's pipeline. params are its generator parameters, in
+    the order of its script's arguments, and defaults their Makefile
+    values.
+
+    fold and per_cycle choose the architecture. Each pipeline stage runs
+    per_cycle iterations chained in one cycle, fold cycles in a row, so
+    the pipeline has ceil(iterations / (fold * per_cycle)) stages and
+    takes a sample every fold cycles; the default 1, 1 is fully
+    unrolled. Iterations left over in the last stage pass the sample
+    through.
+
+    legacy gives the iterations and constants of the script's RTL
+    instead, for bsg_cordic.model; only the unified ones are emitted, and
+    a unit no script has is always unified.
+    """
+
+    name = None
+    module = None
+    script = None
+    summary = None
+    params = ()
+    defaults = ()
+    coord = CIRCULAR
+    # False rotates, True vectors, a side signal name chooses per sample
+    vector = False
+    # one bit signals carried down the stages with their sample, after val
+    side = ()
+    # registers outside the stages: stage 0's, any ahead of it and any
+    # after the last stage
+    extra_registers = 1
+    # the valid bit of the output register
+    out_valid = "val[stages_p]"
+
+    def __init__(self, *args, **kwargs):
+        self.legacy = kwargs.pop("legacy", False) and self.script is not None
+        self.fold = int(kwargs.pop("fold", 1))
+        self.per_cycle = int(kwargs.pop("per_cycle", 1))
+        if self.fold < 1 or self.per_cycle < 1:
+            raise ValueError("fold and per_cycle must be at least 1")
+        if self.legacy and (self.fold, self.per_cycle) != (1, 1):
+            raise ValueError("the scripts' pipelines are unrolled")
+        if len(args) > len(self.params):
+            raise TypeError("%s takes %d parameters" % (self.name, len(self.params)))
+        values = dict(zip(self.params, self.defaults))
+        values.update(zip(self.params, args))
+        for key in kwargs:
+            if key not in self.params:
+                raise TypeError("%s has no parameter %s" % (self.name, key))
+        values.update(kwargs)
+        for key in self.params:
+            setattr(self, key, int(values[key]))
+        self.setup()
+        if not self.legacy:
+            for k, table in zip(self.iterations, self.lookup):
+                if not -2 ** (self.angbitlen - 1) <= table < 2 ** (self.angbitlen - 1):
+                    raise ValueError("the angle of iteration %d does not fit in angbitlen" % k)
+        per_stage = self.fold * self.per_cycle
+        self.stages = -(-len(self.iterations) // per_stage)
+        self.idle = self.stages * per_stage - len(self.iterations)
+        # a sample moves one register every fold cycles
+        self.latency = 1 + (self.stages + self.extra_registers - 1) * self.fold
+
+    def argv(self):
+        return [getattr(self, key) for key in self.params]
+
+    def __repr__(self):
+        return "%s(%s)" % (self.name, " ".join(str(v) for v in self.argv()))
+
+    def setup(self):
+        """sets iterations, lookup (each stage's table angle) and the constants"""
+        raise NotImplementedError
+
+    def module_params(self):
+        """[(parameter, value)] of the module besides the stage count and widths"""
+        return []
+
+    def ports(self):
+        """the unit's data ports, as declarations"""
+        raise NotImplementedError
+
+    def front(self):
+        """declarations and logic ahead of stage 0"""
+        return ""
+
+    def start(self):
+        """[(signal, value)] loaded into stage 0, for x, y, ang and the side signals"""
+        raise NotImplementedError
+
+    def back(self):
+        """the output logic, reading stage stages_p"""
+        raise NotImplementedError
+
+    def extra_register_bits(self):
+        """bits of the front and back end registers"""
+        return 0
+
+    def params_def(self):
+        """the params_def.h entries of the unit's testbench"""
+        return [('int', 'anglen', self.angbitlen),
+                ('int', 'anslen', self.ansbitlen),
+                ('int', 'startquant_pow', self.startquant_pow),
+                ('int', 'precis_p', self.posprec),
+                ('int', 'precision', self.precision)]
+
+    def shifts(self):
+        """(shift, negative) of each iteration"""
+        return [(k, 0) for k in self.iterations]
+
+    def report(self):
+        """[(item, value)] of the architecture, registers estimated from the datapath widths"""
+        s, g = self.ansbitlen, self.angbitlen
+        instances = self.stages * self.per_cycle
+        # x, y, ang, val and the side signals of stages 0..stages_p
+        registers = (self.stages + 1) * (2 * s + g + 1 + len(self.side)) + self.extra_register_bits()
+        if self.fold > 1:
+            registers += (self.fold - 1).bit_length()
+        return [("iterations", len(self.iterations)),
+                ("pipeline stages", self.stages),
+                ("iterations per cycle", self.per_cycle),
+                ("cycles per stage", self.fold),
+                ("initiation interval", self.fold),
+                ("latency", self.latency),
+                ("stage instances", instances),
+                ("adders", instances * (2 if self.coord == LINEAR else 3)),
+                ("barrel shifters", 2 * instances if self.fold > 1 else 0),
+                ("idle iterations", self.idle),
+                ("register bits", registers)]
+
+    def emit(self, command=None):
+        g = self.angbitlen
+        per_stage = self.fold * self.per_cycle
+        shifts = self.shifts() + [(0, 0)] * self.idle
+        lookup = list(self.lookup) + [0] * self.idle
+        side = ("val",) + tuple(self.side)
+        vector = {False: "1'b0", True: "1'b1"}.get(self.vector, "%s[i]" % self.vector)
+        if self.fold > 1:
+            index = "(i * fold_lp + phase_r) * per_cycle_lp + j"
+        else:
+            index = "i * per_cycle_lp + j"
+        folded = self.fold > 1
+
+        text = ["// %s: %s" % (self.module, self.summary)]
+        if command:
+            text.append("// generated by: %s" % command)
+        text.append("// iterations %s; %d stages x %d cycles x %d per cycle; latency %d, initiation interval %d"
+                    % (format_iterations(self.iterations), self.stages, self.fold, self.per_cycle,
+                       self.latency, self.fold))
+        text.append("// compile with bsg_cordic_stage.v")
+        text.append("""
+module %(module)s
+  #(parameter stages_p = %(n)d
+   ,parameter ang_width_p = %(g)d
+   ,parameter ans_width_p = %(s)d%(params)s
+   )
+  (input clk_i%(reset)s
+%(ports)s
+  ,input ready_i
+  ,input val_i
+  ,output ready_o
+  ,output val_o
+  );
+
+  wire stall_pipe = val_o & ~ready_i;
+""" % {"module": self.module, "n": self.stages, "g": g, "s": self.ansbitlen,
+       "params": "".join("\n   ,parameter %s = %d" % pv for pv in self.module_params()),
+       "reset": "\n  ,input reset_i" if folded else "",
+       "ports": "\n".join("  ," + p for p in self.ports())})
+        if folded:
+            text.append("""  // each stage iterates fold_lp cycles in place, then passes its sample
+  // on; a new sample enters only then, and val_o is up the cycle after
+  localparam fold_lp = %(f)d;
+  logic [%(w)d:0] phase_r;
+  wire advance = phase_r == %(last)s;
+  wire advance_pipe = advance & ~stall_pipe;
+  assign ready_o = advance_pipe;
+
+  always_ff @(posedge clk_i)
+    if (reset_i)
+      phase_r <= '0;
+    else if (~stall_pipe)
+      phase_r <= advance ? '0 : phase_r + 1'b1;
+""" % {"f": self.fold, "w": (self.fold - 1).bit_length() - 1,
+       "last": "%d'd%d" % ((self.fold - 1).bit_length(), self.fold - 1)})
+        else:
+            text.append("""  wire advance_pipe = ~stall_pipe;
+  assign ready_o = advance_pipe;
+""")
+        text.append("""  // the shift, step and table angle of each iteration, the first last%(hold_note)s
+  localparam per_cycle_lp = %(c)d;
+  localparam [%(top)d:0][7:0] shift_lp =
+    {%(shift)s};
+  localparam [%(top)d:0] negative_lp = %(n)d'b%(negative)s;%(hold)s
+  localparam [%(top)d:0][ang_width_p-1:0] ang_lookup_lp =
+    {%(lookup)s
+    };
+
+  logic signed [stages_p:0][ans_width_p-1:0] x, y;
+  logic signed [stages_p:0][ang_width_p-1:0] ang;
+  logic [stages_p:0] %(side)s;
+  logic signed [stages_p-1:0][ans_width_p-1:0] x_ans, y_ans;
+  logic signed [stages_p-1:0][ang_width_p-1:0] ang_ans;
+""" % {"n": self.stages * per_stage, "top": self.stages * per_stage - 1, "c": self.per_cycle,
+       "hold_note": "; hold_lp\n  // marks the idle ones, which pass the sample through" if self.idle else "",
+       "shift": ", ".join("8'd%d" % shift for shift, negative in reversed(shifts)),
+       "negative": "".join(str(negative) for shift, negative in reversed(shifts)),
+       "hold": ("\n  localparam [%d:0] hold_lp = %d'b%s;"
+                % (len(shifts) - 1, len(shifts), "1" * self.idle + "0" * len(self.iterations))
+                if self.idle else ""),
+       "lookup": "\n    ,".join(literal(g, t) for t in reversed(lookup)),
+       "side": ", ".join(side)})
+        front = self.front()
+        if front:
+            text.append(front)
+        chain_out = "x_o(xc[j+1])\n            ,.y_o(yc[j+1])\n            ,.ang_o(angc[j+1])"
+        hold = ""
+        if self.idle:
+            chain_out = "x_o(x_it)\n            ,.y_o(y_it)\n            ,.ang_o(ang_it)"
+            hold = """
+          wire signed [ans_width_p-1:0] x_it, y_it;
+          wire signed [ang_width_p-1:0] ang_it;
+          wire hold = hold_lp[%(index)s];
+          assign xc[j+1] = hold ? xc[j] : x_it;
+          assign yc[j+1] = hold ? yc[j] : y_it;
+          assign angc[j+1] = hold ? angc[j] : ang_it;
+""" % {"index": index}
+        text.append("""  genvar i, j;
+  for (i = 0; i < stages_p; i = i+1)
+    begin: stage
+      logic signed [per_cycle_lp:0][ans_width_p-1:0] xc, yc;
+      logic signed [per_cycle_lp:0][ang_width_p-1:0] angc;
+      assign xc[0] = x[i];
+      assign yc[0] = y[i];
+      assign angc[0] = ang[i];
+
+      for (j = 0; j < per_cycle_lp; j = j+1)
+        begin: iteration%(hold)s
+          bsg_cordic_stage #(.coord_p(%(coord)d)
+                            ,.ang_width_p(ang_width_p)
+                            ,.ans_width_p(ans_width_p)
+                            ) cs
+            (.x_i(xc[j])
+            ,.y_i(yc[j])
+            ,.ang_i(angc[j])
+            ,.ang_lookup_i(ang_lookup_lp[%(index)s])
+            ,.shift_i(shift_lp[%(index)s])
+            ,.negative_i(negative_lp[%(index)s])
+            ,.vector_i(%(vector)s)
+            ,.%(chain_out)s
+            );
+        end
+
+      assign x_ans[i] = xc[per_cycle_lp];
+      assign y_ans[i] = yc[per_cycle_lp];
+      assign ang_ans[i] = angc[per_cycle_lp];
+    end
+
+  always_ff @(posedge clk_i)
+    if (advance_pipe)
+      begin
+%(start)s
+        x[stages_p:1] <= x_ans;
+        y[stages_p:1] <= y_ans;
+        ang[stages_p:1] <= ang_ans;
+%(side)s
+      end%(iterate)s
+""" % {"hold": hold, "coord": self.coord, "index": index, "vector": vector, "chain_out": chain_out,
+       "start": "\n".join("        %s[0] <= %s;" % sv for sv in self.start()),
+       "side": "\n".join("        %s[stages_p:1] <= %s[stages_p-1:0];" % (b, b) for b in side),
+       "iterate": """
+    else if (~stall_pipe)
+      begin
+        x[stages_p-1:0] <= x_ans;
+        y[stages_p-1:0] <= y_ans;
+        ang[stages_p-1:0] <= ang_ans;
+      end""" if folded else ""})
+        text.append(self.back())
+        text.append("  assign val_o = %s;\n" % (self.out_valid + " & (phase_r == '0)" if folded else self.out_valid))
+        text.append("endmodule\n")
+        return "\n".join(text)
+
+#
+# circular
+#
+
+class SineCosine(Unit):
+    name = "sine_cosine"
+    module = "bsg_cordic_sine_cosine"
+    script = "bsg_cordic_sine_cosine/bsg_sine_cosine_script.py"
+    summary = "sin_o, cos_o = sin, cos of ang_i degrees"
+    params = ("angbitlen", "ansbitlen", "posprec", "precision", "startquant_pow")
+    defaults = (21, 32, 14, 12, 6)
+    side = ("sign_sin", "sign_cos")
+    extra_registers = 2
+
+    def setup(self):
+        # the script's quadrant select reads 8 bits under the sign
+        if self.angbitlen < (9 if self.legacy else 9 + self.precision):
+            raise ValueError("angbitlen must be at least 9 + precision to hold 180 degrees")
+        self.iterations = list(range(self.posprec + 1))
+        table = tables.circular_lookup(self.posprec, self.precision)
+        self.lookup = [table[k] for k in self.iterations]
+        if self.legacy:
+            self.x_start = tables.circular_constant(self.posprec, self.ansbitlen)
+        else:
+            self.x_start = round(tables.circular_gain(self.iterations) * 2 ** (self.ansbitlen - 1))
+        self.const_90 = 90 << self.precision
+        self.const_180 = 180 << self.precision
+
+    def ports(self):
+        return ["input signed [ang_width_p-1:0] ang_i",
+                "output signed [ans_width_p-1:0] sin_o",
+                "output signed [ans_width_p-1:0] cos_o"]
+
+    def fold_front(self):
+        return """  // fold ang_i into [0, 90], keeping the signs sin and cos get back
+  wire ang_neg = ang_i[ang_width_p-1];
+  wire signed [ang_width_p-1:0] ang_abs = ang_neg ? ~ang_i + 1 : ang_i;
+  wire ang_fold = ang_abs > %s;
+  wire signed [ang_width_p-1:0] ang_folded = ang_fold ? %s - ang_abs : ang_abs;
+""" % (literal(self.angbitlen, self.const_90), literal(self.angbitlen, self.const_180))
+
+    def front(self):
+        return self.fold_front() + """
+  logic signed [ang_width_p-1:0] ang_in;
+  logic val_in, sign_sin_in, sign_cos_in;
+
+  always_ff @(posedge clk_i)
+    if (advance_pipe)
+      begin
+        ang_in <= ang_folded;
+        sign_sin_in <= ang_neg;
+        sign_cos_in <= ang_fold;
+        val_in <= val_i;
+      end
+"""
+
+    def start(self):
+        return [("x", literal(self.ansbitlen, self.x_start)),
+                ("y", literal(self.ansbitlen, 0)),
+                ("ang", "ang_in"),
+                ("val", "val_in"),
+                ("sign_sin", "sign_sin_in"),
+                ("sign_cos", "sign_cos_in")]
+
+    def extra_register_bits(self):
+        # ang_in, val_in, sign_sin_in, sign_cos_in
+        return self.angbitlen + 3
+
+    def back(self):
+        return """  assign sin_o = sign_sin[stages_p] ? ~y[stages_p] + 1 : y[stages_p];
+  assign cos_o = sign_cos[stages_p] ? ~x[stages_p] + 1 : x[stages_p];
+"""
+
+    def params_def(self):
+        return Unit.params_def(self) + [
+            ('long int', 'signedconst', tables.signed_constant(self.ansbitlen)),
+            ('long int', 'signedconst2', tables.signed_constant2(self.ansbitlen))]
+
+class Atan(Unit):
+    name = "atan"
+    module = "bsg_cordic_atan"
+    script = "bsg_cordic_atan/bsg_atan_script.py"
+    summary = "tan_inv_o = atan(quant_i) in degrees"
+    params = ("angbitlen", "ansbitlen", "posprec", "precision", "startquant_pow")
+    defaults = (24, 40, 12, 16, 25)
+    vector = True
+    side = ("sign_op",)
+
+    def setup(self):
+        self.iterations = list(range(self.posprec + 1))
+        table = tables.circular_lookup(self.posprec, self.precision)
+        self.lookup = [table[k] for k in self.iterations]
+        # 1.0, dividing quant_i
+        self.x_start = 1 << self.precision
+
+    def ports(self):
+        return ["input signed [ans_width_p-1:0] quant_i",
+                "output signed [ang_width_p-1:0] tan_inv_o"]
+
+    def front(self):
+        return """  wire in_sign_op = quant_i[ans_width_p-1];
+  wire signed [ans_width_p-1:0] in_quant = in_sign_op ? ~quant_i + 1 : quant_i;
+"""
+
+    def start(self):
+        return [("x", literal(self.ansbitlen, self.x_start)),
+                ("y", "in_quant"),
+                ("ang", literal(self.angbitlen, 0)),
+                ("val", "val_i"),
+                ("sign_op", "in_sign_op")]
+
+    def back(self):
+        return """  assign tan_inv_o = sign_op[stages_p] ? ~ang[stages_p] + 1 : ang[stages_p];
+"""
+
+class SineCosineAtan(SineCosine):
+    """
+    sin/cos and atan on one chain of stages: each sample either rotates
+    (ang_i) or vectors (quant_i), as atan_i says, so the two functions
+    cost one set of adders between them
+    """
+    name = "sine_cosine_atan"
+    module = "bsg_cordic_sine_cosine_atan"
+    script = None
+    summary = "sin_o, cos_o = sin, cos of ang_i degrees, or tan_inv_o = atan(quant_i) when atan_i"
+    vector = "atan"
+    side = ("atan", "sign_op", "sign_cos")
+
+    def setup(self):
+        SineCosine.setup(self)
+        self.one = 1 << self.precision
+
+    def ports(self):
+        return ["input atan_i",
+                "input signed [ang_width_p-1:0] ang_i",
+                "input signed [ans_width_p-1:0] quant_i",
+                "output signed [ans_width_p-1:0] sin_o",
+                "output signed [ans_width_p-1:0] cos_o",
+                "output signed [ang_width_p-1:0] tan_inv_o",
+                "output atan_o"]
+
+    def front(self):
+        return self.fold_front() + """
+  wire quant_neg = quant_i[ans_width_p-1];
+
+  logic signed [ang_width_p-1:0] ang_in;
+  logic signed [ans_width_p-1:0] quant_in;
+  logic val_in, atan_in, sign_op_in, sign_cos_in;
+
+  // sign_op negates sin_o or tan_inv_o, whichever the sample computes
+  always_ff @(posedge clk_i)
+    if (advance_pipe)
+      begin
+        ang_in <= ang_folded;
+        quant_in <= quant_neg ? ~quant_i + 1 : quant_i;
+        atan_in <= atan_i;
+        sign_op_in <= atan_i ? quant_neg : ang_neg;
+        sign_cos_in <= ang_fold;
+        val_in <= val_i;
+      end
+"""
+
+    def start(self):
+        s = self.ansbitlen
+        return [("x", "atan_in ? %s : %s" % (literal(s, self.one), literal(s, self.x_start))),
+                ("y", "atan_in ? quant_in : %s" % literal(s, 0)),
+                ("ang", "atan_in ? %s : ang_in" % literal(self.angbitlen, 0)),
+                ("val", "val_in"),
+                ("atan", "atan_in"),
+                ("sign_op", "sign_op_in"),
+                ("sign_cos", "sign_cos_in")]
+
+    def extra_register_bits(self):
+        # ang_in, quant_in, val_in, atan_in, sign_op_in, sign_cos_in
+        return self.angbitlen + self.ansbitlen + 4
+
+    def back(self):
+        return """  // sin_o and cos_o are don't cares when atan_o, tan_inv_o when not
+  assign sin_o = sign_op[stages_p] ? ~y[stages_p] + 1 : y[stages_p];
+  assign cos_o = sign_cos[stages_p] ? ~x[stages_p] + 1 : x[stages_p];
+  assign tan_inv_o = sign_op[stages_p] ? ~ang[stages_p] + 1 : ang[stages_p];
+  assign atan_o = atan[stages_p];
+"""
+
+    def params_def(self):
+        return Unit.params_def(self)
+
+class RectToPolar(Unit):
+    name = "rect_to_polar"
+    module = "bsg_cordic_hypotenuse"
+    script = "bsg_rect_to_polar/bsg_hypotenuse_script.py"
+    summary = "mag_o, angl_o = the magnitude and angle in degrees of (x_i, y_i)"
+    params = ("angbitlen", "ansbitlen", "posprec", "precision", "precisionbitlen", "startquant_pow")
+    defaults = (18, 32, 20, 8, 27, 4)
+    vector = True
+    side = ("switch", "quad_x", "quad_y")
+    extra_registers = 3
+    out_valid = "val_r"
+
+    def setup(self):
+        self.iterations = list(range(self.posprec + 1))
+        table = tables.circular_lookup(self.posprec, self.precision)
+        self.lookup = [table[k] for k in self.iterations]
+        if self.legacy:
+            self.scale = tables.circular_constant(self.posprec, self.precisionbitlen)
+        else:
+            self.scale = round(tables.circular_gain(self.iterations) * 2 ** (self.precisionbitlen - 1))
+        self.const_90 = 90 << self.precision
+        self.const_180 = 180 << self.precision
+
+    def module_params(self):
+        return [("scale_width_p", self.precisionbitlen)]
+
+    def ports(self):
+        return ["input signed [ans_width_p-1:0] x_i",
+                "input signed [ans_width_p-1:0] y_i",
+                "output signed [ans_width_p-1:0] mag_o",
+                "output signed [ang_width_p-1:0] angl_o"]
+
+    def front(self):
+        return """  // |x_i|, |y_i|, swapped so that x >= y: the angle starts in [0, 45]
+  logic signed [ans_width_p-1:0] x_in, y_in;
+  logic val_in, quad_x_in, quad_y_in;
+
+  always_ff @(posedge clk_i)
+    if (advance_pipe)
+      begin
+        x_in <= x_i[ans_width_p-1] ? ~x_i + 1 : x_i;
+        y_in <= y_i[ans_width_p-1] ? ~y_i + 1 : y_i;
+        quad_x_in <= x_i[ans_width_p-1];
+        quad_y_in <= y_i[ans_width_p-1];
+        val_in <= val_i;
+      end
+
+  wire switch_in = x_in < y_in;
+"""
+
+    def start(self):
+        return [("x", "switch_in ? y_in : x_in"),
+                ("y", "switch_in ? x_in : y_in"),
+                ("ang", literal(self.angbitlen, 0)),
+                ("val", "val_in"),
+                ("switch", "switch_in"),
+                ("quad_x", "quad_x_in"),
+                ("quad_y", "quad_y_in")]
+
+    def extra_register_bits(self):
+        # x_in, y_in and three flags ahead, mag_r, angl_r and val_r after
+        return 3 * self.ansbitlen + self.angbitlen + 4
+
+    def back(self):
+        g = self.angbitlen
+        return """  // the magnitude times the gain constant, and the angle unfolded
+  wire [ans_width_p+scale_width_p-1:0] mag_n = (x[stages_p] * %(scale)s) >> (scale_width_p - 1);
+  wire [ang_width_p-1:0] ang_half = switch[stages_p] ? %(c90)s - ang[stages_p] : ang[stages_p];
+  wire [ang_width_p-1:0] ang_quad = quad_x[stages_p] ? %(c180)s - ang_half : ang_half;
+
+  logic [ans_width_p-1:0] mag_r;
+  logic [ang_width_p-1:0] angl_r;
+  logic val_r;
+
+  always_ff @(posedge clk_i)
+    if (advance_pipe)
+      begin
+        mag_r <= mag_n[ans_width_p-1:0];
+        angl_r <= quad_y[stages_p] ? ~ang_quad + 1 : ang_quad;
+        val_r <= val[stages_p];
+      end
+
+  assign mag_o = mag_r;
+  assign angl_o = angl_r;
+""" % {"scale": literal(self.precisionbitlen, self.scale),
+       "c90": literal(g, self.const_90), "c180": literal(g, self.const_180)}
+
+    def params_def(self):
+        return Unit.params_def(self) + [
+            ('long int', 'signedconst', tables.signed_constant(self.angbitlen)),
+            ('long int', 'signedconst2', tables.signed_constant2(self.angbitlen))]
+
+#
+# hyperbolic
+#
+
+class HyperbolicUnit(Unit):
+    params = ("angbitlen", "ansbitlen", "negprec", "posprec", "precision", "startquant_pow")
+    coord = HYPERBOLIC
+
+    def setup(self):
+        if self.legacy:
+            self.iterations = tables.script_hyperbolic_iterations(self.negprec, self.posprec)
+            # below 4 the register the output is read from is never written
+            if self.iterations is None:
+                raise ValueError("posprec must be at least 4")
+            self.gain = tables.hyperbolic_constant(self.negprec, self.posprec)
+        else:
+            self.iterations = tables.hyperbolic_iterations(self.negprec, self.posprec)
+            self.gain = tables.hyperbolic_gain(self.iterations)
+        self.lookup = [tables.hyperbolic_angle(k, self.precision, rounded=not self.legacy)
+                       for k in self.iterations]
+        self.setup_start()
+
+    def setup_start(self):
+        pass
+
+    def shifts(self):
+        # k <= 0 steps by 1 - 2^(k-2)
+        return [(2 - k, 1) if k <= 0 else (k, 0) for k in self.iterations]
+
+    def theta_max(self):
+        """the largest angle the iterations reach, as the testbenches have it"""
+        theta = math.atanh(2.0 ** -self.posprec)
+        for i in range(-self.negprec, self.posprec + 1):
+            theta += math.atanh(1 - 2.0 ** (i - 2)) if i <= 0 else math.atanh(2.0 ** -i)
+        return theta
+
+    def params_def(self):
+        return [('int', 'anglen', self.angbitlen),
+                ('int', 'anslen', self.ansbitlen),
+                ('int', 'startquant_pow', self.startquant_pow),
+                ('int', 'posiprec', self.posprec),
+                ('int', 'negprec', self.negprec),
+                ('int', 'precision', self.precision)]
+
+class Exponential(HyperbolicUnit):
+    name = "exponential"
+    module = "bsg_cordic_exponential"
+    script = "bsg_cordic_exponential/bsg_exponential_script.py"
+    summary = "expz_o = exp(ang_i)"
+    defaults = (21, 40, 6, 12, 16, 4)
+
+    def setup_start(self):
+        self.start_value = round(self.gain * 2 ** self.precision)
+
+    def ports(self):
+        return ["input signed [ang_width_p-1:0] ang_i",
+                "output signed [ans_width_p-1:0] expz_o"]
+
+    def start(self):
+        return [("x", literal(self.ansbitlen, self.start_value)),
+                ("y", literal(self.ansbitlen, self.start_value)),
+                ("ang", "ang_i"),
+                ("val", "val_i")]
+
+    def back(self):
+        return """  assign expz_o = x[stages_p];
+"""
+
+class SinhCosh(Exponential):
+    name = "sin_cos_hyperbolic"
+    module = "bsg_cordic_sine_cosine_hyperbolic"
+    script = "bsg_cordic_sin_cos_hyperbolic/bsg_sine_cosine_hyperbolic_script.py"
+    summary = "sinh_o, cosh_o = sinh, cosh of ang_i"
+    defaults = (21, 32, 6, 12, 16, 4)
+
+    def ports(self):
+        return ["input signed [ang_width_p-1:0] ang_i",
+                "output signed [ans_width_p-1:0] sinh_o",
+                "output signed [ans_width_p-1:0] cosh_o"]
+
+    def start(self):
+        return [("x", literal(self.ansbitlen, self.start_value)),
+                ("y", literal(self.ansbitlen, 0)),
+                ("ang", "ang_i"),
+                ("val", "val_i")]
+
+    def back(self):
+        return """  assign sinh_o = y[stages_p];
+  assign cosh_o = x[stages_p];
+"""
+
+class Atanh(HyperbolicUnit):
+    name = "atanh"
+    module = "bsg_cordic_tan_hyperbolic_inverse"
+    script = "bsg_cordic_tan_hyperbolic_inverse/bsg_atanh_script.py"
+    summary = "atanh_o = atanh(quant_i), quant_i with ans_width_p-2 fraction bits"
+    defaults = (20, 32, 6, 12, 12, 4)
+    vector = True
+
+    def ports(self):
+        return ["input signed [ans_width_p-1:0] quant_i",
+                "output [ang_width_p-1:0] atanh_o"]
+
+    def start(self):
+        return [("x", literal(self.ansbitlen, 1 << (self.ansbitlen - 2))),
+                ("y", "quant_i"),
+                ("ang", literal(self.angbitlen, 0)),
+                ("val", "val_i")]
+
+    def back(self):
+        return """  assign atanh_o = ang[stages_p];
+"""
+
+class SqrtLn(HyperbolicUnit):
+    name = "squaroot_natlog"
+    module = "bsg_cordic_squaroot_natlog"
+    script = "bsg_cordic_squaroot_natlog/bsg_cordic_squaroot_natlog.py"
+    summary = "squaroot_o, natlog_o = sqrt, ln of quant_i"
+    defaults = (24, 48, 6, 12, 16, 8)
+    vector = True
+
+    def setup_start(self):
+        # (q + c, q - c) with c = gain^2/4 vectors to sqrt(q), at an
+        # angle of ln(q/c)/2; starting ang at ln(c)/2 leaves ln(q)/2
+        constant = self.gain ** 2 / 4
+        self.start_value = round(constant * 2 ** self.precision)
+        self.ang_start = round(math.log(constant) / 2 * 2 ** self.precision)
+
+    def ports(self):
+        return ["input signed [ans_width_p-1:0] quant_i",
+                "output [ans_width_p-1:0] squaroot_o",
+                "output [ang_width_p-1:0] natlog_o"]
+
+    def start(self):
+        c = literal(self.ansbitlen, self.start_value)
+        return [("x", "quant_i + %s" % c),
+                ("y", "quant_i - %s" % c),
+                ("ang", literal(self.angbitlen, self.ang_start)),
+                ("val", "val_i")]
+
+    def back(self):
+        return """  assign squaroot_o = x[stages_p];
+  assign natlog_o = ang[stages_p] << 1;
+"""
+
+    def params_def(self):
+        return HyperbolicUnit.params_def(self) + [
+            ('int', 'signedconst', tables.signed_constant(self.angbitlen)),
+            ('int', 'signedconst2', tables.signed_constant2(self.angbitlen))]
+
+#
+# linear
+#
+
+class LinearUnit(Unit):
+    params = ("angbitlen", "ansbitlen", "posprec", "precision", "startquant_pow")
+    coord = LINEAR
+
+    def setup(self):
+        self.iterations = list(range(self.posprec + 1))
+        self.lookup = [tables.linear_angle(k, self.precision) for k in self.iterations]
+
+class Multiply(LinearUnit):
+    name = "multiply"
+    module = "bsg_cordic_multiply"
+    summary = "prod_o = a_i * b_i, |b_i| < 2"
+    defaults = (16, 32, 14, 12, 4)
+
+    def ports(self):
+        return ["input signed [ans_width_p-1:0] a_i",
+                "input signed [ang_width_p-1:0] b_i",
+                "output signed [ans_width_p-1:0] prod_o"]
+
+    def start(self):
+        return [("x", "a_i"),
+                ("y", literal(self.ansbitlen, 0)),
+                ("ang", "b_i"),
+                ("val", "val_i")]
+
+    def back(self):
+        return """  assign prod_o = y[stages_p];
+"""
+
+class Divide(LinearUnit):
+    name = "divide"
+    module = "bsg_cordic_divide"
+    summary = "quot_o = dividend_i / divisor_i, |quotient| < 2"
+    defaults = (16, 32, 14, 12, 4)
+    vector = True
+
+    def ports(self):
+        return ["input signed [ans_width_p-1:0] dividend_i",
+                "input signed [ans_width_p-1:0] divisor_i",
+                "output signed [ang_width_p-1:0] quot_o"]
+
+    def start(self):
+        return [("x", "divisor_i"),
+                ("y", "dividend_i"),
+                ("ang", literal(self.angbitlen, 0)),
+                ("val", "val_i")]
+
+    def back(self):
+        return """  assign quot_o = ang[stages_p];
+"""
+
+units = dict((cls.name, cls) for cls in
+             (SineCosine, Atan, SineCosineAtan, RectToPolar,
+              Exponential, SinhCosh, Atanh, SqrtLn, Multiply, Divide))
+
+def parse_unit(text, **architecture):
+    """
+    'name', 'name:21,32,14' or 'name:posprec=16,fold=2' as a Unit;
+    architecture is the fold and per_cycle when text does not give them
+    """
+    name, _, values = text.partition(":")
+    if name not in units:
+        raise ValueError("no function %s; there are %s" % (name, ", ".join(sorted(units))))
+    args, kwargs = [], {}
+    for value in filter(None, values.split(",")):
+        key, eq, v = value.partition("=")
+        if eq:
+            kwargs[key] = int(v)
+        elif kwargs:
+            raise ValueError("%s: positional parameters go before name=value ones" % text)
+        else:
+            args.append(int(value))
+    for key, value in architecture.items():
+        kwargs.setdefault(key, value)
+    try:
+        return units[name](*args, **kwargs)
+    except TypeError as e:
+        raise ValueError(str(e))
+
+def command_line(unit):
+    """the generate argument that gives unit again"""
+    values = [str(v) for v in unit.argv()]
+    for key in ("fold", "per_cycle"):
+        if getattr(unit, key) != 1:
+            values.append("%s=%d" % (key, getattr(unit, key)))
+    return "%s:%s" % (unit.name, ",".join(values))
+
+def compare(unit, folds=(1, 2, 4, 8), per_cycles=(1, 2, 4)):
+    """the report of unit for every fold and per_cycle, as text lines"""
+    rows = []
+    for fold in folds:
+        for per_cycle in per_cycles:
+            variant = type(unit)(*unit.argv(), fold=fold, per_cycle=per_cycle)
+            report = dict(variant.report())
+            rows.append([fold, per_cycle, report["pipeline stages"], report["initiation interval"],
+                         report["latency"], report["adders"], report["barrel shifters"],
+                         report["register bits"]])
+    head = ["fold", "per_cycle", "stages", "II", "latency", "adders", "shifters", "registers"]
+    return ["# %s" % unit] + ["  ".join(head)] + ["  ".join(str(v) for v in row) for row in rows]
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description="Generate bsg_cordic pipelines on the shared bsg_cordic_stage",
+        epilog="functions: " + "; ".join("%s (%s)" % (name, " ".join(units[name].params))
+                                         for name in sorted(units)))
+    parser.add_argument("functions", nargs="+", metavar="NAME[:VALUES]",
+                        help="a function, with parameters as a comma list, positional first, then name=value")
+    parser.add_argument("-o", "--outdir", default=".", help="where to write the modules (default: .)")
+    parser.add_argument("--fold", type=int, default=1,
+                        help="cycles each pipeline stage iterates, the initiation interval (default: 1)")
+    parser.add_argument("--per-cycle", type=int, default=1,
+                        help="iterations chained in one cycle (default: 1)")
+    parser.add_argument("--compare", action="store_true",
+                        help="print the report of every fold and per-cycle, write nothing")
+    args = parser.parse_args(argv)
+
+    generated = []
+    for text in args.functions:
+        try:
+            generated.append(parse_unit(text, fold=args.fold, per_cycle=args.per_cycle))
+        except ValueError as e:
+            parser.error(str(e))
+    if args.compare:
+        for unit in generated:
+            print("\n".join(compare(unit)))
+        return
+    if not os.path.isdir(args.outdir):
+        os.makedirs(args.outdir)
+    for unit in generated:
+        command = "python3 -m bsg_cordic.generate %s" % command_line(unit)
+        path = os.path.join(args.outdir, unit.module + ".v")
+        with open(path, "w") as f:
+            f.write(unit.emit(command))
+        tables.write_params(os.path.join(args.outdir, unit.module + "_params_def.h"), unit.params_def())
+        with open(os.path.join(args.outdir, unit.module + "_report.txt"), "w") as f:
+            f.write("# %s\n" % command)
+            for item, value in unit.report():
+                f.write("%-22s %d\n" % (item, value))
+        print("%s: iterations %s, %d stages, latency %d, initiation interval %d"
+              % (path, format_iterations(unit.iterations), unit.stages, unit.latency, unit.fold))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
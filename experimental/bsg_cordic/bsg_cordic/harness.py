@@ -0,0 +1,296 @@
+"""
+Batch accuracy sign-off of a generated bsg_cordic module
+
+The *_test.cpp testbenches step one input per clock and compute their
+error bound in C++, from a params_def.h compiled in, so every change of
+parameters or input range is a rebuild. Here the module is Verilated
+once per configuration with a small generic driver, <module>_batch.cpp.
+The driver maps a file of input columns, streams every row through the
+module with val/ready, and writes each output port to a mapped output
+file. numpy writes the inputs, reads the outputs and compares them:
+
+    python3 -m bsg_cordic.harness sine_cosine --samples 1000000
+    python3 -m bsg_cordic.harness exponential:21,40,6,12,16,4 --range 0:10
+    python3 -m bsg_cordic.harness atan --fold 4 --backend model
+
+(run from experimental/bsg_cordic). Builds go under --build, one
+directory per generate command line, and are reused as long as it
+exists. The Verilated results are checked against the bit-exact
+bsg_cordic.model first; a mismatch means the RTL and the model disagree.
+Then each output is compared with the numpy reference. The report gives
+the max and mean absolute error, the relative error where the
+testbench measures one, and a histogram of the error in units of the
+port's last place (ULP). --backend model skips Verilator and reports the
+model alone, for a machine without it.
+"""
+
+from __future__ import print_function
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+
+from . import generate
+from .model import functions
+
+cordic_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DRIVER = """// batch driver for %(module)s, written by bsg_cordic.harness
+//
+// %(module)s_batch <inputs> <outputs> <rows>: <inputs> holds one int64
+// column of <rows> values per input port, in port order; <outputs> gets
+// one int64 column per output port, sign extended unless one bit wide.
+
+#include "V%(module)s.h"
+#include "verilated.h"
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+
+vluint64_t main_time = 0;
+double sc_time_stamp() {
+  return main_time;
+}
+
+static int64_t *map(const char *path, size_t bytes, bool write) {
+  int fd = open(path, write ? O_RDWR | O_CREAT | O_TRUNC : O_RDONLY, 0644);
+  if (fd < 0 || (write && ftruncate(fd, bytes) != 0)) {
+    perror(path);
+    exit(1);
+  }
+  void *p = mmap(0, bytes, write ? PROT_READ | PROT_WRITE : PROT_READ, MAP_SHARED, fd, 0);
+  if (p == MAP_FAILED) {
+    perror(path);
+    exit(1);
+  }
+  close(fd);
+  return (int64_t *) p;
+}
+
+static uint64_t mask(int64_t v, int width) {
+  return width == 64 ? (uint64_t) v : (uint64_t) v & ((UINT64_C(1) << width) - 1);
+}
+
+static int64_t sext(uint64_t v, int width) {
+  return (int64_t) (v << (64 - width)) >> (64 - width);
+}
+
+int main(int argc, char **argv) {
+  Verilated::commandArgs(argc, argv);
+  if (argc < 4) {
+    fprintf(stderr, "usage: %%s inputs outputs rows\\n", argv[0]);
+    return 1;
+  }
+  size_t rows = strtoull(argv[3], 0, 10);
+  int64_t *in = map(argv[1], %(inputs)d * rows * 8, false);
+  int64_t *out = map(argv[2], %(outputs)d * rows * 8, true);
+
+  V%(module)s *top = new V%(module)s;
+  top->clk_i = 0;
+  top->ready_i = 1;
+  top->val_i = 0;
+%(reset)s
+  size_t sent = 0, got = 0;
+  while (got < rows) {
+    top->val_i = sent < rows;
+    if (sent < rows) {
+%(drive)s
+    }
+    top->clk_i = 0;
+    top->eval();
+    bool taken = top->val_i && top->ready_o;
+    if (top->val_o && top->ready_i) {
+%(capture)s
+      got++;
+    }
+    top->clk_i = 1;
+    top->eval();
+    main_time++;
+    if (taken)
+      sent++;
+  }
+  top->final();
+  delete top;
+  munmap(in, %(inputs)d * rows * 8);
+  munmap(out, %(outputs)d * rows * 8);
+  return 0;
+}
+"""
+
+RESET = """  top->reset_i = 1;
+  for (int i = 0; i < 4; i++) {
+    top->clk_i = 0;
+    top->eval();
+    top->clk_i = 1;
+    top->eval();
+  }
+  top->reset_i = 0;
+"""
+
+def port_widths(unit):
+    """[(direction, port, width)] of unit's data ports"""
+    widths = {"ans_width_p": unit.ansbitlen, "ang_width_p": unit.angbitlen}
+    ports = []
+    for declaration in unit.ports():
+        m = re.match(r"(input|output)\s+(?:signed\s+)?(?:\[(\w+)-1:0\]\s+)?(\w+)$", declaration)
+        ports.append((m.group(1), m.group(3), widths[m.group(2)] if m.group(2) else 1))
+    return ports
+
+def driver(unit):
+    """the batch driver source for unit"""
+    ports = port_widths(unit)
+    inputs = [(p, w) for d, p, w in ports if d == "input"]
+    outputs = [(p, w) for d, p, w in ports if d == "output"]
+    for port, width in inputs + outputs:
+        if width > 64:
+            raise ValueError("%s is %d bits; the driver takes ports up to 64" % (port, width))
+    return DRIVER % {
+        "module": unit.module, "inputs": len(inputs), "outputs": len(outputs),
+        "reset": RESET if unit.fold > 1 else "",
+        "drive": "\n".join("      top->%s = mask(in[%d * rows + sent], %d);" % (p, i, w)
+                           for i, (p, w) in enumerate(inputs)),
+        "capture": "\n".join("      out[%d * rows + got] = %s(top->%s, %d);"
+                             % (i, "sext" if w > 1 else "mask", p, w)
+                             for i, (p, w) in enumerate(outputs))}
+
+def build(unit, root, verilator="verilator"):
+    """
+    The batch executable of unit, built under root the first time; the
+    build directory is named for the generate command line, so any
+    change of parameters builds anew
+    """
+    command = generate.command_line(unit)
+    tag = hashlib.sha1(command.encode()).hexdigest()[:12]
+    directory = os.path.join(os.path.abspath(root), "%s-%s" % (unit.module, tag))
+    binary = os.path.join(directory, "obj_dir", unit.module + "_batch")
+    if os.path.exists(binary):
+        return binary
+    if shutil.which(verilator) is None:
+        raise RuntimeError("%s is not on the path; --backend model runs without it" % verilator)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    source = os.path.join(directory, unit.module + ".v")
+    with open(source, "w") as f:
+        f.write(unit.emit("python3 -m bsg_cordic.generate " + command))
+    test = os.path.join(directory, unit.module + "_batch.cpp")
+    with open(test, "w") as f:
+        f.write(driver(unit))
+    subprocess.check_call([verilator, "--cc", "--exe", "--build", "-O3", "-Wno-fatal",
+                           "--top-module", unit.module, "-o", unit.module + "_batch",
+                           "--Mdir", "obj_dir", source, os.path.join(cordic_dir, "bsg_cordic_stage.v"),
+                           test], cwd=directory)
+    return binary
+
+def run_rtl(binary, unit, inputs, scratch):
+    """{output port: array} of the Verilated unit over the input columns"""
+    ports = port_widths(unit)
+    outputs = [p for d, p, w in ports if d == "output"]
+    rows = len(inputs[0])
+    in_path = os.path.join(scratch, "inputs.bin")
+    out_path = os.path.join(scratch, "outputs.bin")
+    columns = np.memmap(in_path, dtype="<i8", mode="w+", shape=(len(inputs), rows))
+    for i, column in enumerate(inputs):
+        columns[i] = np.asarray(column, dtype=np.int64)
+    columns.flush()
+    del columns
+    subprocess.check_call([binary, in_path, out_path, str(rows)])
+    results = np.memmap(out_path, dtype="<i8", mode="r", shape=(len(outputs), rows))
+    return dict((port, np.array(results[i])) for i, port in enumerate(outputs))
+
+def ulp_bins(top):
+    """histogram bin edges in ULPs, 0, 1, 2, 4, ... past top"""
+    edges = [0, 1]
+    while edges[-1] <= top:
+        edges.append(edges[-1] * 2)
+    return edges
+
+def measure(model, inputs, results):
+    """
+    {output port: (points, max abs, mean abs, max rel or None, max ulp,
+    [(ulp range, count)])} of results against the numpy references, the
+    ranges [lo, hi) ULPs; points where a reference is undefined are left
+    out
+    """
+    got = model.real(results)
+    ideal = model.reference(*inputs)
+    ones = model.real(dict((port, np.ones(1, dtype=np.int64)) for port, kind in model.outputs))
+    report = {}
+    for port, kind in model.outputs:
+        err = ideal[port] - got[port]
+        keep = np.isfinite(err)
+        err = np.abs(err[keep])
+        rel = None
+        if kind == "rel" and len(err):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = err / np.abs(ideal[port][keep])
+            r = r[np.isfinite(r)]
+            rel = float(r.max()) if len(r) else None
+        ulp = err / abs(float(ones[port][0]))
+        top = float(ulp.max()) if len(ulp) else 0.0
+        edges = ulp_bins(top)
+        counts, _ = np.histogram(ulp, bins=edges)
+        histogram = [("%d-%d" % (lo, hi), int(c)) for lo, hi, c in zip(edges, edges[1:], counts) if c]
+        report[port] = (len(err), float(err.max()) if len(err) else 0.0,
+                        float(err.mean()) if len(err) else 0.0, rel, top, histogram)
+    return report
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Batch accuracy sign-off of a bsg_cordic module")
+    parser.add_argument("function", metavar="NAME[:VALUES]", help="as bsg_cordic.generate takes it")
+    parser.add_argument("--samples", type=int, help="points across the input range (default: the testbench's)")
+    parser.add_argument("--range", metavar="LO:HI", help="input range in real units instead")
+    parser.add_argument("--fold", type=int, default=1)
+    parser.add_argument("--per-cycle", type=int, default=1)
+    parser.add_argument("--backend", choices=("verilator", "model"), default="verilator")
+    parser.add_argument("--verilator", default="verilator", help="the verilator executable")
+    parser.add_argument("--build", default="harness_build", help="where the Verilated models are kept")
+    args = parser.parse_args(argv)
+
+    try:
+        unit = generate.parse_unit(args.function, fold=args.fold, per_cycle=args.per_cycle)
+    except ValueError as e:
+        parser.error(str(e))
+    model = functions[unit.name](*unit.argv(), unified=True, fold=unit.fold, per_cycle=unit.per_cycle)
+    if args.range:
+        lo, _, hi = args.range.partition(":")
+        inputs = model.between(float(lo), float(hi), args.samples or 1 << 20)
+    else:
+        inputs = model.stimulus(args.samples)
+    expected = model.run(*inputs)
+
+    print("# %s, %d inputs, %s" % (generate.command_line(unit), len(inputs[0]), args.backend))
+    if args.backend == "verilator":
+        try:
+            binary = build(unit, args.build, args.verilator)
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        results = run_rtl(binary, unit, inputs, os.path.dirname(binary))
+        for port, kind in model.outputs:
+            wrong = np.flatnonzero(results[port] != expected[port])
+            if len(wrong):
+                i = wrong[0]
+                print("%s: %d outputs differ from the model, first at input %s: %d, model %d"
+                      % (port, len(wrong), ", ".join(str(int(a[i])) for a in inputs),
+                         results[port][i], expected[port][i]))
+            else:
+                print("%s: matches the model" % port)
+    else:
+        results = expected
+
+    for port, (points, e_max, e_mean, rel, ulp, histogram) in sorted(measure(model, inputs, results).items()):
+        print("%s: %d points, max %.3g, mean %.3g%s, max %.1f ulp"
+              % (port, points, e_max, e_mean, "" if rel is None else ", max rel %.3g" % rel, ulp))
+        print("  ulp " + "  ".join("%s:%d" % bin for bin in histogram))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,671 @@
+"""
+Bit-exact fixed-point models of the experimental/bsg_cordic pipelines
+
+Each model takes the positional parameters of its generator (the
+Makefile's when none are given), takes the iterations, lookup table and
+start constants from the bsg_cordic.generate unit of the same name, and
+pushes numpy arrays of inputs through the stages with the RTL's widths,
+arithmetic shifts and two's complement wraparound. The result is the
+value on each output port, sign extended, for every input, so a million
+inputs take a second or so instead of a Verilator build per parameter
+set.
+
+    python3 -m bsg_cordic.model sine_cosine
+    python3 -m bsg_cordic.model exponential 21 40 6 12 16 4 --samples 1000000
+    python3 -m bsg_cordic.model atan --sweep posprec=8:16 --sweep precision=12,16
+    python3 -m bsg_cordic.model exponential --unified
+
+(run from experimental/bsg_cordic). Errors are measured as the
+*_test.cpp of each function measures them, absolute for the circular
+functions and relative for the hyperbolic ones, over the testbench's
+input ramp or over --samples points spread across the same range. A
+--sweep takes a comma list or an inclusive lo:hi[:step] range and
+reports every combination.
+
+By default a function with a script is modelled as its script's RTL,
+including two places where that RTL does something other than the
+obvious:
+
+  - the hyperbolic pipelines repeat iterations 4 and 12, but the k=12
+    repeat writes the register the k=11 stage writes too; the model keeps
+    the later generate block, as a simulator running the blocks in
+    source order does, so iteration 11 drops out once posprec >= 12
+    (--iterations lists what an input actually goes through).
+  - bsg_cordic_hypotenuse registers quad_x/quad_y one cycle ahead of the
+    magnitudes and reads them one cycle late at the output, so on a
+    back to back stream the quadrant fix-up of an output comes from the
+    input two samples later (the last input held after the end, as the
+    testbench holds it). run(..., stream=False) gives the per-sample
+    result instead.
+
+--unified (unified=True) models what bsg_cordic.generate emits instead;
+sine_cosine_atan, multiply and divide only exist that way. A unified
+model also takes the generator's fold= and per_cycle=, which change its
+latency but not its results.
+"""
+
+from __future__ import print_function
+
+import argparse
+import itertools
+import math
+import sys
+
+import numpy as np
+
+from . import generate
+from .generate import format_iterations, LINEAR, CIRCULAR
+
+#
+# fixed point helpers; values are kept sign extended, in int64 arrays
+# while every intermediate fits and in python ints (object arrays) above
+#
+
+def wrap(v, width):
+    """the low width bits of v, as a signed value"""
+    half = 1 << (width - 1)
+    return ((v + half) & ((1 << width) - 1)) - half
+
+def unsigned(v, width):
+    """the low width bits of v, as an unsigned value"""
+    return v & ((1 << width) - 1)
+
+def asr(v, shift, width):
+    """v >>> shift for a signed width bit v"""
+    return v >> min(shift, width - 1)
+
+def dtype_for(bits):
+    """array type for intermediates of up to bits bits"""
+    return np.int64 if bits <= 62 else object
+
+def vector(values, width, dtype):
+    """values driven onto a signed width bit port"""
+    return wrap(np.asarray(values).astype(dtype), width)
+
+def filled(like, value):
+    return np.full(like.shape, value, dtype=like.dtype)
+
+def ramp(start, stop, steps, samples=None):
+    """
+    The *_test.cpp stimulus: start, start+step, ... while below stop, with
+    step = round((stop-start)/steps); or samples points across that range
+    """
+    if samples:
+        return np.unique(np.linspace(start, stop, samples, endpoint=False).astype(np.int64))
+    step = max(1, int(math.floor((stop - start) / steps + 0.5)))
+    return np.arange(start, stop, step).astype(np.int64)
+
+def rotation(x, y, z):
+    """rotation drives ang toward zero"""
+    return z < 0
+
+def vectoring(x, y, z):
+    """vectoring drives y toward zero"""
+    return (x < 0) == (y < 0)
+
+def stages(config, x, y, z, direction):
+    """
+    x, y, z through every bsg_cordic_stage of config, a generate unit;
+    direction(x, y, z) is where a stage adds its table angle to z
+    """
+    s, g = config.ansbitlen, config.angbitlen
+    for (shift, negative), table in zip(config.shifts(), config.lookup):
+        rot = direction(x, y, z)
+        xs, ys = asr(x, shift, s), asr(y, shift, s)
+        if negative:
+            xs, ys = x - xs, y - ys
+        z = wrap(np.where(rot, z + table, z - table), g)
+        y_next = wrap(np.where(rot, y - xs, y + xs), s)
+        if config.coord == CIRCULAR:
+            x = wrap(np.where(rot, x + ys, x - ys), s)
+        elif config.coord != LINEAR:
+            x = wrap(np.where(rot, x - ys, x + ys), s)
+        y = y_next
+    return x, y, z
+
+class CordicModel(object):
+    """
+    One generated pipeline. unit is its bsg_cordic.generate unit, whose
+    parameters (the generator's positional arguments) the model takes,
+    inputs the data input ports, and outputs the result ports with the
+    error measure ("abs" or "rel") the testbench applies to them.
+    """
+
+    unit = None
+    inputs = ()
+    outputs = ()
+    # outputs that depend on this many later inputs of a stream
+    lead = 0
+    # the input range, in real units, the optimizer assumes by default
+    domain = (0.0, 1.0)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for key in ("name", "script", "params", "defaults"):
+            setattr(cls, key, getattr(cls.unit, key))
+
+    def __init__(self, *args, unified=False, **kwargs):
+        self.unified = unified
+        self.config = self.unit(*args, legacy=not unified, **kwargs)
+        for key in self.params:
+            setattr(self, key, getattr(self.config, key))
+        self.lookup = [wrap(t, self.angbitlen) for t in self.config.lookup]
+        self.latency = self.config.latency
+        self.dtype = dtype_for(max(self.angbitlen, self.ansbitlen) + 2)
+        self.setup()
+
+    def argv(self):
+        return [getattr(self, key) for key in self.params]
+
+    def __repr__(self):
+        return "%s(%s)" % (self.name, " ".join(str(v) for v in self.argv()))
+
+    def setup(self):
+        pass
+
+    def iterations(self):
+        """the iteration (shift) of each stage an input goes through"""
+        return self.config.iterations
+
+    def run(self, *inputs):
+        """{output port: array of sign extended port values}"""
+        raise NotImplementedError
+
+    def real(self, results):
+        """{output port: the port values as real numbers}"""
+        raise NotImplementedError
+
+    def reference(self, *inputs):
+        """{output port: the ideal real result}"""
+        raise NotImplementedError
+
+    def stimulus(self, samples=None):
+        """the testbench's input arrays, or samples points over the same range"""
+        raise NotImplementedError
+
+    def input_fraction(self):
+        """fraction bits of the input port"""
+        return self.precision
+
+    def between(self, lo, hi, samples):
+        """inputs at samples points across [lo, hi], in real units"""
+        scale = 2.0 ** self.input_fraction()
+        return (np.unique(np.round(np.linspace(lo, hi, samples) * scale).astype(np.int64)),)
+
+    def errors(self, inputs=None, samples=None, chunk=1 << 20, absolute=False):
+        """
+        {output port: (max |error|, mean |error|, rms error, points)} over
+        inputs (stimulus(samples) by default), in chunks to bound memory;
+        points where a relative error is undefined are left out, and
+        absolute measures every output absolutely
+        """
+        if inputs is None:
+            inputs = self.stimulus(samples)
+        total = len(inputs[0])
+        acc = dict((port, [0.0, 0.0, 0.0, 0]) for port, kind in self.outputs)
+        for lo in range(0, total, chunk):
+            hi = min(lo + chunk, total)
+            part = [np.asarray(a)[lo:hi + self.lead] for a in inputs]
+            got = self.real(self.run(*part))
+            ideal = self.reference(*part)
+            for port, kind in self.outputs:
+                err = ideal[port][:hi - lo] - got[port][:hi - lo]
+                if kind == "rel" and not absolute:
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        err = err / ideal[port][:hi - lo]
+                err = np.abs(err[np.isfinite(err)])
+                a = acc[port]
+                if len(err):
+                    a[0] = max(a[0], float(err.max()))
+                a[1] += float(err.sum())
+                a[2] += float((err * err).sum())
+                a[3] += len(err)
+        return dict((port, (a[0], a[1] / max(a[3], 1), math.sqrt(a[2] / max(a[3], 1)), a[3]))
+                    for port, a in acc.items())
+
+#
+# circular: sine/cosine (rotation), atan and rect to polar (vectoring)
+#
+
+class SineCosine(CordicModel):
+    unit = generate.SineCosine
+    inputs = ("ang_i",)
+    outputs = (("sin_o", "abs"), ("cos_o", "abs"))
+    domain = (0.0, 89.95)
+
+    def setup(self):
+        self.x_start = wrap(self.config.x_start, self.ansbitlen)
+
+    def fold(self, ang):
+        """(angle into the stages, negate sin, negate cos)"""
+        g = self.angbitlen
+        neg = ang < 0
+        if self.unified:
+            ang_abs = wrap(np.where(neg, -ang, ang), g)
+            # ang_abs > 90 compares unsigned against the unsigned literal
+            fold = unsigned(ang_abs, g) > self.config.const_90
+            return wrap(np.where(fold, self.config.const_180 - ang_abs, ang_abs), g), neg, fold
+        # the script's quadrant select on ang_i[(ang_width_p-2)-:8]
+        top = (ang >> (g - 9)) & 0xff
+        flip_pos = ~neg & (top > 0x5a) & (top < 0xb4)
+        flip_neg = neg & (top > 0x4c) & (top < 0xa6)
+        quant = np.where(flip_pos, self.config.const_180 - ang,
+                         np.where(flip_neg, self.config.const_180 + ang,
+                                  np.where(neg, -ang, ang)))
+        return wrap(quant, g), neg, flip_pos | flip_neg
+
+    def run(self, ang_i):
+        s = self.ansbitlen
+        z, neg, fold = self.fold(vector(ang_i, self.angbitlen, self.dtype))
+        x, y, z = stages(self.config, filled(z, self.x_start), filled(z, 0), z, rotation)
+        return {"sin_o": wrap(np.where(neg, -y, y), s),
+                "cos_o": wrap(np.where(fold, -x, x), s)}
+
+    def real(self, results):
+        scale = 2.0 ** (self.ansbitlen - 1)
+        return dict((port, results[port].astype(np.float64) / scale) for port in results)
+
+    def reference(self, ang_i):
+        theta = np.radians(vector(ang_i, self.angbitlen, self.dtype).astype(np.float64) / 2.0 ** self.precision)
+        return {"sin_o": np.sin(theta), "cos_o": np.cos(theta)}
+
+    def stimulus(self, samples=None):
+        return (ramp(2 ** self.startquant_pow, 89.95 * 2 ** self.precision,
+                     2 ** (self.angbitlen - 2) - 1, samples),)
+
+class Atan(CordicModel):
+    unit = generate.Atan
+    inputs = ("quant_i",)
+    outputs = (("tan_inv_o", "abs"),)
+    domain = (0.0, 16.0)
+
+    def run(self, quant_i):
+        s = self.ansbitlen
+        # the script declares in_sign_op/in_quant with initializers, which
+        # Verilator evaluates continuously; the unified unit has wires
+        q = vector(quant_i, s, self.dtype)
+        sign = q < 0
+        y = wrap(np.where(sign, -q, q), s)
+        x, y, z = stages(self.config, filled(y, wrap(self.config.x_start, s)), y, filled(y, 0), vectoring)
+        return {"tan_inv_o": wrap(np.where(sign, -z, z), self.angbitlen)}
+
+    def real(self, results):
+        return {"tan_inv_o": np.radians(results["tan_inv_o"].astype(np.float64) / 2.0 ** self.precision)}
+
+    def reference(self, quant_i):
+        q = vector(quant_i, self.ansbitlen, self.dtype).astype(np.float64)
+        return {"tan_inv_o": np.arctan(q / 2.0 ** self.precision)}
+
+    def stimulus(self, samples=None):
+        return (ramp(2 ** self.startquant_pow, 2 ** (self.ansbitlen - 2) - 1,
+                     2 ** (self.angbitlen - 1) - 1, samples),)
+
+class SineCosineAtan(SineCosine):
+    """each sample is sin/cos of ang_i or atan of quant_i, as atan_i says"""
+    unit = generate.SineCosineAtan
+    inputs = ("atan_i", "ang_i", "quant_i")
+    outputs = (("sin_o", "abs"), ("cos_o", "abs"), ("tan_inv_o", "abs"))
+
+    def run(self, atan_i, ang_i, quant_i):
+        s, g = self.ansbitlen, self.angbitlen
+        atan = np.asarray(atan_i).astype(bool)
+        ang, ang_neg, fold = self.fold(vector(ang_i, g, self.dtype))
+        q = vector(quant_i, s, self.dtype)
+        quant_neg = q < 0
+        sign_op = np.where(atan, quant_neg, ang_neg)
+        x = np.where(atan, self.config.one, self.x_start).astype(self.dtype)
+        y = np.where(atan, wrap(np.where(quant_neg, -q, q), s), 0).astype(self.dtype)
+        z = np.where(atan, 0, ang).astype(self.dtype)
+        x, y, z = stages(self.config, x, y, z,
+                         lambda x, y, z: np.where(atan, vectoring(x, y, z), rotation(x, y, z)))
+        return {"sin_o": wrap(np.where(sign_op, -y, y), s),
+                "cos_o": wrap(np.where(fold, -x, x), s),
+                "tan_inv_o": wrap(np.where(sign_op, -z, z), g)}
+
+    def real(self, results):
+        scale = 2.0 ** (self.ansbitlen - 1)
+        return {"sin_o": results["sin_o"].astype(np.float64) / scale,
+                "cos_o": results["cos_o"].astype(np.float64) / scale,
+                "tan_inv_o": np.radians(results["tan_inv_o"].astype(np.float64) / 2.0 ** self.precision)}
+
+    def reference(self, atan_i, ang_i, quant_i):
+        # the outputs of the mode a sample does not compute are not measured
+        atan = np.asarray(atan_i).astype(bool)
+        ideal = SineCosine.reference(self, ang_i)
+        q = vector(quant_i, self.ansbitlen, self.dtype).astype(np.float64)
+        return {"sin_o": np.where(atan, np.nan, ideal["sin_o"]),
+                "cos_o": np.where(atan, np.nan, ideal["cos_o"]),
+                "tan_inv_o": np.where(atan, np.arctan(q / 2.0 ** self.precision), np.nan)}
+
+    def between(self, lo, hi, samples):
+        """alternate samples: sin/cos of angles across [lo, hi] degrees, atan of their tangents"""
+        degrees = np.linspace(lo, hi, samples)
+        scale = 2.0 ** self.precision
+        atan = np.arange(samples) % 2
+        ang = np.round(degrees * scale).astype(np.int64)
+        quant = np.round(np.tan(np.radians(degrees)) * scale).astype(np.int64)
+        return (atan, np.where(atan, 0, ang), np.where(atan, quant, 0))
+
+    def stimulus(self, samples=None):
+        return self.between(self.domain[0], self.domain[1], samples or 2 ** 14)
+
+class RectToPolar(CordicModel):
+    unit = generate.RectToPolar
+    inputs = ("x_i", "y_i")
+    outputs = (("mag_o", "abs"), ("angl_o", "abs"))
+    lead = 2
+    domain = (1.0, 1000.0)
+
+    def setup(self):
+        if self.unified:
+            self.lead = 0
+        self.scale = unsigned(self.config.scale, self.precisionbitlen)
+        self.dtype = dtype_for(max(self.angbitlen + 2, self.ansbitlen + self.precisionbitlen))
+
+    def run(self, x_i, y_i, stream=True):
+        g, s, w = self.angbitlen, self.ansbitlen, self.precisionbitlen
+        xi, yi = vector(x_i, s, self.dtype), vector(y_i, s, self.dtype)
+        quad_x, quad_y = xi < 0, yi < 0
+        x_in = wrap(np.where(quad_x, -xi, xi), s)
+        y_in = wrap(np.where(quad_y, -yi, yi), s)
+        switch = x_in < y_in
+        x = np.where(switch, y_in, x_in)
+        y = np.where(switch, x_in, y_in)
+        # the script's stages rotate on the sign of y alone
+        direction = vectoring if self.unified else (lambda x, y, z: y >= 0)
+        x, y, z = stages(self.config, x, y, filled(x, 0), direction)
+        # x[stages_p] * scale is an unsigned ans+scale bit product
+        mag = unsigned(unsigned(x, s) * self.scale, s + w) >> (w - 1)
+        half = wrap(np.where(switch, self.config.const_90 - z, z), g)
+        if stream and len(quad_x) and not self.unified:
+            quad_x = np.concatenate([quad_x[2:], np.repeat(quad_x[-1:], min(2, len(quad_x)))])
+            quad_y = np.concatenate([quad_y[2:], np.repeat(quad_y[-1:], min(2, len(quad_y)))])
+        quad = wrap(np.where(quad_x, self.config.const_180 - half, half), g)
+        return {"mag_o": wrap(mag, s), "angl_o": wrap(np.where(quad_y, -quad, quad), g)}
+
+    def real(self, results):
+        scale = 2.0 ** self.precision
+        return {"mag_o": results["mag_o"].astype(np.float64) / scale,
+                "angl_o": np.radians(results["angl_o"].astype(np.float64) / scale)}
+
+    def reference(self, x_i, y_i):
+        x = vector(x_i, self.ansbitlen, self.dtype).astype(np.float64)
+        y = vector(y_i, self.ansbitlen, self.dtype).astype(np.float64)
+        return {"mag_o": np.hypot(x, y) / 2.0 ** self.precision, "angl_o": np.arctan2(y, x)}
+
+    def between(self, lo, hi, samples):
+        """radii across [lo, hi] at angles across the first quadrant, as the testbench tests"""
+        side = max(2, int(math.sqrt(samples)))
+        r, a = np.meshgrid(np.linspace(lo, hi, side), np.linspace(0, math.pi / 2, side))
+        scale = 2.0 ** self.precision
+        return (np.round(r * np.cos(a) * scale).astype(np.int64).ravel(),
+                np.round(r * np.sin(a) * scale).astype(np.int64).ravel())
+
+    def stimulus(self, samples=None):
+        # the testbench walks x up and y down along x + y = limit + start,
+        # keeping the points inside the circle of radius limit
+        limit = 2 ** (self.ansbitlen - 2)
+        start = 2 ** self.startquant_pow
+        if samples:
+            x = np.unique(np.linspace(start, limit, samples, endpoint=False).astype(np.int64))
+        else:
+            steps = 2 ** ((self.ansbitlen - 2) // 2) - 1
+            step = max(1, int(math.floor((limit - start) / float(steps) + 0.5)))
+            x = start + step * np.arange(steps + self.posprec + 4, dtype=np.int64)
+        y = limit + start - x
+        keep = np.hypot(x.astype(np.float64), y.astype(np.float64)) < limit
+        return (x[keep], y[keep])
+
+#
+# hyperbolic, with the negative (1 - 2^(k-2)) iterations that widen the
+# range: exponential, sinh/cosh (rotation), atanh and sqrt/ln (vectoring)
+#
+
+class HyperbolicModel(CordicModel):
+    unit = generate.HyperbolicUnit
+    direction = staticmethod(rotation)
+
+    def setup(self):
+        self.gain = self.config.gain
+
+    def iterate(self, x, y, z):
+        return stages(self.config, x, y, z, self.direction)
+
+    def theta_max(self):
+        """the largest angle the iterations reach, as the testbench has it"""
+        return self.config.theta_max()
+
+    def fixed(self, results):
+        scale = 2.0 ** self.precision
+        return dict((port, results[port].astype(np.float64) / scale) for port in results)
+
+    real = fixed
+
+class Exponential(HyperbolicModel):
+    unit = generate.Exponential
+    inputs = ("ang_i",)
+    outputs = (("expz_o", "rel"),)
+    domain = (0.0, 10.0)
+
+    def setup(self):
+        HyperbolicModel.setup(self)
+        self.start = wrap(self.config.start_value, self.ansbitlen)
+
+    def run(self, ang_i):
+        z = vector(ang_i, self.angbitlen, self.dtype)
+        x, y, z = self.iterate(filled(z, self.start), filled(z, self.start), z)
+        return {"expz_o": x}
+
+    def reference(self, ang_i):
+        a = vector(ang_i, self.angbitlen, self.dtype).astype(np.float64)
+        return {"expz_o": np.exp(a / 2.0 ** self.precision)}
+
+    def stimulus(self, samples=None):
+        return (ramp(2 ** self.startquant_pow, self.theta_max() * 2 ** self.precision,
+                     2 ** (self.angbitlen - 1) - 1, samples),)
+
+class SinhCosh(Exponential):
+    unit = generate.SinhCosh
+    outputs = (("sinh_o", "rel"), ("cosh_o", "rel"))
+    domain = (0.5, 10.0)
+
+    def run(self, ang_i):
+        z = vector(ang_i, self.angbitlen, self.dtype)
+        x, y, z = self.iterate(filled(z, self.start), filled(z, 0), z)
+        return {"sinh_o": y, "cosh_o": x}
+
+    def reference(self, ang_i):
+        a = vector(ang_i, self.angbitlen, self.dtype).astype(np.float64) / 2.0 ** self.precision
+        return {"sinh_o": np.sinh(a), "cosh_o": np.cosh(a)}
+
+class Atanh(HyperbolicModel):
+    unit = generate.Atanh
+    inputs = ("quant_i",)
+    outputs = (("atanh_o", "rel"),)
+    direction = staticmethod(vectoring)
+    domain = (0.01, 0.99)
+
+    def input_fraction(self):
+        return self.ansbitlen - 2
+
+    def run(self, quant_i):
+        y = vector(quant_i, self.ansbitlen, self.dtype)
+        # x_in_lp is 1.0 with ansbitlen-2 fraction bits
+        x, y, z = self.iterate(filled(y, 1 << (self.ansbitlen - 2)), y, filled(y, 0))
+        return {"atanh_o": z}
+
+    def reference(self, quant_i):
+        q = vector(quant_i, self.ansbitlen, self.dtype).astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {"atanh_o": np.arctanh(q / 2.0 ** (self.ansbitlen - 2))}
+
+    def stimulus(self, samples=None):
+        stop = 2 ** (self.ansbitlen - 2) - 1 - 2 ** (self.ansbitlen - 13)
+        return (ramp(2 ** self.startquant_pow, stop, 2 ** (self.angbitlen - 1) - 1, samples),)
+
+class SqrtLn(HyperbolicModel):
+    unit = generate.SqrtLn
+    inputs = ("quant_i",)
+    outputs = (("squaroot_o", "rel"), ("natlog_o", "rel"))
+    direction = staticmethod(vectoring)
+    domain = (2.0, 1000.0)
+
+    def setup(self):
+        HyperbolicModel.setup(self)
+        # gain^2/4 and ln(gain^2/4)/2
+        self.start = self.config.start_value
+        self.ang_start = wrap(self.config.ang_start, self.angbitlen)
+
+    def run(self, quant_i):
+        s = self.ansbitlen
+        q = vector(quant_i, s, self.dtype)
+        x, y, z = self.iterate(wrap(q + self.start, s), wrap(q - self.start, s), filled(q, self.ang_start))
+        return {"squaroot_o": x, "natlog_o": wrap(z << 1, self.angbitlen)}
+
+    def reference(self, quant_i):
+        q = vector(quant_i, self.ansbitlen, self.dtype).astype(np.float64) / 2.0 ** self.precision
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {"squaroot_o": np.sqrt(q), "natlog_o": np.log(q)}
+
+    def stimulus(self, samples=None):
+        stop = min(math.exp(2 * self.theta_max()) * 2 ** self.precision, 2 ** (self.ansbitlen - 2) - 1)
+        return (ramp(2 ** self.startquant_pow, stop, 2 ** self.angbitlen - 1, samples),)
+
+#
+# linear: multiply (rotation) and divide (vectoring)
+#
+
+class LinearModel(CordicModel):
+    unit = generate.LinearUnit
+    domain = (-1.9, 1.9)
+
+    def grid(self, lo, hi, samples):
+        """(operands from 2^startquant_pow to 2.0, factors across [lo, hi]) pairs"""
+        side = max(2, int(math.sqrt(samples)))
+        top = min(2 ** (self.precision + 1), 2 ** (self.ansbitlen - 3))
+        a, b = np.meshgrid(np.linspace(2 ** self.startquant_pow, top, side),
+                           np.linspace(lo, hi, side))
+        return np.round(a).astype(np.int64).ravel(), b.ravel()
+
+    def stimulus(self, samples=None):
+        return self.between(self.domain[0], self.domain[1], samples or 2 ** 14)
+
+    def real(self, results):
+        return dict((port, results[port].astype(np.float64) / 2.0 ** self.precision) for port in results)
+
+class Multiply(LinearModel):
+    unit = generate.Multiply
+    inputs = ("a_i", "b_i")
+    outputs = (("prod_o", "abs"),)
+
+    def run(self, a_i, b_i):
+        a = vector(a_i, self.ansbitlen, self.dtype)
+        x, y, z = stages(self.config, a, filled(a, 0), vector(b_i, self.angbitlen, self.dtype), rotation)
+        return {"prod_o": y}
+
+    def reference(self, a_i, b_i):
+        a = vector(a_i, self.ansbitlen, self.dtype).astype(np.float64)
+        b = vector(b_i, self.angbitlen, self.dtype).astype(np.float64)
+        return {"prod_o": a * b / 4.0 ** self.precision}
+
+    def between(self, lo, hi, samples):
+        """a_i up to 2.0 times b_i across [lo, hi]"""
+        a, b = self.grid(lo, hi, samples)
+        return a, np.round(b * 2.0 ** self.precision).astype(np.int64)
+
+class Divide(LinearModel):
+    unit = generate.Divide
+    inputs = ("dividend_i", "divisor_i")
+    outputs = (("quot_o", "abs"),)
+
+    def run(self, dividend_i, divisor_i):
+        y = vector(dividend_i, self.ansbitlen, self.dtype)
+        x = vector(divisor_i, self.ansbitlen, self.dtype)
+        x, y, z = stages(self.config, x, y, filled(y, 0), vectoring)
+        return {"quot_o": z}
+
+    def reference(self, dividend_i, divisor_i):
+        n = vector(dividend_i, self.ansbitlen, self.dtype).astype(np.float64)
+        d = vector(divisor_i, self.ansbitlen, self.dtype).astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {"quot_o": n / d}
+
+    def between(self, lo, hi, samples):
+        """divisors up to 2.0, at quotients across [lo, hi]"""
+        d, q = self.grid(lo, hi, samples)
+        return np.round(d * q).astype(np.int64), d
+
+functions = dict((cls.name, cls) for cls in
+                 (SineCosine, Atan, SineCosineAtan, Exponential, SinhCosh, Atanh, SqrtLn,
+                  RectToPolar, Multiply, Divide))
+
+def parse_values(text):
+    """'8,10,12' or an inclusive '8:16[:2]' as a list of ints"""
+    if ":" in text:
+        bounds = [int(v) for v in text.split(":")]
+        step = bounds[2] if len(bounds) > 2 else 1
+        return list(range(bounds[0], bounds[1] + 1, step))
+    return [int(v) for v in text.split(",")]
+
+def sweep(cls, base, grid, samples=None, unified=False):
+    """
+    (model, parameters, errors) for every combination of grid, a list of
+    (param, values), over the parameters in base; a configuration the
+    generator cannot build has no model and the reason for errors
+    """
+    names = [param for param, values in grid]
+    for point in itertools.product(*[values for param, values in grid]):
+        args = dict(zip(cls.params, base))
+        args.update(zip(names, point))
+        try:
+            model = cls(unified=unified, **args)
+        except ValueError as e:
+            yield None, args, str(e)
+            continue
+        yield model, args, model.errors(samples=samples)
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Bit-exact models of the bsg_cordic pipelines")
+    parser.add_argument("function", choices=sorted(functions))
+    parser.add_argument("args", nargs="*", type=int,
+                        help="the generator's positional parameters (default: its Makefile's)")
+    parser.add_argument("--samples", type=int,
+                        help="points across the test range (default: the testbench ramp)")
+    parser.add_argument("--sweep", action="append", default=[], metavar="PARAM=VALUES",
+                        help="vary a parameter over a comma list or an inclusive lo:hi[:step]")
+    parser.add_argument("--iterations", action="store_true",
+                        help="list the iterations each configuration runs")
+    parser.add_argument("--unified", action="store_true",
+                        help="model the RTL bsg_cordic.generate writes, not the script's")
+    args = parser.parse_args(argv)
+
+    cls = functions[args.function]
+    if len(args.args) > len(cls.params):
+        parser.error("%s takes %s" % (cls.name, " ".join(cls.params)))
+    base = list(args.args) + list(cls.defaults[len(args.args):])
+    grid = []
+    for item in args.sweep:
+        param, _, values = item.partition("=")
+        if param not in cls.params or not values:
+            parser.error("--sweep takes one of %s as PARAM=VALUES" % ", ".join(cls.params))
+        grid.append((param, parse_values(values)))
+
+    head = list(cls.params) + ["latency"]
+    for port, kind in cls.outputs:
+        head += [port + " max", "mean", "rms"]
+    print("# %s, %s error" % (cls.name, ", ".join("%s %s" % o for o in cls.outputs)))
+    print("  ".join(head))
+    for model, point, errors in sweep(cls, base, grid, args.samples, args.unified):
+        row = [str(point[p]) for p in cls.params]
+        if isinstance(errors, str):
+            print("  ".join(row + ["-", errors]))
+            continue
+        row.append(str(model.latency))
+        for port, kind in cls.outputs:
+            row += ["%.3g" % v for v in errors[port][:3]]
+        print("  ".join(row))
+        if args.iterations:
+            print("#   iterations " + format_iterations(model.iterations()))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,300 @@
+"""
+Smallest bsg_cordic configuration that meets an error target
+
+Searches the generator parameters of one function for the configuration
+with the fewest pipeline stages (the lowest latency), then the fewest
+datapath bits, whose worst error over an input range stays within a
+target. Every candidate is measured with the bit-exact model in
+bsg_cordic.model, in parallel across --jobs processes:
+
+    python3 -m bsg_cordic.optimize exponential 1e-3 --range 0:10 --unified
+    python3 -m bsg_cordic.optimize sine_cosine 1e-4
+    python3 -m bsg_cordic.optimize squaroot_natlog 1e-3 --range 0.5:5000 --absolute
+
+(run from experimental/bsg_cordic). The error is the model's (relative
+for the hyperbolic functions) unless --absolute, and the range is in
+the function's input units: degrees for sine_cosine, the ratio for atan
+and atanh, and the magnitude for rect_to_polar, at angles across the
+first quadrant.
+
+Latencies are tried in increasing order. At each one, every (negprec,
+posprec) with that latency and every precision in a window around the
+target is searched for the narrowest ansbitlen that meets it, assuming
+the error falls as ansbitlen grows. The angle width follows from the
+precision and the largest angle the iterations reach; negprec is the
+smallest whose range covers the input range, or one more. The winner is
+measured again on --verify times as many points before it is printed
+with its generator command line. --unified searches the RTL
+bsg_cordic.generate writes instead of the script's, and prints the
+generate command.
+"""
+
+from __future__ import print_function
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+
+from .model import functions, format_iterations
+
+def int_bits(v):
+    """bits of the integer part of |v|"""
+    return int(abs(v)).bit_length()
+
+class Space(object):
+    """
+    The search space of one function: its structures (posprec, negprec)
+    and, for a structure and precision, the parameters that follow and
+    the ansbitlen values to search
+    """
+
+    def __init__(self, name, unified=False):
+        self.cls = functions[name]
+        self.unified = unified
+
+    def model(self, **params):
+        return self.cls(unified=self.unified, **params)
+
+    def structures(self, lo, hi):
+        raise NotImplementedError
+
+    def derived(self, struct, precision, lo, hi, bits):
+        raise NotImplementedError
+
+    def answer_widths(self, struct, precision, lo, hi, bits):
+        raise NotImplementedError
+
+    def precisions(self, bits):
+        return range(max(1, bits - 10), bits + 9)
+
+    def cost(self, params):
+        return params["angbitlen"] + params["ansbitlen"]
+
+class SineCosineSpace(Space):
+    def structures(self, lo, hi):
+        for posprec in range(2, 33):
+            yield {"posprec": posprec}
+
+    def derived(self, struct, precision, lo, hi, bits):
+        # sign and 8 bits of degrees to hold 180
+        return {"angbitlen": 9 + precision}
+
+    def answer_widths(self, struct, precision, lo, hi, bits):
+        return range(max(4, bits - 4), bits + 13)
+
+class AtanSpace(SineCosineSpace):
+    def derived(self, struct, precision, lo, hi, bits):
+        return {"angbitlen": 8 + precision}
+
+    def answer_widths(self, struct, precision, lo, hi, bits):
+        least = 2 + int_bits(max(abs(lo), abs(hi))) + precision
+        return range(least, least + 17)
+
+class RectToPolarSpace(SineCosineSpace):
+    def derived(self, struct, precision, lo, hi, bits):
+        # the gain constant is good to 2^-(precisionbitlen-1) of the magnitude
+        scale = int(math.ceil(math.log(max(hi, 1.0) * 2 ** bits, 2))) + 3
+        return {"angbitlen": 9 + precision, "precisionbitlen": max(4, scale)}
+
+    def answer_widths(self, struct, precision, lo, hi, bits):
+        least = 2 + int_bits(hi) + precision
+        return range(least, least + 17)
+
+    def cost(self, params):
+        return params["angbitlen"] + params["ansbitlen"] + params["precisionbitlen"]
+
+class HyperbolicSpace(Space):
+    def needed(self, model, lo, hi):
+        """the largest angle the iterations have to reach over [lo, hi]"""
+        return max(abs(lo), abs(hi))
+
+    def structures(self, lo, hi):
+        for posprec in range(4, 33):
+            for negprec in range(12):
+                model = self.model(negprec=negprec, posprec=posprec)
+                if model.theta_max() >= self.needed(model, lo, hi):
+                    yield {"negprec": negprec, "posprec": posprec}
+                    yield {"negprec": negprec + 1, "posprec": posprec}
+                    break
+
+    def derived(self, struct, precision, lo, hi, bits):
+        theta = self.model(**struct).theta_max()
+        return {"angbitlen": 2 + int_bits(theta) + precision}
+
+    def answer_widths(self, struct, precision, lo, hi, bits):
+        model = self.model(**struct)
+        least = 2 + int_bits(max(math.exp(min(max(abs(lo), abs(hi)), 700)), model.gain)) + precision
+        return range(least, least + 17)
+
+class AtanhSpace(HyperbolicSpace):
+    def needed(self, model, lo, hi):
+        return math.atanh(min(max(abs(lo), abs(hi)), 1 - 1e-12))
+
+    def answer_widths(self, struct, precision, lo, hi, bits):
+        # the input has ansbitlen-2 fraction bits
+        return range(max(6, bits - 2), bits + 17)
+
+class SqrtLnSpace(HyperbolicSpace):
+    def needed(self, model, lo, hi):
+        # the vector (q + c, q - c) starts at angle ln(q/c)/2, c = gain^2/4
+        c = model.gain ** 2 / 4
+        return max(abs(math.log(max(lo, 1e-300) / c)), abs(math.log(hi / c))) / 2
+
+    def derived(self, struct, precision, lo, hi, bits):
+        model = self.model(**struct)
+        # natlog_o is the angle register shifted up a bit, and the angle
+        # starts from ln(c)/2
+        span = abs(math.log(model.gain ** 2 / 4)) / 2 + model.theta_max()
+        return {"angbitlen": 3 + int_bits(span) + precision}
+
+    def answer_widths(self, struct, precision, lo, hi, bits):
+        model = self.model(**struct)
+        least = 2 + int_bits(max(hi, model.gain ** 2 / 4)) + precision
+        return range(least, least + 17)
+
+spaces = {
+    "sine_cosine": SineCosineSpace,
+    "atan": AtanSpace,
+    "rect_to_polar": RectToPolarSpace,
+    "exponential": HyperbolicSpace,
+    "sin_cos_hyperbolic": HyperbolicSpace,
+    "atanh": AtanhSpace,
+    "squaroot_natlog": SqrtLnSpace,
+}
+
+def worst(model, lo, hi, samples, absolute):
+    """the largest error over every output, None if an output went unmeasured"""
+    errors = model.errors(model.between(lo, hi, samples), absolute=absolute)
+    if any(points == 0 for e_max, e_mean, e_rms, points in errors.values()):
+        return None
+    return max(e[0] for e in errors.values())
+
+def search(task):
+    """
+    (parameters, error) with the narrowest ansbitlen of widths that meets
+    target, or None if even the widest does not
+    """
+    name, params, widths, lo, hi, target, samples, absolute, unified = task
+    cls = functions[name]
+
+    def measure(width):
+        try:
+            model = cls(ansbitlen=width, unified=unified, **params)
+        except ValueError:
+            return None
+        error = worst(model, lo, hi, samples, absolute)
+        return error if error is not None and error <= target else None
+
+    widths = list(widths)
+    top = measure(widths[-1])
+    if top is None:
+        return None
+    best = (widths[-1], top)
+    low, high = 0, len(widths) - 1
+    while low < high:
+        mid = (low + high) // 2
+        error = measure(widths[mid])
+        if error is None:
+            low = mid + 1
+        else:
+            high = mid
+            best = (widths[mid], error)
+    found = dict(params)
+    found["ansbitlen"] = best[0]
+    return found, best[1]
+
+def levels(space, lo, hi, max_latency):
+    """[(latency, [structure])] in increasing latency"""
+    by_latency = {}
+    for struct in space.structures(lo, hi):
+        latency = space.model(**struct).latency
+        if latency <= max_latency:
+            by_latency.setdefault(latency, []).append(struct)
+    return sorted(by_latency.items())
+
+def optimize(name, target, lo, hi, samples=20000, verify=10, jobs=None, absolute=False,
+             max_latency=40, log=None, unified=False):
+    """
+    (model, error) of the smallest configuration of name whose error over
+    [lo, hi] is within target, or None
+    """
+    space = spaces[name](name, unified)
+    bits = max(1, int(math.ceil(-math.log(target, 2))))
+    pool = multiprocessing.Pool(jobs) if jobs != 1 else None
+    mapper = pool.imap_unordered if pool else map
+    try:
+        for latency, structs in levels(space, lo, hi, max_latency):
+            tasks = []
+            for struct in structs:
+                for precision in space.precisions(bits):
+                    params = dict(struct, precision=precision)
+                    params.update(space.derived(struct, precision, lo, hi, bits))
+                    widths = space.answer_widths(struct, precision, lo, hi, bits)
+                    tasks.append((name, params, widths, lo, hi, target, samples, absolute, unified))
+            found = [r for r in mapper(search, tasks) if r]
+            if log:
+                log("latency %d: %d candidates, %d meet %g" % (latency, len(tasks), len(found), target))
+            found.sort(key=lambda r: (space.cost(r[0]), r[0]["precision"], r[1]))
+            for params, error in found:
+                model = space.model(**params)
+                checked = worst(model, lo, hi, samples * verify, absolute)
+                if checked is not None and checked <= target:
+                    return model, checked
+                if log:
+                    log("  %r fails on the denser check (%g)" % (model, checked))
+    finally:
+        if pool:
+            pool.close()
+    return None
+
+def parse_range(text):
+    lo, _, hi = text.partition(":")
+    return float(lo), float(hi)
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Smallest bsg_cordic configuration for an error target")
+    parser.add_argument("function", choices=sorted(spaces))
+    parser.add_argument("max_error", type=float, help="worst error allowed")
+    parser.add_argument("--range", type=parse_range, metavar="LO:HI",
+                        help="input range in real units (default: the function's usual domain)")
+    parser.add_argument("--absolute", action="store_true", help="hold every output to an absolute error")
+    parser.add_argument("--samples", type=int, default=20000, help="points measured per candidate")
+    parser.add_argument("--verify", type=int, default=10,
+                        help="measure the winner on this many times the points")
+    parser.add_argument("--max-latency", type=int, default=40)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--unified", action="store_true",
+                        help="search the RTL bsg_cordic.generate writes, not the script's")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    if args.max_error <= 0:
+        parser.error("max_error must be positive")
+
+    cls = functions[args.function]
+    lo, hi = args.range or cls.domain
+    log = (lambda text: print("# " + text, file=sys.stderr)) if args.verbose else None
+    result = optimize(args.function, args.max_error, lo, hi, args.samples, args.verify,
+                      args.jobs, args.absolute, args.max_latency, log, args.unified)
+    if result is None:
+        print("no configuration up to latency %d meets %g over [%g, %g]"
+              % (args.max_latency, args.max_error, lo, hi), file=sys.stderr)
+        sys.exit(1)
+    model, error = result
+
+    # have the testbench start from the bottom of the range
+    first = int(model.between(lo, hi, 2)[0][0])
+    model.startquant_pow = max(first.bit_length() - 1, 0)
+    kind = "absolute" if args.absolute else ", ".join("%s %s" % o for o in cls.outputs)
+    print("# %s: worst error %.3g (%s) over [%g, %g], target %g"
+          % (cls.name, error, kind, lo, hi, args.max_error))
+    print("# latency %d, iterations %s" % (model.latency, format_iterations(model.iterations())))
+    print("# " + "  ".join("%s %d" % (p, v) for p, v in zip(cls.params, model.argv())))
+    if args.unified:
+        print("python3 -m bsg_cordic.generate %s:%s" % (cls.name, ",".join(str(v) for v in model.argv())))
+    else:
+        print("python3 %s %s" % (os.path.basename(cls.script), " ".join(str(v) for v in model.argv())))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
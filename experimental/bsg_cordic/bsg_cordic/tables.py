@@ -0,0 +1,139 @@
+"""
+Angle tables, gain constants and iteration schedules of the bsg_cordic
+pipelines, shared by the per-function scripts, bsg_cordic.generate and
+bsg_cordic.model
+
+An iteration k of the circular and linear pipelines shifts by k. The
+hyperbolic ones run negative iterations k = -negprec..0, which step by
+1 - 2^(k-2) to widen the input range, then k = 1..posprec, repeating
+4, 13, 40, ... so that they converge. Tables are integers with the
+given number of fraction bits; the scripts print them in hex.
+"""
+
+import math
+
+def circular_angle(k, precision):
+    """atan(2^-k) in degrees"""
+    return round((math.atan2(1, 2 ** k) * 180) / math.pi * (2 ** precision))
+
+def circular_lookup(posprec, precision):
+    """circular_angle of iterations 0..posprec"""
+    return [circular_angle(k, precision) for k in range(posprec + 1)]
+
+def circular_gain(iterations):
+    """the product of cos(atan(2^-k)), the scale the iterations leave out"""
+    const = 1
+    for k in iterations:
+        const = const * math.cos(math.atan2(1, 2 ** k))
+    return const
+
+def circular_constant(posprec, width):
+    """
+    circular_gain of iterations 0..posprec-1 with width-1 fraction bits,
+    the scripts' start value (their last iteration is left out)
+    """
+    return round(circular_gain(range(posprec)) * (2 ** (width - 1)))
+
+def hyperbolic_angle(k, precision, rounded=False):
+    """
+    atanh(1 - 2^(k-2)) for k <= 0, atanh(2^-k) above, truncated as the
+    scripts have it unless rounded
+    """
+    m = math.atanh(1 - 2 ** (k - 2)) if k <= 0 else math.atanh(2 ** -k)
+    if rounded:
+        return round(m * (2 ** precision))
+    return int(m * (2 ** precision))
+
+def hyperbolic_lookup(negprec, posprec, precision):
+    """hyperbolic_angle of iterations -negprec..posprec, indexed by k+negprec"""
+    return [hyperbolic_angle(k, precision) for k in range(-negprec, posprec + 1)]
+
+def hyperbolic_gain(iterations):
+    """1 / the product of the hyperbolic iterations' scale factors"""
+    const = 1
+    for k in iterations:
+        if k <= 0:
+            comp = ((1 - (1 - 2 ** (k - 2)) ** 2) ** 0.5)
+        else:
+            comp = ((1 - 2 ** (-2 * k)) ** 0.5)
+        const = const * comp
+    return 1 / const
+
+def hyperbolic_constant(negprec, posprec):
+    """hyperbolic_gain of -negprec..posprec once each, as the scripts have it"""
+    return hyperbolic_gain(range(-negprec, posprec + 1))
+
+def hyperbolic_iterations(negprec, posprec):
+    """-negprec..posprec with 4, 13, 40, ... repeated"""
+    chain = list(range(-negprec, 1))
+    repeat = 4
+    for k in range(1, posprec + 1):
+        chain.append(k)
+        if k == repeat:
+            chain.append(k)
+            repeat = 3 * repeat + 1
+    return chain
+
+def script_hyperbolic_stages(negprec, posprec):
+    """
+    (register read, register written, iteration) of each stage of the
+    scripts' hyperbolic generate loops, in generate order; they repeat 4
+    and 12, and the stage after each repeat reads the register one past
+    its index
+    """
+    n = negprec
+    stages = [(i, i + 1, i - n) for i in range(n + 1)]
+    for j in range(n + 1, n + posprec + 1):
+        k = j - n
+        if k in (4, 12):
+            stages += [(j, j + 1, k), (j + 1, j + 2, k)]
+        elif k > 4:
+            stages.append((j + 1, j + 2, k))
+        else:
+            stages.append((j, j + 1, k))
+    return stages
+
+def script_hyperbolic_iterations(negprec, posprec):
+    """
+    The iterations an input of the scripts' hyperbolic pipelines goes
+    through, traced back from the register the output is read from. The
+    k=12 repeat writes the register k=11 writes, and the later generate
+    block wins, so 11 drops out once posprec >= 12. None if the output
+    register is never written (posprec < 4).
+    """
+    writer = {}
+    for src, dst, k in script_hyperbolic_stages(negprec, posprec):
+        writer[dst] = (src, k)
+    chain = []
+    reg = negprec + posprec + 2
+    while reg:
+        if reg not in writer:
+            return None
+        reg, k = writer[reg]
+        chain.append(k)
+    return chain[::-1]
+
+def linear_angle(k, precision):
+    """2^-k"""
+    return 1 << (precision - k) if k <= precision else 0
+
+def signed_constant(width):
+    """the most negative width bit value, as the testbenches take it"""
+    return hex(1 << (width - 1))
+
+def signed_constant2(width):
+    """a width bit mask"""
+    return hex((1 << width) - 1)
+
+def write_params(path, entries):
+    """
+    The params_def.h the *_test.cpp testbenches include, declaring
+    (c type, name, value) for each of entries
+    """
+    f_params = open(path, "w+")
+    f_params.write('#ifndef PARAMS_DEF\n')
+    f_params.write('#define PARAMS_DEF\n')
+    for ctype, name, value in entries:
+        f_params.write('%s %s = %s;\n' % (ctype, name, value))
+    f_params.write('#endif')
+    f_params.close()
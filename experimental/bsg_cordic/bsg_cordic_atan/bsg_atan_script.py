@@ -1,14 +1,9 @@
-import math, sys
+import math, os, sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bsg_cordic import tables
 # Inputs to the module has a bit-length defined by ansbitlen and output by ansbitlen. Both accomodate a fixed point representation
 # which uses 'precision' number of bits for the decimal point. 'posprec' determines the number of pipeline stages starting from 0th stage. 
-def lookup_compute(posprec, precision_result):
-    lookup=[]
-    for j in range(0,posprec+1):
-        m=(math.atan2(1,2**j)*180)/math.pi
-        lookup.append(format(round(m*(2**precision_result)),'x'))
-    return lookup
-
-
 def constant_compute(precision, ansbitlen):
     const=[]
     const.append('1')
@@ -112,37 +107,33 @@ endmodule
     return
 
 
-angbitlen = (int)(sys.argv[1])# Advised to use 1-sign bit+7-bits for reperenting a 
-#max of 90 degrees+precision number of bits. 
-#Output in fixed point format with precision number of bits for decimal representation.
-ansbitlen = (int)(sys.argv[2])# Can be any desired length including precision number of bits.
-#Output in fixed point format with precision number of bits for decimal representation.
-posprec = (int)(sys.argv[3])
-precision = (int)(sys.argv[4])
-startquant_pow = (int)(sys.argv[5])# Input to the module will start from 2^startquant_pow.
-# Fixed-point value will be 2^(startquant_pow-precision)
-
-lookup = lookup_compute(posprec, precision)
-bsg_atan_init(angbitlen, ansbitlen, posprec)
-lookup_initialization(posprec, angbitlen, lookup)
-constant = constant_compute(precision, ansbitlen)
-bsg_constxy_initialization(constant, ansbitlen)
-ninetyconstant = format(90*(2**precision),'x')
-main_body_print(ansbitlen, ninetyconstant)
-
-
-# This file object is used to create a header file facilitating the passing
-# of parameters of the module to Verilator for testing purposes. 
-
-f_params = open("params_def.h","w+")
-f_params.write('#ifndef PARAMS_DEF\n')
-f_params.write('#define PARAMS_DEF\n')
-f_params.write('int anglen = %(g)d;\n'%{'g':angbitlen})
-f_params.write('int anslen = %(s)d;\n'%{'s':ansbitlen})
-f_params.write('int startquant_pow = %(s)d;\n'%{'s':startquant_pow})
-f_params.write('int precis_p = %(p)d;\n'%{'p':posprec})
-f_params.write('int precision = %(p)d;\n'%{'p':precision})
-f_params.write('#endif')
-f_params.close()
+if __name__ == "__main__":
+    angbitlen = (int)(sys.argv[1])# Advised to use 1-sign bit+7-bits for reperenting a 
+    #max of 90 degrees+precision number of bits. 
+    #Output in fixed point format with precision number of bits for decimal representation.
+    ansbitlen = (int)(sys.argv[2])# Can be any desired length including precision number of bits.
+    #Output in fixed point format with precision number of bits for decimal representation.
+    posprec = (int)(sys.argv[3])
+    precision = (int)(sys.argv[4])
+    startquant_pow = (int)(sys.argv[5])# Input to the module will start from 2^startquant_pow.
+    # Fixed-point value will be 2^(startquant_pow-precision)
+
+    lookup = [format(v, 'x') for v in tables.circular_lookup(posprec, precision)]
+    bsg_atan_init(angbitlen, ansbitlen, posprec)
+    lookup_initialization(posprec, angbitlen, lookup)
+    constant = constant_compute(precision, ansbitlen)
+    bsg_constxy_initialization(constant, ansbitlen)
+    ninetyconstant = format(90*(2**precision),'x')
+    main_body_print(ansbitlen, ninetyconstant)
+
+
+    # params_def.h passes the parameters of the module to the Verilator testbench
+    tables.write_params("params_def.h", [
+        ('int', 'anglen', angbitlen),
+        ('int', 'anslen', ansbitlen),
+        ('int', 'startquant_pow', startquant_pow),
+        ('int', 'precis_p', posprec),
+        ('int', 'precision', precision),
+    ])
     
     
@@ -1,33 +1,24 @@
-import math
+import argparse, math, os, sys
 
-def constant_compute(negprec, posprec):
-    const=1
-    for i in range(-negprec,1):
-        comp=((1-(1-2**(i-2))**2)**0.5)
-        const=const*comp
-    for i in range(1,posprec+1):
-        comp=((1-2**(-2*i))**0.5)
-        const=const*comp
-    return 1/const
-    
-print("Please input the maximum input number that needs to be computed.")
-
-maxnum = input()
-maxnum = round(float(maxnum))
-
-print("We now need to decide the number of pipeline stages in positive as well as negative direction.")
-print("The number of pipeline stages in positive direction determines the accuracy of output" )
-print("The script can generate output Verilog code for a maximum of 12-13 stages. It's advised to use at least 5-6 pipeline stages in positive dierction.")
-print("Works and tested extensively for 9-12 stages.")
-
-posprec = input("Please enter the positive pipeline stages needed: ")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bsg_cordic import tables
 
-print("It's suggested to use at least 4 bits for precision.")
-print("If 4 bits are used then the resulting representation would be in fixed point in which first 4 least significant bits signify the the digits to the right of the decimal.")
-precision = input("Precision bits in a sense are indicative of the minimum number that can be computed with correct results. Please enter the number of precision bits needed for your design: ")
+parser = argparse.ArgumentParser(
+    description="Widths and negative stages of bsg_cordic_exponential for the largest result needed. "
+                "To search them against an error target instead, run "
+                "'python3 -m bsg_cordic.optimize exponential' from experimental/bsg_cordic.")
+parser.add_argument("maxnum", type=float,
+                    help="the maximum number, exp(ang_i), that needs to be computed")
+parser.add_argument("posprec", type=int,
+                    help="pipeline stages in the positive direction; they determine the accuracy of the output. "
+                         "At least 5-6 are advised, and 9-12 are tested extensively")
+parser.add_argument("precision", type=int,
+                    help="fraction bits of the input and output fixed point, at least 4 suggested")
+args = parser.parse_args()
 
-posprec = (int)(posprec)
-precision = (int)(precision)
+maxnum = round(args.maxnum)
+posprec = args.posprec
+precision = args.precision
 
 if maxnum < 8.217603730491943:
     negprec = 0
@@ -81,7 +72,7 @@ print("The number of pipeline stages in negative direction is determined by the
 print("In this case we compare the value ln(maximum_input_by_user) to the max angle table given in the readme and then find the minimum 'M' value needed")
 
 print("The negative precision depending on the maximum result output needed is %(s)d" %{'s':negprec})
-constant=constant_compute(negprec, posprec)*(2**precision)
+constant=tables.hyperbolic_constant(negprec, posprec)*(2**precision)
 
 print("The minimum length of output should be %(s)d bits." % {'s':ansbitlen})
 
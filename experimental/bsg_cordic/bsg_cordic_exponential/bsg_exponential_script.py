@@ -1,4 +1,7 @@
-import sys, math
+import math, os, sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bsg_cordic import tables
 
 def bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter):
     print("""
@@ -29,25 +32,6 @@ def bsg_lookup_initialization(negprec, posprec, angbitlen,result):
         print("     %(g)d'h%(r)s," %{'g':angbitlen,'r':result[i] })
     print("     %(g)d'h%(r)s };" %{'g':angbitlen,'r':result[0] })
     return
-def constant_compute(negprec, posprec):
-    const=1
-    for i in range(-negprec,1):
-        comp=((1-(1-2**(i-2))**2)**0.5)
-        const=const*comp
-    for i in range(1,posprec+1):
-        comp=((1-2**(-2*i))**0.5)
-        const=const*comp
-    return 1/const
-def lookup_compute(negprec, posprec, precision):
-    lookup=[]
-    for i in range(-negprec,1):
-        m=math.atanh(1-2**(i-2))
-        lookup.append(format((int)(m*(2**precision)),'x'))
-    for j in range(negprec+1,negprec+posprec+1):
-        m=math.atanh(2**(-j+negprec))
-        lookup.append(format((int)(m*(2**precision)),'x'))
-    return lookup
-
 def bsg_constxy_initialization(constant, ansbitlen):
     print("""    
     localparam x_start = %(s)d'h%(c)s;
@@ -201,48 +185,45 @@ def main_body_print():
 endmodule""")
     return
     
-angbitlen = (int)(sys.argv[1])
-# ^^ Defines the bit-length of the angular ('z' in CORDIC naming) datapath. 
-# Has a precision of 'precision' bits and is input to the module.
-ansbitlen = (int)(sys.argv[2])
-# ^^ Defines the bit-length of the answer ('x' and 'y' in CORDIC naming) datapath.
-# Also has a precision of 'precision' bits and is output of the module defined by
-# exp(ang_i) 
-negprec = (int)(sys.argv[3])
-# ^^ Determines the number of iterations in negative direction. These iterations
-# increase the domain of input that can be converged by the module.
-posprec = (int)(sys.argv[4])
-#^^ The number of iterations in positive direction. Advised and
-# observed mathematically to have n-iterations to have a precision of n-bits.
-precision = (int)(sys.argv[5])
-startquant_pow = (int)(sys.argv[6])
-#^^ Determines the bit position to start the input of testing from. If experiencing
-# high error in the lower range of quantities, try increasing this quantity.
-extriter = 1
-# Increase extriter when you want to go beyond 13 iterations in the positive direction.
-# This script and the verilog module is limited upto 13 iterations only. Apart from changing
-#'extriter' changes would be needed to the verilog code as well. It's added for the convenience
-# of expansion later on, if needed. 
-bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter)
-lookup=lookup_compute(negprec, posprec, precision)
-bsg_lookup_initialization(negprec, posprec, angbitlen,lookup)
-constant=constant_compute(negprec, posprec)*(2**precision)
-constant=format(round(constant),'x')
-bsg_constxy_initialization(constant, ansbitlen)
-main_body_print()
-length=len(constant)
+if __name__ == "__main__":
+    angbitlen = (int)(sys.argv[1])
+    # ^^ Defines the bit-length of the angular ('z' in CORDIC naming) datapath. 
+    # Has a precision of 'precision' bits and is input to the module.
+    ansbitlen = (int)(sys.argv[2])
+    # ^^ Defines the bit-length of the answer ('x' and 'y' in CORDIC naming) datapath.
+    # Also has a precision of 'precision' bits and is output of the module defined by
+    # exp(ang_i) 
+    negprec = (int)(sys.argv[3])
+    # ^^ Determines the number of iterations in negative direction. These iterations
+    # increase the domain of input that can be converged by the module.
+    posprec = (int)(sys.argv[4])
+    #^^ The number of iterations in positive direction. Advised and
+    # observed mathematically to have n-iterations to have a precision of n-bits.
+    precision = (int)(sys.argv[5])
+    startquant_pow = (int)(sys.argv[6])
+    #^^ Determines the bit position to start the input of testing from. If experiencing
+    # high error in the lower range of quantities, try increasing this quantity.
+    extriter = 1
+    # Increase extriter when you want to go beyond 13 iterations in the positive direction.
+    # This script and the verilog module is limited upto 13 iterations only. Apart from changing
+    #'extriter' changes would be needed to the verilog code as well. It's added for the convenience
+    # of expansion later on, if needed. 
+    bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter)
+    lookup=[format(v, 'x') for v in tables.hyperbolic_lookup(negprec, posprec, precision)]
+    bsg_lookup_initialization(negprec, posprec, angbitlen,lookup)
+    constant=tables.hyperbolic_constant(negprec, posprec)*(2**precision)
+    constant=format(round(constant),'x')
+    bsg_constxy_initialization(constant, ansbitlen)
+    main_body_print()
+    length=len(constant)
 
 
-# This file object is used to create a header file facilitating the passing of parameters of the module to
-# Verilator for testing purposes. 
-f_params = open("params_def.h","w+")
-f_params.write('#ifndef PARAMS_DEF\n')
-f_params.write('#define PARAMS_DEF\n')
-f_params.write('int anglen = %(g)d;\n'%{'g':angbitlen})
-f_params.write('int anslen = %(s)d;\n'%{'s':ansbitlen})
-f_params.write('int startquant_pow = %(s)d;\n'%{'s':startquant_pow})
-f_params.write('int posiprec = %(p)d;\n'%{'p':posprec})
-f_params.write('int negprec = %(n)d;\n'%{'n':negprec})
-f_params.write('int precision = %(p)d;\n'%{'p':precision})
-f_params.write('#endif')
-f_params.close()
+    # params_def.h passes the parameters of the module to the Verilator testbench
+    tables.write_params("params_def.h", [
+        ('int', 'anglen', angbitlen),
+        ('int', 'anslen', ansbitlen),
+        ('int', 'startquant_pow', startquant_pow),
+        ('int', 'posiprec', posprec),
+        ('int', 'negprec', negprec),
+        ('int', 'precision', precision),
+    ])
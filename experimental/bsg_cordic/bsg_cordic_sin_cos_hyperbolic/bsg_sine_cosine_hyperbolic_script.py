@@ -1,4 +1,7 @@
-import sys, math
+import math, os, sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bsg_cordic import tables
 
 def bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter):
     print("""
@@ -37,28 +40,6 @@ def bsg_lookup_initialization(negprec, posprec, angbitlen,result):
     return
 
 
-def constant_compute(negprec, posprec):
-    const=1
-    for i in range(-negprec,1):
-        comp=((1-(1-2**(i-2))**2)**0.5)
-        const=const*comp
-    for i in range(1,posprec+1):
-        comp=((1-2**(-2*i))**0.5)
-        const=const*comp
-    return 1/const
-
-
-def lookup_compute(negprec, posprec, precision):
-    lookup=[]
-    for i in range(-negprec,1):
-        m=math.atanh(1-2**(i-2))
-        lookup.append(format((int)(m*(2**precision)),'x'))
-    for j in range(negprec+1,negprec+posprec+1):
-        m=math.atanh(2**(-j+negprec))
-        lookup.append(format((int)(m*(2**precision)),'x'))
-    return lookup
-
-
 def bsg_constxy_initialization(constant, ansbitlen):
     print("""    
     localparam x_start = %(s)d'h%(c)s;
@@ -221,45 +202,42 @@ def main_body_print():
     endmodule""")
     return
     
-angbitlen = (int)(sys.argv[1])
-# Determined by the maximum input quantity into the module decided by the
-# number of iterations and the corresponding maximum theta_max. Determine this
-# length as 1-sign + 1-overflow bit + bit-length of [theta_max] + 'precision' bits.
-
-ansbitlen = (int)(sys.argv[2])
-# Determine this length by finding out the maximum of the sine and cosine hyperbolic
-# corresponding to the theta_max. `ansbitlen` is equal to 1-sign + 1-overflow bit
-# + bit-length of [sinh(theta_max)] + 'precision' bits.
-
-negprec = (int)(sys.argv[3])
-# Determine this by deciding the theta_max and `negprec` is the corresponding 'M' value.
-
-posprec = (int)(sys.argv[4])
-
-precision = (int)(sys.argv[5])
-
-startquant_pow = (int)(sys.argv[6])
-
-extriter = 1
-
-bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter)
-lookup=lookup_compute(negprec, posprec, precision)
-bsg_lookup_initialization(negprec, posprec, angbitlen,lookup)
-constant=constant_compute(negprec, posprec)*(2**precision)
-constant=format(round(constant),'x')
-bsg_constxy_initialization(constant, ansbitlen)
-main_body_print()
-
-# This file object is used to create a header file facilitating the passing of parameters of the module to
-# Verilator for testing purposes. 
-f_params = open("params_def.h","w+")
-f_params.write('#ifndef PARAMS_DEF\n')
-f_params.write('#define PARAMS_DEF\n')
-f_params.write('int anglen = %(g)d;\n'%{'g':angbitlen})
-f_params.write('int anslen = %(s)d;\n'%{'s':ansbitlen})
-f_params.write('int startquant_pow = %(s)d;\n'%{'s':startquant_pow})
-f_params.write('int posiprec = %(p)d;\n'%{'p':posprec})
-f_params.write('int negprec = %(n)d;\n'%{'n':negprec})
-f_params.write('int precision = %(p)d;\n'%{'p':precision})
-f_params.write('#endif')
-f_params.close()
+if __name__ == "__main__":
+    angbitlen = (int)(sys.argv[1])
+    # Determined by the maximum input quantity into the module decided by the
+    # number of iterations and the corresponding maximum theta_max. Determine this
+    # length as 1-sign + 1-overflow bit + bit-length of [theta_max] + 'precision' bits.
+
+    ansbitlen = (int)(sys.argv[2])
+    # Determine this length by finding out the maximum of the sine and cosine hyperbolic
+    # corresponding to the theta_max. `ansbitlen` is equal to 1-sign + 1-overflow bit
+    # + bit-length of [sinh(theta_max)] + 'precision' bits.
+
+    negprec = (int)(sys.argv[3])
+    # Determine this by deciding the theta_max and `negprec` is the corresponding 'M' value.
+
+    posprec = (int)(sys.argv[4])
+
+    precision = (int)(sys.argv[5])
+
+    startquant_pow = (int)(sys.argv[6])
+
+    extriter = 1
+
+    bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter)
+    lookup=[format(v, 'x') for v in tables.hyperbolic_lookup(negprec, posprec, precision)]
+    bsg_lookup_initialization(negprec, posprec, angbitlen,lookup)
+    constant=tables.hyperbolic_constant(negprec, posprec)*(2**precision)
+    constant=format(round(constant),'x')
+    bsg_constxy_initialization(constant, ansbitlen)
+    main_body_print()
+
+    # params_def.h passes the parameters of the module to the Verilator testbench
+    tables.write_params("params_def.h", [
+        ('int', 'anglen', angbitlen),
+        ('int', 'anslen', ansbitlen),
+        ('int', 'startquant_pow', startquant_pow),
+        ('int', 'posiprec', posprec),
+        ('int', 'negprec', negprec),
+        ('int', 'precision', precision),
+    ])
@@ -1,19 +1,7 @@
-import math, sys
+import math, os, sys
 
-def lookup_compute(posprec, precision_result):
-    lookup=[]
-    for j in range(0,posprec+1):
-        m=(math.atan2(1,2**j)*180)/math.pi
-        lookup.append(format(round(m*(2**precision_result)),'x'))
-    return lookup
-
-def constant_compute(posprec, ansbitlen):
-    const=1
-    for i in range(0,posprec):
-        comp = math.cos(math.atan2(1,2**i))
-        const=const*comp
-    const = format(round(const*(2**(ansbitlen-1))),'x')
-    return const
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bsg_cordic import tables
 
 def bsg_sine_cosine_init(angbitlen, ansbitlen, posprec):
     print('''
@@ -161,51 +149,35 @@ endmodule
 ''')
     return
 
-def signed_constant(ansbitlen):
-    const = "1"
-    for i in range(0,ansbitlen-1):
-        const = const + str(0)
-    return (hex(int(const, 2)))
-
-def signed_constant2(ansbitlen):
-    const = ""
-    for i in range(0,ansbitlen):
-        const = const + str(1)
-    return (hex(int(const, 2)))
-
-
-angbitlen = (int)(sys.argv[1])
-#^^ Advised to use 1-sign bit+8-bits for reperenting a max of 180 degrees+precision number of bits.
-ansbitlen = (int)(sys.argv[2])
-#^^Output in fixed point format with (anslen-1) number of bits for decimal representation.
-posprec = (int)(sys.argv[3])
-precision = (int)(sys.argv[4])
-startquant_pow = (int)(sys.argv[5])
-# ^^Input to the module will start from 2^startquant_pow. Fixed-point value will be 2^(startquant_pow-precision)
-# A general recommendation is that if Sin TEST FAILS, try increasing startquant_pow.
+if __name__ == "__main__":
+    angbitlen = (int)(sys.argv[1])
+    #^^ Advised to use 1-sign bit+8-bits for reperenting a max of 180 degrees+precision number of bits.
+    ansbitlen = (int)(sys.argv[2])
+    #^^Output in fixed point format with (anslen-1) number of bits for decimal representation.
+    posprec = (int)(sys.argv[3])
+    precision = (int)(sys.argv[4])
+    startquant_pow = (int)(sys.argv[5])
+    # ^^Input to the module will start from 2^startquant_pow. Fixed-point value will be 2^(startquant_pow-precision)
+    # A general recommendation is that if Sin TEST FAILS, try increasing startquant_pow.
 
-lookup = lookup_compute(posprec, precision)
-bsg_sine_cosine_init(angbitlen, ansbitlen, posprec)
-lookup_initialization(posprec, angbitlen, lookup)
-constant = constant_compute(posprec, ansbitlen)
-bsg_constxy_initialization(constant, ansbitlen)
-const_sign = constant_180(precision)
-quadrant_print(angbitlen,const_sign)
-main_body_print()
-signedconst = signed_constant(ansbitlen)
-signedconst2 = signed_constant2(ansbitlen)
+    lookup = [format(v, 'x') for v in tables.circular_lookup(posprec, precision)]
+    bsg_sine_cosine_init(angbitlen, ansbitlen, posprec)
+    lookup_initialization(posprec, angbitlen, lookup)
+    constant = format(tables.circular_constant(posprec, ansbitlen), 'x')
+    bsg_constxy_initialization(constant, ansbitlen)
+    const_sign = constant_180(precision)
+    quadrant_print(angbitlen,const_sign)
+    main_body_print()
+    signedconst = tables.signed_constant(ansbitlen)
+    signedconst2 = tables.signed_constant2(ansbitlen)
 
-# This file object is used to create a header file facilitating the passing of parameters of the module to
-# Verilator for testing purposes. 
-f_params = open("params_def.h","w+")
-f_params.write('#ifndef PARAMS_DEF\n')
-f_params.write('#define PARAMS_DEF\n')
-f_params.write('int anglen = %(g)d;\n'%{'g':angbitlen})
-f_params.write('int anslen = %(s)d;\n'%{'s':ansbitlen})
-f_params.write('int startquant_pow = %(s)d;\n'%{'s':startquant_pow})
-f_params.write('int precis_p = %(p)d;\n'%{'p':posprec})
-f_params.write('int precision = %(p)d;\n'%{'p':precision})
-f_params.write('long int signedconst = %(sc)s;\n'%{'sc':signedconst})
-f_params.write('long int signedconst2 = %(scc)s;\n'%{'scc':signedconst2})
-f_params.write('#endif')
-f_params.close()
+    # params_def.h passes the parameters of the module to the Verilator testbench
+    tables.write_params("params_def.h", [
+        ('int', 'anglen', angbitlen),
+        ('int', 'anslen', ansbitlen),
+        ('int', 'startquant_pow', startquant_pow),
+        ('int', 'precis_p', posprec),
+        ('int', 'precision', precision),
+        ('long int', 'signedconst', signedconst),
+        ('long int', 'signedconst2', signedconst2),
+    ])
@@ -1,5 +1,7 @@
-  
-import sys, math
+import math, os, sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bsg_cordic import tables
 
 def bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter):
     print("""
@@ -35,39 +37,6 @@ def bsg_lookup_initialization(negprec, posprec, angbitlen,result):
     return
 
 
-def constant_compute(negprec, posprec):
-    const=1
-    for i in range(-negprec,1):
-        comp=((1-(1-2**(i-2))**2)**0.5)
-        const=const*comp
-    for i in range(1,posprec+1):
-        comp=((1-2**(-2*i))**0.5)
-        const=const*comp
-    return 1/const
-
-
-def lookup_compute(negprec, posprec, precision):
-    lookup=[]
-    for i in range(-negprec,1):
-        m=math.atanh(1-2**(i-2))
-        lookup.append(format((int)(m*(2**precision)),'x'))
-    for j in range(negprec+1,negprec+posprec+1):
-        m=math.atanh(2**(-j+negprec))
-        lookup.append(format((int)(m*(2**precision)),'x'))
-    return lookup
-
-def signed_constant(angbitlen):
-    const = "1"
-    for i in range(0,angbitlen-1):
-        const = const + str(0)
-    return (hex(int(const, 2)))
-
-def signed_constant2(angbitlen):
-    const = ""
-    for i in range(0,angbitlen):
-        const = const + str(1)
-    return (hex(int(const, 2)))
-
 def bsg_constxy_initialization(constant, ansbitlen, angbitlen, lnconstant):
     print("""
     localparam start = %(s)d'h%(c)s;
@@ -224,58 +193,55 @@ def main_body_print():
     return
     
 
-angbitlen = (int)(sys.argv[1])
-#^^ Defines the bit-length of natural logarithm answer value and has a 
-# precision of 'precision' bits.
-
-ansbitlen = (int)(sys.argv[2])
-#^^ Defines the bit-length of the square root answer value and also
-# has a precision of 'precision' bits.
-
-negprec = (int)(sys.argv[3])
-#^^ Defines the number of pipeline stages in negative direction which equates
-# to the maximum convergence input domain. For a 'm' value of 6, the theta_max
-# equals 15.54462 and the design according to the hyperbolic equality has a 
-# convergence input domain of exp(2*15.54462).
-
-posprec = (int)(sys.argv[4])
-#^^ Defines the number of pipeline stages in positive direction which equates
-# to the precision of output answer.
-
-precision = (int)(sys.argv[5])
-#^^ Defines the number of precision bits for both input and output.
-
-startquant_pow = (int)(sys.argv[6])
-#^^ Defines the starting input LSB point from where the module starts computing.
-# This quantity is only used for testing purposes.
-extriter = 1
-
-bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter)
-lookup=lookup_compute(negprec, posprec, precision)
-bsg_lookup_initialization(negprec, posprec, angbitlen,lookup)
-constant=constant_compute(negprec, posprec)
-constant = (constant**2)/4
-lnconstant = ((math.log(constant))/2)*(2**precision)
-constanthex=format(round(constant*(2**precision)),'x')
-lnconstanthex=format(round(lnconstant),'x')
-bsg_constxy_initialization(constanthex, ansbitlen, angbitlen, lnconstanthex)
-main_body_print()
-signedconst = signed_constant(angbitlen)
-signedconst2 = signed_constant2(angbitlen)
-
-
-# This file object is used to create a header file facilitating the passing of parameters of the module to
-# Verilator for testing purposes. 
-f_params = open("params_def.h","w+")
-f_params.write('#ifndef PARAMS_DEF\n')
-f_params.write('#define PARAMS_DEF\n')
-f_params.write('int anglen = %(g)d;\n'%{'g':angbitlen})
-f_params.write('int anslen = %(s)d;\n'%{'s':ansbitlen})
-f_params.write('int startquant_pow = %(s)d;\n'%{'s':startquant_pow})
-f_params.write('int posiprec = %(p)d;\n'%{'p':posprec})
-f_params.write('int negprec = %(n)d;\n'%{'n':negprec})
-f_params.write('int precision = %(p)d;\n'%{'p':precision})
-f_params.write('int signedconst = %(sc)s;\n'%{'sc':signedconst})
-f_params.write('int signedconst2 = %(scc)s;\n'%{'scc':signedconst2})
-f_params.write('#endif')
-f_params.close()
+if __name__ == "__main__":
+    angbitlen = (int)(sys.argv[1])
+    #^^ Defines the bit-length of natural logarithm answer value and has a 
+    # precision of 'precision' bits.
+
+    ansbitlen = (int)(sys.argv[2])
+    #^^ Defines the bit-length of the square root answer value and also
+    # has a precision of 'precision' bits.
+
+    negprec = (int)(sys.argv[3])
+    #^^ Defines the number of pipeline stages in negative direction which equates
+    # to the maximum convergence input domain. For a 'm' value of 6, the theta_max
+    # equals 15.54462 and the design according to the hyperbolic equality has a 
+    # convergence input domain of exp(2*15.54462).
+
+    posprec = (int)(sys.argv[4])
+    #^^ Defines the number of pipeline stages in positive direction which equates
+    # to the precision of output answer.
+
+    precision = (int)(sys.argv[5])
+    #^^ Defines the number of precision bits for both input and output.
+
+    startquant_pow = (int)(sys.argv[6])
+    #^^ Defines the starting input LSB point from where the module starts computing.
+    # This quantity is only used for testing purposes.
+    extriter = 1
+
+    bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter)
+    lookup=[format(v, 'x') for v in tables.hyperbolic_lookup(negprec, posprec, precision)]
+    bsg_lookup_initialization(negprec, posprec, angbitlen,lookup)
+    constant=tables.hyperbolic_constant(negprec, posprec)
+    constant = (constant**2)/4
+    lnconstant = ((math.log(constant))/2)*(2**precision)
+    constanthex=format(round(constant*(2**precision)),'x')
+    lnconstanthex=format(round(lnconstant),'x')
+    bsg_constxy_initialization(constanthex, ansbitlen, angbitlen, lnconstanthex)
+    main_body_print()
+    signedconst = tables.signed_constant(angbitlen)
+    signedconst2 = tables.signed_constant2(angbitlen)
+
+
+    # params_def.h passes the parameters of the module to the Verilator testbench
+    tables.write_params("params_def.h", [
+        ('int', 'anglen', angbitlen),
+        ('int', 'anslen', ansbitlen),
+        ('int', 'startquant_pow', startquant_pow),
+        ('int', 'posiprec', posprec),
+        ('int', 'negprec', negprec),
+        ('int', 'precision', precision),
+        ('int', 'signedconst', signedconst),
+        ('int', 'signedconst2', signedconst2),
+    ])
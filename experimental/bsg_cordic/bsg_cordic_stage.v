@@ -0,0 +1,48 @@
+// One CORDIC iteration, shared by every module python3 -m bsg_cordic.generate
+// writes.
+//
+// coord_p selects the coordinate system: 1 circular, 0 linear, -1 hyperbolic.
+// The step is x, y >>> shift_i, or x, y - (x, y >>> shift_i) when negative_i
+// is set, for the hyperbolic iterations k <= 0 that step by 1 - 2^(k-2).
+// An unrolled pipeline ties shift_i, negative_i and ang_lookup_i to
+// constants; a folded one drives them from its iteration count, which
+// makes the shifts barrel shifters.
+//
+// vector_i picks the direction: rotation drives ang toward zero, vectoring
+// drives y toward zero. A unit that only rotates or only vectors ties it off.
+
+module bsg_cordic_stage #(parameter coord_p = 1
+                         ,parameter ang_width_p = 16
+                         ,parameter ans_width_p = 16
+                         )
+   (input  signed [ans_width_p-1:0] x_i
+   ,input  signed [ans_width_p-1:0] y_i
+   ,input  signed [ang_width_p-1:0] ang_i
+   ,input  signed [ang_width_p-1:0] ang_lookup_i
+   ,input  [7:0] shift_i
+   ,input negative_i
+   ,input vector_i
+   ,output signed [ans_width_p-1:0] x_o
+   ,output signed [ans_width_p-1:0] y_o
+   ,output signed [ang_width_p-1:0] ang_o
+   );
+
+   wire signed [ans_width_p-1:0] x_shift = x_i >>> shift_i;
+   wire signed [ans_width_p-1:0] y_shift = y_i >>> shift_i;
+   wire signed [ans_width_p-1:0] x_step = negative_i ? x_i - x_shift : x_shift;
+   wire signed [ans_width_p-1:0] y_step = negative_i ? y_i - y_shift : y_shift;
+
+   // rot_op adds the table angle to ang and steps y against x
+   wire rot_op = vector_i ? ~(x_i[ans_width_p-1] ^ y_i[ans_width_p-1]) : ang_i[ang_width_p-1];
+
+   assign ang_o = rot_op ? ang_i + ang_lookup_i : ang_i - ang_lookup_i;
+   assign y_o = rot_op ? y_i - x_step : y_i + x_step;
+
+   if (coord_p == 0)
+     assign x_o = x_i;
+   else if (coord_p > 0)
+     assign x_o = rot_op ? x_i + y_step : x_i - y_step;
+   else
+     assign x_o = rot_op ? x_i - y_step : x_i + y_step;
+
+endmodule
@@ -1,4 +1,7 @@
-import sys, math
+import math, os, sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bsg_cordic import tables
 
 def bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter):
     print("""
@@ -31,25 +34,6 @@ def bsg_lookup_initialization(negprec, posprec, angbitlen,result):
     print("     %(g)d'h%(r)s };" %{'g':angbitlen,'r':result[0] })
     return
 
-def constant_compute(negprec, posprec):
-    const=1
-    for i in range(-negprec,1):
-        comp=((1-(1-2**(i-2))**2)**0.5)
-        const=const*comp
-    for i in range(1,posprec+1):
-        comp=((1-2**(-2*i))**0.5)
-        const=const*comp
-    return 1/const
-def lookup_compute(negprec, posprec, precision):
-    lookup=[]
-    for i in range(-negprec,1):
-        m=math.atanh(1-2**(i-2))
-        lookup.append(format((int)(m*(2**precision)),'x'))
-    for j in range(negprec+1,negprec+posprec+1):
-        m=math.atanh(2**(-j+negprec))
-        lookup.append(format((int)(m*(2**precision)),'x'))
-    return lookup
-
 def zerolen(precision):
     zerostr = ""
     for i in range(0,precision):
@@ -204,54 +188,51 @@ def main_body_print(ansbitlen,zerostr):
     endmodule""" %{'s':ansbitlen, 'z':zerostr})
     return
     
-angbitlen = (int)(sys.argv[1])
-# This parameter represents the bit-length of the output, has a fixed-point
-# representation and has a precision of `precision` bits. Determine this
-#length to accomodate the look-up table as well as the output, the latter being 
-# always greater than the former. Refer the table mentioned in the readme to find
-# the maximum angles.
+if __name__ == "__main__":
+    angbitlen = (int)(sys.argv[1])
+    # This parameter represents the bit-length of the output, has a fixed-point
+    # representation and has a precision of `precision` bits. Determine this
+    #length to accomodate the look-up table as well as the output, the latter being 
+    # always greater than the former. Refer the table mentioned in the readme to find
+    # the maximum angles.
 
-ansbitlen = (int)(sys.argv[2])
-# This parameter represents the bit-length of the input. Since the domain of the 
-# function atanh(x) is [0,1) in our case, so 1 bit is reserved for sign, 1 for 
-# 1 for single digit to the right left of the decimal point and the rest for the
-# fractional quantity. The effective input quantity would be input/pow(2,anslen-2). 
+    ansbitlen = (int)(sys.argv[2])
+    # This parameter represents the bit-length of the input. Since the domain of the 
+    # function atanh(x) is [0,1) in our case, so 1 bit is reserved for sign, 1 for 
+    # 1 for single digit to the right left of the decimal point and the rest for the
+    # fractional quantity. The effective input quantity would be input/pow(2,anslen-2). 
                           
-negprec = (int)(sys.argv[3])
-# Determines the maximum angle that can be accumulated in the `ang` register
-# for an 'M' number of pipeline stages in the negative direction. 
-# In our case the maximum quantity that can be input would then be tanh(M).
-# Please refer to the table in the readme to find the `theta_max` to the 
-# corresponding number of negative stages.
+    negprec = (int)(sys.argv[3])
+    # Determines the maximum angle that can be accumulated in the `ang` register
+    # for an 'M' number of pipeline stages in the negative direction. 
+    # In our case the maximum quantity that can be input would then be tanh(M).
+    # Please refer to the table in the readme to find the `theta_max` to the 
+    # corresponding number of negative stages.
 
-posprec = (int)(sys.argv[4])
-# Determines the precision of the output. The more the number of stages in the 
-# positive direction, the more precise the output would be. 
+    posprec = (int)(sys.argv[4])
+    # Determines the precision of the output. The more the number of stages in the 
+    # positive direction, the more precise the output would be. 
 
-precision = (int)(sys.argv[5])
-# Determines the precision of the output answer as well as the angles in the 
-# look-up table.
+    precision = (int)(sys.argv[5])
+    # Determines the precision of the output answer as well as the angles in the 
+    # look-up table.
 
-startquant_pow = (int)(sys.argv[6])
+    startquant_pow = (int)(sys.argv[6])
 
-extriter = 1
+    extriter = 1
 
-bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter)
-lookup=lookup_compute(negprec, posprec, precision)
-bsg_lookup_initialization(negprec, posprec, angbitlen,lookup)
-zerostr = zerolen(ansbitlen-2)
-main_body_print(ansbitlen,zerostr)
+    bsg_exponential_main_initial(angbitlen, ansbitlen, negprec, posprec, extriter)
+    lookup=[format(v, 'x') for v in tables.hyperbolic_lookup(negprec, posprec, precision)]
+    bsg_lookup_initialization(negprec, posprec, angbitlen,lookup)
+    zerostr = zerolen(ansbitlen-2)
+    main_body_print(ansbitlen,zerostr)
 
-# This file object is used to create a header file facilitating the passing of parameters of the module to
-# Verilator for testing purposes. 
-f_params = open("params_def.h","w+")
-f_params.write('#ifndef PARAMS_DEF\n')
-f_params.write('#define PARAMS_DEF\n')
-f_params.write('int anglen = %(g)d;\n'%{'g':angbitlen})
-f_params.write('int anslen = %(s)d;\n'%{'s':ansbitlen})
-f_params.write('int startquant_pow = %(s)d;\n'%{'s':startquant_pow})
-f_params.write('int posiprec = %(p)d;\n'%{'p':posprec})
-f_params.write('int negprec = %(n)d;\n'%{'n':negprec})
-f_params.write('int precision = %(p)d;\n'%{'p':precision})
-f_params.write('#endif')
-f_params.close()
+    # params_def.h passes the parameters of the module to the Verilator testbench
+    tables.write_params("params_def.h", [
+        ('int', 'anglen', angbitlen),
+        ('int', 'anslen', ansbitlen),
+        ('int', 'startquant_pow', startquant_pow),
+        ('int', 'posiprec', posprec),
+        ('int', 'negprec', negprec),
+        ('int', 'precision', precision),
+    ])
@@ -1,33 +1,9 @@
-import math, sys
+import math, os, sys
 
-def lookup_compute(posprec, precision_result):
-    lookup=[]
-    for j in range(0,posprec+1):
-        m=(math.atan2(1,2**j)*180)/math.pi
-        lookup.append(format(round(m*(2**precision_result)),'x'))
-    return lookup
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bsg_cordic import tables
 
-def constant_compute(posprec, ansbitlen):
-    const=1
-    for i in range(0,posprec):
-        comp = math.cos(math.atan2(1,2**i))
-        const=const*comp
-    const = format(round(const*(2**(ansbitlen-1))),'x')
-    return const
-
-def signed_constant(ansbitlen):
-    const = "1"
-    for i in range(0,ansbitlen-1):
-        const = const + str(0)
-    return (hex(int(const, 2)))
-
-def signed_constant2(ansbitlen):
-    const = ""
-    for i in range(0,ansbitlen):
-        const = const + str(1)
-    return (hex(int(const, 2)))
-
-def bsg_sine_cosine_init(angbitlen, ansbitlen, posprec):
+def bsg_sine_cosine_init(angbitlen, ansbitlen, posprec, precisionbitlen):
     print('''
     module bsg_cordic_hypotenuse #(precis_p = %(p)d, ang_width_p = %(g)d, ans_width_p = %(s)d, scale_width_p = %(sw)d)
     (
@@ -72,7 +48,7 @@ def lookup_initialization(posprec, angbitlen, result):
     print("     %(g)d'h%(r)s };" %{'g':angbitlen,'r':result[0] })
     return
 
-def main_body_print(precisionbitlen, constant, angbitlen, ninetyconstant, one_eighty_constant):
+def main_body_print(precisionbitlen, constant, angbitlen, ninetyconstant, one_eighty_constant, stage_module):
     print('''
     wire quad_x_init = x_i[ans_width_p-1];
     wire quad_y_init = y_i[ans_width_p-1];
@@ -115,7 +91,7 @@ def main_body_print(precisionbitlen, constant, angbitlen, ninetyconstant, one_ei
     generate
         for(i = 0; i <= precis_p ; i = i+1)
             begin : stage
-               bsg_cordic_rect_to_polar_stage #(.stage_p(i), .ang_width_p(ang_width_p), .ans_width_p(ans_width_p)) cs
+               %(sm)s #(.stage_p(i), .ang_width_p(ang_width_p), .ans_width_p(ans_width_p)) cs
                        (.x_i(x[i])
                         ,.y_i(y[i])
                         ,.ang_i(ang[i])
@@ -186,37 +162,38 @@ def main_body_print(precisionbitlen, constant, angbitlen, ninetyconstant, one_ei
             assign ready_o = ~stall_pipe & val_out;
             
 endmodule
-'''% {'c':constant, 'p': precisionbitlen,'a':angbitlen, 'nc':ninetyconstant, 'oc':one_eighty_constant})
+'''% {'c':constant, 'p': precisionbitlen,'a':angbitlen, 'nc':ninetyconstant, 'oc':one_eighty_constant,
+     'sm':stage_module})
     return
 
 
-angbitlen = (int)(sys.argv[1])
-ansbitlen = (int)(sys.argv[2])
-posprec = (int)(sys.argv[3])
-precision = (int)(sys.argv[4])
-precisionbitlen = (int)(sys.argv[5])
-startquant_pow = (int)(sys.argv[6])
-lookup = lookup_compute(posprec, precision)
-bsg_sine_cosine_init(angbitlen, ansbitlen, posprec)
-lookup_initialization(posprec, angbitlen, lookup)
-constant = constant_compute(posprec, precisionbitlen)
-ninetyconstant = format(90*(2**precision),'x')
-one_eighty_constant = format(180*(2**precision),'x')
-main_body_print(precisionbitlen, constant, angbitlen, ninetyconstant, one_eighty_constant)
-signedconst = signed_constant(angbitlen)
-signedconst2 = signed_constant2(angbitlen)
+def main(argv, stage_module="bsg_cordic_rect_to_polar_stage"):
+    angbitlen = (int)(argv[0])
+    ansbitlen = (int)(argv[1])
+    posprec = (int)(argv[2])
+    precision = (int)(argv[3])
+    precisionbitlen = (int)(argv[4])
+    startquant_pow = (int)(argv[5])
+    lookup = [format(v, 'x') for v in tables.circular_lookup(posprec, precision)]
+    bsg_sine_cosine_init(angbitlen, ansbitlen, posprec, precisionbitlen)
+    lookup_initialization(posprec, angbitlen, lookup)
+    constant = format(tables.circular_constant(posprec, precisionbitlen), 'x')
+    ninetyconstant = format(90*(2**precision),'x')
+    one_eighty_constant = format(180*(2**precision),'x')
+    main_body_print(precisionbitlen, constant, angbitlen, ninetyconstant, one_eighty_constant, stage_module)
+    signedconst = tables.signed_constant(angbitlen)
+    signedconst2 = tables.signed_constant2(angbitlen)
+
+    # params_def.h passes the parameters of the module to the Verilator testbench
+    tables.write_params("params_def.h", [
+        ('int', 'anglen', angbitlen),
+        ('int', 'anslen', ansbitlen),
+        ('int', 'startquant_pow', startquant_pow),
+        ('int', 'precis_p', posprec),
+        ('int', 'precision', precision),
+        ('long int', 'signedconst', signedconst),
+        ('long int', 'signedconst2', signedconst2),
+    ])
 
-# This file object is used to create a header file facilitating the passing of parameters of the module to
-# Verilator for testing purposes. 
-f_params = open("params_def.h","w+")
-f_params.write('#ifndef PARAMS_DEF\n')
-f_params.write('#define PARAMS_DEF\n')
-f_params.write('int anglen = %(g)d;\n'%{'g':angbitlen})
-f_params.write('int anslen = %(s)d;\n'%{'s':ansbitlen})
-f_params.write('int startquant_pow = %(s)d;\n'%{'s':startquant_pow})
-f_params.write('int precis_p = %(p)d;\n'%{'p':posprec})
-f_params.write('int precision = %(p)d;\n'%{'p':precision})
-f_params.write('long int signedconst = %(sc)s;\n'%{'sc':signedconst})
-f_params.write('long int signedconst2 = %(scc)s;\n'%{'scc':signedconst2})
-f_params.write('#endif')
-f_params.close()
\ No newline at end of file
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,226 @@
+#
+# bsg_netlist.py
+#
+# Shared netlist emission for the hard/*/ relative-placement (rp) generators.
+#
+# Cell templates keep the notation used throughout the generators:
+#
+#   "ND2D2BWP #0 (.A1(#1), .A2(#2), .ZN(#3));"
+#
+# where #0 is the instance name and #1..#N are the pin connections.
+# Each template is compiled once into a str.format() string, so that
+# an instance costs a single format call instead of one str.replace()
+# per argument (which was quadratic, and let #1 match inside #10).
+#
+# Output goes through a buffered writer rather than one print per line.
+#
+# Usage, from a generator in hard/<fab>/<dir>/:
+#
+#   sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../common/bsg_rp_gen"))
+#   from bsg_netlist import *
+#
+#   nand2 = compile_cell("ND2D2BWP #0 (.A1(#1), .A2(#2), .ZN(#3));")
+#   emit_gate_instance(nand2, ["u0", "a", "b", "z"])
+#
+
+from __future__ import print_function
+
+import atexit
+import re
+import sys
+
+_cell_arg_re = re.compile(r"#([0-9]+)")
+
+class BsgCell(object):
+
+    # template: cell template string using #0..#N
+    # orient:   prefix each instance with an rp_orient directive
+    def __init__(self, template, orient=True):
+        self.template = template
+        self.orient   = orient
+        body = template.replace("{", "{{").replace("}", "}}")
+        body = _cell_arg_re.sub(lambda m: "{" + m.group(1) + "}", body)
+        self.num_args = max([int(x) for x in _cell_arg_re.findall(template)] + [-1]) + 1
+        if orient :
+            self.fmt = "// synopsys rp_orient ({{N FS}} {0})\n" + body
+        else :
+            self.fmt = body
+
+    def instance(self, arg_list):
+        if len(arg_list) < self.num_args :
+            raise ValueError("cell '" + self.template + "' needs " + str(self.num_args)
+                             + " arguments, got " + str(len(arg_list)))
+        return self.fmt.format(*arg_list)
+
+
+_cell_cache = {}
+
+# compile a template once; repeated calls with the same template are free
+def compile_cell (template, orient=True) :
+    if isinstance(template, BsgCell) :
+        return template
+    key = (template, orient)
+    cell = _cell_cache.get(key)
+    if cell is None :
+        cell = BsgCell(template, orient)
+        _cell_cache[key] = cell
+    return cell
+
+
+class BsgNetlistWriter(object):
+
+    # stream:     file-like object to write to
+    # max_chunks: number of buffered strings before flushing
+    def __init__(self, stream, max_chunks=4096):
+        self.stream     = stream
+        self.max_chunks = max_chunks
+        self.chunks     = []
+        # mimics the python2 "print x," softspace: the next line or
+        # fragment is preceded by a single space.
+        self.softspace  = False
+
+    def write(self, s):
+        self.chunks.append(s)
+        if len(self.chunks) >= self.max_chunks :
+            self.flush()
+
+    # a full line
+    def line(self, s=""):
+        if self.softspace :
+            self.softspace = False
+            self.write(" " + s + "\n")
+        else :
+            self.write(s + "\n")
+
+    # a fragment, with the next output separated by a space
+    def fragment(self, s):
+        if self.softspace :
+            self.write(" " + s)
+        else :
+            self.write(s)
+        self.softspace = True
+
+    def flush(self):
+        if self.chunks :
+            self.stream.write("".join(self.chunks))
+            self.chunks = []
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+        if self.stream not in (sys.stdout, sys.stderr) :
+            self.stream.close()
+
+
+_stdout_writer = BsgNetlistWriter(sys.stdout)
+_writer = _stdout_writer
+atexit.register(_stdout_writer.flush)
+
+# redirect all emit_* output; returns the previous writer
+def set_netlist_writer (writer) :
+    global _writer
+    old = _writer
+    _writer = writer
+    return old
+
+def get_netlist_writer () :
+    return _writer
+
+# collects the netlist in memory instead of writing it out
+class BsgStringStream(object):
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, s):
+        self.chunks.append(s)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def getvalue(self):
+        return "".join(self.chunks)
+
+# run fn(*args) and return everything it emitted as a string
+def capture_netlist (fn, *args) :
+    stream = BsgStringStream()
+    writer = BsgNetlistWriter(stream)
+    old = set_netlist_writer(writer)
+    try :
+        fn(*args)
+    finally :
+        set_netlist_writer(old)
+    writer.flush()
+    return stream.getvalue()
+
+def emit_line (s="") :
+    _writer.line(s)
+
+def emit_fragment (s) :
+    _writer.fragment(s)
+
+def emit_module_header (name, input_args, output_args) :
+    my_list = []
+    for x in input_args :
+        my_list.append("input "+x+"\n")
+    for x in output_args :
+        my_list.append("output "+x+"\n")
+    emit_line("module " + name + " ( " + (" "*(len(name)+8)+",").join(my_list))
+    emit_line(");")
+
+def emit_module_footer () :
+    emit_line("endmodule")
+
+def emit_wire_definition (name) :
+    emit_line("wire " + name + "; ")
+
+def emit_wire_definition_nocr (name) :
+    emit_fragment("wire " + name + "; ")
+
+def gate_instance (gate, arg_list) :
+    return compile_cell(gate).instance(arg_list)
+
+def emit_gate_instance (gate, arg_list) :
+    emit_line(compile_cell(gate).instance(arg_list))
+
+def queue_gate_instance (out_dict, gate, arg_list, order) :
+    out_dict[compile_cell(gate).instance(arg_list)] = order
+
+def access_bit (name, bit) :
+    return name + "[" + str(bit) + "]"
+
+def param_bits_all (name, bit) :
+    return "[" + str(bit-1) + ":0] " + name
+
+def param_bits_2D_all (name, words, bit) :
+    return "[" + str(words-1) + ":0][" + str(bit-1) + ":0] " + name
+
+def param_bits_3D_all (name, words, bit, zop) :
+    return "[" + str(words-1) + ":0][" + str(bit-1) + ":0][" + str(zop-1) + ":0] " + name
+
+def ident_name_word_bit (name, word, bit) :
+    return name + "_w" + str(word) + "_b" + str(bit)
+
+def ident_name_bit_port (name, bit, port) :
+    return name + "_b" + str(bit) + "_p" + str(port)
+
+def ident_name_word_bit_port (name, word, bit, port) :
+    return name + "_w" + str(word) + "_b" + str(bit) + "_p" + str(port)
+
+def ident_name_bit (name, bit) :
+    return name + "_b" + str(bit)
+
+def emit_rp_group_begin (name) :
+    emit_line("// synopsys rp_group (" + name + ")")
+
+def emit_rp_group_end (name) :
+    emit_line("// synopsys rp_endgroup (" + name + ")")
+
+def rp_fill_string (params) :
+    return "// synopsys rp_fill (" + params + ")"
+
+def emit_rp_fill (params) :
+    emit_line(rp_fill_string(params))
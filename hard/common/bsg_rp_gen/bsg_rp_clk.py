@@ -0,0 +1,289 @@
+#
+# bsg_rp_clk.py
+#
+# Tap range and resolution of the ring oscillator of bsg_clk_gen
+# (bsg_rp_clk_gen_osc_v3.py) and the delay line of bsg_dmc
+# (bsg_rp_dly_line_v3.py), and a sweep over their num_rows_p, num_cols_p
+# and num_dly_p for the configuration that covers a frequency range with
+# the finest steps.
+#
+# Both are built from the columns of bsg_rp_clk_gen_osc_unit_v3.py: a
+# chain of rows of three CKND2D1s, fb_col[0] tied low. The one hot tap t
+# (row t % rows of column t / rows) puts the inverted clkdly_i onto the
+# chain through its ctl_en NAND and N2; every later row passes it on
+# through N1 and N2. So tap t sees
+#
+#   CKND2 (clkdly inverter of the column) + ctl_en + N2
+#     + (N1 + N2) for each of the rows after it
+#
+# and the last tap is the fastest. The oscillator loop is that plus its
+# CKND1 / reset CKND2D1 and num_dly_p CKBD4s; it inverts once, so the
+# period is twice the loop. The delay line locks when the 90 and 180
+# degree units and the num_dly_p CKBD4s ahead of the sampling flop add up
+# to half a period,
+#
+#   2 * unit(t) + dly = period / 2
+#
+# and clk_o is the 90 degree unit(t). Gate delays come from clk_gen_timing
+# in the cell table, with the same logical effort model as the rf read
+# muxes (see bsg_rp_mem.py),
+#
+#   delay = tau * (load / drive + p)
+#
+# where the load is the input capacitance (g * drive) of the cells driven,
+# plus wire_load_per_row for each row a wire spans down a column (the hop
+# from the bottom of one column to the top of the next spans them all)
+# and wire_load_per_col for each column a wire runs across.
+#
+# The step between neighbouring taps is an N1 + N2 pair everywhere but
+# across a column hop, whatever the configuration; rows, cols and dly set
+# the range and where the hops fall. The sweep therefore picks, among the
+# configurations that cover the range, those whose largest step inside
+# it is within 1% of the finest, and of those the smallest area.
+#
+
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+from bsg_rp_tech import *
+
+hard_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+clk_kinds = ("osc", "dly_line")
+
+def clk_model ( tech ) :
+    assert ("clk_gen_timing" in tech.table), "no clk_gen_timing in tech " + tech.name;
+    return tech.table["clk_gen_timing"];
+
+def clk_cin ( model, cell ) :
+    c = model["cells"][cell];
+    return c["g"] * c["drive"];
+
+def clk_delay ( model, cell, load ) :
+    c = model["cells"][cell];
+    return model["tau"] * (load / c["drive"] + c["p"]);
+
+# delay (ps) of num_dly CKBD4s, the last driving load; the driver ahead of
+# them sees clk_cin(CKBD4), or load if there are none
+def clk_buffer_chain ( model, dly, load ) :
+    buf = clk_cin(model, "CKBD4");
+    return sum([clk_delay(model, "CKBD4", load if i == dly-1 else buf) for i in range(0,dly)]);
+
+# delay (ps) of each tap, from the clkdly_i of the columns to the chain
+# output, which drives out_load
+def clk_tap_delays ( model, rows, cols, out_load ) :
+    nand = clk_cin(model, "CKND2D1");
+    wire_row = model["wire_load_per_row"];
+    taps = rows * cols;
+
+    n1 = clk_delay(model, "CKND2D1", nand);
+    n2 = [];
+    for t in range(0,taps) :
+        if t == taps-1 :
+            load = out_load;
+        elif t % rows == rows-1 :
+            load = nand + wire_row * rows;
+        else :
+            load = nand + wire_row;
+        n2.append(clk_delay(model, "CKND2D1", load));
+
+    entry = clk_delay(model, "CKND2", rows * nand + wire_row * rows) + clk_delay(model, "CKND2D1", nand);
+    delays = [0.0] * taps;
+    after = 0.0;
+    for t in reversed(range(0,taps)) :
+        delays[t] = entry + n2[t] + after;
+        after = after + n1 + n2[t];
+    return delays;
+
+# the load of the net that fans out to the clkdly_i of every column
+def clk_column_load ( model, cols, extra ) :
+    return cols * clk_cin(model, "CKND2") + model["wire_load_per_col"] * cols + extra;
+
+# {"period": [ps per tap], "delay": [ps per tap] or None}; the period is
+# the oscillator's, or the one the delay line locks to, and the delay the
+# delay line's clk_o
+def clk_taps ( tech, kind, rows, cols, dly ) :
+    model = clk_model(tech);
+    if kind == "osc" :
+        # fb_dly drives clk_o (CKND4), the gate inverter (CKND1) and the columns
+        fb_dly = clk_column_load(model, cols, clk_cin(model, "CKND4") + clk_cin(model, "CKND1"));
+        fixed = clk_delay(model, "CKND1", clk_cin(model, "CKND2D1"));
+        if dly == 0 :
+            fixed = fixed + clk_delay(model, "CKND2D1", fb_dly);
+        else :
+            fixed = (fixed + clk_delay(model, "CKND2D1", clk_cin(model, "CKBD4"))
+                     + clk_buffer_chain(model, dly, fb_dly));
+        taps = clk_tap_delays(model, rows, cols, clk_cin(model, "CKND1"));
+        return { "period" : [2 * (fixed + t) for t in taps], "delay" : None };
+
+    # the 90 degree unit's B0 drives the 180 degree unit's clk_i (I0, the
+    # gate and two sync flops) and clk_o
+    clk_i = (clk_cin(model, "CKND1") + clk_cin(model, "CKLNQD20") + 2 * clk_cin(model, "DFQD1")
+             + model["output_load"]);
+    into = clk_delay(model, "CKND1", clk_column_load(model, cols, 0.0));
+    out = clk_delay(model, "CKBD4", clk_i);
+    units = [into + t + out for t in clk_tap_delays(model, rows, cols, clk_cin(model, "CKBD4"))];
+    meta = clk_buffer_chain(model, dly, clk_cin(model, "DFNCND1"));
+    return { "period" : [2 * (2 * u + meta) for u in units], "delay" : units };
+
+# the cells of one configuration, by table name
+def clk_cells ( kind, rows, cols, dly ) :
+    row = { "DFCSNQD1" : 1, "CKND2D1" : 3, "TIE" : 2 };
+    col = { "TIE" : 2, "CKND2" : 2, "INVD1" : 1 };
+    cells = {};
+    def add ( counts, times ) :
+        for (c, n) in counts.items() :
+            cells[c] = cells.get(c, 0) + n * times;
+    add(row, rows * cols * (1 if kind == "osc" else 2));
+    add(col, cols * (1 if kind == "osc" else 2));
+    if kind == "osc" :
+        add({ "TIE" : 2, "INVD1" : 1, "CKND1" : 2, "CKND2D1" : 1, "CKBD4" : dly, "CKND4" : 1
+            , "DFQD1" : 2, "CKLNQD16" : 1 }, 1);
+    else :
+        add({ "TIE" : 2, "CKND1" : 1, "DFQD1" : 2, "CKLNQD20" : 1, "CKBD4" : 1 }, 2);
+        add({ "TIE" : 2, "INVD1" : 1, "DFSNQD1" : 1, "DFCNQD1" : 3, "CKBD4" : dly, "DFNCND1" : 1
+            , "DFCND1" : 2 }, 1);
+        add({ "AN2D1" : 2, "OR2D1" : 1, "MUX2D1" : 1, "DFCSNQD1" : 1 }, rows * cols);
+    return cells;
+
+def clk_area ( tech, kind, rows, cols, dly ) :
+    model = clk_model(tech);
+    return sum([model["cells"][c]["area"] * n for (c, n) in clk_cells(kind, rows, cols, dly).items()]);
+
+# how one configuration does over [f_lo, f_hi] MHz, or None if its taps do
+# not reach both ends. step is the largest frequency step (MHz) between
+# neighbouring taps inside the range, taking in the taps just past each
+# end; for the delay line, delay_step is the largest clk_o step (ps).
+def clk_cover ( tech, kind, rows, cols, dly, f_lo, f_hi ) :
+    taps = clk_taps(tech, kind, rows, cols, dly);
+    freq = [1e6 / p for p in taps["period"]];
+    if not (min(freq) <= f_lo and max(freq) >= f_hi) :
+        return None;
+    # freq rises with the tap
+    lo = max([t for t in range(0,len(freq)) if freq[t] <= f_lo]);
+    hi = min([t for t in range(0,len(freq)) if freq[t] >= f_hi]);
+    steps = [freq[t+1] - freq[t] for t in range(lo,hi)];
+    r = { "rows"   : rows, "cols" : cols, "dly" : dly
+        , "f_min"  : min(freq), "f_max" : max(freq)
+        , "step"   : max(steps + [0.0])
+        , "taps"   : hi - lo + 1
+        , "area"   : clk_area(tech, kind, rows, cols, dly)
+        };
+    if taps["delay"] is not None :
+        d = taps["delay"];
+        r["delay_step"] = max([d[t] - d[t+1] for t in range(lo,hi)] + [0.0]);
+    return r;
+
+def clk_sweep ( tech, kind, f_lo, f_hi ) :
+    sweep = clk_model(tech)["sweep"];
+    results = [];
+    for rows in expand_sizes(sweep["rows"]) :
+        for cols in expand_sizes(sweep["cols"]) :
+            if rows * cols < 2 :
+                continue;
+            for dly in expand_sizes(sweep["dly"]) :
+                r = clk_cover(tech, kind, rows, cols, dly, f_lo, f_hi);
+                if r is not None :
+                    results.append(r);
+    return results;
+
+# the sweep results ranked, best first: steps within 1% of the finest
+# count as equally fine, and the smallest area wins among them
+def clk_rank ( results, kind ) :
+    if not results :
+        return [];
+    key = "delay_step" if kind == "dly_line" else "step";
+    finest = min([r[key] for r in results]);
+    fine = sorted([r for r in results if r[key] <= finest * 1.01], key=lambda r: (r["area"], r[key]));
+    rest = sorted([r for r in results if r[key] > finest * 1.01], key=lambda r: (r[key], r["area"]));
+    return fine + rest;
+
+clk_titles = { "osc" : "oscillator", "dly_line" : "delay line" };
+
+def clk_header ( tech, kind ) :
+    return [ "# " + tech.name + " " + clk_titles[kind] + "; frequencies in MHz, delays in ps, area in um^2 (rough estimates)"
+           , "%5s %5s %4s %9s %9s %5s %8s" % ("rows", "cols", "dly", "f_min", "f_max", "taps", "step")
+             + (" %10s" % "delay step" if kind == "dly_line" else "") + " %9s" % "area"
+           ];
+
+def clk_line ( r, kind ) :
+    return ("%5d %5d %4d %9.1f %9.1f %5d %8.2f" % (r["rows"], r["cols"], r["dly"], r["f_min"], r["f_max"], r["taps"], r["step"])
+            + (" %10.2f" % r["delay_step"] if kind == "dly_line" else "") + " %9.1f" % r["area"]);
+
+# every tap of one configuration
+def clk_tap_table ( tech, kind, rows, cols, dly ) :
+    taps = clk_taps(tech, kind, rows, cols, dly);
+    lines = [ "# " + tech.name + " " + clk_titles[kind] + ", " + str(rows) + " rows x " + str(cols) + " cols, "
+              + str(dly) + " CKBD4s; area " + ("%.1f" % clk_area(tech, kind, rows, cols, dly)) + " um^2 (rough estimates)"
+            , "%5s %4s %4s %9s %9s" % ("tap", "col", "row", "period", "MHz") + (" %9s" % "delay" if kind == "dly_line" else "")
+            ];
+    for t in range(0,len(taps["period"])) :
+        p = taps["period"][t];
+        lines.append("%5d %4d %4d %9.1f %9.1f" % (t, t // rows, t % rows, p, 1e6 / p)
+                     + (" %9.1f" % taps["delay"][t] if kind == "dly_line" else ""));
+    return lines;
+
+# run the tsmc scripts of kind for one configuration into outdir, the
+# way their Makefiles do; returns the files written
+def clk_emit ( tech, kind, rows, cols, dly, outdir ) :
+    if not os.path.isdir(outdir) :
+        os.makedirs(outdir);
+    files = [];
+    for script in clk_model(tech)["scripts"][kind] :
+        path = os.path.join(hard_dir, tech.name, script);
+        out = os.path.join(outdir, os.path.basename(script)[:-len(".py")] + ".v");
+        with open(out, "w") as f :
+            subprocess.check_call([sys.executable, path, str(rows), str(cols), str(dly)], stdout=f);
+        files.append(out);
+    return files;
+
+clk_shown = 10;
+
+def clk_gen_usage ( argv ) :
+    print("Usage: " + argv[0] + " <osc|dly_line> sweep f_min f_max [outdir]   # MHz; emits the best into outdir");
+    print("       " + argv[0] + " <osc|dly_line> taps rows cols dly");
+    print("       " + argv[0] + " <osc|dly_line> emit rows cols dly outdir");
+
+def clk_gen_main ( tech, argv ) :
+    if "clk_gen_timing" not in tech.table :
+        print("no clk_gen_timing in tech " + tech.name);
+        return False;
+    args = argv[1:];
+    if len(args) < 2 or args[0] not in clk_kinds :
+        clk_gen_usage(argv);
+        return False;
+    kind = args[0];
+    try :
+        if args[1] == "sweep" and len(args) in (4, 5) :
+            (f_lo, f_hi) = sorted([float(args[2]), float(args[3])]);
+            ranked = clk_rank(clk_sweep(tech, kind, f_lo, f_hi), kind);
+            if not ranked :
+                print("no configuration covers " + args[2] + " to " + args[3] + " MHz");
+                return False;
+            for line in clk_header(tech, kind) + [clk_line(r, kind) for r in ranked[:clk_shown]] :
+                print(line);
+            print("# " + str(len(ranked)) + " configurations cover the range");
+            if len(args) == 5 :
+                best = ranked[0];
+                for f in clk_emit(tech, kind, best["rows"], best["cols"], best["dly"], args[4]) :
+                    print(f);
+        elif args[1] in ("taps", "emit") and len(args) == (5 if args[1] == "taps" else 6) :
+            (rows, cols, dly) = [int(x) for x in args[2:5]];
+            if rows < 1 or cols < 1 or dly < 0 or rows * cols < 2 :
+                print("rows and cols must be at least 1, with two taps or more, and dly at least 0");
+                return False;
+            if args[1] == "taps" :
+                for line in clk_tap_table(tech, kind, rows, cols, dly) :
+                    print(line);
+            else :
+                for f in clk_emit(tech, kind, rows, cols, dly, args[5]) :
+                    print(f);
+        else :
+            clk_gen_usage(argv);
+            return False;
+    except ValueError :
+        clk_gen_usage(argv);
+        return False;
@@ -0,0 +1,324 @@
+#
+# bsg_rp_fifo.py
+#
+# Shift register fifo arrays with deterministic naming and placement
+# directives, for bsg_fifo_shift_datapath.
+#
+# data_i:   input data
+# clk_i:    clock
+# data_o:   output data
+# sel_one_hot_i  :  one hot signal
+#           0 - recycle data
+#           1 - take data from previous node
+#           2 - take data from data_i
+#
+# there are a few ways to implement the 3-input one hot mux:
+#
+# AOI222X1:     need an additional inverter. area 8.1 delay .17 to .33
+# NAND2, NAND3:      NAND2 delay:  .03 to .05; NAND3 delay: .04 to .11
+#
+# only real issue with using the NAND's is hold time...
+#
+# The x2 array moves two words per cycle: each word picks one of
+#
+#           0 - recycle data
+#           1 - take data from the next node
+#           2 - take data from the node after that
+#           3 - take data_i word 0
+#           4 - take data_i word 1
+#
+# with a 5-input one hot mux of NAND2s, summed by a NAND3 and a NAND2
+# into an OR2; data_o holds the two oldest words.
+#
+
+from __future__ import print_function
+
+from bsg_netlist import *
+from bsg_rp_tech import *
+from bsg_rp_place import *
+
+# NOTE: for symmetric pins, assume that earlier ones are always faster.
+# For example, for AOI22  A's are faster than B's and A0 is faster than A1.
+#
+
+# this has bits going vertically and words going horizontally
+def place_fifo_shift_array ( tech, words, bits ) :
+
+    dff     = tech.cell("fifo_shift","dff");
+    dff_out = tech.cell("fifo_shift","dff_out");
+    nand2   = tech.cell("fifo_shift","nand2");
+    nand3   = tech.cell("fifo_shift","nand3");
+
+    net = BsgPlacement (ident_name_word_bit("bsg_rp_"+tech.fab+"_fifo_shift",words,bits)
+                        , [ "clk_i"
+                            , param_bits_all("data_i",bits)
+                            , param_bits_all("sel_one_hot_i",3*words)
+                            ]
+                        , [ param_bits_all("data_o",bits)]
+                        , "fifo_shift"
+                        );
+
+    for w in range (0,words+1) :
+        net.line("wire " +  ",".join([ident_name_word_bit("reg",w,b) for b in range(0,bits)]) + ";")
+
+    for b in range(0,bits) :
+        net.line("assign " + access_bit("data_o",b) + " =  " + ident_name_word_bit("reg",0,b) + ";")
+
+    for w in reversed(range (0,words)) :
+
+        for g in [1, 2, 0] :
+            if (g != 1 or w < words-1) :
+                net.column();
+
+                net.line("wire " +  ",".join([ident_name_word_bit_port("a2",w,b,g) for b in range(0,bits)]) + ";")
+
+                for b in range (0,bits) :
+                    # we put the selects first on these gates because
+                    # that is the faster input. in general, the critical path
+                    # is select line, which is updated at the end of the cycle
+                    # when we discover if there is an enque or a deque.
+
+                    if (g == 0) :
+                        source = ident_name_word_bit("reg",w,b);
+                    elif (g == 1) :
+                        # no value to forward if it's the last item in the chain
+                        source = ident_name_word_bit("reg",w+1,b);
+                    else :
+                        source = access_bit("data_i",b);
+                    net.cell(nand2
+                             ,[ ident_name_word_bit_port("nand2",w,b,g)
+                                , access_bit("sel_one_hot_i",w*3+g)
+                                , source
+                                , ident_name_word_bit_port("a2",w,b,g)]
+                             );
+                net.end_column();
+        net.column();
+
+        net.line("wire " +  ",".join([ident_name_word_bit("a3",w,b) for b in range(0,bits)]) + ";")
+        for b in range (0,bits) :
+            if (w < words - 1) :
+                net.cell(nand3
+                         ,[ ident_name_word_bit("nand3",w,b)
+                            , ident_name_word_bit_port("a2",w,b,2)
+                            , ident_name_word_bit_port("a2",w,b,0)
+                            , ident_name_word_bit_port("a2",w,b,1)
+                            , ident_name_word_bit("a3",w,b)
+                            ]
+                         );
+            else :
+                net.cell(nand2
+                         ,[ ident_name_word_bit("nand3",w,b)
+                            , ident_name_word_bit_port("a2",w,b,0)
+                            , ident_name_word_bit_port("a2",w,b,2)
+                            , ident_name_word_bit("a3",w,b)
+                            ]
+                         );
+        net.end_column();
+
+        net.column();
+
+        for b in range (0,bits) :
+            net.cell(dff_out if (w==0) else dff
+                     ,[ ident_name_word_bit("dff",w,b)
+                        , ident_name_word_bit("a3",w,b)
+                        , "clk_i"
+                        , ident_name_word_bit("reg",w,b)
+                        ]
+                     );
+        net.end_column();
+
+    return net;
+
+# the inputs of the one hot mux of word w of the x2 array, fastest
+# first: the data_i words, recycle, then the shifts
+def fifo_shift_x2_ports ( words, w ) :
+    return [g for g in [3, 4, 0, 1, 2] if (g < 1 or g > 2 or w+g < words)];
+
+# the gates that sum the mux inputs: one NAND for up to three, otherwise
+# a NAND3 or NAND2 and a NAND2 into an OR2
+def fifo_shift_x2_groups ( ports ) :
+    if (len(ports) <= 3) :
+        return [ports];
+    return [ports[:-2], ports[-2:]];
+
+def place_fifo_shift_x2_array ( tech, words, bits ) :
+    assert (words >= 2), "the x2 shift fifo needs at least 2 words";
+
+    dff     = tech.cell("fifo_shift","dff");
+    dff_out = tech.cell("fifo_shift","dff_out");
+    nand    = { 2 : tech.cell("fifo_shift","nand2"), 3 : tech.cell("fifo_shift","nand3") };
+    or2     = tech.cell("fifo_shift","or2");
+
+    net = BsgPlacement (ident_name_word_bit("bsg_rp_"+tech.fab+"_fifo_shift_x2",words,bits)
+                        , [ "clk_i"
+                            , param_bits_all("data_i",2*bits) + " /*" + param_bits_2D_all("data_i",2,bits) + "*/"
+                            , param_bits_all("sel_one_hot_i",5*words) + " /*" + param_bits_2D_all("sel_one_hot_i",words,5) + "*/"
+                            ]
+                        , [ param_bits_all("data_o",2*bits) + " /*" + param_bits_2D_all("data_o",2,bits) + "*/" ]
+                        , "fifo_shift_x2"
+                        );
+
+    for w in range (0,words) :
+        net.line("wire " +  ",".join([ident_name_word_bit("reg",w,b) for b in range(0,bits)]) + ";")
+
+    for w in range (0,2) :
+        for b in range(0,bits) :
+            net.line("assign " + access_bit("data_o",w*bits+b) + " =  " + ident_name_word_bit("reg",w,b) + ";")
+
+    for w in reversed(range (0,words)) :
+        ports = fifo_shift_x2_ports(words, w);
+
+        for g in [1, 2, 3, 4, 0] :
+            if g not in ports :
+                continue;
+            net.column();
+
+            net.line("wire " +  ",".join([ident_name_word_bit_port("a2",w,b,g) for b in range(0,bits)]) + ";")
+
+            for b in range (0,bits) :
+                if (g == 0) :
+                    source = ident_name_word_bit("reg",w,b);
+                elif (g <= 2) :
+                    source = ident_name_word_bit("reg",w+g,b);
+                else :
+                    source = access_bit("data_i",(g-3)*bits+b);
+                # selects first, as above
+                net.cell(nand[2]
+                         ,[ ident_name_word_bit_port("nand2",w,b,g)
+                            , access_bit("sel_one_hot_i",w*5+g)
+                            , source
+                            , ident_name_word_bit_port("a2",w,b,g)]
+                         );
+            net.end_column();
+
+        groups = fifo_shift_x2_groups(ports);
+        for (i, group) in enumerate(groups) :
+            net.column();
+
+            # with one group, the NAND drives the flop directly
+            out = "a3" if (len(groups) == 1) else "a3_" + str(i);
+            net.line("wire " +  ",".join([ident_name_word_bit(out,w,b) for b in range(0,bits)]) + ";")
+            for b in range (0,bits) :
+                net.cell(nand[len(group)]
+                         ,[ ident_name_word_bit("nand" + str(len(group)) + "_" + str(i),w,b) ]
+                         + [ ident_name_word_bit_port("a2",w,b,g) for g in group ]
+                         + [ ident_name_word_bit(out,w,b) ]
+                         );
+            net.end_column();
+
+        if (len(groups) > 1) :
+            net.column();
+
+            net.line("wire " +  ",".join([ident_name_word_bit("a3",w,b) for b in range(0,bits)]) + ";")
+            for b in range (0,bits) :
+                net.cell(or2
+                         ,[ ident_name_word_bit("or2",w,b)
+                            , ident_name_word_bit("a3_0",w,b)
+                            , ident_name_word_bit("a3_1",w,b)
+                            , ident_name_word_bit("a3",w,b)
+                            ]
+                         );
+            net.end_column();
+
+        net.column();
+
+        for b in range (0,bits) :
+            net.cell(dff_out if (w < 2) else dff
+                     ,[ ident_name_word_bit("dff",w,b)
+                        , ident_name_word_bit("a3",w,b)
+                        , "clk_i"
+                        , ident_name_word_bit("reg",w,b)
+                        ]
+                     );
+        net.end_column();
+
+    return net;
+
+def generate_fifo_shift_array ( tech, words, bits ) :
+    emit_placement_verilog(place_fifo_shift_array(tech, words, bits));
+
+def generate_fifo_shift_x2_array ( tech, words, bits ) :
+    emit_placement_verilog(place_fifo_shift_x2_array(tech, words, bits));
+
+#
+# area and delay estimates, from fifo_shift_timing in the cell table
+#
+# data:   clk->q of a word, through its mux, to the setup of the next
+# select: from sel_one_hot_i, which fans out to every bit of a word, to
+#         setup; it excludes the arrival time of the select itself
+#
+
+def fifo_shift_model ( tech ) :
+    assert ("fifo_shift_timing" in tech.table), "no fifo_shift_timing in tech " + tech.name;
+    return tech.table["fifo_shift_timing"];
+
+# the gates of one bit of word w, as a list of cell names
+def fifo_shift_cells ( words, w, x2 ) :
+    if not x2 :
+        cells = ["nand2"] * (3 if w < words-1 else 2) + ["nand3" if w < words-1 else "nand2"];
+        return cells + ["dff_out" if w == 0 else "dff"];
+    groups = fifo_shift_x2_groups(fifo_shift_x2_ports(words, w));
+    cells = ["nand2"] * sum([len(g) for g in groups]);
+    cells = cells + ["nand" + str(len(g)) for g in groups] + (["or2"] if len(groups) > 1 else []);
+    return cells + ["dff_out" if w < 2 else "dff"];
+
+def fifo_shift_estimate ( tech, words, bits, x2=False ) :
+    model = fifo_shift_model(tech);
+    area  = model["area"];
+    delay = model["delay"];
+
+    total = 0.0;
+    count = 0;
+    mux = 0;
+    for w in range(0,words) :
+        cells = fifo_shift_cells(words, w, x2);
+        total = total + bits * sum([area[c] for c in cells]);
+        count = count + bits * len(cells);
+
+        # the NAND2 of the mux, then the slowest summing NAND (and OR2)
+        if x2 :
+            groups = fifo_shift_x2_groups(fifo_shift_x2_ports(words, w));
+            sums = max([delay["nand" + str(len(g))] for g in groups]) + (delay["or2"] if len(groups) > 1 else 0);
+        else :
+            sums = delay["nand3" if w < words-1 else "nand2"];
+        mux = max(mux, delay["nand2"] + sums);
+
+    return { "area"   : total
+           , "cells"  : count
+           , "data"   : delay["clk_q"] + mux + delay["setup"]
+           , "select" : delay["sel_per_bit"] * bits + mux + delay["setup"]
+           };
+
+def fifo_shift_summary ( tech, sizes, x2=False ) :
+    lines = [ "# " + tech.name + (" x2" if x2 else "") + " shift fifo; area in um^2, delays in ps (rough estimates)"
+            , "%6s %5s %7s %10s %6s %7s %8s" % ("words", "bits", "cells", "area", "data", "select", "words/ns")
+            ];
+    for (words, bits) in sizes :
+        e = fifo_shift_estimate(tech, words, bits, x2);
+        rate = (2.0 if x2 else 1.0) * 1000.0 / max(e["data"], e["select"]);
+        lines.append("%6d %5d %7d %10.1f %6d %7d %8.2f" % (words, bits, e["cells"], e["area"], e["data"], e["select"], rate));
+    return lines;
+
+fifo_shift_summary_words = [2, 4, 8, 16, 32];
+fifo_shift_summary_bits  = [8, 16, 32, 64, 128];
+
+def fifo_shift_gen_main ( tech, argv ) :
+    args = argv[1:];
+    x2 = ("x2" in args);
+    fmt = [a for a in args if a in placement_formats][:1];
+    args = [a for a in args if a != "x2" and a not in placement_formats];
+    if (args[:1] == ["summary"] and len(args) in (1, 3) and all([x.isdigit() for x in args[1:]])) :
+        if len(args) == 3 :
+            sizes = [(int(args[1]), int(args[2]))];
+        else :
+            sizes = [(w, b) for w in fifo_shift_summary_words for b in fifo_shift_summary_bits if (w >= 2 or not x2)];
+        for line in fifo_shift_summary(tech, sizes, x2) :
+            print(line);
+    elif (len(args) == 2 and all([x.isdigit() for x in args])) :
+        if x2 :
+            net = place_fifo_shift_x2_array (tech, int(args[0]), int(args[1]));
+        else :
+            net = place_fifo_shift_array (tech, int(args[0]), int(args[1]));
+        emit_placement(net, (fmt + ["verilog"])[0], tech);
+    else :
+        print("Usage: " + argv[0] + " words bits [x2] [" + "|".join(placement_formats) + "]")
@@ -0,0 +1,165 @@
+#!/usr/bin/python
+#
+# bsg_rp_gen
+#
+# Single entry point for the rp generators of every PDK.
+#
+#   bsg_rp_gen.py <pdk> all <outdir>       # every hardened variant of <pdk>
+#   bsg_rp_gen.py <pdk> list               # the files "all" would write
+#   bsg_rp_gen.py <pdk> sweep <outdir> <max_bits> [processes]
+#                                          # every flop flavour and gate stack,
+#                                          # widths 1..max_bits, one file each
+#   bsg_rp_gen.py <pdk> <generator> args   # one generator, same args as
+#                                          # hard/<pdk>/*/bsg_<generator>_gen.py
+#   bsg_rp_gen.py <pdk> fifo_shift summary [x2] [words bits]
+#                                          # shift fifo area/delay estimates
+#   bsg_rp_gen.py <pdk> mul <width> [pipeline] [tcl]
+#                                          # a whole multiplier, see bsg_rp_mul.py
+#   bsg_rp_gen.py <pdk> mul_check <width> [pipeline] [vectors]
+#                                          # check it against integer multiplication
+#   bsg_rp_gen.py <pdk> clk_gen <osc|dly_line> sweep <f_min> <f_max> [outdir]
+#                                          # oscillator / delay line sizes, see bsg_rp_clk.py
+#   bsg_rp_gen.py <pdk> clk_spice run <outdir> [processes] [corner ...]
+#                                          # oscillator frequency of every control
+#                                          # code in ngspice, see bsg_rp_spice.py
+#
+# <pdk> is a tech/<pdk>.json cell table, e.g. tsmc_40; the variants come
+# from its "variants" list, so a whole PDK is generated in one process
+# run, loading the table and compiling each cell template only once.
+#
+
+from __future__ import print_function
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bsg_netlist import *
+from bsg_rp_tech import *
+from bsg_rp_misc import *
+from bsg_rp_place import *
+from bsg_rp_mem import *
+from bsg_rp_fifo import *
+from bsg_rp_mul import *
+from bsg_rp_mul_eval import *
+from bsg_rp_sweep import *
+from bsg_rp_clk import *
+from bsg_rp_spice import *
+
+generator_main = { "dff"        : dff_gen_main
+                 , "mux"        : mux_gen_main
+                 , "gate_stack" : gate_stack_gen_main
+                 , "reduce"     : reduce_gen_main
+                 , "rf"         : rf_gen_main
+                 , "fifo_shift" : fifo_shift_gen_main
+                 , "mul"        : mul_gen_main
+                 , "mul_check"  : mul_check_main
+                 , "clk_gen"    : clk_gen_main
+                 , "clk_spice"  : clk_spice_main
+                 }
+
+# name of the file a variant is written to
+def variant_file_name (tech, v) :
+    g = v["generator"]
+    if g == "dff" :
+        name = dff_suffix[v["type"] + str(v["strength"])]
+    elif g == "mux" :
+        name = "mux_w" + str(v["inputs"])
+    elif g == "rf" :
+        name = "rf_w" + str(v["words"]) + "_" + str(v["readports"]) + "r1w"
+    elif g == "reduce" :
+        name = "reduce_" + v.get("op", "and")
+    elif g == "gate_stack" :
+        name = v["cell"]
+    elif g == "fifo_shift" :
+        name = ("fifo_shift_x2" if v.get("x2", 0) else "fifo_shift") + "_w" + str(v["words"])
+    else :
+        raise ValueError("unknown generator '" + g + "'")
+    return "bsg_rp_" + tech.fab + "_" + name + ".v"
+
+# emit every module of one variant
+def generate_variant (tech, v) :
+    g = v["generator"]
+    if g == "dff" :
+        for b in expand_sizes(v["bits"]) :
+            generate_dff_nreset_en(tech, v["type"], b, v["strength"])
+    elif g == "mux" :
+        for b in expand_sizes(v["bits"]) :
+            generate_mux_shift(tech, v["inputs"], b)
+    elif g == "rf" :
+        for b in expand_sizes(v["bits"]) :
+            generate_Nr1w_array(tech, v["words"], b, v["readports"], v.get("tree", "fixed"))
+    elif g == "reduce" :
+        generate_reduce(tech, expand_sizes(v["bits"]), v.get("op", "and"))
+    elif g == "gate_stack" :
+        template = gate_stack_template(tech, v["cell"])
+        generate_gate_stacks(tech, v["cell"], v["rows"], template, 1)
+        if v.get("horiz", 0) :
+            generate_gate_stacks(tech, v["cell"], v["rows"], template, 0)
+    elif g == "fifo_shift" :
+        for b in expand_sizes(v["bits"]) :
+            if v.get("x2", 0) :
+                generate_fifo_shift_x2_array(tech, v["words"], b)
+            else :
+                generate_fifo_shift_array(tech, v["words"], b)
+    else :
+        raise ValueError("unknown generator '" + g + "'")
+
+# write one file per variant into outdir; returns the file names
+def generate_all (tech, outdir) :
+    if not os.path.isdir(outdir) :
+        os.makedirs(outdir)
+    files = []
+    for v in tech.variants :
+        name = variant_file_name(tech, v)
+        writer = BsgNetlistWriter(open(os.path.join(outdir, name), "w"))
+        old = set_netlist_writer(writer)
+        try :
+            generate_variant(tech, v)
+        finally :
+            set_netlist_writer(old)
+            writer.close()
+        files.append(name)
+    return files
+
+def usage (argv) :
+    print("Usage: " + argv[0] + " <pdk> all <outdir>      # every hardened variant of <pdk>")
+    print("       " + argv[0] + " <pdk> list               # the files 'all' would write")
+    print("       " + argv[0] + " <pdk> sweep <outdir> <max_bits> [processes]")
+    print("       " + argv[0] + " <pdk> <generator> args   # one generator")
+    print("  pdk:       " + " ".join(tech_names()))
+    print("  generator: " + " ".join(sorted(generator_main.keys())))
+
+def main (argv) :
+    if len(argv) < 3 :
+        usage(argv)
+        return 1
+
+    try :
+        tech = load_tech(argv[1])
+    except ValueError as e :
+        print(str(e), file=sys.stderr)
+        return 1
+
+    if argv[2] == "all" and len(argv) == 4 :
+        for f in generate_all(tech, argv[3]) :
+            print(os.path.join(argv[3], f))
+    elif argv[2] == "list" and len(argv) == 3 :
+        for v in tech.variants :
+            print(variant_file_name(tech, v))
+    elif argv[2] == "sweep" and len(argv) in (5, 6) :
+        processes = int(argv[5]) if len(argv) == 6 else None
+        counts = run_sweep(tech, argv[3], int(argv[4]), processes)
+        print(" ".join([k + " " + str(counts[k]) for k in ("generated", "written", "unchanged", "skipped")]))
+    elif argv[2] in generator_main :
+        # the generator sees the same argv as its legacy script;
+        # checkers return False on failure
+        if generator_main[argv[2]](tech, [argv[0] + " " + argv[1] + " " + argv[2]] + argv[3:]) is False :
+            return 1
+    else :
+        usage(argv)
+        return 1
+    return 0
+
+if __name__ == "__main__" :
+    sys.exit(main(sys.argv))
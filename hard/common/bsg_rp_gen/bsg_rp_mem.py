@@ -0,0 +1,619 @@
+#
+# bsg_rp_mem.py
+#
+# Register files with deterministic naming, and placement directives,
+# driven by a per-PDK cell table (see bsg_rp_tech.py).
+#
+# MBT 4/1/2015
+#
+#
+# data_i:   input data
+# write_sel_one_hot_i: write select
+# clock_i:  clock
+# data_o:   output data
+# read_sel_one_hot_i:  read select
+#
+
+from __future__ import print_function
+
+import itertools
+
+from bsg_netlist import *
+from bsg_rp_tech import *
+from bsg_rp_place import *
+
+# NOTE: for symmetric pins, assume that earlier ones are always faster.
+# For example, for AOI22  A's are faster than B's and A0 is faster than A1.
+#
+
+def rf_module_name ( tech, words, bits, readports ) :
+    return ident_name_word_bit("bsg_rp_"+tech.fab+"_rf",words,bits) + "_" + str(readports) + "r1w";
+
+# an empty rf module, to be filled column by column
+def rf_placement ( tech, words, bits, readports ) :
+    return BsgPlacement (rf_module_name(tech,words,bits,readports)
+                         , [ "clock_i"
+                             , param_bits_all("data_i",bits)
+                             , param_bits_all("write_sel_one_hot_i",words)
+                             , param_bits_all("read_sel_one_hot_i",words*readports)
+                             ]
+                         , [ param_bits_all("data_o",bits*readports)]
+                         , "rf"
+                         );
+
+# this has bits going vertically and words going horizontally
+def place_2_word_1r1w_array ( tech, words, bits, readports):
+    assert ( (words == 2) and readports == 1), "only words == 2 supported";
+    dffe  = tech.cell("rf","dffe");
+    aoi22 = tech.cell("rf","aoi22");
+    invx3 = tech.cell("rf","invx3");
+
+    net = rf_placement(tech, words, bits, readports);
+
+    for w in range (0,words) :
+        net.column();
+
+        net.line("wire " +  ",".join([ident_name_word_bit("q",w,b) for b in range(0,bits)]) + ";")
+        for b in range (0,bits) :
+
+            net.cell(dffe
+                     ,[ ident_name_word_bit("reg",w,b)
+                        , access_bit("data_i",b)
+                        , access_bit("write_sel_one_hot_i",w)
+                        , "clock_i"
+                        , ident_name_word_bit("q",w,b)]
+                     );
+        net.end_column();
+
+    net.column();
+
+    net.line("wire " +  ",".join([ident_name_bit_port("qaoi",b,0) for b in range(0,bits)]) + ";")
+
+    for b in range(0,bits) :
+        net.cell(aoi22,
+                 [ ident_name_bit_port("bsg_aoi22",b,0)
+                   ,access_bit("read_sel_one_hot_i",0)
+                   ,ident_name_word_bit("q",0,b)
+                   ,access_bit("read_sel_one_hot_i",1)
+                   ,ident_name_word_bit("q",1,b)
+                   ,ident_name_bit_port("qaoi",b,0)
+                   ]);
+    net.end_column();
+
+    net.column();
+
+    for b in range(0,bits) :
+        net.cell(invx3,
+                 [ ident_name_bit("bsg_inv",b)
+                   , ident_name_bit_port("qaoi",b,0)
+                   , access_bit("data_o",b)
+                   ]);
+    net.end_column();
+
+    return net;
+
+
+# this has bits going vertically and words going horizontally
+def place_4_word_1r1w_array ( tech, words, bits, readports):
+    assert ( (words == 4) and readports == 1), "only words == 4 supported";
+    dffe  = tech.cell("rf","dffe");
+    aoi22 = tech.cell("rf","aoi22");
+    nand2 = tech.cell("rf","nand2");
+
+    net = rf_placement(tech, words, bits, readports);
+
+    for bank in range(0,2) :
+        for w in range (2*bank,2*bank+2) :
+            net.column();
+
+            net.line("wire " +  ",".join([ident_name_word_bit("q",w,b) for b in range(0,bits)]) + ";")
+            for b in range (0,bits) :
+
+                net.cell(dffe
+                         ,[ ident_name_word_bit("reg",w,b)
+                            , access_bit("data_i",b)
+                            , access_bit("write_sel_one_hot_i",w)
+                            , "clock_i"
+                            , ident_name_word_bit("q",w,b)]
+                         );
+            net.end_column();
+
+        net.column();
+
+        net.line("wire " +  ",".join([ident_name_word_bit("qaoi",bank,b) for b in range(0,bits)]) + ";")
+
+        for b in range(0,bits) :
+            net.cell(aoi22,
+                     [ ident_name_word_bit("bsg_aoi22",bank,b)
+                       ,access_bit("read_sel_one_hot_i",bank*2)
+                       ,ident_name_word_bit("q",bank*2,b)
+                       ,access_bit("read_sel_one_hot_i",bank*2+1)
+                       ,ident_name_word_bit("q",bank*2+1,b)
+                       ,ident_name_word_bit("qaoi",bank,b)
+                       ]);
+        net.end_column();
+
+    net.column();
+
+    # fixme: which nand2 is appropriate?
+    for b in range(0,bits) :
+        net.cell(nand2,
+                 [ ident_name_bit("bsg_nand",b)
+                   , ident_name_word_bit("qaoi",0,b)
+                   , ident_name_word_bit("qaoi",1,b)
+                   , access_bit("data_o",b)
+                   ]);
+    net.end_column();
+
+    return net;
+
+# the placed netlist of an rf
+#
+# tree: "fixed" for the hand-placed AOI22/NAND4/NOR2/NAND2 read mux,
+#       "timing" to pick the read mux from the tech's rf_tree delay model
+def place_Nr1w_array ( tech, words, bits, readports, tree="fixed") :
+
+    if (words == 2) :
+        return place_2_word_1r1w_array (tech,words,bits,readports);
+
+    if (words == 4) :
+        return place_4_word_1r1w_array (tech,words,bits,readports);
+
+    if (tree == "timing") :
+        return place_Nr1w_tree_array (tech,words,bits,readports,choose_rf_tree(tech,words));
+
+    # this one has words going vertically and bits horizontally
+
+    assert (words == 32 or words == 16 or words == 8), "only words == 32,16, and 8 is currently handled";
+    dffe  = tech.cell("rf","dffe");
+    aoi22 = tech.cell("rf","aoi22");
+    nand4 = tech.cell("rf","nand4");
+    nor2  = tech.cell("rf","nor2");
+    nand2 = tech.cell("rf","nand2");
+    inv   = tech.cell("rf","inv");
+
+    # get the maximum width of a cell that is not the dffe
+    # mux_width = max([v for k,v in width.iteritems() if k not in ('dffe')])
+
+    net = rf_placement(tech, words, bits, readports);
+
+    for b in range (0,bits) :
+        net.line("wire " + ident_name_bit("data_i_inv",b) + "; ");
+        net.column();
+        # we generate the state first
+        net.line("wire " +  ",".join([ident_name_word_bit("q",w,b) for w in range(words)]) + ";")
+        for w in range (0,words) :
+            net.cell(dffe
+                     ,[ ident_name_word_bit("reg",w,b)
+                        , ident_name_bit("data_i_inv",b)
+                        , access_bit("write_sel_one_hot_i",w)
+                        , "clock_i"
+                        , ident_name_word_bit("q",w,b)]
+                     );
+        net.end_column();
+
+
+        # then muxes, one for each port; each gate is given its row
+        for p in range(0,readports) :
+            net.column(placed=True);
+
+
+            # only add input inverter on first port
+            if (p == 0) :
+                net.cell(inv
+                         , [ ident_name_bit("bsg_inv_in",b)
+                             ,  access_bit("data_i",b)
+                             , ident_name_bit("data_i_inv",b)
+                             ]
+                         , 1
+                         );
+
+            # AOI22 every pair of words
+
+            # we generate the state first
+            net.line("wire " +  ",".join([ident_name_word_bit_port("qaoi",w,b,p) for w in range(0,words,2)]) + ";")
+
+            for w in range (0,words,2) :
+                net.cell(aoi22
+                         ,[ ident_name_word_bit_port("bsg_aoi22",w,b,p)
+                            ,access_bit("read_sel_one_hot_i",words*p+w)    # crit
+                            ,ident_name_word_bit("q",      w,b)
+                            ,access_bit("read_sel_one_hot_i",words*p+w+1)  # crit
+                            ,ident_name_word_bit("q",      w+1,b)
+                            ,ident_name_word_bit_port("qaoi",w,b,p)
+                            ]
+                         ,w
+                         );
+
+            # NAND4 each pair
+            for w in range (0,words,8) :
+                net.fragment("wire " + ident_name_word_bit_port("nand",w,b,p) + "; ");
+                net.cell(nand4
+                         , [ident_name_word_bit_port("bsg_nand4",w,b,p)
+                            , ident_name_word_bit_port("qaoi",w+0,b,p)
+                            , ident_name_word_bit_port("qaoi",w+2,b,p)
+                            , ident_name_word_bit_port("qaoi",w+4,b,p)
+                            , ident_name_word_bit_port("qaoi",w+6,b,p)
+                            , ident_name_word_bit_port("nand",w,b,p)]
+                         ,w+3
+                         );
+
+            if (words >= 16) :
+                # NOR2 each group of 8
+                for w in range (0,words,16) :
+                    net.fragment("wire " + ident_name_word_bit_port("nor2",w,b,p) + "; ");
+                    net.cell(nor2
+                             , [ ident_name_word_bit_port("bsg_nor2",w,b,p)
+                                 , ident_name_word_bit_port("nand",w,b,p)
+                                 , ident_name_word_bit_port("nand",w+8,b,p)
+                                 , ident_name_word_bit_port("nor2",w,b,p)
+                                 ]
+                             ,w+7
+                             );
+
+                 # NAND2 each group of 16
+                for w in range (0,words,32) :
+                    net.fragment("wire " + ident_name_word_bit_port("nand2",w,b,p) + "; ");
+                    net.cell(nand2
+                             , [ ident_name_word_bit_port("bsg_nand2",w,b,p)
+                                 , ident_name_word_bit_port("nor2",w,b,p)
+# the 16 if (words > 16) else 0 hack allows 16 word RF's to be generated
+# (fixme; it would be more efficient to run through an inverter rather than a nand2 gate for 16 word RF's!)
+#
+                                 , ident_name_word_bit_port("nor2",w+(16 if (words>16) else 0),b,p)
+                                 , ident_name_word_bit_port("nand2",w,b,p)
+                                 ]
+# tweak placement to position 13 for words == 16
+                             , w+(15 if (words > 16) else 13)
+                             );
+
+                net.line("\n")
+                # add inverters to data in, and data out.
+                # these are on opposite sides of the array
+                # we may potentially pay in delay, but we get
+                # a lot in isolation and usability, with no area cost.
+
+            if (words >= 16) :
+                my_nand = "nand2";
+            else :
+                my_nand = "nand";
+
+            net.cell(inv
+                     , [ ident_name_word_bit_port("bsg_inv_out",w,b,p)
+                         , ident_name_word_bit_port(my_nand,0,b,p)
+                         , access_bit("data_o",p*bits+b)
+                         ]
+                     , words-1  # put this gate right at the end
+                     );
+
+            # the gates come out by row, which is not technically
+            # necessary since each has its own rp_fill, but it makes
+            # things more readable
+            net.end_column();
+
+    return net;
+
+def generate_Nr1w_array ( tech, words, bits, readports, tree="fixed") :
+    emit_placement_verilog(place_Nr1w_array(tech, words, bits, readports, tree));
+
+#
+# timing-driven read mux trees
+#
+# The read mux of each port starts with one AOI22 per pair of words.
+# Each following level is a row of NAND (odd levels) or NOR (even levels)
+# gates, each combining up to fanin signals of the level below; a group
+# of one is an inverter. After an odd number of levels the selected bit
+# is inverted again, so the tree is finished by the output inverter.
+#
+# The cells, and a logical effort style delay model, come from the
+# rf_tree table of the tech:
+#
+#   delay = tau * (load / drive + p)
+#
+# where load is the input capacitance (g * drive) of the gate driven plus
+# wire_load_per_row for each row the wire spans, or output_load for the
+# output inverter. All AOI22 inputs are assumed to arrive together.
+#
+# A tree is (aoi, fanins, strengths, inv): the AOI22 strength, the fan-in
+# of each level, the strength of each level, and the strength of the
+# output inverter; strengths index the cell lists of the rf_tree table.
+#
+
+# the hand-placed trees of place_Nr1w_array, for comparison
+legacy_rf_tree = { 8  : (0, [4],     [0],     2)
+                 , 16 : (0, [4,2,1], [0,1,1], 2)
+                 , 32 : (0, [4,2,2], [0,1,1], 2)
+                 }
+
+def rf_tree_model ( tech ) :
+    assert ("rf_tree" in tech.table), "no rf_tree delay model in tech " + tech.name;
+    return tech.table["rf_tree"];
+
+def rf_tree_family ( level, size ) :
+    if (size == 1) :
+        return "inv";
+    if (level % 2 == 1) :
+        return "nand" + str(size);
+    return "nor" + str(size);
+
+def rf_tree_cell ( model, family, strength ) :
+    cells = model["cells"][family];
+    return cells[min(strength, len(cells)-1)];
+
+# fan-in sequences that reduce n signals to one in an odd number of levels
+def rf_tree_fanins ( n, max_levels=5 ) :
+    result = [];
+    seen = set();
+    def walk ( n, fanins, sizes ) :
+        if (n == 1) :
+            if (len(fanins) % 2 == 0) :
+                fanins = fanins + [1];
+                sizes = sizes + (1,);
+            # fan-ins larger than the signals left give the same tree
+            if (sizes not in seen) :
+                seen.add(sizes);
+                result.append(fanins);
+            return;
+        if (len(fanins) == max_levels) :
+            return;
+        for f in (2,3,4) :
+            walk((n + f - 1) // f, fanins + [f], sizes + (min(f,n),));
+    walk(n, [], ());
+    return result;
+
+# the gates of a tree, level by level; level 0 is the AOI22s.
+# each gate covers words lo..hi and gets a row in the mux column.
+def rf_tree_gates ( words, fanins ) :
+    levels = [[ { "level" : 0, "index" : w, "size" : 2, "lo" : w, "hi" : w+1, "kids" : [], "row" : w }
+                for w in range(0,words,2) ]];
+    for l in range(0,len(fanins)) :
+        below = levels[-1];
+        level = [];
+        for g in range(0,len(below),fanins[l]) :
+            kids = below[g:g+fanins[l]];
+            gate = { "level" : l+1, "index" : len(level), "size" : len(kids)
+                   , "lo" : kids[0]["lo"], "hi" : kids[-1]["hi"], "kids" : kids };
+            for k in kids :
+                k["parent"] = gate;
+            level.append(gate);
+        levels.append(level);
+    return levels;
+
+# AOI22s take the even rows; the input inverter sits at row 1 and the
+# output inverter at the last row. Every other gate goes to the free odd
+# row nearest the middle of the words it covers. Returns False if the
+# tree does not fit in the column.
+def rf_tree_place ( words, levels ) :
+    used = set(range(0,words,2)) | set([1, words-1]);
+    for level in levels[1:] :
+        for gate in level :
+            want = gate["lo"] + (gate["hi"]-gate["lo"]) // 2;
+            if (want % 2 == 0) :
+                want = want - 1;
+            gate["row"] = None;
+            for d in range(0,words,2) :
+                for r in (want-d, want+d) :
+                    if (0 < r < words and r not in used and gate["row"] is None) :
+                        gate["row"] = r;
+                if (gate["row"] is not None) :
+                    break;
+            if (gate["row"] is None) :
+                return False;
+            used.add(gate["row"]);
+    return True;
+
+# predicted delay of a placed tree; returns delay (ps), area per port,
+# and the critical path as a list of gates, ending with the output inverter
+def rf_tree_evaluate ( model, words, levels, tree ) :
+    (aoi, fanins, strengths, inv) = tree;
+    tau  = model["tau"];
+    wire = model["wire_load_per_row"];
+
+    inv_out = { "cell" : rf_tree_cell(model,"inv",inv), "row" : words-1, "kids" : [levels[-1][0]] };
+
+    area = inv_out["cell"]["area"];
+    for level in levels :
+        for gate in level :
+            if (gate["level"] == 0) :
+                gate["cell"] = rf_tree_cell(model,"aoi22",aoi);
+            else :
+                gate["cell"] = rf_tree_cell(model,rf_tree_family(gate["level"],gate["size"]),strengths[gate["level"]-1]);
+            area = area + gate["cell"]["area"];
+
+    for level in levels :
+        for gate in level :
+            parent = gate.get("parent", inv_out);
+            load = parent["cell"]["g"] * parent["cell"]["drive"] + wire * abs(gate["row"] - parent["row"]);
+            gate["load"] = load;
+            gate["delay"] = tau * (load / gate["cell"]["drive"] + gate["cell"]["p"]);
+            gate["arrival"] = max([k["arrival"] for k in gate["kids"]] + [0.0]) + gate["delay"];
+
+    inv_out["load"] = model["output_load"];
+    inv_out["delay"] = tau * (inv_out["load"] / inv_out["cell"]["drive"] + inv_out["cell"]["p"]);
+    inv_out["arrival"] = levels[-1][0]["arrival"] + inv_out["delay"];
+
+    path = [inv_out];
+    while (path[0]["kids"]) :
+        path.insert(0, max(path[0]["kids"], key=lambda k: k["arrival"]));
+
+    return { "delay" : inv_out["arrival"], "area" : area, "path" : path };
+
+# whether a timing driven read mux fits an rf of this many words; with
+# 10 words only rows 3, 5 and 7 are free, and every tree needs four gates
+def rf_tree_fits ( words ) :
+    if (words % 2 != 0 or words < 6) :
+        return False;
+    for fanins in rf_tree_fanins(words // 2) :
+        if rf_tree_place(words, rf_tree_gates(words, fanins)) :
+            return True;
+    return False;
+
+_rf_tree_choice = {};
+
+# the fastest tree for a read port; trees within 1% of the fastest
+# count as equally fast, and the smallest of those wins
+def choose_rf_tree ( tech, words ) :
+    assert (rf_tree_fits(words)), "timing driven read muxes need an even number of words >= 6, other than 10";
+
+    key = (tech.name, words);
+    if key in _rf_tree_choice :
+        return _rf_tree_choice[key];
+
+    model = rf_tree_model(tech);
+    n_aoi = len(model["cells"]["aoi22"]);
+    n_inv = len(model["cells"]["inv"]);
+
+    results = [];
+    for fanins in rf_tree_fanins(words // 2) :
+        levels = rf_tree_gates(words, fanins);
+        if not rf_tree_place(words, levels) :
+            continue;
+        # the number of strengths of each level's cells
+        choices = [];
+        for l in range(1,len(levels)) :
+            choices.append(range(0,max([len(model["cells"][rf_tree_family(l,g["size"])]) for g in levels[l]])));
+        for aoi in range(0,n_aoi) :
+            for strengths in itertools.product(*choices) :
+                for inv in range(0,n_inv) :
+                    tree = (aoi, fanins, list(strengths), inv);
+                    r = rf_tree_evaluate(model, words, levels, tree);
+                    results.append((r["delay"], r["area"], tree));
+
+    fastest = min([r[0] for r in results]);
+    best = min([r for r in results if r[0] <= fastest * 1.01], key=lambda r: (r[1], r[0]));
+    _rf_tree_choice[key] = best[2];
+    return best[2];
+
+def rf_tree_describe ( levels ) :
+    return " > ".join(["aoi22"] + ["/".join(sorted(set([rf_tree_family(l,g["size"]) for g in levels[l]]), reverse=True))
+                                   for l in range(1,len(levels))] + ["inv"]);
+
+def rf_tree_cell_name ( cell ) :
+    return cell["template"].split()[0];
+
+# the predicted critical path, as verilog comments
+def rf_tree_report ( tech, module_name, words, tree ) :
+    model = rf_tree_model(tech);
+    levels = rf_tree_gates(words, tree[1]);
+    rf_tree_place(words, levels);
+    r = rf_tree_evaluate(model, words, levels, tree);
+
+    lines = [ "// " + module_name + ": timing driven read mux, each read port is"
+            , "//   " + rf_tree_describe(levels)
+            , "// predicted critical path " + ("%.1f" % r["delay"]) + " ps, area " + ("%.1f" % r["area"]) + " per bit per port"
+            , "//   %-8s %-24s %4s %7s %7s %8s" % ("level", "cell", "row", "load", "delay", "arrival")
+            ];
+    for g in r["path"] :
+        level = "out" if "level" not in g else str(g["level"]);
+        lines.append("//   %-8s %-24s %4d %7.2f %7.1f %8.1f" % (level, rf_tree_cell_name(g["cell"]), g["row"], g["load"], g["delay"], g["arrival"]));
+
+    if words in legacy_rf_tree :
+        legacy = legacy_rf_tree[words];
+        llevels = rf_tree_gates(words, legacy[1]);
+        rf_tree_place(words, llevels);
+        lr = rf_tree_evaluate(model, words, llevels, legacy);
+        lines.append("// fixed tree (" + rf_tree_describe(llevels) + "): "
+                     + ("%.1f" % lr["delay"]) + " ps, area " + ("%.1f" % lr["area"]));
+    return lines;
+
+def place_Nr1w_tree_array ( tech, words, bits, readports, tree ) :
+    model = rf_tree_model(tech);
+    levels = rf_tree_gates(words, tree[1]);
+    rf_tree_place(words, levels);
+    rf_tree_evaluate(model, words, levels, tree);
+    inv_out = compile_cell(rf_tree_cell(model,"inv",tree[3])["template"]);
+
+    dffe = tech.cell("rf","dffe");
+    inv  = tech.cell("rf","inv");
+
+    net = rf_placement(tech, words, bits, readports);
+
+    for line in rf_tree_report(tech, net.name, words, tree) :
+        net.comment(line)
+
+    for b in range (0,bits) :
+        net.line("wire " + ident_name_bit("data_i_inv",b) + "; ");
+        net.column();
+        # we generate the state first
+        net.line("wire " +  ",".join([ident_name_word_bit("q",w,b) for w in range(words)]) + ";")
+        for w in range (0,words) :
+            net.cell(dffe
+                     ,[ ident_name_word_bit("reg",w,b)
+                        , ident_name_bit("data_i_inv",b)
+                        , access_bit("write_sel_one_hot_i",w)
+                        , "clock_i"
+                        , ident_name_word_bit("q",w,b)]
+                     );
+        net.end_column();
+
+        # then muxes, one for each port
+        for p in range(0,readports) :
+            net.column(placed=True);
+
+            def out_name ( g ) :
+                if (g["level"] == 0) :
+                    return ident_name_word_bit_port("qaoi",g["index"],b,p);
+                return ident_name_word_bit_port("t"+str(g["level"]),g["index"],b,p);
+
+            # only add input inverter on first port
+            if (p == 0) :
+                net.cell(inv
+                         , [ ident_name_bit("bsg_inv_in",b)
+                             ,  access_bit("data_i",b)
+                             , ident_name_bit("data_i_inv",b)
+                             ]
+                         , 1
+                         );
+
+            net.line("wire " + ",".join([out_name(g) for level in levels for g in level]) + ";")
+
+            for g in levels[0] :
+                w = g["index"];
+                net.cell(g["cell"]["template"]
+                         ,[ ident_name_word_bit_port("bsg_aoi22",w,b,p)
+                            ,access_bit("read_sel_one_hot_i",words*p+w)    # crit
+                            ,ident_name_word_bit("q",      w,b)
+                            ,access_bit("read_sel_one_hot_i",words*p+w+1)  # crit
+                            ,ident_name_word_bit("q",      w+1,b)
+                            ,out_name(g)
+                            ]
+                         ,g["row"]
+                         );
+
+            for level in levels[1:] :
+                for g in level :
+                    net.cell(g["cell"]["template"]
+                             , [ ident_name_word_bit_port("bsg_t"+str(g["level"]),g["index"],b,p) ]
+                             + [ out_name(k) for k in g["kids"] ]
+                             + [ out_name(g) ]
+                             , g["row"]
+                             );
+
+            net.cell(inv_out
+                     , [ ident_name_bit_port("bsg_inv_out",b,p)
+                         , out_name(levels[-1][0])
+                         , access_bit("data_o",p*bits+b)
+                         ]
+                     , words-1  # put this gate right at the end
+                     );
+            net.end_column();
+
+    return net;
+
+def rf_gen_usage ( argv ) :
+    print("Usage: " + argv[0] + " words bits readports [fixed|timing] [" + "|".join(placement_formats) + "]")
+
+# the placement goes out as verilog unless def or json is given
+def rf_gen_main ( tech, argv ) :
+    args = argv[1:];
+    fmt = [a for a in args if a in placement_formats];
+    tree = [a for a in args if a in ("fixed", "timing")];
+    args = [a for a in args if a not in placement_formats and a not in ("fixed", "timing")];
+    if len(args) != 3 or len(fmt) > 1 or len(tree) > 1 or not all([x.isdigit() for x in args]) :
+        rf_gen_usage(argv);
+        return;
+    if tree == ["timing"] and int(args[0]) > 4 and not rf_tree_fits(int(args[0])) :
+        print("no timing driven read mux fits " + args[0] + " words; use an even number of words >= 6, other than 10");
+        return;
+    net = place_Nr1w_array (tech, int(args[0]), int(args[1]), int(args[2]), (tree + ["fixed"])[0]);
+    emit_placement(net, (fmt + ["verilog"])[0], tech);
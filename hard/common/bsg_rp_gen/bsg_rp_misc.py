@@ -0,0 +1,444 @@
+#
+# bsg_rp_misc.py
+#
+# bsg_misc rp generators (dff, one hot mux, gate stacks, and reduce),
+# driven by a per-PDK cell table (see bsg_rp_tech.py).
+#
+# The *_main() functions implement the command lines of the original
+# hard/<pdk>/bsg_misc/*_gen.py scripts, which now just call them.
+#
+
+from __future__ import print_function
+
+from bsg_netlist import *
+from bsg_rp_tech import *
+
+# NOTE: for symmetric pins, assume that earlier ones are always faster.
+# For example, for AOI22  A's are faster than B's and A0 is faster than A1.
+#
+
+#
+# bsg_dff_gen
+#
+
+dff_suffix = {};
+dff_suffix["dffre1"] = "dff_nreset_en_s1";
+dff_suffix["dffre2"] = "dff_nreset_en_s2";
+dff_suffix["dffr1"]  = "dff_nreset_s1";
+dff_suffix["dffe1"]  = "dff_en_s1";
+dff_suffix["dff1"]   = "dff_s1";
+dff_suffix["dff2"]   = "dff_s2";
+dff_suffix["dff4"]   = "dff_s4";
+dff_suffix["dff8"]   = "dff_s8";
+
+dff_param_list = {};
+dff_param_list["dffre2"] = ["nreset_i","en_i"];
+dff_param_list["dffre1"] = ["nreset_i","en_i"];
+dff_param_list["dffe1"]  = ["en_i"];
+dff_param_list["dffr1"]  = ["nreset_i"];
+dff_param_list["dff1"]   = [];
+dff_param_list["dff2"]   = [];
+dff_param_list["dff4"]   = [];
+dff_param_list["dff8"]   = [];
+
+def generate_dff_nreset_en ( tech, basecell, bits, strength ) :
+    basecell = basecell+str(strength);
+    module_name = ident_name_bit("bsg_rp_"+tech.fab+"_"+dff_suffix[basecell],bits);
+    cell = tech.cell("dff",basecell);
+
+    emit_module_header (module_name
+                        , [ tech.clock
+                            , param_bits_all("data_i",bits)
+                            ] + dff_param_list[basecell]
+        , [ param_bits_all("data_o",bits)]
+    );
+    column = 0
+
+    emit_rp_group_begin("dff")
+
+    for b in range (0,bits) :
+        emit_rp_fill(" 0 " + str(column) + " RX");
+        column=column+1;
+        emit_gate_instance(cell
+                           ,[ ident_name_bit("reg",b)
+                              , access_bit("data_i",b)
+                              , "en_i"
+                              , tech.clock
+                              , access_bit("data_o",b)
+                              , "nreset_i"]
+                           );
+
+    emit_rp_group_end("dff")
+    emit_module_footer()
+
+def dff_gen_main ( tech, argv ) :
+    if len(argv) == 4 :
+        # suffix, basecell;  e.g. dff, dff
+        generate_dff_nreset_en( tech, argv[1], int(argv[2]), int(argv[3]) );
+    else :
+        if ((len(argv) == 5) and (argv[4]=="SWEEP")) :
+            for b in range (1,int(argv[2])+1) :
+                generate_dff_nreset_en( tech, argv[1], b, argv[3] );
+        else:
+            print("Usage: " + argv[0] + " type " + " bits " + " strength")
+            print("Usage: " + argv[0] + " type " + " bits " + " strength " + "SWEEP (to go from 1..bits)")
+
+#
+# bsg_mux_gen
+#
+# one hot muxes; see the notes in hard/<pdk>/bsg_misc/bsg_mux_gen.py
+#
+
+# this has bits going vertically and words going horizontally
+def generate_mux_shift ( tech, inputs, bits):
+    nand2 = tech.cell("mux","nand2");
+
+    if (inputs == 4) :
+        left  = 2;
+        right = 2;
+        joiner = tech.cell("mux","nand4");
+    else:
+        if (inputs == 3) :
+            left  = 2;
+            right = 1;
+            joiner = tech.cell("mux","nand3");
+        else:
+            if (inputs == 2) :
+                left  = 1;
+                right = 1;
+                joiner = nand2;
+
+    module_name = ident_name_word_bit("bsg_rp_"+tech.fab+"_mux",inputs,bits);
+
+    emit_module_header (module_name
+                        , [ param_bits_all("data_i",inputs*bits)
+                            , param_bits_all("sel_one_hot_i",inputs)
+                            ]
+                        , [ param_bits_all("data_o",bits)]
+                        );
+    column = 0
+
+    emit_rp_group_begin("mux_gen")
+
+    for g in range(0,left) :
+        emit_rp_fill(str(column) + " 0 UX");
+        column=column+1;
+
+        emit_line("wire " +  ",".join([ident_name_word_bit("a2",g,b) for b in range(0,bits)]) + ";")
+
+        for b in range (0,bits) :
+
+            # this mux is optimized for data in to out
+            # if we want to optimize for select in to out
+            # we would flip the two inputs.
+            emit_gate_instance(nand2
+                               ,[ ident_name_word_bit("nand2",g,b)
+                                  , access_bit("data_i",bits*g+b)
+                                  , access_bit("sel_one_hot_i",g)
+                                  , ident_name_word_bit("a2",g,b)
+                                  ]
+                               );
+    emit_rp_fill(str(column) + " 0 UX");
+    column=column+1;
+
+    for g in range(left,left+right) :
+        emit_line("wire " +  ",".join([ident_name_word_bit("a2",g,b) for b in range(0,bits)]) + ";")
+
+    for b in range(0,bits) :
+        emit_gate_instance(joiner
+                           ,[ ident_name_word_bit("join",g,b)]
+                           + [ident_name_word_bit("a2",w,b) for w in range(0,left+right)]
+                           + [access_bit("data_o",b)]
+                           );
+
+    for g in range(left,left+right) :
+        emit_rp_fill(str(column) + " 0 UX");
+        column=column+1;
+
+        for b in range (0,bits) :
+
+            # this mux is optimized for data in to out
+            # if we want to optimize for select in to out
+            # we would flip the two inputs.
+
+            emit_gate_instance(nand2
+                               ,[ ident_name_word_bit("nand2",g,b)
+                                  , access_bit("data_i",bits*g+b)
+                                  , access_bit("sel_one_hot_i",g)
+                                  , ident_name_word_bit("a2",g,b)
+                                  ]
+                               );
+
+    emit_rp_group_end("mux_gen")
+    emit_module_footer()
+
+def mux_gen_main ( tech, argv ) :
+    if len(argv) == 3 :
+        generate_mux_shift (tech, int(argv[1]), int(argv[2]));
+    else :
+        print("Usage: " + argv[0] + " inputs bits")
+
+#
+# bsg_gate_stack_gen
+#
+# template is a full cell template, e.g. "ND2D1BWP #0 (.A1(#1), .A2(#2), .ZN(#3));"
+# with the output last. gatename only names the module, so a stack can be
+# named after the cell the bsg_misc wrappers expect.
+#
+
+def gate_stack_template ( tech, gatename ) :
+    return tech.table["cells"]["gate_stack"][gatename];
+
+def generate_gate_stack ( tech, gatename, rows, template, vert) :
+    if (vert) :
+        module_name = ident_name_bit("bsg_rp_"+tech.fab+"_"+gatename,rows);
+    else :
+        module_name = ident_name_bit("bsg_rp_"+tech.fab+"_"+gatename+"_horiz",rows);
+
+    cell = compile_cell(template);
+    num_inputs = cell.num_args - 2;
+    input_params = [param_bits_all("i"+str(x),rows) for x in range(0,num_inputs)]
+    emit_module_header (module_name
+                        , input_params
+                        , [ param_bits_all("o",rows)]
+                        );
+    column = 0
+
+    emit_rp_group_begin(gatename)
+
+    for pos in range (0,rows) :
+
+        if (vert) :
+            emit_rp_fill("0 " + str(pos) + " UX");
+        else :
+            emit_rp_fill(str(pos) +" 0 UX");
+
+        # NOTE: for symmetric pins, assume that earlier ones are always faster.
+        # For example, for AOI22  A's are faster than B's and A0 is faster than A1.
+
+        input_params = [access_bit("i"+str(x),pos) for x in range(0,num_inputs)]
+        output_params = [ access_bit("o",pos) ]
+        emit_gate_instance(cell
+                           , [ident_name_bit("stack", pos)] +
+                               input_params +
+                               output_params
+                             );
+
+    emit_rp_group_end(gatename)
+    emit_module_footer()
+
+# stacks of 1..rows, each preceded by a separator
+def generate_gate_stacks ( tech, gatename, rows, template, vert) :
+    for x in range(1,rows+1) :
+        emit_line("\n// ****************************************************** \n")
+        generate_gate_stack(tech,gatename,x,template,vert);
+
+# the verilog module that thunks to the right netlist
+def generate_gate_stack_wrapper ( tech, gatename, rows, template, wrapper_name ) :
+    num_inputs = compile_cell(template).num_args - 2;
+    input_params = ["input [width_p-1:0] i"+str(x) for x in range(0,num_inputs)]
+    emit_line('''
+
+module bsg_'''+wrapper_name+''' #(width_p="inv",harden_p=1)
+   ('''+"\n    ,".join(input_params)+'''
+    , output [width_p-1:0] o
+    );
+''')
+
+    for x in range(1,rows+1) :
+        emit_line(''' if (harden_p && (width_p=='''+str(x)+'''))
+    begin:macro
+      bsg_rp_'''+tech.fab+'''_'''+gatename+'''_b'''+str(x)+''' gate(.*);
+    end
+ else ''')
+    emit_line('''
+   begin: notmacro
+       initial assert(0!=1) else $error("%m unsupported gatestack size",width_p);
+   end
+
+endmodule
+''')
+
+def gate_stack_gen_main ( tech, argv ) :
+    if len(argv) == 4 :
+        template = argv[1] + " " + argv[3]
+        if argv[2].isdigit() :
+            generate_gate_stacks(tech,argv[1],int(argv[2]),template,1);
+        elif (argv[2][0]=="-") :
+            generate_gate_stacks(tech,argv[1],-(int(argv[2])),template,0);
+
+    elif len(argv) == 5 :
+        generate_gate_stack_wrapper(tech,argv[1],int(argv[2]),argv[1] + " " + argv[3],argv[4]);
+    else :
+        print("Usage: bsg_gate_stack_gen.py AND2X1 32 > bsg_and_stacks.v # generate each individual netlist of each size")
+        print("       bsg_gate_stack_gen.py AND2X1 32 and > bsg_and.v    # generate the verilog function that thunks to the right netlist")
+
+#
+# bsg_reduce_gen
+#
+# and, or and xor reduction trees of 2..256 bits.
+#
+# and (or) is built from alternating levels of nands and nors (nors and
+# nands), each gate taking up to 4 signals of the level below, with an
+# even number of levels so the output needs no inverter; xor is a tree of
+# xor2s. Each level has as few gates as the fan-in allows, but at least 2
+# ahead of the last level, so a 4..16 bit and is a row of nands feeding
+# one nor. In an and/or tree a group of one is an inverter; in an xor
+# tree it is passed through.
+#
+# The gates go in one column, with bit i of the input at row i; each gate
+# sits at the free row nearest the middle of the bits it covers.
+#
+
+reduce_default_widths = [4, 6, 8, 9, 12, 16]
+
+# the gate family of each level, repeating
+reduce_ops = { "and" : ["nand", "nor"]
+             , "or"  : ["nor", "nand"]
+             , "xor" : ["xor"]
+             }
+
+reduce_max_bits = 256
+
+# the number of signals at each level, from the inputs down to 1
+def reduce_level_sizes ( op, bits ) :
+    assert (op in reduce_ops), "op must be one of " + " ".join(sorted(reduce_ops.keys()));
+    assert (2 <= bits <= reduce_max_bits), "only widths 2.." + str(reduce_max_bits) + " supported";
+    fanin = 2 if (op == "xor") else 4;
+    depth = 0;
+    while (fanin ** depth < bits) :
+        depth = depth + 1;
+    if (len(reduce_ops[op]) == 2 and depth % 2 == 1) :
+        depth = depth + 1;
+    sizes = [bits];
+    for l in range(1,depth) :
+        sizes.append(min(sizes[-1], max((sizes[-1] + fanin - 1) // fanin, 2)));
+    sizes.append(1);
+    return sizes;
+
+# split n signals into k groups of consecutive signals, larger groups first
+def reduce_groups ( n, k ) :
+    (q, r) = divmod(n, k);
+    return [q+1]*r + [q]*(k-r);
+
+# the gates of a tree, level by level; each is a dict with the level,
+# the input bits it covers (lo..hi), its inputs, and its cell name,
+# which is None for a signal passed through
+def reduce_tree ( op, bits ) :
+    sizes = reduce_level_sizes(op, bits);
+    signals = [ { "lo" : b, "hi" : b, "name" : access_bit("i",b) } for b in range(0,bits) ];
+    levels = [];
+    for l in range(1,len(sizes)) :
+        family = reduce_ops[op][(l-1) % len(reduce_ops[op])];
+        level = [];
+        base = 0;
+        for n in reduce_groups(len(signals), sizes[l]) :
+            kids = signals[base:base+n];
+            base = base + n;
+            if (n > 1) :
+                cell = family + str(n);
+            elif (op == "xor") :
+                cell = None;
+            else :
+                cell = "inv";
+            if (l == len(sizes)-1) :
+                name = "o";
+            elif (cell is None) :
+                name = kids[0]["name"];
+            else :
+                name = access_bit("l"+str(l),len(level));
+            level.append({ "level" : l, "lo" : kids[0]["lo"], "hi" : kids[-1]["hi"]
+                         , "kids" : kids, "cell" : cell, "name" : name });
+        levels.append(level);
+        signals = level;
+    return levels;
+
+# rows for every gate; see above
+def reduce_place ( levels ) :
+    used = set();
+    for level in levels :
+        for g in level :
+            if (g["cell"] is None) :
+                continue;
+            want = (g["lo"] + g["hi"]) // 2;
+            d = 0;
+            while (True) :
+                free = [r for r in (want-d, want+d) if r >= 0 and r not in used];
+                if (free) :
+                    g["row"] = free[0];
+                    used.add(free[0]);
+                    break;
+                d = d + 1;
+
+def reduce_depth ( levels ) :
+    return len([l for l in levels if [g for g in l if g["cell"] is not None]]);
+
+def reduce_describe ( levels ) :
+    return " > ".join(["/".join(sorted(set([g["cell"] for g in l if g["cell"] is not None]), reverse=True))
+                       for l in levels if [g for g in l if g["cell"] is not None]]);
+
+def reduce_num_gates ( levels ) :
+    return len([g for l in levels for g in l if g["cell"] is not None]);
+
+def generate_reduce_tree ( tech, op, bits ) :
+    levels = reduce_tree(op, bits);
+    reduce_place(levels);
+
+    module_name = "bsg_rp_"+tech.fab+"_reduce_"+op+"_b"+str(bits);
+    group_name = op+"r_b"+str(bits);
+
+    emit_line("// " + module_name + ": depth " + str(reduce_depth(levels)) + " (" + reduce_describe(levels)
+              + "), " + str(reduce_num_gates(levels)) + " gates");
+    emit_line("module "+module_name+" (input ["+str(bits-1)+":0] i, output o);")
+    for l in range(0,len(levels)-1) :
+        emit_line("wire ["+str(len(levels[l])-1)+":0] l"+str(l+1)+";")
+    emit_rp_group_begin(group_name)
+
+    for level in levels :
+        for g in level :
+            if (g["cell"] is None) :
+                continue;
+            emit_rp_fill("0 " + str(g["row"]) + " UX");
+            emit_gate_instance(tech.cell("reduce",g["cell"],orient=False)
+                               , [ "r" + str(g["level"]) + "_b" + str(g["lo"]) + "_" + str(g["hi"]) ]
+                               + [ k["name"] for k in g["kids"] ]
+                               + [ g["name"] ]
+                               );
+
+    emit_rp_group_end(group_name)
+    emit_module_footer()
+
+def generate_reduce ( tech, widths=None, op="and" ) :
+    if widths is None :
+        widths = reduce_default_widths
+    for bits in widths :
+        emit_line()
+        generate_reduce_tree(tech,op,bits)
+
+# the depth and gate count of each width, one per line
+def reduce_depth_report ( op, widths ) :
+    lines = ["%5s %5s %5s  %s" % ("bits", "depth", "gates", "levels")];
+    for bits in widths :
+        levels = reduce_tree(op, bits);
+        lines.append("%5d %5d %5d  %s" % (bits, reduce_depth(levels), reduce_num_gates(levels), reduce_describe(levels)));
+    return lines;
+
+def reduce_gen_main ( tech, argv ) :
+    args = argv[1:]
+    report = (args[:1] == ["depth"])
+    if report :
+        args = args[1:]
+    op = "and"
+    if args[:1] and args[0] in reduce_ops :
+        op = args[0]
+        args = args[1:]
+    if not all([x.isdigit() for x in args]) :
+        print("Usage: " + argv[0] + " [and|or|xor] [bits...]        # default and " + " ".join([str(x) for x in reduce_default_widths]))
+        print("       " + argv[0] + " depth [and|or|xor] [bits...]  # logic depth per width, default 2.." + str(reduce_max_bits))
+        return
+    widths = [int(x) for x in args]
+    if report :
+        for line in reduce_depth_report(op, widths or range(2,reduce_max_bits+1)) :
+            print(line)
+    else :
+        generate_reduce(tech, widths or None, op)
@@ -0,0 +1,812 @@
+#
+# bsg_rp_mul.py
+#
+# The hardened blocks of the radix-4 booth multiplier (see
+# bsg_misc/bsg_mul_pipelined.v, and hard/<pdk>/bsg_misc/bsg_mul/README),
+# and a composer that builds a whole multiplier out of them, driven by a
+# per-PDK cell table (see bsg_rp_tech.py).
+#
+#   booth_4_block: per bit, four rows of booth partial product dots
+#                  summed by a 4:2 compressor
+#   comp42_block:  a row of 4:2 compressors
+#   and_csa_block: a row of carry save adders, one input of which is
+#                  an and; used for the last (unsigned only) row of
+#                  partial products
+#
+# Each block is one rp_group, with one row of cells per bit (two for the
+# booth and 4:2 blocks).
+#
+
+from __future__ import print_function
+
+import itertools
+import math
+
+from bsg_netlist import *
+from bsg_rp_tech import *
+
+# NOTE: for symmetric pins, assume that earlier ones are always faster.
+# For example, for AOI22  A's are faster than B's and A0 is faster than A1.
+# fixme: the code currently assumes that the A input of ADDFHX's are the slowest
+# input, which is true in TSMC. We should fix the code so that we swizzle
+# the order in the below string, rather than in the code base, which is
+# just confusing.
+
+def mul_sdn_bit ( word, bit ) :
+    return "SDN_i[" + str(word * 3 + bit) + "]" + "/*SDN_i[" + str(word) + "][" + str(bit) + "]" + "*/";
+
+def mul_y_vec_bit ( dof, word, bit ) :
+    return "y_vec_i[" + str(2*(dof*4+word)+bit)+ "] /*y_vec_i[" + str(dof) + "][" + str(word) + "][" + str(bit) + "]" + "*/";
+
+def mul_i_bit ( word, bit, rows ) :
+    return "i[" + str(word * rows + bit) + "]" + "/*i[" + str(word) + "][" + str(bit) + "]" + "*/";
+
+#
+# bsg_booth_4_block_gen
+#
+# slots[pos][r] is what goes into row r of bit pos, named as in the
+# parameters of bsg_mul_booth_4_block:
+#
+#   dot:     the booth dot of y_vec_i[pos][r] and SDN_i[r+1]
+#   dot_bar: its inverse
+#   S_above: the N of the row above, SDN_i[r][0]
+#   B:       0
+#   one:     1
+#
+# the default is all dots, which is bsg_rp_<fab>_booth_4_block_b<rows>.
+#
+#   AOI22 (3)  XNOR2 (2) CSA   AOI22 (1)   XNOR2 (0)
+#   XNOR2 (3)  AOI22 (2) CSA   XNOR2 (1)   AOI22 (0)
+#
+
+def generate_booth_4_block ( tech, rows, slots=None, module_name=None ) :
+    if module_name is None :
+        module_name = ident_name_bit("bsg_rp_"+tech.fab+"_booth_4_block",rows);
+    if slots is None :
+        slots = [["dot"]*4]*rows;
+
+    aoi22 = tech.cell("mul","aoi22",orient=False);
+    xnor2 = tech.cell("mul","xnor2",orient=False);
+    xor2  = tech.cell("mul","xor2",orient=False);
+    addf  = tech.cell("mul","addf",orient=False);
+
+    emit_module_header (module_name
+                        , [  param_bits_all("SDN_i",5*3) + " /*" + param_bits_2D_all("SDN_i",5,3)+ "*/"
+                            , "cr_i"
+                            , param_bits_all("y_vec_i",rows*4*2) + " /*" + param_bits_3D_all("y_vec_i",rows,4,2) + "*/"
+                            ]
+                        , [ "cl_o", param_bits_all("c_o",rows), param_bits_all("s_o",rows)]
+                        );
+
+    emit_rp_group_begin("b4b")
+
+    for pos in range (0,rows) :
+        emit_line("")
+        emit_line("wire " + ",".join([ident_name_word_bit("pp",pos,b) for b in range(0,4)])+";")
+        emit_line("wire " + ",".join([ident_name_word_bit("aoi",pos,b) for b in range(0,4)])+";")
+        emit_line("wire " + ",".join([ident_name_word_bit("cl",pos,b) for b in range(0,1)])+";")
+        emit_line("wire " + ",".join([ident_name_word_bit("s0",pos,b) for b in range(0,1)])+";")
+
+        def aoi ( r ) :
+            if slots[pos][r] in ("dot", "dot_bar") :
+                emit_gate_instance(aoi22
+                                   , [ ident_name_word_bit ("aoi2"    ,pos,r)
+                                       , mul_sdn_bit        (r+1,1)
+                                       , mul_y_vec_bit      (pos,r,0)
+                                       , mul_sdn_bit        (r+1,2)
+                                       , mul_y_vec_bit      (pos,r,1)
+                                       , ident_name_word_bit("aoi"     ,pos,r)
+                                       ]);
+
+        def xnor ( r ) :
+            if slots[pos][r] == "dot" :
+                emit_gate_instance(xnor2
+                                   , [ ident_name_word_bit ("xnor2"   ,pos ,r)
+                                       , ident_name_word_bit("aoi"     ,pos ,r)
+                                       , mul_sdn_bit        (r+1,0)
+                                       , ident_name_word_bit("pp"      ,pos ,r)
+                                       ]);
+            elif slots[pos][r] == "dot_bar" :
+                emit_gate_instance(xor2
+                                   , [ ident_name_word_bit ("xor2"    ,pos ,r)
+                                       , ident_name_word_bit("aoi"     ,pos ,r)
+                                       , mul_sdn_bit        (r+1,0)
+                                       , ident_name_word_bit("pp"      ,pos ,r)
+                                       ]);
+
+        def pp ( r ) :
+            kind = slots[pos][r];
+            if kind in ("dot", "dot_bar") :
+                return ident_name_word_bit("pp", pos, r);
+            if kind == "S_above" :
+                return mul_sdn_bit(r,0);
+            if kind == "one" :
+                return "1'b1";
+            return "1'b0";
+
+        emit_rp_fill("0 " + str(pos*2) + " RX");
+
+        xnor(3);
+        aoi(2);
+        emit_gate_instance(addf
+                           , [ ident_name_word_bit("add42", pos, 0)
+                               , pp(3)
+                               , pp(2)
+                               , pp(1)
+                               , ident_name_word_bit("s0", pos, 0)
+                               , ident_name_word_bit("cl", pos, 0) if (pos < rows-1) else "cl_o"
+                               ]);
+        xnor(1);
+        aoi(0);
+
+        emit_rp_fill("0 " + str(pos*2+1) + " RX");
+
+        aoi(3);
+        xnor(2);
+        emit_gate_instance(addf
+                           , [ ident_name_word_bit("add42", pos, 1)
+                               , pp(0)
+                               , ident_name_word_bit("s0", pos, 0)
+                               , ident_name_word_bit("cl", pos-1,0) if (pos > 0) else "cr_i"
+                               , access_bit("s_o", pos)
+                               , access_bit("c_o", pos)
+                               ]);
+        aoi(1);
+        xnor(0);
+
+    emit_rp_group_end("b4b")
+    emit_module_footer()
+
+def booth_4_block_gen_main ( tech, argv ) :
+    if len(argv) == 2 :
+        generate_booth_4_block (tech, int(argv[1]));
+    else :
+        print("Usage: " + argv[0] + " rows")
+
+#
+# bsg_comp42_gen
+#
+
+def generate_comp42_block ( tech, rows, module_name=None ) :
+    if module_name is None :
+        module_name = ident_name_bit("bsg_rp_"+tech.fab+"_comp42_block",rows);
+    addf = tech.cell("mul","addf",orient=False);
+
+    emit_module_header (module_name
+                        , [  param_bits_all("i",4*rows) + " /*" + param_bits_2D_all("i",4,rows)+ "*/"
+                            , "cr_i"
+                            ]
+                        , [ "cl_o", param_bits_all("c_o",rows), param_bits_all("s_o",rows)]
+                        );
+
+    emit_rp_group_begin("c42")
+
+    for pos in range (0,rows) :
+        emit_line("")
+        emit_line("wire " + ident_name_bit("s_int",pos) +";")
+        emit_line("wire " + ident_name_bit("cl_int",pos)+";")
+
+        emit_rp_fill("0 " + str(pos*2) + " UX");
+
+        emit_gate_instance(addf
+                           , [ ident_name_word_bit("add42", pos, 0)
+                               , mul_i_bit(3, pos, rows)
+                               , mul_i_bit(2, pos, rows)
+                               , mul_i_bit(1, pos, rows)
+                               , ident_name_bit("s_int", pos)
+                               , "cl_o" if (pos == rows-1) else ident_name_bit("cl_int",pos)
+                               ]);
+
+        # insert ADDF here
+        emit_gate_instance(addf
+                           , [ ident_name_word_bit("add42", pos, 1)
+                               , mul_i_bit(0, pos, rows)
+                               , ident_name_bit("s_int", pos)
+                               , ident_name_bit("cl_int" ,pos-1) if (pos > 0) else "cr_i"
+                               , access_bit("s_o", pos)
+                               , access_bit("c_o", pos)
+                               ]);
+
+    emit_rp_group_end("c42")
+    emit_module_footer()
+
+def comp42_gen_main ( tech, argv ) :
+    if len(argv) == 2 :
+        generate_comp42_block (tech, int(argv[1]));
+    else :
+        print("Usage: " + argv[0] + " rows")
+
+#
+# bsg_and_csa_gen
+#
+
+def generate_and_csa_block ( tech, rows, module_name=None ) :
+    if module_name is None :
+        module_name = ident_name_bit("bsg_rp_"+tech.fab+"_and_csa_block",rows);
+    and2 = tech.cell("mul","and2",orient=False);
+    addf = tech.cell("mul","addf",orient=False);
+
+    emit_module_header (module_name
+                        , [  param_bits_all("x_i",rows)
+                             , param_bits_all("y_i",rows)
+                             , param_bits_all("z_and1_i",rows)
+                             , param_bits_all("z_and2_i",rows)
+                            ]
+                        , [ param_bits_all("c_o",rows), param_bits_all("s_o",rows)]
+                        );
+
+    emit_rp_group_begin("and_csa")
+
+    for pos in range (0,rows) :
+
+        emit_rp_fill("0 " + str(pos*2) + " UX");
+        emit_line("wire " + ident_name_bit("and_int",pos) + ";")
+
+        emit_gate_instance(addf
+                           , [ ident_name_word_bit("csa", pos, 0)
+                               # fastest input first
+                               , ident_name_bit("and_int",pos)
+                               , access_bit("x_i", pos)
+                               , access_bit("y_i", pos)
+                               , access_bit("s_o", pos)
+                               , access_bit("c_o", pos)
+                               ]);
+
+        # insert ADDF here
+        emit_gate_instance(and2
+                           , [ ident_name_word_bit("and", pos, 0)
+                               , access_bit("z_and1_i", pos)
+                               , access_bit("z_and2_i", pos)
+                               , ident_name_bit("and_int", pos)
+                               ]);
+
+    emit_rp_group_end("and_csa")
+    emit_module_footer()
+
+def and_csa_gen_main ( tech, argv ) :
+    if len(argv) == 2 :
+        generate_and_csa_block(tech, int(argv[1]));
+    else :
+        print("Usage: " + argv[0] + " rows")
+
+#
+# bsg_mul_gen
+#
+# A whole width x width multiplier (signed or unsigned, picked by
+# signed_i) composed from the blocks above; width is a multiple of 8.
+#
+#   booth:  the width/2 booth rows, in groups of four, each group summed
+#           by a row of booth_4_blocks; plus the neg bit of the last row
+#           and (for unsigned) the width/2'th row, which is just an and
+#           (the "green" row).
+#   c42_n:  4:2 compressor rows, four vectors to two, until two are left
+#   csa:    one row of and_csa_blocks adds in the green row
+#   cpa:    sum_a + sum_b
+#
+# Columns that are down to two bits leave the array as soon as they can,
+# straight for the final adder. Every row is split into blocks of at most
+# mul_block_rows bits, chained by the lateral carry.
+#
+# The sign extension uses the usual constant-folded prefixes: the
+# partial product of row i has its sign bit E at width+1, and gets
+# E E ~E on top for row 0, and ~E 1 for the others.
+#
+# mul_timing in the cell table gives rough per-cell delays (ps); they are
+# used to order the 4:2 inputs (latest to i[0]) and to place the pipeline
+# registers, cutting at the stage boundaries that give the shortest
+# worst stage.
+#
+
+mul_block_rows = 8;
+
+def mul_timing_model ( tech ) :
+    assert ("mul_timing" in tech.table), "no mul_timing delay model in tech " + tech.name;
+    return tech.table["mul_timing"];
+
+def mul_module_name ( tech, width, pipeline ) :
+    return "bsg_rp_" + tech.fab + "_mul_" + str(width) + "_" + str(width) + "_p" + str(pipeline);
+
+# split columns lo..hi into balanced blocks of at most mul_block_rows
+def mul_blocks ( lo, hi ) :
+    n = hi - lo + 1;
+    k = (n + mul_block_rows - 1) // mul_block_rows;
+    blocks = [];
+    for j in range(0,k) :
+        rows = n // k + (1 if j < n % k else 0);
+        blocks.append((lo, lo+rows-1));
+        lo = lo + rows;
+    return blocks;
+
+# what booth row i puts in column c, as a booth_4_block slot
+def mul_booth_slot ( width, i, c ) :
+    k = c - 2*i;
+    if (k == -2 and i > 0) :
+        return "S_above";
+    if (0 <= k <= width) :
+        return "dot";
+    if (k == width+1) :
+        return "dot" if (i == 0) else "dot_bar";
+    if (k == width+2) :
+        return "dot" if (i == 0) else "one";
+    if (k == width+3 and i == 0) :
+        return "dot_bar";
+    return "B";
+
+# bit k of the sign extended y, as seen by a booth dot
+def mul_y_bit ( width, k ) :
+    if (k < 0) :
+        return "1'b0";
+    return access_bit("y_ext", min(k, width));
+
+def mul_bit ( expr, t ) :
+    return { "expr" : expr, "t" : t };
+
+def mul_const ( expr ) :
+    return { "expr" : expr, "t" : 0, "const" : True };
+
+def mul_concat ( exprs ) :
+    return "{" + ", ".join(reversed(exprs)) + "}";
+
+# arrival times through a row of 4:2 compressors (booth or comp42 block);
+# ins[pos] = [i0, i1, i2, i3], i0 being the input of the second adder
+def mul_c42_timing ( model, ins, t_cr ) :
+    s = [];
+    c = [];
+    t_cl = t_cr;
+    for i in ins :
+        t0 = max(i[1:]);
+        t1 = max(i[0], t0 + model["addf_s"], t_cl);
+        t_cl = t0 + model["addf_co"];
+        s.append(t1 + model["addf_s"]);
+        c.append(t1 + model["addf_co"]);
+    return (s, c, t_cl);
+
+def mul_emit ( m, line ) :
+    m["lines"].append(line);
+
+def mul_module ( m, key, name, fn, args ) :
+    if key not in m["modules"] :
+        m["modules"][key] = (name, fn, args);
+        m["module_order"].append(key);
+    return m["modules"][key][0];
+
+def mul_count ( m, cell, n=1 ) :
+    m["cells"][cell] = m["cells"].get(cell, 0) + n;
+
+# max arrival of the bits that are still live
+def mul_live ( m ) :
+    bits = [];
+    seen = set();
+    groups = [m["retired"][c] for c in sorted(m["retired"].keys())];
+    groups = groups + [[v[c] for c in sorted(v.keys())] for v in m["vectors"]];
+    groups.append([m["green_plain"][c] for c in sorted(m["green_plain"].keys())]);
+    groups.append([b for c in sorted(m["green_and"].keys()) for b in m["green_and"][c]]);
+    for g in groups :
+        for b in g :
+            if (not b.get("const") and id(b) not in seen) :
+                seen.add(id(b));
+                bits.append(b);
+    return bits;
+
+def mul_end_stage ( m, name, rows ) :
+    bits = mul_live(m);
+    t = max([b["t"] for b in bits] + [0]);
+    stage = { "name" : name, "rows" : rows, "t" : t, "reg" : 0 };
+    m["stages"].append(stage);
+    if name in m["cuts"] :
+        k = len([s for s in m["stages"] if s["reg"]]);
+        q = "pipe" + str(k) + "_q";
+        mul_emit(m, "");
+        mul_emit(m, "wire " + param_bits_all(q, len(bits)) + ";");
+        mul_emit(m, "bsg_dff_en #(.width_p(" + str(len(bits)) + "), .harden_p(1)) pipe" + str(k));
+        mul_emit(m, "  (.clk_i(clk_i), .en_i(en_i), .data_o(" + q + ")");
+        mul_emit(m, "   ,.data_i(" + mul_concat([b["expr"] for b in bits]) + ")");
+        mul_emit(m, "   );");
+        for (j, b) in enumerate(bits) :
+            b["expr"] = access_bit(q, j);
+            b["t"] = m["model"]["dff_clk_q"];
+        stage["reg"] = len(bits);
+
+# columns from the bottom with at most two bits go straight to the final adder
+def mul_retire ( m ) :
+    c = m["retire_col"];
+    while c < 2*m["width"] and c not in m["green_and"] :
+        bits = [v[c] for v in m["vectors"] if c in v];
+        if c in m["green_plain"] :
+            bits.append(m["green_plain"][c]);
+        if len(bits) > 2 :
+            break;
+        m["retired"][c] = bits;
+        for v in m["vectors"] :
+            v.pop(c, None);
+        m["green_plain"].pop(c, None);
+        c = c + 1;
+    m["retire_col"] = c;
+    m["vectors"] = [v for v in m["vectors"] if v];
+
+def mul_booth_stage ( m ) :
+    width = m["width"];
+    model = m["model"];
+    tech = m["tech"];
+    rows = width // 2;
+    t_sdn = model["booth_encode"];
+
+    mul_emit(m, "");
+    mul_emit(m, "// booth encoding; the last row only exists for unsigned");
+    mul_emit(m, "wire " + param_bits_all("x_pad", width+3) + " = { 2'b0, x_i, 1'b0 };");
+    mul_emit(m, "wire " + param_bits_all("y_ext", width+1) + " = { y_i[" + str(width-1) + "] & signed_i, y_i };");
+    mul_emit(m, "wire [" + str(rows) + ":0][2:0] SDN;");
+    mul_emit(m, "");
+    for i in range(0,rows+1) :
+        trip = "x_pad[" + str(2*i+2) + ":" + str(2*i) + "]";
+        if (i == rows) :
+            trip = trip + " & ~{ 3 { signed_i } }";
+        mul_emit(m, "wire [2:0] trip_" + str(i) + " = " + trip + ";");
+        mul_emit(m, "assign SDN[" + str(i) + "][0] = trip_" + str(i) + "[2];");
+        mul_emit(m, "assign SDN[" + str(i) + "][1] = (trip_" + str(i) + "[1] & trip_" + str(i) + "[0] & ~trip_" + str(i) + "[2]) | (~trip_" + str(i) + "[1] & ~trip_" + str(i) + "[0] & trip_" + str(i) + "[2]);");
+        mul_emit(m, "assign SDN[" + str(i) + "][2] = trip_" + str(i) + "[0] ^ trip_" + str(i) + "[1];");
+
+    for g in range(0,rows//4) :
+        cols = [c for c in range(0,2*width)
+                if [r for r in range(0,4) if mul_booth_slot(width,4*g+r,c) != "B"]];
+        s_vec = {};
+        c_vec = {};
+        cr = mul_const("1'b0");
+        for (j, (lo, hi)) in enumerate(mul_blocks(cols[0], cols[-1])) :
+            n = hi - lo + 1;
+            inst = "brr" + str(g) + "_c" + str(j);
+            slots = [[mul_booth_slot(width,4*g+r,c) for r in range(0,4)] for c in range(lo,hi+1)];
+            if [s for s in slots if s != ["dot"]*4] :
+                key = ("booth", n, tuple(tuple(s) for s in slots));
+                name = m["top"] + "_booth_4_block_g" + str(g) + "_c" + str(j) + "_b" + str(n);
+            else :
+                key = ("booth", n);
+                name = m["top"] + "_booth_4_block_b" + str(n);
+            name = mul_module(m, key, name, generate_booth_4_block, (tech, n, slots, name));
+
+            y_vec = [];
+            ins = [];
+            for (pos, c) in enumerate(range(lo,hi+1)) :
+                t_pp = [];
+                for r in range(0,4) :
+                    kind = slots[pos][r];
+                    k = c - 2*(4*g+r);
+                    if kind in ("dot", "dot_bar") :
+                        y_vec = y_vec + [mul_y_bit(width,k-1), mul_y_bit(width,k)];
+                        t_pp.append(t_sdn + model["aoi22"] + model["xnor2" if kind == "dot" else "xor2"]);
+                        mul_count(m, "aoi22");
+                        mul_count(m, "xnor2" if kind == "dot" else "xor2");
+                    else :
+                        y_vec = y_vec + ["1'b0", "1'b0"];
+                        t_pp.append(t_sdn if kind == "S_above" else 0);
+                ins.append(t_pp);
+                mul_count(m, "addf", 2);
+            (t_s, t_c, t_cl) = mul_c42_timing(model, ins, cr["t"]);
+
+            sdn = [access_bit("SDN", 4*g+r) for r in range(0,4)];
+            sdn = sdn + [access_bit("SDN", 4*g-1) if g > 0 else "3'b000"];
+            mul_emit(m, "");
+            mul_emit(m, "wire " + param_bits_all(inst + "_s", n) + ", " + inst + "_c;");
+            mul_emit(m, "wire " + inst + "_cl;");
+            mul_emit(m, name + " " + inst);
+            mul_emit(m, "  (.SDN_i(" + mul_concat(sdn[-1:] + sdn[:-1]) + ")");
+            mul_emit(m, "   ,.cr_i(" + cr["expr"] + ")");
+            mul_emit(m, "   ,.y_vec_i(" + mul_concat(y_vec) + ")");
+            mul_emit(m, "   ,.cl_o(" + inst + "_cl), .c_o(" + inst + "_c), .s_o(" + inst + "_s)");
+            mul_emit(m, "   );");
+            m["rows"].append({ "inst" : inst, "kind" : "booth", "cell" : "add42_w0_b0", "lo" : lo, "row" : "brr" + str(g) });
+
+            for (pos, c) in enumerate(range(lo,hi+1)) :
+                s_vec[c] = mul_bit(access_bit(inst + "_s", pos), t_s[pos]);
+                if (c+1 < 2*width) :
+                    c_vec[c+1] = mul_bit(access_bit(inst + "_c", pos), t_c[pos]);
+            cr = mul_bit(inst + "_cl", t_cl);
+        if (cols[-1]+1 < 2*width) :
+            s_vec[cols[-1]+1] = cr;
+        m["vectors"] = m["vectors"] + [s_vec, c_vec];
+        m["producer"] = m["producer"] + ["brr" + str(g), "brr" + str(g)];
+
+    # the neg bit of the last booth row, and the unsigned-only row
+    m["green_plain"][width-2] = mul_bit(access_bit(access_bit("SDN", rows-1), 0), t_sdn);
+    s_last = mul_bit(access_bit(access_bit("SDN", rows), 2), t_sdn);
+    for k in range(0,width) :
+        m["green_and"][width+k] = [s_last, mul_bit(access_bit("y_i", k), 0)];
+
+    mul_retire(m);
+    mul_end_stage(m, "booth", rows//4);
+
+# one row of 4:2 compressors, reducing ins (up to four vectors) to two
+def mul_c42_row ( m, ins, name ) :
+    width = m["width"];
+    model = m["model"];
+    cols = sorted(set([c for v in ins for c in v.keys()]));
+    s_vec = {};
+    c_vec = {};
+    cr = mul_const("1'b0");
+    for (j, (lo, hi)) in enumerate(mul_blocks(cols[0], cols[-1])) :
+        n = hi - lo + 1;
+        inst = name + "_c" + str(j);
+        module = mul_module(m, ("c42", n), m["top"] + "_comp42_block_b" + str(n), generate_comp42_block, (m["tech"], n, m["top"] + "_comp42_block_b" + str(n)));
+
+        bits = [];
+        for c in range(lo,hi+1) :
+            col = [v[c] for v in ins if c in v];
+            col = col + [mul_const("1'b0")] * (4 - len(col));
+            # latest first, into the second adder
+            bits.append(sorted(col, key=lambda b: -b["t"]));
+        mul_count(m, "addf", 2*n);
+        (t_s, t_c, t_cl) = mul_c42_timing(model, [[b["t"] for b in col] for col in bits], cr["t"]);
+
+        i_vec = [bits[pos][w]["expr"] for w in range(0,4) for pos in range(0,n)];
+        mul_emit(m, "");
+        mul_emit(m, "wire " + param_bits_all(inst + "_s", n) + ", " + inst + "_c;");
+        mul_emit(m, "wire " + inst + "_cl;");
+        mul_emit(m, module + " " + inst);
+        mul_emit(m, "  (.i(" + mul_concat(i_vec) + ")");
+        mul_emit(m, "   ,.cr_i(" + cr["expr"] + ")");
+        mul_emit(m, "   ,.cl_o(" + inst + "_cl), .c_o(" + inst + "_c), .s_o(" + inst + "_s)");
+        mul_emit(m, "   );");
+        m["rows"].append({ "inst" : inst, "kind" : "c42", "cell" : "add42_w0_b1", "lo" : lo, "row" : name });
+
+        for (pos, c) in enumerate(range(lo,hi+1)) :
+            s_vec[c] = mul_bit(access_bit(inst + "_s", pos), t_s[pos]);
+            if (c+1 < 2*width) :
+                c_vec[c+1] = mul_bit(access_bit(inst + "_c", pos), t_c[pos]);
+        cr = mul_bit(inst + "_cl", t_cl);
+    if (cols[-1]+1 < 2*width) :
+        s_vec[cols[-1]+1] = cr;
+    return [s_vec, c_vec];
+
+def mul_c42_stages ( m ) :
+    level = 0;
+    while len(m["vectors"]) > 2 :
+        vectors = [];
+        producer = [];
+        for (idx, j) in enumerate(range(0,len(m["vectors"]),4)) :
+            ins = m["vectors"][j:j+4];
+            if (len(ins) <= 2) :
+                vectors = vectors + ins;
+                producer = producer + m["producer"][j:j+4];
+                continue;
+            name = "crr" + str(level) + "_" + str(idx);
+            vectors = vectors + mul_c42_row(m, ins, name);
+            producer = producer + [name, name];
+            m["tree"][name] = m["producer"][j:j+4];
+        m["vectors"] = vectors;
+        m["producer"] = producer;
+        mul_retire(m);
+        mul_end_stage(m, "c42_" + str(level), len(set(producer)));
+        level = level + 1;
+
+# the last two vectors and the green row, through one row of and_csa blocks
+def mul_csa_stage ( m ) :
+    width = m["width"];
+    model = m["model"];
+    vectors = m["vectors"] + [{}] * (2 - len(m["vectors"]));
+    plain = m["green_plain"];
+    ands = m["green_and"];
+
+    m["tree"]["csa"] = m["producer"];
+    cols = [c for c in range(m["retire_col"],2*width)
+            if (c in ands or len([v for v in vectors if c in v]) + (c in plain) > 2)];
+    lo = cols[0] if cols else 2*width;
+    final = dict((c, list(m["retired"][c])) for c in m["retired"]);
+    for c in range(m["retire_col"],lo) :
+        final[c] = [v[c] for v in vectors if c in v] + ([plain[c]] if c in plain else []);
+
+    for (j, (blo, bhi)) in enumerate(mul_blocks(lo, 2*width-1) if lo < 2*width else []) :
+        n = bhi - blo + 1;
+        inst = "csa_c" + str(j);
+        module = mul_module(m, ("and_csa", n), m["top"] + "_and_csa_block_b" + str(n), generate_and_csa_block, (m["tech"], n, m["top"] + "_and_csa_block_b" + str(n)));
+        x = [];
+        y = [];
+        z1 = [];
+        z2 = [];
+        for c in range(blo,bhi+1) :
+            (a, b) = [v.get(c, mul_const("1'b0")) for v in vectors];
+            if c in ands :
+                z = ands[c];
+            elif c in plain :
+                z = [plain[c], mul_const("1'b1")];
+            else :
+                z = [mul_const("1'b0"), mul_const("1'b0")];
+            t_and = max(z[0]["t"], z[1]["t"]) + model["and2"];
+            t = max(t_and, a["t"], b["t"]);
+            x.append(a["expr"]);
+            y.append(b["expr"]);
+            z1.append(z[0]["expr"]);
+            z2.append(z[1]["expr"]);
+            pos = c - blo;
+            final.setdefault(c, []).append(mul_bit(access_bit(inst + "_s", pos), t + model["addf_s"]));
+            if (c+1 < 2*width) :
+                final.setdefault(c+1, []).append(mul_bit(access_bit(inst + "_c", pos), t + model["addf_co"]));
+        mul_count(m, "addf", n);
+        mul_count(m, "and2", n);
+
+        mul_emit(m, "");
+        mul_emit(m, "wire " + param_bits_all(inst + "_s", n) + ", " + inst + "_c;");
+        mul_emit(m, module + " " + inst);
+        mul_emit(m, "  (.x_i(" + mul_concat(x) + ")");
+        mul_emit(m, "   ,.y_i(" + mul_concat(y) + ")");
+        mul_emit(m, "   ,.z_and1_i(" + mul_concat(z1) + ")");
+        mul_emit(m, "   ,.z_and2_i(" + mul_concat(z2) + ")");
+        mul_emit(m, "   ,.c_o(" + inst + "_c), .s_o(" + inst + "_s)");
+        mul_emit(m, "   );");
+        m["rows"].append({ "inst" : inst, "kind" : "csa", "cell" : "csa_w0_b0", "lo" : blo, "row" : "csa" });
+
+    assert (max([len(b) for b in final.values()]) <= 2), "more than two bits left for the final adder";
+    m["vectors"] = [dict((c, final[c][w]) for c in final if len(final[c]) > w) for w in (0,1)];
+    m["retired"] = {};
+    m["green_plain"] = {};
+    m["green_and"] = {};
+    mul_end_stage(m, "csa", 1);
+
+def mul_cpa_stage ( m ) :
+    width = m["width"];
+    for (w, name) in enumerate(("sum_a", "sum_b")) :
+        v = m["vectors"][w];
+        mul_emit(m, "");
+        mul_emit(m, "wire " + param_bits_all(name, 2*width) + " = "
+                 + mul_concat([v[c]["expr"] if c in v else "1'b0" for c in range(0,2*width)]) + ";");
+    mul_emit(m, "");
+    mul_emit(m, "assign z_o = sum_a + sum_b;");
+    t = max([b["t"] for v in m["vectors"] for b in v.values()] + [0]);
+    levels = int(math.ceil(math.log(2*width, 2)));
+    m["stages"].append({ "name" : "cpa", "rows" : 0, "t" : t + m["model"]["cpa_level"] * levels, "reg" : 0 });
+
+# compose the multiplier, registering after the stages named in cuts
+def mul_compose ( tech, width, cuts=(), pipeline=None ) :
+    assert (width % 8 == 0 and width >= 8), "the multiplier width must be a multiple of 8";
+    if pipeline is None :
+        pipeline = len(cuts);
+    m = { "tech" : tech, "width" : width, "model" : mul_timing_model(tech)
+        , "top" : mul_module_name(tech, width, pipeline), "pipeline" : pipeline, "cuts" : set(cuts)
+        , "lines" : [], "modules" : {}, "module_order" : [], "cells" : {}, "rows" : []
+        , "stages" : [], "vectors" : [], "producer" : [], "tree" : {}
+        , "retired" : {}, "retire_col" : 0, "green_plain" : {}, "green_and" : {}
+        };
+    mul_booth_stage(m);
+    mul_c42_stages(m);
+    mul_csa_stage(m);
+    mul_cpa_stage(m);
+    return m;
+
+# worst stage delay of a pipeline; t is the arrival at the end of each stage
+# of an unregistered multiplier, cut the stages after which to register
+def mul_worst_stage ( model, t, cut ) :
+    bounds = [-1] + cut + [len(t)-1];
+    worst = 0;
+    for j in range(1,len(bounds)) :
+        start = t[bounds[j-1]] - model["dff_clk_q"] if bounds[j-1] >= 0 else 0;
+        d = t[bounds[j]] - start + (model["dff_setup"] if bounds[j] != len(t)-1 else 0);
+        worst = max(worst, d);
+    return worst;
+
+def mul_choose_cuts ( tech, width, pipeline ) :
+    stages = mul_compose(tech, width)["stages"];
+    names = [s["name"] for s in stages[:-1]];
+    if (pipeline > len(names)) :
+        raise ValueError("a " + str(width) + " bit multiplier has at most " + str(len(names)) + " pipeline stages");
+    model = mul_timing_model(tech);
+    t = [s["t"] for s in stages];
+    best = None;
+    for cut in itertools.combinations(range(0,len(names)), pipeline) :
+        worst = mul_worst_stage(model, t, list(cut));
+        if (best is None or worst < best[0]) :
+            best = (worst, cut);
+    return [names[j] for j in best[1]];
+
+def mul_report ( m ) :
+    width = m["width"];
+    model = m["model"];
+    stages = m["stages"];
+    lines = [ "// " + m["top"] + ": " + str(width) + "x" + str(width) + " radix-4 booth multiplier, signed_i selects signed"
+            , "//   " + str(width//2) + " booth rows in " + str(width//8) + " groups of 4, plus the unsigned-only row"
+            , "//   %-8s %5s %9s %9s" % ("stage", "rows", "arrival", "registers")
+            ];
+    path = 0;
+    for s in stages :
+        lines.append("//   %-8s %5d %9d %9s" % (s["name"], s["rows"], s["t"], str(s["reg"]) if s["reg"] else "-"));
+        path = max(path, s["t"] + (model["dff_setup"] if s["reg"] else 0));
+    cells = ", ".join([str(m["cells"][c]) + " " + c for c in sorted(m["cells"].keys())]);
+    lines.append("//   " + str(len(m["rows"])) + " blocks of " + str(len(m["modules"])) + " kinds; " + cells);
+    lines.append("//   " + str(sum([s["reg"] for s in stages])) + " register bits; estimated critical path " + str(path) + " ps");
+    return lines;
+
+def generate_mul ( tech, width, pipeline=0 ) :
+    m = mul_compose(tech, width, mul_choose_cuts(tech, width, pipeline), pipeline);
+    for key in m["module_order"] :
+        (name, fn, args) = m["modules"][key];
+        fn(*args);
+        emit_line("");
+    for line in mul_report(m) :
+        emit_line(line);
+    emit_module_header (m["top"]
+                        , [ "clk_i", "en_i"
+                            , param_bits_all("x_i", width)
+                            , param_bits_all("y_i", width)
+                            , "signed_i"
+                            ]
+                        , [ param_bits_all("z_o", 2*width) ]
+                        );
+    for line in m["lines"] :
+        emit_line(line);
+    emit_line("");
+    emit_module_footer();
+
+#
+# placement of the blocks, in the style of bsg_place_mul_32_32.tcl: one
+# column per row of blocks, in order of the tree so that each 4:2 row sits
+# between its inputs, with the first booth group on the right and the
+# csa row on the left; blocks go up the column in bit order.
+#
+
+def mul_place_order ( m, name ) :
+    if name not in m["tree"] :
+        return [name];
+    kids = [];
+    for k in m["tree"][name] :
+        if k not in kids :
+            kids.append(k);
+    half = (len(kids) + 1) // 2;
+    order = [];
+    for k in kids[:half] :
+        order = order + mul_place_order(m, k);
+    if name == "csa" :
+        return order + [o for k in kids[half:] for o in mul_place_order(m, k)] + [name];
+    order.append(name);
+    for k in kids[half:] :
+        order = order + mul_place_order(m, k);
+    return order;
+
+def mul_place_tcl ( m ) :
+    order = mul_place_order(m, "csa");
+    columns = len(order);
+    used = set();
+    places = [];
+    for r in m["rows"] :
+        col = columns - 1 - order.index(r["row"]);
+        row = (r["lo"] + mul_block_rows // 2) // mul_block_rows;
+        while (col, row) in used :
+            row = row + 1;
+        used.add((col, row));
+        places.append((r, col, row));
+    rows = max([p[2] for p in places]) + 1;
+
+    proc = "bsg_place_mul_" + str(m["width"]) + "_" + str(m["width"]) + "_p" + str(m["pipeline"]);
+    lines = [ "proc " + proc + " { prefix rp_group_name } {"
+            , "    set sep \"_\""
+            , ""
+            , "    create_rp_group $rp_group_name -design bsg_chip -columns " + str(columns) + " -rows " + str(rows)
+            ];
+    for (r, col, row) in places :
+        lines.append("");
+        lines.append("    set group [get_attribute [get_cell ${prefix}${sep}" + r["inst"] + "/" + r["cell"] + "] rp_group_name]");
+        if r["kind"] == "booth" :
+            lines.append("    set_rp_group_options $group -placement_type compression");
+        lines.append("    add_to_rp_group bsg_chip::$rp_group_name -hier $group -column " + str(col) + " -row " + str(row));
+    lines.append("}");
+    return lines;
+
+def mul_gen_main ( tech, argv ) :
+    if not (tech.has_cell("mul","addf") and "mul_timing" in tech.table) :
+        print("no mul cells or mul_timing in tech " + tech.name);
+        return;
+    args = argv[1:];
+    tcl = (args[-1:] == ["tcl"]);
+    if tcl :
+        args = args[:-1];
+    if (len(args) in (1,2) and all([x.isdigit() for x in args]) and int(args[0]) % 8 == 0 and int(args[0]) > 0) :
+        width = int(args[0]);
+        pipeline = int(args[1]) if len(args) == 2 else 0;
+        try :
+            if tcl :
+                m = mul_compose(tech, width, mul_choose_cuts(tech, width, pipeline), pipeline);
+                for line in mul_place_tcl(m) :
+                    emit_line(line);
+            else :
+                generate_mul(tech, width, pipeline);
+        except ValueError as e :
+            print(str(e));
+    else :
+        print("Usage: " + argv[0] + " width [pipeline] [tcl]   # width a multiple of 8");
@@ -0,0 +1,545 @@
+#
+# bsg_rp_mul_eval.py
+#
+# Bit accurate evaluation of the multiplier netlists written by
+# bsg_rp_mul.py, so they can be checked against integer multiplication
+# without a Verilog simulator.
+#
+# The netlist is read back in, flattened to single bit nets, levelized,
+# and then evaluated bit parallel: every net holds one python int whose
+# bit t is its value for test vector t, so a few thousand vectors cost
+# about as much as one.
+#
+# It understands what the generators write and little else: the AND2,
+# ADDF, AOI22, XOR2 and XNOR2 cells of the tech table's mul group, module
+# instances, wire/assign with ~ & | ^ + and {} on bit and part selects,
+# and bsg_dff_en, which is taken as transparent; instead, every path into
+# the output is checked to cross the same number of registers.
+#
+
+from __future__ import print_function
+
+import random
+import re
+import sys
+import time
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+from bsg_netlist import *
+from bsg_rp_tech import *
+from bsg_rp_mul import *
+
+# the logic function of each mul cell; the outputs are the last pins
+mul_eval_cells = { "aoi22" : (4, ["aoi22"])
+                 , "xnor2" : (2, ["xnor"])
+                 , "xor2"  : (2, ["xor"])
+                 , "and2"  : (2, ["and"])
+                 , "addf"  : (3, ["addf_s", "addf_co"])
+                 }
+
+_comment_re = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+_token_re   = re.compile(r"\s*(?:(\d+'[bdh][0-9a-fA-F_]+)|(\d+)|([A-Za-z_][A-Za-z0-9_$]*)|(.))")
+_inst_re    = re.compile(r"^(\w+)\s*(?:#\s*\((.*?)\))?\s*(\w+)\s*\((.*)\)$", re.S)
+_port_re    = re.compile(r"^\.\s*(\w+)\s*(?:\((.*)\))?$", re.S)
+_range_re   = re.compile(r"\[\s*(\d+)\s*:\s*0\s*\]")
+
+# cell name -> (function, pin names) from the templates of the mul group
+def mul_eval_cell_table ( tech ) :
+    table = {};
+    for (key, (ins, fns)) in mul_eval_cells.items() :
+        if not tech.has_cell("mul", key) :
+            continue;
+        template = tech.cell("mul", key, orient=False).template;
+        pins = re.findall(r"\.\s*(\w+)\s*\(\s*#(\d+)\s*\)", template);
+        pins = [p for (p, n) in sorted(pins, key=lambda p: int(p[1]))];
+        table[template.split()[0]] = (key, pins[:ins], pins[ins:], fns);
+    return table;
+
+def _split_top ( s, sep=",") :
+    parts = [];
+    depth = 0;
+    cur = [];
+    for ch in s :
+        if ch in "([{" :
+            depth = depth + 1;
+        elif ch in ")]}" :
+            depth = depth - 1;
+        if (ch == sep and depth == 0) :
+            parts.append("".join(cur));
+            cur = [];
+        else :
+            cur.append(ch);
+    parts.append("".join(cur));
+    return [p.strip() for p in parts if p.strip()];
+
+# module name -> (ports, statements); ports are (dir, name, dims)
+def mul_eval_parse ( text ) :
+    text = _comment_re.sub("", text).replace("endmodule", ";endmodule;");
+    modules = {};
+    cur = None;
+    for st in text.split(";") :
+        st = st.strip();
+        if not st :
+            continue;
+        if st.startswith("module ") :
+            m = re.match(r"module\s+(\w+)\s*(?:#\s*\(.*?\))?\s*\((.*)\)$", st, re.S);
+            ports = [];
+            for p in _split_top(m.group(2)) :
+                words = p.split();
+                dims = [int(d) + 1 for d in _range_re.findall(p)];
+                ports.append((words[0], words[-1], dims));
+            cur = (ports, []);
+            modules[m.group(1)] = cur;
+        elif st == "endmodule" :
+            cur = None;
+        else :
+            cur[1].append(st);
+    return modules;
+
+
+class BsgMulEval(object):
+
+    # text: the netlist; top: the module to evaluate
+    def __init__(self, tech, text, top):
+        self.cells   = mul_eval_cell_table(tech);
+        self.modules = mul_eval_parse(text);
+        # nodes are [op, inputs]; 0 and 1 are the constants
+        self.nodes   = [["0", []], ["1", []]];
+        self.counts  = {};
+        self.inputs  = {};
+        self.outputs = {};
+        ports = self.modules[top][0];
+        scope = {};
+        for (d, name, dims) in ports :
+            bits = [self.node("in" if d == "input" else "buf") for b in range(0, self._width(dims))];
+            scope[name] = (bits, dims);
+            (self.inputs if d == "input" else self.outputs)[name] = bits;
+        self.elaborate(top, scope, "");
+        self.order = self.levelize();
+
+    def _width(self, dims):
+        w = 1;
+        for d in dims :
+            w = w * d;
+        return w;
+
+    def node(self, op, ins=None):
+        self.nodes.append([op, ins or []]);
+        return len(self.nodes) - 1;
+
+    def drive(self, net, bit):
+        if (self.nodes[net][0] != "buf" or self.nodes[net][1]) :
+            raise ValueError("net driven twice");
+        self.nodes[net][1] = [bit];
+
+    def elaborate(self, name, scope, path):
+        (ports, body) = self.modules[name];
+        for st in body :
+            if st.startswith("wire ") :
+                self.declare(st[5:], scope);
+            elif st.startswith("assign ") :
+                (lhs, rhs) = st[7:].split("=", 1);
+                self.connect(self.expr(lhs, scope), self.expr(rhs, scope));
+            else :
+                self.instance(st, scope, path);
+
+    def declare(self, st, scope):
+        init = None;
+        if "=" in st :
+            (st, init) = st.split("=", 1);
+        dims = [int(d) + 1 for d in _range_re.findall(st)];
+        for n in _range_re.sub("", st).split(",") :
+            n = n.strip();
+            scope[n] = ([self.node("buf") for b in range(0, self._width(dims))], dims);
+        if init is not None :
+            self.connect(scope[n][0], self.expr(init, scope));
+
+    def connect(self, lhs, rhs):
+        rhs = rhs + [0] * (len(lhs) - len(rhs));
+        for (l, r) in zip(lhs, rhs) :
+            self.drive(l, r);
+
+    def instance(self, st, scope, path):
+        m = _inst_re.match(st);
+        if m is None :
+            raise ValueError("can not read '" + st[:60] + "'");
+        (kind, params, inst, conns) = m.groups();
+        conns = dict([(p.group(1), p.group(2)) for p in [_port_re.match(c) for c in _split_top(conns)]]);
+        self.counts[kind] = self.counts.get(kind, 0) + 1;
+
+        if kind in self.cells :
+            (key, ins, outs, fns) = self.cells[kind];
+            args = [self.expr(conns[p], scope)[0] for p in ins];
+            for (p, fn) in zip(outs, fns) :
+                self.connect(self.expr(conns[p], scope), [self.node(fn, args)]);
+        elif kind == "bsg_dff_en" :
+            d = self.expr(conns["data_i"], scope);
+            q = self.expr(conns["data_o"], scope);
+            self.connect(q, [self.node("dff", [b]) for b in d]);
+        elif kind in self.modules :
+            child = {};
+            for (d, name, dims) in self.modules[kind][0] :
+                w = self._width(dims);
+                if d == "input" :
+                    bits = self.expr(conns[name], scope) if conns.get(name) else [];
+                    child[name] = ((bits + [0] * w)[:w], dims);
+                else :
+                    child[name] = ([self.node("buf") for b in range(0, w)], dims);
+                    if conns.get(name) :
+                        self.connect(self.expr(conns[name], scope), [self.node("buf", [b]) for b in child[name][0]]);
+            self.elaborate(kind, child, path + inst + "/");
+        else :
+            raise ValueError("unknown cell or module '" + kind + "'");
+
+    #
+    # expressions, as lists of nets, lsb first
+    #
+    def expr(self, s, scope):
+        self.tokens = [t for t in _token_re.findall(s) if "".join(t).strip()];
+        self.pos = 0;
+        bits = self._or(scope);
+        if (self.pos != len(self.tokens)) :
+            raise ValueError("can not read '" + s + "'");
+        return bits;
+
+    def _peek(self):
+        if self.pos < len(self.tokens) :
+            return self.tokens[self.pos][3] or None;
+        return None;
+
+    def _binary(self, scope, op, fn, sub):
+        a = sub(scope);
+        while self._peek() == op :
+            self.pos = self.pos + 1;
+            b = sub(scope);
+            w = max(len(a), len(b));
+            a = a + [0] * (w - len(a));
+            b = b + [0] * (w - len(b));
+            a = fn(a, b);
+        return a;
+
+    def _or(self, scope):
+        return self._binary(scope, "|", lambda a, b: [self.node("or", [x, y]) for (x, y) in zip(a, b)], self._xor);
+
+    def _xor(self, scope):
+        return self._binary(scope, "^", lambda a, b: [self.node("xor", [x, y]) for (x, y) in zip(a, b)], self._and);
+
+    def _and(self, scope):
+        return self._binary(scope, "&", lambda a, b: [self.node("and", [x, y]) for (x, y) in zip(a, b)], self._add);
+
+    def _add(self, scope):
+        return self._binary(scope, "+", self._adder, self._unary);
+
+    def _adder(self, a, b):
+        c = 0;
+        s = [];
+        for (x, y) in zip(a, b) :
+            s.append(self.node("addf_s", [x, y, c]));
+            c = self.node("addf_co", [x, y, c]);
+        return s;
+
+    def _unary(self, scope):
+        if self._peek() == "~" :
+            self.pos = self.pos + 1;
+            return [self.node("not", [b]) for b in self._unary(scope)];
+        return self._primary(scope);
+
+    def _number(self):
+        t = self.tokens[self.pos];
+        self.pos = self.pos + 1;
+        return int(t[1]);
+
+    def _expect(self, ch):
+        if self._peek() != ch :
+            raise ValueError("expected '" + ch + "'");
+        self.pos = self.pos + 1;
+
+    def _primary(self, scope):
+        (sized, number, ident, ch) = self.tokens[self.pos];
+        self.pos = self.pos + 1;
+        if sized :
+            (w, v) = sized.split("'");
+            v = int(v[1:].replace("_", ""), { "b" : 2, "d" : 10, "h" : 16 }[v[0]]);
+            return [(v >> b) & 1 for b in range(0, int(w))];
+        if ch == "(" :
+            bits = self._or(scope);
+            self._expect(")");
+            return bits;
+        if ch == "{" :
+            if (self.tokens[self.pos][1] and self.tokens[self.pos+1][3] == "{") :
+                # replication, { n { x } }
+                n = self._number();
+                self._expect("{");
+                bits = self._or(scope);
+                self._expect("}");
+                self._expect("}");
+                return bits * n;
+            parts = [self._or(scope)];
+            while self._peek() == "," :
+                self.pos = self.pos + 1;
+                parts.append(self._or(scope));
+            self._expect("}");
+            return [b for p in reversed(parts) for b in p];
+        if ident :
+            (bits, dims) = scope[ident];
+            # selects peel off the outermost packed dimension first
+            inner = self._width(dims[1:]);
+            while self._peek() == "[" :
+                self.pos = self.pos + 1;
+                hi = self._number();
+                lo = hi;
+                if self._peek() == ":" :
+                    self.pos = self.pos + 1;
+                    lo = self._number();
+                self._expect("]");
+                bits = bits[lo*inner:(hi+1)*inner];
+                dims = dims[1:];
+                inner = self._width(dims[1:]);
+            return bits;
+        raise ValueError("unexpected '" + ch + "'");
+
+    # nodes in an order where every input comes first, as
+    # (node, op, inputs); also sets the logic depth and, per output bit,
+    # the (fewest, most) registers on the paths into it
+    def levelize(self):
+        state = [0] * len(self.nodes);
+        order = [];
+        roots = [b for bits in self.outputs.values() for b in bits];
+        for r in roots :
+            stack = [r];
+            while stack :
+                n = stack[-1];
+                if state[n] == 0 :
+                    state[n] = 1;
+                    for i in self.nodes[n][1] :
+                        if state[i] == 0 :
+                            stack.append(i);
+                        elif state[i] == 1 :
+                            raise ValueError("combinational loop");
+                elif state[n] == 1 :
+                    state[n] = 2;
+                    stack.pop();
+                    order.append(n);
+                else :
+                    stack.pop();
+
+        depth = [0] * len(self.nodes);
+        regs = [None] * len(self.nodes);
+        for n in order :
+            (op, ins) = self.nodes[n];
+            if (op == "buf" and not ins) :
+                raise ValueError("undriven net");
+            if op == "in" :
+                regs[n] = (0, 0);
+            below = [regs[i] for i in ins if regs[i] is not None];
+            if below :
+                regs[n] = (min([r[0] for r in below]), max([r[1] for r in below]));
+                if op == "dff" :
+                    regs[n] = (regs[n][0]+1, regs[n][1]+1);
+            depth[n] = max([depth[i] for i in ins] + [0]) + (0 if op in ("buf", "dff") else 1);
+        self.depth = max([depth[n] for n in roots] + [0]);
+        self.regs = [regs[n] or (0, 0) for n in roots];
+        return [(n, self.nodes[n][0], self.nodes[n][1]) for n in order if self.nodes[n][0] not in ("in", "0", "1")];
+
+    # inputs: port -> one bit plane per bit, each an int or a numpy
+    # array of words, with bit t of the plane the value for vector t;
+    # zero and ones are the all 0 and all 1 planes. Returns the output
+    # ports the same way.
+    def evaluate(self, inputs, zero, ones):
+        v = [None] * len(self.nodes);
+        v[0] = zero;
+        v[1] = ones;
+        for (name, bits) in self.inputs.items() :
+            for (b, n) in enumerate(bits) :
+                v[n] = inputs[name][b] if name in inputs else zero;
+        for (n, op, ins) in self.order :
+            if op in ("buf", "dff") :
+                v[n] = v[ins[0]];
+            elif op == "not" :
+                v[n] = ones ^ v[ins[0]];
+            elif op == "and" :
+                v[n] = v[ins[0]] & v[ins[1]];
+            elif op == "or" :
+                v[n] = v[ins[0]] | v[ins[1]];
+            elif op == "xor" :
+                v[n] = v[ins[0]] ^ v[ins[1]];
+            elif op == "xnor" :
+                v[n] = ones ^ v[ins[0]] ^ v[ins[1]];
+            elif op == "aoi22" :
+                v[n] = ones ^ ((v[ins[0]] & v[ins[1]]) | (v[ins[2]] & v[ins[3]]));
+            elif op == "addf_s" :
+                v[n] = v[ins[0]] ^ v[ins[1]] ^ v[ins[2]];
+            elif op == "addf_co" :
+                (a, b, c) = (v[ins[0]], v[ins[1]], v[ins[2]]);
+                v[n] = (a & b) | (c & (a ^ b));
+        return dict((name, [v[n] for n in bits]) for (name, bits) in self.outputs.items());
+
+
+#
+# checking a multiplier against integer multiplication
+#
+# Operands are random, except that the first vectors of each run are the
+# corner cases below. With numpy, operands are kept as arrays of 8 bit
+# limbs, so the reference product and the packing into bit planes are
+# vectorized too and any width works; without it, python ints stand in
+# for both, which is fine for a few thousand vectors.
+#
+
+def mul_eval_corners ( width ) :
+    top = 1 << (width-1);
+    vals = [0, 1, (1 << width) - 1, top, top - 1];
+    return [(x, y) for x in vals for y in vals];
+
+def mul_eval_reference ( x, y, width, signed ) :
+    if signed :
+        x = x - ((x >> (width-1)) << width);
+        y = y - ((y >> (width-1)) << width);
+    return (x * y) & ((1 << 2*width) - 1);
+
+def _int_batch ( e, width, signed, rnd, n, first ) :
+    pairs = [(rnd.getrandbits(width), rnd.getrandbits(width)) for t in range(0, n)];
+    if first :
+        corners = mul_eval_corners(width);
+        pairs[:len(corners)] = corners[:n];
+    ones = (1 << n) - 1;
+    planes = {};
+    for (port, k) in (("x_i", 0), ("y_i", 1)) :
+        planes[port] = [sum([((p[k] >> b) & 1) << t for (t, p) in enumerate(pairs)]) for b in range(0, width)];
+    planes["signed_i"] = [ones if signed else 0];
+    planes["en_i"] = [ones];
+    z = e.evaluate(planes, 0, ones)["z_o"];
+    for (t, (x, y)) in enumerate(pairs) :
+        got = sum([((z[b] >> t) & 1) << b for b in range(0, 2*width)]);
+        if got != mul_eval_reference(x, y, width, signed) :
+            return (x, y, got);
+    return None;
+
+def _numpy_planes ( limbs, width ) :
+    return [numpy.packbits(((limbs[b // 8] >> (b % 8)) & 1).astype(numpy.uint8), bitorder="little").view(numpy.uint64)
+            for b in range(0, width)];
+
+def _numpy_batch ( e, width, signed, rng, n, first ) :
+    L = width // 8;
+    x = rng.integers(0, 256, size=(L, n), dtype=numpy.int64);
+    y = rng.integers(0, 256, size=(L, n), dtype=numpy.int64);
+    if first :
+        corners = mul_eval_corners(width)[:n];
+        for (t, (cx, cy)) in enumerate(corners) :
+            x[:, t] = [(cx >> (8*k)) & 255 for k in range(0, L)];
+            y[:, t] = [(cy >> (8*k)) & 255 for k in range(0, L)];
+
+    zero = numpy.zeros(n // 64, dtype=numpy.uint64);
+    ones = ~zero;
+    planes = { "x_i" : _numpy_planes(x, width), "y_i" : _numpy_planes(y, width)
+             , "signed_i" : [ones if signed else zero], "en_i" : [ones] };
+    z = e.evaluate(planes, zero, ones)["z_o"];
+    bits = [numpy.unpackbits(p.view(numpy.uint8), bitorder="little").astype(numpy.int64) for p in z];
+
+    # schoolbook product in 8 bit limbs; a signed product is the unsigned
+    # one less (sign(x) * y + sign(y) * x) << width, mod 2^(2*width)
+    p = [numpy.zeros(n, dtype=numpy.int64) for k in range(0, 2*L)];
+    for a in range(0, L) :
+        for b in range(0, L) :
+            p[a+b] += x[a] * y[b];
+    if signed :
+        (xs, ys) = (x[L-1] >> 7, y[L-1] >> 7);
+        for b in range(0, L) :
+            p[L+b] -= xs * y[b] + ys * x[b];
+    carry = 0;
+    bad = numpy.zeros(n, dtype=bool);
+    for k in range(0, 2*L) :
+        t = p[k] + carry;
+        carry = t >> 8;
+        got = sum([bits[8*k+j] << j for j in range(0, 8)]);
+        bad |= (got != (t & 255));
+    if bad.any() :
+        t = int(numpy.argmax(bad));
+        val = lambda limbs, m : sum([int(limbs[k][t]) << (8*k) for k in range(0, m)]);
+        return (val(x, L), val(y, L), sum([int(bits[b][t]) << b for b in range(0, 2*width)]));
+    return None;
+
+# returns (vectors run per signedness, first mismatch as (signed, x, y, z) or None)
+def mul_eval_check ( e, width, vectors, seed=1 ) :
+    if numpy is not None :
+        batch = 1 << 16;
+        rng = numpy.random.default_rng(seed);
+        vectors = max(64, vectors - vectors % 64);
+    else :
+        batch = 1 << 12;
+        rng = random.Random(seed);
+    for signed in (0, 1) :
+        done = 0;
+        while done < vectors :
+            n = min(batch, vectors - done);
+            if numpy is not None :
+                bad = _numpy_batch(e, width, signed, rng, n, done == 0);
+            else :
+                bad = _int_batch(e, width, signed, rng, n, done == 0);
+            if bad is not None :
+                return (vectors, (signed,) + bad);
+            done = done + n;
+    return (vectors, None);
+
+# the multiplier in a netlist: the module that no other module instantiates
+def mul_eval_top ( text ) :
+    modules = mul_eval_parse(text);
+    used = set();
+    for (ports, body) in modules.values() :
+        for st in body :
+            m = _inst_re.match(st);
+            if m is not None :
+                used.add(m.group(1));
+    tops = [name for name in modules if name not in used];
+    if len(tops) != 1 :
+        raise ValueError("expected one top module, found " + ", ".join(sorted(tops)));
+    return tops[0];
+
+# bsg_rp_mul_eval.py <pdk> <width> [pipeline] [vectors]
+# bsg_rp_mul_eval.py <pdk> <netlist.v> [vectors]
+# returns False on a mismatch
+def mul_check_main ( tech, argv ) :
+    args = argv[1:];
+    vectors = (1 << 20) if numpy is not None else (1 << 13);
+    if (1 <= len(args) <= 3 and all([x.isdigit() for x in args])) :
+        width = int(args[0]);
+        pipeline = int(args[1]) if len(args) > 1 else 0;
+        if len(args) == 3 :
+            vectors = int(args[2]);
+        text = capture_netlist(generate_mul, tech, width, pipeline);
+    elif (1 <= len(args) <= 2 and all([x.isdigit() for x in args[1:]])) :
+        with open(args[0]) as f :
+            text = f.read();
+        if len(args) == 2 :
+            vectors = int(args[1]);
+        width = None;
+    else :
+        print("Usage: " + argv[0] + " width [pipeline] [vectors]");
+        print("       " + argv[0] + " netlist.v [vectors]");
+        return None;
+
+    start = time.time();
+    top = mul_eval_top(text);
+    e = BsgMulEval(tech, text, top);
+    if width is None :
+        width = len(e.inputs["x_i"]);
+    (vectors, bad) = mul_eval_check(e, width, vectors);
+    regs = sorted(set(e.regs));
+
+    print(top + ": " + str(vectors) + " vectors each signed and unsigned, "
+          + ("no mismatches" if bad is None else "MISMATCH"));
+    print("  " + str(len(e.order)) + " nets, " + str(e.depth) + " levels, "
+          + ("%d registers on every path" % regs[0][0] if regs == [(regs[0][0], regs[0][0])] else "UNBALANCED registers " + str(regs))
+          + "; " + ("%.1f" % (time.time() - start)) + " s with " + ("numpy" if numpy is not None else "python ints"));
+    if bad is not None :
+        print("  " + ("signed" if bad[0] else "unsigned") + " x=0x%x y=0x%x gave z=0x%x" % bad[1:]);
+    return bad is None and len(regs) == 1 and regs[0][0] == regs[0][1];
+
+if __name__ == "__main__" :
+    if len(sys.argv) < 3 :
+        mul_check_main(None, sys.argv[:1]);
+        sys.exit(1);
+    sys.exit(0 if mul_check_main(load_tech(sys.argv[1]), [sys.argv[0] + " " + sys.argv[1]] + sys.argv[2:]) else 1);
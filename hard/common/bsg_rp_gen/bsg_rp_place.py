@@ -0,0 +1,307 @@
+#
+# bsg_rp_place.py
+#
+# A placed netlist: what the column generators (rf, fifo_shift) build
+# before anything is written out, and the backends that write it.
+#
+# The netlist is a module with one rp group of columns. A column is
+# either stacked, where its cells take rows 0, 1, 2, ... in the order
+# they are added and one rp_fill starts the column, or placed, where
+# every cell is given its row and gets an rp_fill of its own. The cells
+# are kept in flat arrays, one entry per cell: the index of its cell
+# template, its column and row, and its pin connections. Declarations
+# (wires, assigns, comments) are kept as text with the position they
+# were added at, so the verilog comes out in the order it was built.
+#
+# Backends, all written through the netlist writer of bsg_netlist.py:
+#
+#   emit_placement_verilog:  the module, with the rp_* directives
+#   emit_placement_def:      a DEF COMPONENTS section; with a geometry
+#                            from the tech table the coordinates are in
+#                            DEF units, otherwise x is the column and y
+#                            the row
+#   emit_placement_json:     the placement as column arrays, for the
+#                            P&R scripts
+#
+# Usage:
+#
+#   p = BsgPlacement("bsg_rp_tsmc_40_rf_w8_b4_1r1w", inputs, outputs, "rf")
+#   p.line("wire q;")
+#   p.column()
+#   p.cell(dffe, ["reg_w0_b0", "d", "en", "clk_i", "q"])
+#   p.end_column()
+#   emit_placement_verilog(p)
+#
+
+from __future__ import print_function
+
+import json
+import re
+from array import array
+
+from bsg_netlist import *
+
+placement_formats = ("verilog", "def", "json")
+
+_master_re = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\s+#0([A-Za-z0-9_]*)\s*\(")
+
+# the (master, instance name suffix) of each cell a template instantiates
+def cell_masters (cell) :
+    return [(m.group(1), m.group(2)) for m in _master_re.finditer(cell.template)]
+
+class BsgPlacement(object):
+
+    # name:    module name
+    # inputs:  input port declarations, as for emit_module_header
+    # outputs: output port declarations
+    # group:   rp group name
+    def __init__(self, name, inputs, outputs, group):
+        self.name    = name
+        self.inputs  = inputs
+        self.outputs = outputs
+        self.group   = group
+        # verilog comment lines before the module
+        self.comments = []
+
+        # cell templates, indexed by cell_kind
+        self.kinds       = []
+        self._kind_index = {}
+
+        # one entry per cell
+        self.cell_kind = array("i")
+        self.cell_col  = array("i")
+        self.cell_row  = array("i")
+        self.cell_args = []
+
+        # one entry per column: its first cell, and 1 if placed
+        self.col_first  = array("i")
+        self.col_placed = array("b")
+        # the open column, its first cell and whether it is placed
+        self._open      = False
+        self._col       = -1
+        self._first     = 0
+        self._placed    = False
+
+        # (position, text, fragment); the position is (column, 0, 0)
+        # before that column starts, and (column, 1, cells) inside it
+        self.text = []
+
+    def columns(self):
+        return len(self.col_first)
+
+    def cells(self):
+        return len(self.cell_kind)
+
+    # one past the last cell of column c
+    def column_end(self, c):
+        return self.col_first[c+1] if c+1 < len(self.col_first) else len(self.cell_kind)
+
+    # cells of column c, as a range of cell indices
+    def column_cells(self, c):
+        return range(self.col_first[c], self.column_end(c))
+
+    def _position(self):
+        if self._open :
+            return (len(self.col_first) - 1, 1, len(self.cell_kind))
+        return (len(self.col_first), 0, 0)
+
+    def comment(self, s):
+        self.comments.append(s)
+
+    # a line of declarations
+    def line(self, s=""):
+        self.text.append((self._position(), s, False))
+
+    # a declaration followed by the next one on the same line
+    def fragment(self, s):
+        self.text.append((self._position(), s, True))
+
+    # starts the next column; placed columns take a row for every cell
+    def column(self, placed=False):
+        assert (not self._open), "column " + str(len(self.col_first) - 1) + " is still open"
+        self.col_first.append(len(self.cell_kind))
+        self.col_placed.append(1 if placed else 0)
+        self._open   = True
+        self._col    = len(self.col_first) - 1
+        self._first  = len(self.cell_kind)
+        self._placed = placed
+        return self._col
+
+    def end_column(self):
+        assert (self._open), "no column is open"
+        self._open = False
+
+    # adds a cell to the open column; the row is required in a placed
+    # column and taken from the order in a stacked one
+    def cell(self, cell, args, row=None):
+        assert (self._open), "cells go in a column"
+        if self._placed :
+            assert (row is not None), "a cell of placed column " + str(self._col) + " needs a row"
+        else :
+            row = len(self.cell_args) - self._first
+        # keyed by what the generator passes, template string or BsgCell
+        kind = self._kind_index.get(cell)
+        if kind is None :
+            kind = self._add_kind(cell)
+        self.cell_kind.append(kind)
+        self.cell_col.append(self._col)
+        self.cell_row.append(row)
+        # tuples of strings drop out of the garbage collector's scans
+        self.cell_args.append(tuple(args))
+
+    def _add_kind(self, cell):
+        compiled = compile_cell(cell)
+        kind = self._kind_index.get(compiled)
+        if kind is None :
+            kind = len(self.kinds)
+            self.kinds.append(compiled)
+            self._kind_index[compiled] = kind
+        self._kind_index[cell] = kind
+        return kind
+
+    # cell indices of column c in output order: placed columns by row,
+    # cells on the same row in the order they were added
+    def column_order(self, c):
+        cells = self.column_cells(c)
+        if self.col_placed[c] :
+            return sorted(cells, key=self.cell_row.__getitem__)
+        return cells
+
+    # cell indices in output order, column by column
+    def order(self):
+        result = []
+        for c in range(len(self.col_first)) :
+            result.extend(self.column_order(c))
+        return result
+
+
+def _emit_text (text, t, position) :
+    while t < len(text) and text[t][0] <= position :
+        if text[t][2] :
+            emit_fragment(text[t][1])
+        else :
+            emit_line(text[t][1])
+        t = t + 1
+    return t
+
+def emit_placement_verilog (p) :
+    assert (not p._open), "column " + str(p.columns() - 1) + " is still open"
+    for s in p.comments :
+        emit_line(s)
+    emit_module_header(p.name, p.inputs, p.outputs)
+    emit_rp_group_begin(p.group)
+
+    # the lines of a column go out in one write
+    t = 0
+    kinds = p.kinds
+    for c in range(p.columns()) :
+        t = _emit_text(p.text, t, (c, 0, 0))
+        cells = p.column_order(c)
+        end = p.column_end(c)
+        if p.col_placed[c] :
+            t = _emit_text(p.text, t, (c, 1, end))
+            lines = []
+            for i in cells :
+                row = str(p.cell_row[i])
+                lines.append(rp_fill_string(str(c) + " " + row + " UX"))
+                lines.append(kinds[p.cell_kind[i]].instance(p.cell_args[i]) + " //  " + row)
+        else :
+            lines = [rp_fill_string(str(c) + " 0 UX")]
+            for i in cells :
+                if t < len(p.text) and p.text[t][0] <= (c, 1, i) :
+                    emit_line("\n".join(lines))
+                    lines = []
+                    t = _emit_text(p.text, t, (c, 1, i))
+                lines.append(kinds[p.cell_kind[i]].instance(p.cell_args[i]))
+        if lines :
+            emit_line("\n".join(lines))
+        t = _emit_text(p.text, t, (c, 1, end))
+    _emit_text(p.text, t, (p.columns(), 0, 0))
+
+    emit_rp_group_end(p.group)
+    emit_module_footer()
+
+# (width by master, row height) from the "<group>_geometry" entry of the
+# tech table, e.g. rf_geometry; widths are given per cell of the group
+# and, for a timing driven rf, taken from the rf_tree areas.
+# None if the tech has no geometry for the group.
+def placement_geometry (tech, group) :
+    geometry = tech.table.get(group + "_geometry")
+    if geometry is None :
+        return None
+    height = geometry["cell_height"]
+    widths = {}
+    if group == "rf" :
+        for family in tech.table.get("rf_tree", {}).get("cells", {}).values() :
+            for c in family :
+                for (m, suffix) in cell_masters(compile_cell(c["template"])) :
+                    widths[m] = c["area"] / height
+    for (name, width) in geometry["width"].items() :
+        if tech.has_cell(group, name) :
+            for (m, suffix) in cell_masters(tech.cell(group, name)) :
+                widths[m] = width
+    return (widths, height)
+
+# DEF COMPONENTS of the placement; even rows are N and odd rows FS,
+# as the rows of the rp group alternate
+def emit_placement_def (p, geometry=None) :
+    masters = [cell_masters(k) for k in p.kinds]
+    if geometry is not None :
+        (widths, height) = geometry
+        if not all([m in widths for ms in masters for (m, suffix) in ms]) :
+            geometry = None
+
+    # x of each column: the widest cell of each column before it
+    x = [0] * (p.columns() + 1)
+    for c in range(p.columns()) :
+        if geometry is None :
+            x[c+1] = c + 1
+        else :
+            kinds = set([p.cell_kind[i] for i in p.column_cells(c)])
+            x[c+1] = x[c] + int(round(1000 * max([widths[m] for k in kinds for (m, suffix) in masters[k]] + [0])))
+
+    order = p.order()
+    emit_line("VERSION 5.8 ;")
+    emit_line("DESIGN " + p.name + " ;")
+    if geometry is None :
+        emit_line("# relative placement: x is the rp column and y the rp row")
+        emit_line("UNITS DISTANCE MICRONS 1 ;")
+    else :
+        emit_line("UNITS DISTANCE MICRONS 1000 ;")
+    emit_line("COMPONENTS " + str(sum([len(masters[p.cell_kind[i]]) for i in order])) + " ;")
+    for i in order :
+        row = p.cell_row[i]
+        y = row if geometry is None else int(round(1000 * height)) * row
+        at = " + PLACED ( " + str(x[p.cell_col[i]]) + " " + str(y) + " ) " + ("FS" if row % 2 else "N") + " ;"
+        name = p.cell_args[i][0]
+        for (m, suffix) in masters[p.cell_kind[i]] :
+            emit_line("- " + name + suffix + " " + m + at)
+    emit_line("END COMPONENTS")
+    emit_line("END DESIGN")
+
+def emit_placement_json (p) :
+    order = p.order()
+    emit_line(json.dumps({ "module"  : p.name
+                         , "group"   : p.group
+                         , "inputs"  : p.inputs
+                         , "outputs" : p.outputs
+                         , "kinds"   : [ { "template" : k.template
+                                         , "masters"  : [m + suffix for (m, suffix) in cell_masters(k)] }
+                                         for k in p.kinds ]
+                         , "columns" : { "first"  : list(p.col_first)
+                                       , "placed" : list(p.col_placed) }
+                         , "cells"   : { "kind" : [p.cell_kind[i] for i in order]
+                                       , "col"  : [p.cell_col[i] for i in order]
+                                       , "row"  : [p.cell_row[i] for i in order]
+                                       , "args" : [p.cell_args[i] for i in order] }
+                         }, sort_keys=True))
+
+def emit_placement (p, fmt="verilog", tech=None) :
+    if fmt == "verilog" :
+        emit_placement_verilog(p)
+    elif fmt == "def" :
+        emit_placement_def(p, placement_geometry(tech, p.group) if tech is not None else None)
+    elif fmt == "json" :
+        emit_placement_json(p)
+    else :
+        raise ValueError("unknown format '" + fmt + "'; expected one of " + ", ".join(placement_formats))
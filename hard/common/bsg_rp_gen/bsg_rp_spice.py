@@ -0,0 +1,262 @@
+#
+# bsg_rp_spice.py
+#
+# Batch characterization of the bsg_clk_gen oscillator decks in
+# hard/<pdk>/bsg_clk_gen/spice with ngspice.
+#
+# osc.sp steps through every control code in one HSPICE transient, with
+# PULSE sources on the s* inputs, at the one corner its setup.<node>.sp
+# is written for. The "clk_spice" entry of the tech table names the deck,
+# its control inputs (lsb first), its reset input and clock net, and a
+# list of corners: a setup file, .lib sections to swap in it, a
+# temperature and a supply. One deck is written per corner and code,
+# with the controls held at the code and the reset released once; each
+# measures the average clock period over "cycles" periods, after
+# "settle" rising edges. The decks run in ngspice across a process pool
+# and the periods go to outdir/osc.csv, one row per code.
+#
+# A deck is simulated only if its text changed since it was last run
+# into the same outdir: each result is kept in outdir/cache under the
+# sha1 of the deck. The PDK files the decks include are not part of the
+# key, so a model update needs an empty cache.
+#
+# The HSPICE only lines (.option, .malias) are left out of the decks and
+# the ngspice HSPICE compatibility mode is turned on. Setups that need
+# .malias (tsmc_180_250) only run with models under the aliased names.
+#
+
+from __future__ import print_function
+
+import hashlib
+import multiprocessing
+import os
+import re
+import subprocess
+
+from bsg_rp_tech import *
+
+hard_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+spice_init    = "set ngbehavior=hsa\nset num_threads=1\n"
+spice_program = "ngspice"
+spice_csv     = "osc.csv"
+spice_drop    = (".option", ".options", ".malias", ".tran", ".end", ".temp")
+
+def _sha1 (s) :
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()
+
+def _read (path) :
+    with open(path) as f :
+        return f.read()
+
+def _write_if_changed (path, text) :
+    if os.path.exists(path) and _read(path) == text :
+        return False
+    with open(path, "w") as f :
+        f.write(text)
+    return True
+
+def _on_path (program) :
+    for d in os.environ.get("PATH", "").split(os.pathsep) :
+        if os.access(os.path.join(d, program), os.X_OK) :
+            return True
+    return False
+
+def spice_table (tech) :
+    return tech.table["clk_spice"]
+
+def spice_corners (tech, names=None) :
+    corners = spice_table(tech)["corners"]
+    if not names :
+        return corners
+    known = dict((c["name"], c) for c in corners)
+    for n in names :
+        if n not in known :
+            raise ValueError("unknown corner '" + n + "'; expected one of " + ", ".join(sorted(known.keys())))
+    return [known[n] for n in names]
+
+def spice_codes (tech) :
+    return range(1 << len(spice_table(tech)["controls"]))
+
+# the ngspice form of an HSPICE netlist line, or None to leave it out;
+# HSPICE takes a "*" or "$" after the fields as a comment, ngspice does not
+def spice_line (line, corner, drop_sources) :
+    s = line.strip()
+    if not s or s[0] == "*" :
+        return line
+    s = re.split(r"\s[*$]", s)[0].rstrip()
+    fields = s.split()
+    key = fields[0].lower()
+    if key in spice_drop :
+        return None
+    if key == ".lib" and len(fields) == 3 :
+        fields[2] = corner.get("lib", {}).get(fields[2], fields[2])
+        return " ".join(fields)
+    if key == ".param" and re.match(r"(?i)\.param\s+supply\s*=", s) :
+        return ".param supply=" + repr(corner["supply"])
+    if key[0] == "v" and len(fields) > 1 and fields[1].lower() in drop_sources :
+        return None
+    return s
+
+# the ngspice deck of one corner and control code
+def spice_deck (tech, corner, code) :
+    t        = spice_table(tech)
+    spice    = os.path.join(hard_dir, tech.name, t["dir"])
+    controls = [c.lower() for c in t["controls"]]
+    drop     = controls + [t["reset"].lower()]
+    supply   = corner["supply"]
+    half     = repr(supply / 2.0)
+    release  = str(t["release_ns"]) + "n"
+    lines    = [ "* bsg_clk_gen " + t["deck"] + " of " + tech.name + ", corner " + corner["name"]
+                 + ", code " + str(code) + "; written by bsg_rp_gen.py"
+               , ".temp " + repr(corner["temp"])
+               ]
+    for name in (corner.get("setup", t["setup"]), t["deck"]) :
+        for line in _read(os.path.join(spice, name)).splitlines() :
+            out = spice_line(line, corner, drop)
+            if out is not None :
+                lines.append(out)
+    lines.append("")
+    lines.append("* control code " + str(code) + ", reset released at " + release)
+    for (i, c) in enumerate(t["controls"]) :
+        lines.append("Vctl_" + c + " " + c + " gnd " + ("supply" if (code >> i) & 1 else "0"))
+    lines.append("Vctl_" + t["reset"] + " " + t["reset"] + " gnd PULSE 0 supply " + release + " 10p 10p 1 2")
+    lines.append(".tran " + str(t["step_ps"]) + "p " + str(t["tstop_ns"]) + "n")
+    edge = "v(" + t["clock"] + ") VAL=" + half + " TD=" + release
+    lines.append(".meas tran cycles TRIG " + edge + " RISE=" + str(t["settle"])
+                 + " TARG " + edge + " RISE=" + str(t["settle"] + t["cycles"]))
+    lines.append(".end")
+    return "\n".join(lines) + "\n"
+
+# runs in a pool worker; returns (corner, code, key, seconds per cycle),
+# None for the period if ngspice failed or the clock did not settle
+def _spice_worker (arg) :
+    (corner, code, key, deck, cycles) = arg
+    (directory, name) = os.path.split(deck)
+    log = name[:-len(".sp")] + ".log"
+    with open(os.devnull, "w") as null :
+        status = subprocess.call([spice_program, "-b", "-o", log, name], cwd=directory, stdout=null, stderr=null)
+    period = None
+    if status == 0 and os.path.exists(os.path.join(directory, log)) :
+        m = re.search(r"(?m)^\s*cycles\s*=\s*([-+0-9.eE]+)", _read(os.path.join(directory, log)))
+        if m :
+            period = float(m.group(1)) / cycles
+    return (corner, code, key, period)
+
+# writes every deck, runs the ones not in the cache unless decks_only,
+# and the csv; returns (periods {(corner, code): seconds or None}, counts)
+def run_spice (tech, outdir, corners, processes=None, decks_only=False) :
+    t      = spice_table(tech)
+    cache  = os.path.join(outdir, "cache")
+    counts = { "decks" : 0, "written" : 0, "simulated" : 0, "cached" : 0, "failed" : 0 }
+    result = {}
+    todo   = []
+    for d in [cache] + [os.path.join(outdir, c["name"]) for c in corners] :
+        if not os.path.isdir(d) :
+            os.makedirs(d)
+
+    for corner in corners :
+        directory = os.path.join(outdir, corner["name"])
+        _write_if_changed(os.path.join(directory, ".spiceinit"), spice_init)
+        for code in spice_codes(tech) :
+            text = spice_deck(tech, corner, code)
+            deck = os.path.join(directory, "code_%03d.sp" % code)
+            counts["decks"] += 1
+            if _write_if_changed(deck, text) :
+                counts["written"] += 1
+            key = _sha1(spice_init + text)
+            hit = os.path.join(cache, key)
+            if os.path.exists(hit) :
+                result[(corner["name"], code)] = float(_read(hit))
+                counts["cached"] += 1
+            else :
+                todo.append((corner["name"], code, key, deck, t["cycles"]))
+
+    if decks_only :
+        return (result, counts)
+    if todo and not _on_path(spice_program) :
+        raise RuntimeError(spice_program + " is not on the path; " + str(len(todo)) + " decks were written to " + outdir)
+
+    if todo :
+        if processes == 1 :
+            runs = map(_spice_worker, todo)
+        else :
+            pool = multiprocessing.Pool(processes)
+            runs = pool.imap_unordered(_spice_worker, todo)
+
+        for (corner, code, key, period) in runs :
+            result[(corner, code)] = period
+            counts["simulated"] += 1
+            # failures are not cached, so they run again next time
+            if period is None :
+                counts["failed"] += 1
+                continue
+            with open(os.path.join(cache, key), "w") as f :
+                f.write(repr(period) + "\n")
+
+        if processes != 1 :
+            pool.close()
+            pool.join()
+
+    _write_if_changed(os.path.join(outdir, spice_csv), spice_csv_text(tech, corners, result))
+    return (result, counts)
+
+def spice_csv_text (tech, corners, result) :
+    head = ["code"]
+    for c in corners :
+        head += [c["name"] + "_ps", c["name"] + "_mhz"]
+    rows = [",".join(head)]
+    for code in spice_codes(tech) :
+        row = [str(code)]
+        for c in corners :
+            p = result.get((c["name"], code))
+            row += ["", ""] if p is None else ["%.2f" % (p * 1e12), "%.2f" % (1e-6 / p)]
+        rows.append(",".join(row))
+    return "\n".join(rows) + "\n"
+
+# frequency per code in MHz, one column per corner
+def spice_table_lines (tech, corners, result) :
+    lines = ["# " + tech.name + " " + spice_table(tech)["deck"] + ": frequency in MHz by control code"]
+    lines.append(" code" + "".join(["%10s" % c["name"] for c in corners]))
+    for code in spice_codes(tech) :
+        cells = []
+        for c in corners :
+            p = result.get((c["name"], code))
+            cells.append("%10s" % ("-" if p is None else "%.1f" % (1e-6 / p)))
+        lines.append("%5d" % code + "".join(cells))
+    return lines
+
+def clk_spice_usage (argv) :
+    print("Usage: " + argv[0] + " run <outdir> [processes] [corner ...]   # writes <outdir>/" + spice_csv)
+    print("       " + argv[0] + " decks <outdir> [corner ...]")
+    print("       " + argv[0] + " corners")
+
+def clk_spice_main (tech, argv) :
+    if "clk_spice" not in tech.table :
+        print("no clk_spice in tech " + tech.name)
+        return False
+    args = argv[1:]
+    if args == ["corners"] :
+        for c in spice_corners(tech) :
+            print("%-8s %-14s %5s C %6s V  %s" % (c["name"], c.get("setup", spice_table(tech)["setup"]), c["temp"],
+                                                 c["supply"], " ".join(sorted(c.get("lib", {}).values()))))
+        return True
+    if len(args) < 2 or args[0] not in ("run", "decks") :
+        clk_spice_usage(argv)
+        return False
+    names = args[2:]
+    processes = None
+    if args[0] == "run" and names and names[0].isdigit() :
+        processes = int(names[0])
+        names = names[1:]
+    try :
+        corners = spice_corners(tech, names)
+        (result, counts) = run_spice(tech, args[1], corners, processes, args[0] == "decks")
+    except (ValueError, RuntimeError) as e :
+        print(str(e))
+        return False
+    if args[0] == "run" :
+        for line in spice_table_lines(tech, corners, result) :
+            print(line)
+    print(" ".join([k + " " + str(counts[k]) for k in ("decks", "written", "simulated", "cached", "failed")]))
+    return counts["failed"] == 0
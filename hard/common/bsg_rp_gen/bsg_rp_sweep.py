@@ -0,0 +1,150 @@
+#
+# bsg_rp_sweep.py
+#
+# Batch version of the SWEEP options: generates every
+# (flop flavour or gate stack) x (width 1..max_bits) module of a PDK
+# across a process pool. Each module goes to its own <module>.v file and
+# outdir/manifest.json lists them all, so downstream tools can read only
+# the sizes they need.
+#
+# A module is regenerated only if its cell table, the generator sources,
+# or its parameters changed since the last sweep into the same outdir
+# (recorded as "key" in the manifest), and a file is rewritten only if
+# its contents changed, so make-style dependencies stay quiet.
+#
+
+from __future__ import print_function
+
+import hashlib
+import json
+import multiprocessing
+import os
+
+from bsg_netlist import *
+from bsg_rp_tech import *
+from bsg_rp_misc import *
+
+manifest_name = "manifest.json"
+
+_source_dir = os.path.dirname(os.path.abspath(__file__))
+_sources    = ["bsg_netlist.py", "bsg_rp_tech.py", "bsg_rp_misc.py", "bsg_rp_sweep.py"]
+
+def _md5 (s) :
+    return hashlib.md5(s.encode("utf-8")).hexdigest()
+
+def _read (path) :
+    with open(path) as f :
+        return f.read()
+
+# hash of everything that affects the generated netlists of a tech
+def sweep_engine_key (tech) :
+    parts = [_read(os.path.join(_source_dir, s)) for s in _sources]
+    parts.append(_read(os.path.join(tech_dir, tech.name + ".json")))
+    return _md5("".join(parts))
+
+# jobs are (generator, cell, bits, vert)
+def sweep_jobs (tech, max_bits) :
+    jobs = []
+    for cell in tech.cell_names("dff") :
+        for b in range(1, max_bits+1) :
+            jobs.append(("dff", cell, b, 1))
+    horiz = set([v["cell"] for v in tech.variants
+                 if v["generator"] == "gate_stack" and v.get("horiz", 0)])
+    for cell in tech.cell_names("gate_stack") :
+        for b in range(1, max_bits+1) :
+            jobs.append(("gate_stack", cell, b, 1))
+            if cell in horiz :
+                jobs.append(("gate_stack", cell, b, 0))
+    return jobs
+
+def sweep_module_name (tech, job) :
+    (generator, cell, bits, vert) = job
+    if generator == "dff" :
+        return ident_name_bit("bsg_rp_"+tech.fab+"_"+dff_suffix[cell], bits)
+    if vert :
+        return ident_name_bit("bsg_rp_"+tech.fab+"_"+cell, bits)
+    return ident_name_bit("bsg_rp_"+tech.fab+"_"+cell+"_horiz", bits)
+
+def _generate_job (tech, job) :
+    (generator, cell, bits, vert) = job
+    if generator == "dff" :
+        # dff cells are named <type><strength>, e.g. dffre2
+        generate_dff_nreset_en(tech, cell[:-1], bits, cell[-1])
+    else :
+        generate_gate_stack(tech, cell, bits, gate_stack_template(tech, cell), vert)
+
+# runs in a pool worker; returns (job, text)
+def _sweep_worker (arg) :
+    (tech_name, job) = arg
+    tech = load_tech(tech_name)
+    return (job, capture_netlist(_generate_job, tech, job))
+
+def load_manifest (outdir) :
+    path = os.path.join(outdir, manifest_name)
+    if not os.path.exists(path) :
+        return {}
+    with open(path) as f :
+        return dict((m["module"], m) for m in json.load(f)["modules"])
+
+# returns a dict of counts: generated, written, unchanged, skipped
+def run_sweep (tech, outdir, max_bits, processes=None) :
+    if not os.path.isdir(outdir) :
+        os.makedirs(outdir)
+
+    engine_key = sweep_engine_key(tech)
+    old        = load_manifest(outdir)
+    modules    = {}
+    todo       = []
+    counts     = { "generated" : 0, "written" : 0, "unchanged" : 0, "skipped" : 0 }
+
+    for job in sweep_jobs(tech, max_bits) :
+        name = sweep_module_name(tech, job)
+        entry = { "module"    : name
+                , "file"      : name + ".v"
+                , "generator" : job[0]
+                , "cell"      : job[1]
+                , "bits"      : job[2]
+                , "vert"      : job[3]
+                , "key"       : _md5(engine_key + repr(job))
+                }
+        modules[name] = entry
+        prev = old.get(name)
+        if (prev is not None and prev["key"] == entry["key"]
+            and os.path.exists(os.path.join(outdir, entry["file"]))) :
+            entry["md5"] = prev["md5"]
+            counts["skipped"] += 1
+        else :
+            todo.append((tech.name, job))
+
+    if todo :
+        if processes == 1 :
+            results = map(_sweep_worker, todo)
+        else :
+            pool = multiprocessing.Pool(processes)
+            results = pool.imap_unordered(_sweep_worker, todo, 16)
+
+        for (job, text) in results :
+            entry = modules[sweep_module_name(tech, job)]
+            entry["md5"] = _md5(text)
+            counts["generated"] += 1
+            path = os.path.join(outdir, entry["file"])
+            if os.path.exists(path) and _read(path) == text :
+                counts["unchanged"] += 1
+                continue
+            with open(path, "w") as f :
+                f.write(text)
+            counts["written"] += 1
+
+        if processes != 1 :
+            pool.close()
+            pool.join()
+
+    with open(os.path.join(outdir, manifest_name), "w") as f :
+        json.dump({ "tech"     : tech.name
+                  , "fab"      : tech.fab
+                  , "max_bits" : max_bits
+                  , "modules"  : [modules[k] for k in sorted(modules.keys())]
+                  }, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+    return counts
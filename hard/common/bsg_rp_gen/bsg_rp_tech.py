@@ -0,0 +1,102 @@
+#
+# bsg_rp_tech.py
+#
+# Per-PDK cell tables for the rp generators.
+#
+# Each tech/<pdk>.json file holds, for one process:
+#
+#   fab:      the name used in generated module names (bsg_rp_<fab>_...)
+#   clock:    the clock port name used by the dff generator
+#   cells:    cell templates, grouped by the generator that uses them
+#             (dff, mux, rf, reduce, gate_stack, mul, fifo_shift)
+#   variants: the hardened sizes referenced by hard/<pdk>/*/*.v
+#
+# and optionally the delay models of the timing driven generators
+# (rf_tree for the rf read muxes, mul_timing for the multiplier,
+# clk_gen_timing for the oscillator and delay line sweeps),
+# the area/delay estimates of fifo_shift_timing, and the oscillator
+# spice decks and corners of clk_spice.
+#
+# The <pdk> name is the directory under hard/ (e.g. tsmc_180_250);
+# the fab name (e.g. tsmc_250) is accepted as well.
+#
+
+from __future__ import print_function
+
+import json
+import os
+
+from bsg_netlist import compile_cell
+
+tech_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tech")
+
+# json gives unicode strings under python2
+def _str (x) :
+    if isinstance(x, dict) :
+        return dict((_str(k), _str(v)) for k, v in x.items())
+    if isinstance(x, list) :
+        return [_str(v) for v in x]
+    if x is None or isinstance(x, (str, bool, int, float)) :
+        return x
+    return str(x)
+
+
+class BsgTech(object):
+
+    # name:  pdk directory name, e.g. tsmc_40
+    # table: the parsed tech/<name>.json
+    def __init__(self, name, table):
+        self.name     = name
+        self.table    = table
+        self.fab      = table["fab"]
+        self.clock    = table.get("clock", "clk_i")
+        self.variants = table.get("variants", [])
+
+    def has_cell(self, group, name):
+        return name in self.table["cells"].get(group, {})
+
+    # compiled template for one cell of a generator's group
+    def cell(self, group, name, orient=True):
+        cells = self.table["cells"].get(group, {})
+        if name not in cells :
+            raise KeyError("no '" + group + "' cell '" + name + "' in tech " + self.name)
+        return compile_cell(cells[name], orient)
+
+    def cell_names(self, group):
+        return sorted(self.table["cells"].get(group, {}).keys())
+
+
+def tech_names () :
+    return sorted([f[:-len(".json")] for f in os.listdir(tech_dir) if f.endswith(".json")])
+
+_tech_cache = {}
+
+def load_tech (name) :
+    if name in _tech_cache :
+        return _tech_cache[name]
+
+    path = os.path.join(tech_dir, name + ".json")
+    if not os.path.exists(path) :
+        # accept the fab name used in module names, e.g. tsmc_250
+        for n in tech_names() :
+            if load_tech(n).fab == name :
+                _tech_cache[name] = _tech_cache[n]
+                return _tech_cache[n]
+        raise ValueError("unknown tech '" + name + "'; expected one of " + ", ".join(tech_names()))
+
+    with open(path) as f :
+        tech = BsgTech(name, _str(json.load(f)))
+    _tech_cache[name] = tech
+    return tech
+
+# expand a size list from a variant, e.g. [[1, 20], 29, 30] -> 1..20, 29, 30
+def expand_sizes (spec) :
+    if not isinstance(spec, list) :
+        spec = [spec]
+    sizes = []
+    for x in spec :
+        if isinstance(x, list) :
+            sizes.extend(range(x[0], x[1]+1))
+        else :
+            sizes.append(x)
+    return sizes
@@ -0,0 +1,20 @@
+#!/usr/bin/python
+#
+# bsg_mul_gen < width > [ pipeline stages ] [ tcl ]
+#
+# Generates a whole width x width booth multiplier, composed from the
+# booth_4, comp42 and and_csa blocks, with the pipeline registers placed
+# by the delays in the cell table. With tcl, prints the rp placement
+# proc instead of the netlist.
+#
+# The cells are in hard/common/bsg_rp_gen/tech/tsmc_180_250.json and the generator
+# itself is in hard/common/bsg_rp_gen/bsg_rp_mul.py.
+#
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../common/bsg_rp_gen"))
+from bsg_rp_mul import *
+
+mul_gen_main(load_tech("tsmc_180_250"), sys.argv)
@@ -0,0 +1,27 @@
+#!/usr/bin/python
+#
+# bsg_shift_gen_tsmc_28
+#
+# This script generates shift registers with deterministic naming, and placement directives.
+#
+# data_i:   input data
+# clock_i:  clock
+# data_o:   output data
+# sel_one_hot_i  :  one hot signal
+#           0 - recycle data
+#           1 - take data from previous node
+#           2 - take data from data_i
+#
+# The mux is NAND2s into a NAND3; the only real issue with that is hold time.
+#
+# The cells are in hard/common/bsg_rp_gen/tech/tsmc_28.json and the generator
+# itself is in hard/common/bsg_rp_gen/bsg_rp_fifo.py.
+#
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../common/bsg_rp_gen"))
+from bsg_rp_fifo import *
+
+fifo_shift_gen_main(load_tech("tsmc_28"), sys.argv)
@@ -11,42 +11,13 @@
 #
 #
 
-import sys;
+from __future__ import print_function
 
-def emit_module_header (name, input_args, output_args) :
-    print "module " + name + " (",
-    my_list = []
-    for x in input_args :
-        my_list.append("input "+x+"\n");
-    for x in output_args :
-        my_list.append("output "+x+"\n");
-    print (" "*(len(name)+8)+",").join(my_list);
+import os
+import sys
 
-    print ");";
-
-def emit_module_footer( ) :
-    print "endmodule";
-
-def emit_wire_definition (name) :
-    print "wire " + name + "; "
-
-def emit_wire_definition_nocr (name) :
-    print "wire " + name + "; ",
-
-def emit_gate_instance (gate_str, arg_list ) :
-    print gate_instance(gate_str,arg_list);
-
-def queue_gate_instance (out_dict, gate_str, arg_list, order) :
-    the_string = gate_instance(gate_str,arg_list)
-    out_dict[the_string] = order
-
-def gate_instance (gate_str, arg_list ) :
-    for i in range(0,len(arg_list)) :
-        gate_str = gate_str.replace("#"+str(i),arg_list[i]);
-    return gate_str;
-
-def access_bit (name, bit) :
-    return name + "[" + str(bit) + "]";
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../common/bsg_rp_gen"))
+from bsg_netlist import *
 
 def access_2D_bit (name, word,bit) :
     if (name == "SDN_i") :
@@ -63,39 +34,6 @@ def access_3D_bit (name, dof, word,bit) :
     else :
         return "error";
 
-def param_bits_all (name, bit) :
-    return "[" + str(bit-1) + ":0] " + name;
-
-def param_bits_2D_all (name, words,bit) :
-    return "["+str(words-1) + ":0][" + str(bit-1) + ":0] " + name;
-
-def param_bits_3D_all (name, words,bit,zop) :
-    return "["+str(words-1) + ":0][" + str(bit-1) + ":0]["+str(zop-1)+":0] " + name;
-
-def ident_name_word_bit (name,word,bit) :
-    return name + "_w" + str(word) + "_b" + str(bit);
-
-def ident_name_bit_port (name,bit,port) :
-    return name + "_b" + str(bit) + "_p" + str(port);
-
-def ident_name_word_bit_port (name,word,bit,port) :
-    return name + "_w" + str(word) + "_b" + str(bit) + "_p" + str(port);
-
-def ident_name_bit (name,bit) :
-    return name + "_b" + str(bit);
-
-
-def emit_rp_group_begin (name) :
-    print "// synopsys rp_group (" + name + ")"
-
-def emit_rp_group_end (name) :
-    print "// synopsys rp_endgroup (" + name +")"
-
-def emit_rp_fill (params):
-    print "// synopsys rp_fill (" + params +")"
-
-
-
 # NOTE: for symmetric pins, assume that earlier ones are always faster.
 # For example, for AOI22  A's are faster than B's and A0 is faster than A1.
 #
@@ -111,10 +49,10 @@ def emit_rp_fill (params):
 
 fab = "tsmc_40"
 
-aoi22 = "AOI22X1 #0 (.A0(#1), .A1(#2), .B0(#3), .B1(#4), .Y(#5)  );"
-xnor2 = "XNOR2X1 #0 (.A (#1), .B (#2), .Y (#3)                   );"
-xor2  = "XOR2X1  #0 (.A (#1), .B (#2), .Y (#3)                   );"
-addf  = "ADDFHX1 #0 (.A (#1), .B (#2), .CI (#3), .S(#4), .CO(#5) );"
+aoi22 = compile_cell("AOI22X1 #0 (.A0(#1), .A1(#2), .B0(#3), .B1(#4), .Y(#5)  );", orient=False)
+xnor2 = compile_cell("XNOR2X1 #0 (.A (#1), .B (#2), .Y (#3)                   );", orient=False)
+xor2  = compile_cell("XOR2X1  #0 (.A (#1), .B (#2), .Y (#3)                   );", orient=False)
+addf  = compile_cell("ADDFHX1 #0 (.A (#1), .B (#2), .CI (#3), .S(#4), .CO(#5) );", orient=False)
 
 
 #
@@ -138,24 +76,24 @@ def generate_booth_4_block ( rows ) :
 
     for pos in range (0,rows) :
 
-        print ""
-        print "wire " + ",".join([ident_name_word_bit("pp",pos,b) for b in range(0,4)])+";"
-        print "wire " + ",".join([ident_name_word_bit("aoi",pos,b) for b in range(0,4)])+";"
-        print "wire " + ",".join([ident_name_word_bit("cl",pos,b) for b in range(0,1)])+";"
-        print "wire " + ",".join([ident_name_word_bit("s0",pos,b) for b in range(0,1)])+";"
+        emit_line("")
+        emit_line("wire " + ",".join([ident_name_word_bit("pp",pos,b) for b in range(0,4)])+";")
+        emit_line("wire " + ",".join([ident_name_word_bit("aoi",pos,b) for b in range(0,4)])+";")
+        emit_line("wire " + ",".join([ident_name_word_bit("cl",pos,b) for b in range(0,1)])+";")
+        emit_line("wire " + ",".join([ident_name_word_bit("s0",pos,b) for b in range(0,1)])+";")
 
 
         emit_rp_fill("0 " + str(pos*2) + " RX");
 
         if (pos == 0) :
-            print "assign cl_o = 1'b0;"
+            emit_line("assign cl_o = 1'b0;")
 
         if (pos == 7) :
-            print "assign c_o[" + str(pos) + "] = 1'b0;"
-            print "assign s_o[" + str(pos) + "] = 1'b1;"
+            emit_line("assign c_o[" + str(pos) + "] = 1'b0;")
+            emit_line("assign s_o[" + str(pos) + "] = 1'b1;")
 
         if (pos == 6) :
-            print "assign c_o[" + str(pos) + "] = 1'b0;"
+            emit_line("assign c_o[" + str(pos) + "] = 1'b0;")
 
         #3
         if (pos < 7) :
@@ -260,12 +198,11 @@ def generate_booth_4_block ( rows ) :
                                    ]);
 
 
-
     emit_rp_group_end("b4b_end")
     emit_module_footer()
 
 if len(sys.argv) == 2 :
         generate_booth_4_block (int(sys.argv[1]));
 else :
-    print "Usage: " + sys.argv[0]
+    print("Usage: " + sys.argv[0])
 
@@ -3,13 +3,21 @@
 // note: this does a reduction
 //
 
+// unused inputs are tied to 1 for and, and 0 for or
 `define bsg_andr_macro(bits)                                 \
 if (harden_p && (width_p<=bits))                             \
   begin: macro                                               \
-     wire [bits-1:0] widen = bits ' (i);                     \
+     wire [bits-1:0] widen = ~(bits ' (~i));                 \
      bsg_rp_tsmc_40_reduce_and_b``bits andr(.i(widen),.o);  \
   end
 
+`define bsg_orr_macro(bits)                                  \
+if (harden_p && (width_p<=bits))                             \
+  begin: macro                                               \
+     wire [bits-1:0] widen = bits ' (i);                     \
+     bsg_rp_tsmc_40_reduce_or_b``bits orr(.i(widen),.o);    \
+  end
+
 module bsg_reduce #(parameter `BSG_INV_PARAM(width_p )
                   , parameter xor_p = 0
                   , parameter and_p = 0
@@ -43,6 +51,12 @@ module bsg_reduce #(parameter `BSG_INV_PARAM(width_p )
         `bsg_andr_macro(9) else
         `bsg_andr_macro(12) else
         `bsg_andr_macro(16) else
+        `bsg_andr_macro(24) else
+        `bsg_andr_macro(32) else
+        `bsg_andr_macro(48) else
+        `bsg_andr_macro(64) else
+        `bsg_andr_macro(128) else
+        `bsg_andr_macro(256) else
           begin: notmacro
              initial assert(harden_p==0) else $error("## %m unhandled bitstack case");
              assign o = &i;
@@ -50,8 +64,26 @@ module bsg_reduce #(parameter `BSG_INV_PARAM(width_p )
      end
    else if (or_p)
      begin: orr
-        initial assert(harden_p==0) else $error("## %m unhandled bitstack case");
-        assign o = |i;
+        if (width_p < 4)
+          begin: notmacro
+             assign o = |i;
+          end else
+        `bsg_orr_macro(4) else
+        `bsg_orr_macro(6) else
+        `bsg_orr_macro(8) else
+        `bsg_orr_macro(9) else
+        `bsg_orr_macro(12) else
+        `bsg_orr_macro(16) else
+        `bsg_orr_macro(24) else
+        `bsg_orr_macro(32) else
+        `bsg_orr_macro(48) else
+        `bsg_orr_macro(64) else
+        `bsg_orr_macro(128) else
+        `bsg_orr_macro(256) else
+          begin: notmacro
+             initial assert(harden_p==0) else $error("## %m unhandled bitstack case");
+             assign o = |i;
+          end
      end
 
 endmodule
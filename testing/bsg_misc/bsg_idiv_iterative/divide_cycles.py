@@ -0,0 +1,294 @@
+"""
+Cycle counts of bsg_idiv_iterative, as it is and with early termination
+
+    python3 divide_cycles.py --width 32 -n 1000000     # random operands
+    python3 divide_cycles.py --width 64 trace.txt      # operands from a trace
+    python3 divide_cycles.py --width 8 --check         # the model against the FSM
+
+The controller walks WAIT, NEG0, [NEG1], SHIFT, CALC x (width /
+bits_per_iter + 1), [REPAIR], REMAIN, [QUOT] and holds DONE until yumi_i,
+so an operation takes
+
+    latency = 4 + NEG1 + width / bits_per_iter + 1 + REPAIR + QUOT
+
+cycles from the one ready_and_o takes it in to v_o, 37 to 40 for 32 bits,
+one bit per iteration. NEG1 negates a negative signed dividend, QUOT the
+quotient when the signs differ (not for a divisor of 0), and REPAIR
+restores a negative last partial remainder, which non-restoring division
+leaves exactly when the quotient is even. Nothing skips leading zeros:
+the count depends on the operands only through those three states.
+
+The early-out variant is the "data detection logic" of the TODO in
+bsg_idiv_iterative.v. After NEG0/NEG1, --detect-cycles (1) extra cycles
+compare the leading zeros of the magnitudes; SHIFT then loads the
+partial remainder and the dividend pre-shifted past the quotient bits
+that must be 0, so CALC runs n = bits(|dividend|) - bits(|divisor|) + 1
+steps instead of width + 1: 1 + ceil((n - 1) / bits_per_iter) cycles,
+the last single step as now. n is 0 when |dividend| < |divisor| or the
+divisor is 0, and CALC and REPAIR are skipped.
+
+Both are modelled twice: simulate() steps the registers of the RTL one
+operation at a time, and latency() is the closed form above over numpy
+arrays. --check runs the first against the second and against the
+expected results of divide_stim.py. The report gives the mean, the range
+and the 99th percentile of the latency for each design over the
+operands, and the throughput of back to back operations, one per
+latency + 1 cycles with yumi_i the cycle v_o rises.
+
+A trace has one operation per line, the dividend and the divisor in hex
+as in divide_<width>.stim, and optionally s or u; lines without it count
+as --kind says, both being one signed and one unsigned operation each,
+as test_bsg.v issues them.
+"""
+
+from __future__ import print_function
+
+import argparse
+import sys
+
+import numpy as np
+
+import divide_stim
+
+def simulate(a, b, signed_div, width, bits_per_iter=1, early_out=False, detect_cycles=1):
+    """
+    (quotient, remainder, [state of each cycle]) of one operation on the
+    width-bit dividend a and divisor b, stepping the registers of
+    bsg_idiv_iterative and its controller from the cycle the request is
+    taken up to DONE
+    """
+    top = 1 << width
+    mask = (top << 1) - 1
+    neg = lambda v: bool(v & top)
+    ones = lambda flag: mask if flag else 0
+
+    # WAIT latches the operands, sign extended when signed
+    opA = (b | (top if signed_div and b >> (width - 1) else 0)) & mask
+    opC = (a | (top if signed_div and a >> (width - 1) else 0)) & mask
+    opB = 0
+    add1_neg_last = add2_neg_last = False
+    trace = ["WAIT"]
+    state = "NEG0"
+    calc_cnt = 0
+    calc_max = width // bits_per_iter
+    detect = "DETECT" if early_out and detect_cycles > 0 else "SHIFT"
+
+    while state != "DONE":
+        trace.append(state)
+        last = add2_neg_last if bits_per_iter == 2 else add1_neg_last
+        inv_a, cin, clr_a = not last, not last, True
+        inv_b, clr_b = False, True
+        if state == "NEG0":
+            inv_a, clr_b, cin = True, False, True
+        elif state in ("NEG1", "QUOT"):
+            clr_a, inv_b, cin = False, True, True
+        elif state == "SHIFT":
+            clr_a, clr_b, cin = False, False, False
+        elif state == "CALC" and bits_per_iter == 2 and calc_cnt == 0:
+            inv_a = cin = not add1_neg_last
+        elif state == "REPAIR":
+            inv_a, cin = False, False
+        elif state == "REMAIN":
+            clr_a, inv_b, cin = False, r_neg, r_neg
+        add1 = (((opA ^ ones(inv_a)) if clr_a else 0) + ((opB ^ ones(inv_b)) if clr_b else 0) + cin) & mask
+        add2 = 0
+        if bits_per_iter == 2:
+            add2 = ((opA ^ ones(not neg(add1))) + (((add1 << 1) | (opC >> width)) & mask)
+                    + (not neg(add1))) & mask
+
+        if state == "NEG0":
+            q_neg = (neg(opA) != neg(opC)) and signed_div
+            r_neg = neg(opC) and signed_div
+            if neg(opA) and signed_div:
+                opA = add1
+            opB = opC
+            next_state = "NEG1" if neg(opC) and signed_div else detect
+        elif state == "NEG1":
+            opC = add1
+            next_state = detect
+        elif state == "DETECT":
+            detect_cycles -= 1
+            next_state = "DETECT" if detect_cycles > 0 else "SHIFT"
+        elif state == "SHIFT":
+            next_state = "CALC"
+            if early_out:
+                steps = steps_needed(opC, opA)
+                if steps == 0:
+                    opB, opC = opC, mask if opA == 0 else 0
+                    next_state = "REMAIN"
+                else:
+                    calc_max = -(-(steps - 1) // bits_per_iter)
+                    steps = 1 + calc_max * bits_per_iter
+                    opB, opC = opC >> (steps - 1), (opC << (width + 2 - steps)) & mask
+            else:
+                opB, opC = opC >> width, ((opC << 1) | (not neg(add1))) & mask
+        elif state == "CALC":
+            done = calc_cnt == calc_max
+            if done:
+                opB = add1
+                opC = ((opC << 1) | (not neg(add1))) & mask
+                next_state = "REPAIR" if neg(add1) else "REMAIN"
+            elif bits_per_iter == 2:
+                opB = ((add2 << 1) | ((opC >> (width - 1)) & 1)) & mask
+                opC = ((opC << 2) | ((not neg(add1)) << 1) | (not neg(add2))) & mask
+            else:
+                opB = ((add1 << 1) | (opC >> width)) & mask
+                opC = ((opC << 1) | (not neg(add1))) & mask
+            calc_cnt = 0 if done else calc_cnt + 1
+            if not done:
+                next_state = "CALC"
+        elif state == "REPAIR":
+            opB = add1
+            next_state = "REMAIN"
+        elif state == "REMAIN":
+            next_state = "DONE" if opA == 0 or not q_neg else "QUOT"
+            opA, opB = add1, opC
+        elif state == "QUOT":
+            opC = add1
+            next_state = "DONE"
+        add1_neg_last, add2_neg_last = neg(add1), neg(add2)
+        state = next_state
+
+    return opC & (top - 1), opA & (top - 1), trace
+
+def steps_needed(dividend, divisor):
+    """the CALC steps of the early-out variant for the magnitudes given"""
+    if divisor == 0 or dividend < divisor:
+        return 0
+    return dividend.bit_length() - divisor.bit_length() + 1
+
+def bit_length(v):
+    """the bit length of each of the uint64 values v"""
+    v = v.copy()
+    length = np.zeros(v.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = v >= np.uint64(1 << shift)
+        length += np.where(big, shift, 0)
+        v = np.where(big, v >> np.uint64(shift), v)
+    return length + (v > 0)
+
+def latency(a, b, signed_div, width, bits_per_iter=1, early_out=False, detect_cycles=1):
+    """
+    the cycles from taking each operation to v_o, the operands uint64
+    arrays of width-bit values and signed_div a bool array
+    """
+    one = np.uint64(1)
+    sa, sb = divide_stim.signed(a, width), divide_stim.signed(b, width)
+    neg_a, neg_b = signed_div & (sa < 0), signed_div & (sb < 0)
+    ma = np.where(neg_a, ~sa.view(np.uint64) + one, a)
+    mb = np.where(neg_b, ~sb.view(np.uint64) + one, b)
+    zero = b == 0
+    even = (ma // np.where(zero, one, mb)) % np.uint64(2) == 0
+    if early_out:
+        steps = np.where(zero | (ma < mb), 0, bit_length(ma) - bit_length(mb) + 1)
+        calc = np.where(steps == 0, 0, 1 + -(-(steps - 1) // bits_per_iter))
+        repair = (steps > 0) & even
+        extra = detect_cycles
+    else:
+        calc = width // bits_per_iter + 1
+        repair = ~zero & even
+        extra = 0
+    quot = (neg_a ^ neg_b) & ~zero
+    return 4 + extra + neg_a + calc + repair + quot
+
+def read_trace(paths, width, kind):
+    """(dividends, divisors, signed) of the operations in the trace files"""
+    a, b, s = [], [], []
+    mask = (1 << width) - 1
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                fields = line.split()
+                if not fields or fields[0].startswith(("//", "#")):
+                    continue
+                dividend, divisor = int(fields[0], 16) & mask, int(fields[1], 16) & mask
+                flags = [fields[2] == "s"] if len(fields) > 2 else \
+                        {"signed": [True], "unsigned": [False], "both": [True, False]}[kind]
+                for flag in flags:
+                    a.append(dividend)
+                    b.append(divisor)
+                    s.append(flag)
+    return np.array(a, dtype=np.uint64), np.array(b, dtype=np.uint64), np.array(s, dtype=bool)
+
+def random_operations(width, count, kind, seed):
+    """(dividends, divisors, signed) of count random operations"""
+    a, b = divide_stim.random_inputs(width, count, seed)
+    if kind == "both":
+        return np.repeat(a, 2), np.repeat(b, 2), np.tile([True, False], count)
+    return a, b, np.full(count, kind == "signed")
+
+def check(width, kind, bits_per_iters, detect_cycles, count, seed):
+    """the number of operations where simulate() disagrees with latency() or the expected results"""
+    a, b = divide_stim.corners(width)
+    if count:
+        ra, rb = divide_stim.random_inputs(width, count, seed)
+        a, b = np.concatenate([a, ra]), np.concatenate([b, rb])
+    sq, sr, uq, ur = divide_stim.divide(a, b, width)
+    mask = np.uint64((1 << width) - 1)
+    sq, sr = sq.view(np.uint64) & mask, sr.view(np.uint64) & mask
+    wrong = 0
+    for signed_div in {"signed": [True], "unsigned": [False], "both": [True, False]}[kind]:
+        expected = list(zip(sq.tolist(), sr.tolist()) if signed_div else zip(uq.tolist(), ur.tolist()))
+        flags = np.full(len(a), signed_div)
+        for bits_per_iter in bits_per_iters:
+            for early_out in (False, True):
+                cycles = latency(a, b, flags, width, bits_per_iter, early_out, detect_cycles).tolist()
+                for i, (x, y) in enumerate(zip(a.tolist(), b.tolist())):
+                    q, r, trace = simulate(x, y, signed_div, width, bits_per_iter, early_out, detect_cycles)
+                    if (q, r) != expected[i] or len(trace) != cycles[i]:
+                        if not wrong:
+                            print("%s %x / %x, %d per iteration%s: %x rem %x in %d cycles, expected %x rem %x in %d"
+                                  % ("signed" if signed_div else "unsigned", x, y, bits_per_iter,
+                                     ", early out" if early_out else "", q, r, len(trace),
+                                     expected[i][0], expected[i][1], cycles[i]))
+                        wrong += 1
+    return wrong
+
+def report(a, b, signed_div, width, bits_per_iters, detect_cycles):
+    print("# %d operations, width %d, %d signed" % (len(a), width, int(signed_div.sum())))
+    print("%-9s %-10s %8s %5s %5s %5s %10s %8s" % ("bits/iter", "design", "mean", "min", "max", "p99",
+                                                  "ops/cycle", "speedup"))
+    for bits_per_iter in bits_per_iters:
+        base = None
+        for early_out in (False, True):
+            cycles = latency(a, b, signed_div, width, bits_per_iter, early_out, detect_cycles)
+            mean = float(cycles.mean())
+            base = base or mean + 1
+            print("%-9d %-10s %8.2f %5d %5d %5d %10.4f %7.2fx"
+                  % (bits_per_iter, "early-out" if early_out else "current", mean, cycles.min(), cycles.max(),
+                     np.percentile(cycles, 99), 1 / (mean + 1), base / (mean + 1)))
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Cycle counts of bsg_idiv_iterative with and without early termination")
+    parser.add_argument("trace", nargs="*", help="operations, one 'dividend divisor [s|u]' in hex per line")
+    parser.add_argument("--width", type=int, default=32)
+    parser.add_argument("--bits-per-iter", type=int, nargs="+", choices=(1, 2), default=[1, 2])
+    parser.add_argument("--kind", choices=("signed", "unsigned", "both"), default="both",
+                        help="the operations of trace lines without s or u, and of random ones")
+    parser.add_argument("-n", "--random", type=int,
+                        help="random operations without a trace (default 1M), or after the corner cases with --check")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--detect-cycles", type=int, default=1,
+                        help="what finding the leading zeros costs the early-out variant")
+    parser.add_argument("--check", action="store_true",
+                        help="simulate the corner cases and -n random operations instead")
+    args = parser.parse_args(argv)
+    if not 2 <= args.width <= 64:
+        parser.error("the width is 2 to 64 bits")
+    if args.width % 2 and 2 in args.bits_per_iter:
+        parser.error("two bits per iteration take an even width")
+
+    if args.check:
+        wrong = check(args.width, args.kind, args.bits_per_iter, args.detect_cycles,
+                      args.random or 0, args.seed)
+        print("%d mismatches" % wrong)
+        sys.exit(1 if wrong else 0)
+
+    if args.trace:
+        a, b, signed_div = read_trace(args.trace, args.width, args.kind)
+    else:
+        a, b, signed_div = random_operations(args.width, args.random or 1 << 20, args.kind, args.seed)
+    report(a, b, signed_div, args.width, args.bits_per_iter, args.detect_cycles)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
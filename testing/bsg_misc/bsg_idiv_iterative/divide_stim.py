@@ -0,0 +1,165 @@
+"""
+Stimulus and expected results for test_bsg.v in one pass
+
+    python3 divide_stim.py 4               # exhaustive, 256 inputs
+    python3 divide_stim.py 32 -n 10000000  # corner cases, then random ones
+    python3 divide_stim.py 64              # corner cases alone
+
+writes divide_<width>_gen.stim, the inputs test_bsg.v reads, and
+s_expected_gen.txt and u_expected_gen.txt, what make verify GEN=1
+compares the simulation against, so neither signed.c nor unsigned.c nor
+the get_stim PLI is needed. The _gen names keep the checked in
+divide_<width>.stim and expected files as they are. Widths up to 8 are exhaustive. Wider ones get every pair
+of the corner values (0, 1, -1, INT_MIN, INT_MAX, the powers of two and
+their neighbours, ...) and then -n random inputs, half of them with
+random leading zeros so that all quotient sizes come up. The division
+follows the RISC-V rules: a quotient of all ones and the dividend as the
+remainder for a divisor of 0, INT_MIN and 0 for INT_MIN / -1, and signed
+division truncates toward zero.
+
+The random inputs are drawn, divided and formatted in chunks across
+--jobs processes; each chunk seeds its own generator from --seed, so the
+files do not depend on the number of jobs. The simulation should run as
+many iterations as there are inputs, which is printed at the end:
+
+    make vcs SIGN=1 UNSIGN=1 WIDTH=32 GEN=1 ITERS=<inputs>
+"""
+
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+chunk_size = 1 << 20
+
+# make verify keeps the lines of the expected files with a digit in them,
+# so the header must have none
+HEADER = """// Dividend, divisor and the expected quotient and remainder of each
+// input of the stimulus file for the %s divider, according to
+// RISC-V standards; written by divide_stim.py
+"""
+
+def corner_values(width):
+    """the corner values of width bits as unsigned integers"""
+    top = (1 << width) - 1
+    values = set([0, 1, 2, 3, top, top - 1, top - 2])
+    for k in range(width):
+        p = 1 << k
+        values.update([p, p - 1, p + 1, -p, -p - 1, -p + 1])
+    half = 1 << (width - 1)
+    values.update([half, half - 1, half + 1, half - 2])
+    return sorted(set(v & top for v in values))
+
+def corners(width):
+    """(dividends, divisors) of every pair of inputs worth a look"""
+    if width <= 8:
+        values = np.arange(1 << width, dtype=np.uint64)
+    else:
+        values = np.array(corner_values(width), dtype=np.uint64)
+    # the dividend varies slowest, as in divide_4.stim
+    return np.repeat(values, len(values)), np.tile(values, len(values))
+
+def random_inputs(width, count, seed):
+    """(dividends, divisors) of count random inputs"""
+    rng = np.random.default_rng(seed)
+    pair = []
+    for _ in range(2):
+        v = rng.integers(0, 1 << width, size=count, dtype=np.uint64)
+        # drop a random number of leading bits from half of them
+        shift = rng.integers(0, width, size=count, dtype=np.uint64)
+        short = rng.random(count) < 0.5
+        v = np.where(short, v >> shift, v)
+        pair.append(v)
+    return tuple(pair)
+
+def signed(v, width):
+    """v, unsigned integers of width bits, as int64"""
+    shift = np.uint64(64 - width)
+    return (v << shift).view(np.int64) >> np.int64(64 - width)
+
+def divide(a, b, width):
+    """
+    (signed quotient, signed remainder, unsigned quotient, unsigned
+    remainder) of the unsigned width-bit dividends a and divisors b, the
+    signed ones as int64 and the unsigned ones as uint64
+    """
+    mask = np.uint64((1 << width) - 1)
+    zero = b == 0
+    one = np.uint64(1)
+    safe = np.where(zero, one, b)
+    uq = np.where(zero, mask, a // safe)
+    ur = np.where(zero, a, a % safe)
+
+    sa, sb = signed(a, width), signed(b, width)
+    # magnitudes as uint64, so that INT_MIN of 64 bits has one
+    neg_a, neg_b = sa < 0, sb < 0
+    ma = np.where(neg_a, ~sa.view(np.uint64) + one, sa.view(np.uint64))
+    mb = np.where(neg_b, ~sb.view(np.uint64) + one, sb.view(np.uint64))
+    mb = np.where(zero, one, mb)
+    mq, mr = ma // mb, ma % mb
+    q = np.where(neg_a ^ neg_b, ~mq + one, mq) & mask
+    r = np.where(neg_a, ~mr + one, mr) & mask
+    # INT_MIN / -1 overflows back to INT_MIN above
+    sq = np.where(zero, np.int64(-1), signed(q, width))
+    sr = np.where(zero, sa, signed(r, width))
+    return sq, sr, uq, ur
+
+def lines(a, b, width):
+    """(stimulus, signed expected, unsigned expected) text of the inputs"""
+    sq, sr, uq, ur = divide(a, b, width)
+    digits = (width + 3) // 4
+    hexa = "{:0%dx} {:0%dx}\n" % (digits, digits)
+    stim = "".join(map(hexa.format, a.tolist(), b.tolist()))
+    sa, sb = signed(a, width), signed(b, width)
+    s = "".join(map("{} {} {} {}\n".format, sa.tolist(), sb.tolist(), sq.tolist(), sr.tolist()))
+    u = "".join(map("{} {} {} {}\n".format, a.tolist(), b.tolist(), uq.tolist(), ur.tolist()))
+    return stim, s, u
+
+def random_chunk(job):
+    width, count, seed, index = job
+    a, b = random_inputs(width, count, [seed, index])
+    return lines(a, b, width)
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Stimulus and expected results for the bsg_idiv_iterative test")
+    parser.add_argument("width", type=int, help="the divider width, up to 64")
+    parser.add_argument("-n", "--random", type=int, default=0, help="random inputs after the corner cases")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default=".", help="where the three files go")
+    args = parser.parse_args(argv)
+    if not 2 <= args.width <= 64:
+        parser.error("the width is 2 to 64 bits")
+
+    stim_path = os.path.join(args.out, "divide_%d_gen.stim" % args.width)
+    files = [open(stim_path, "w"),
+             open(os.path.join(args.out, "s_expected_gen.txt"), "w"),
+             open(os.path.join(args.out, "u_expected_gen.txt"), "w")]
+    files[1].write(HEADER % "signed")
+    files[2].write(HEADER % "unsigned")
+
+    a, b = corners(args.width)
+    total = len(a)
+    for f, text in zip(files, lines(a, b, args.width)):
+        f.write(text)
+
+    jobs = [(args.width, min(chunk_size, args.random - start), args.seed, i)
+            for i, start in enumerate(range(0, args.random, chunk_size))]
+    pool = multiprocessing.Pool(args.jobs) if args.jobs > 1 and len(jobs) > 1 else None
+    for texts in (pool.imap(random_chunk, jobs) if pool else map(random_chunk, jobs)):
+        for f, text in zip(files, texts):
+            f.write(text)
+    if pool:
+        pool.close()
+    total += args.random
+
+    for f in files:
+        f.close()
+    print("%s: %d inputs, run with ITERS=%d" % (stim_path, total, total))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -19,6 +19,12 @@
 // `define ITERS 10000
 `endif
 
+// the inputs, as divide_stim.py writes them; with PLI defined, the
+// get_stim PLI of get_stim.c reads them instead
+`ifndef STIM
+`define STIM "divide_4.stim"
+`endif
+
 module test_bsg;
 
    reg div_req;
@@ -30,7 +36,7 @@ module test_bsg;
    reg reset;
    reg clk;
 
-   integer i, f1, f2, f3, f4;
+   integer i, f1, f2, f3, f4, stim;
 
    reg  [`WIDTH-1:0] dividend;
    reg  [`WIDTH-1:0] divisor;
@@ -67,14 +73,24 @@ module test_bsg;
    always  #10 clk = ~clk;
    
    initial #25 begin
+`ifdef PLI
       $init();
+`else
+      stim = $fopen(`STIM, "r");
+`endif
       f1 = $fopen("s_output.txt","w");
       f2 = $fopen("u_output.txt","w");
       f3 = $fopen("s.txt","w");
       f4 = $fopen("u.txt","w");
             
       for (i=0; i<`ITERS; i=i+1) begin
+`ifdef PLI
 	 $get_stim(dividend, divisor);
+`else
+	 // random inputs past the end of the file, as get_stim does
+	 if (stim == 0 || $fscanf(stim, "%h %h\n", dividend, divisor) != 2)
+	   {dividend, divisor} = {$urandom, $urandom, $urandom, $urandom};
+`endif
 
 	 // do the signed case
 	`ifdef SIGN
@@ -125,7 +141,12 @@ module test_bsg;
       $fclose(f3);
       $fclose(f4); 
 	   
+`ifdef PLI
       $done;
+`else
+      if (stim != 0)
+	$fclose(stim);
+`endif
       #80 $finish;
    end
 	      